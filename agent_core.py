@@ -6,10 +6,12 @@ Com auto-reconnect e tratamento de sessão expirada.
 import asyncio
 import base64
 import json
+import time
 import traceback
 import sys
 import os
 import importlib.util
+from array import array
 
 # CRITICAL: Force import of skills.py and memory.py files (not folders!)
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -25,16 +27,29 @@ def load_module_from_file(module_name, file_path):
 # Load skills.py and memory.py explicitly
 skills_module = load_module_from_file("skills_module", os.path.join(current_dir, "skills.py"))
 memory_module = load_module_from_file("memory_module", os.path.join(current_dir, "memory.py"))
+# Mesmo nome usado pelos imports de skills.py, para compartilhar o estado dos jobs
+job_manager = load_module_from_file("job_manager", os.path.join(current_dir, "job_manager.py"))
 
 from google import genai
 from google.genai import types
 
+import telemetry
+
+_MIC_ATE_ENVIO = telemetry.histograma(
+    "adk_audio_mic_ate_envio_segundos", "Do chunk lido no microfone até o envio ao Gemini",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+_PRIMEIRO_AUDIO = telemetry.histograma(
+    "adk_gemini_primeiro_audio_segundos", "Da última fala (ou texto) enviada ao primeiro áudio da resposta")
+_FILAS = telemetry.medidor("adk_fila_itens", "Itens em cada fila do AgentCore")
+_AUDIO_RECEBIDO = telemetry.contador("adk_gemini_audio_bytes_total", "Bytes de áudio recebidos do Gemini")
+
 
 class AgentCore:
     """Agente multimodal com Gemini Live API + auto-reconnect."""
 
     MAX_RECONNECT_ATTEMPTS = 10
     RECONNECT_DELAY = 3  # segundos
+    LIMIAR_VOZ = 500     # pico (PCM 16-bit) a partir do qual um chunk do mic conta como fala
 
     def __init__(self, api_key: str, on_text=None, on_status=None, on_skill_log=None):
         self.client = genai.Client(api_key=api_key)
@@ -42,6 +57,13 @@ class AgentCore:
         self.on_status = on_status or (lambda s: None)
         self.on_skill_log = on_skill_log or (lambda s: None)
 
+        # Skills longas (downloads, etc) reportam progresso no log de skills
+        skills_module.registrar_log_skill(self.on_skill_log)
+        # Jobs em segundo plano avisam a sessão quando terminam
+        job_manager.registrar_callback(self._on_job_concluido)
+        self._loop = None
+        self._avisos_pendentes = []
+
         self.session = None
         self.running = False
         self._session_alive = False
@@ -51,6 +73,15 @@ class AgentCore:
         self.screen_input_queue = asyncio.Queue(maxsize=2)
         self.audio_output_queue = asyncio.Queue()
 
+        # Telemetria (no-op com ADK_TELEMETRIA desligada)
+        _FILAS.definir_funcao(self.audio_input_queue.qsize, fila="audio_entrada")
+        _FILAS.definir_funcao(self.screen_input_queue.qsize, fila="tela_entrada")
+        _FILAS.definir_funcao(self.audio_output_queue.qsize, fila="audio_saida")
+        self._t_pedido = None        # perf_counter da última fala/texto enviado, até o primeiro áudio
+        self._origem_pedido = None
+        self._respondendo = False    # entre o primeiro áudio e o fim do turno do modelo
+        telemetry.iniciar()
+
         # Modelo
         self.model = "gemini-2.5-flash-native-audio-preview-12-2025"
 
@@ -92,6 +123,8 @@ class AgentCore:
             "12. Para gráficos/trading: use localizar_elemento com imagem da ferramenta como template\n"
             "13. Se não encontrar elemento, use detectar_texto_tela para ver TUDO na tela e ajustar busca\n"
             "14. Sempre confirme se encontrou o elemento ANTES de clicar (verificar 'encontrado': true)\n"
+            "15. Tarefas demoradas (downloads grandes, instalações, planejador, programador): use iniciar_job "
+            "e continue conversando; o resultado chega numa mensagem [SISTEMA] quando o job terminar\n"
         )
 
     def _build_system_instruction(self):
@@ -134,6 +167,7 @@ class AgentCore:
     async def run_with_reconnect(self):
         """Loop principal com auto-reconnect."""
         self.running = True
+        self._loop = asyncio.get_running_loop()
         attempt = 0
 
         while self.running and attempt < self.MAX_RECONNECT_ATTEMPTS:
@@ -186,6 +220,11 @@ class AgentCore:
             self.on_text("✅ Conectado! Fale ou digite suas mensagens.")
             print("[AgentCore] Sessão Live API conectada!")
 
+            # Jobs que terminaram enquanto a sessão estava caída
+            pendentes, self._avisos_pendentes = self._avisos_pendentes, []
+            for aviso in pendentes:
+                await self.send_text(aviso, salvar=False)
+
             try:
                 async with asyncio.TaskGroup() as tg:
                     tg.create_task(self._send_audio_loop())
@@ -205,8 +244,14 @@ class AgentCore:
         while self.running and self._session_alive:
             try:
                 msg = await asyncio.wait_for(self.audio_input_queue.get(), timeout=1.0)
+                capturado = msg.pop("capturado", None)
                 if self.session and self._session_alive:
                     await self.session.send_realtime_input(audio=msg)
+                    if capturado is not None and telemetry.ATIVO:
+                        agora = time.perf_counter()
+                        _MIC_ATE_ENVIO.observar(agora - capturado)
+                        if self._tem_voz(msg.get("data", b"")):
+                            self._marcar_pedido("voz", agora)
             except asyncio.TimeoutError:
                 continue
             except Exception as e:
@@ -255,6 +300,12 @@ class AgentCore:
                                     with open("audio_debug.log", "a", encoding='utf-8') as f:
                                         f.write(msg + "\n")
                                     self.audio_output_queue.put_nowait(part.inline_data.data)
+                                    self._respondendo = True
+                                    if self._t_pedido is not None:
+                                        _PRIMEIRO_AUDIO.observar(time.perf_counter() - self._t_pedido,
+                                                                 origem=self._origem_pedido)
+                                        self._t_pedido = None
+                                    _AUDIO_RECEBIDO.inc(len(part.inline_data.data))
                                     q_size = self.audio_output_queue.qsize()
                                     with open("audio_debug.log", "a", encoding='utf-8') as f:
                                         f.write(f"[DEBUG] Queue size after put: {q_size}\n")
@@ -268,8 +319,12 @@ class AgentCore:
 
                         # Interrupção
                         if response.server_content and response.server_content.interrupted:
+                            self._respondendo = False
                             while not self.audio_output_queue.empty():
                                 self.audio_output_queue.get_nowait()
+
+                        if response.server_content and response.server_content.turn_complete:
+                            self._respondendo = False
                     except Exception as inner_e:
                         print(f"[AgentCore] Erro processando: {inner_e}")
 
@@ -289,7 +344,9 @@ class AgentCore:
             self.on_skill_log(f"🔧 {nome}({json.dumps(params, ensure_ascii=False)[:200]})")
 
             try:
-                resultado = await asyncio.to_thread(skills_module.executar_skill, nome, params)
+                # to_thread copia o contexto: o span da skill vira filho deste
+                with telemetry.span("tool_call", skill=nome):
+                    resultado = await asyncio.to_thread(skills_module.executar_skill, nome, params)
                 self.on_skill_log(f"✅ {resultado[:300]}")
             except Exception as e:
                 resultado = json.dumps({"sucesso": False, "mensagem": str(e)})
@@ -310,8 +367,8 @@ class AgentCore:
                 print(f"[AgentCore] Erro tool response: {e}")
                 self._session_alive = False
 
-    async def send_text(self, text: str):
-        """Envia texto ao Gemini."""
+    async def send_text(self, text: str, salvar: bool = True):
+        """Envia texto ao Gemini (salvar=False para avisos internos, fora do histórico)."""
         if self.session and self._session_alive:
             try:
                 await self.session.send_client_content(
@@ -320,7 +377,10 @@ class AgentCore:
                         parts=[types.Part(text=text)]
                     )
                 )
-                memory_module.salvar_mensagem("user", text)
+                if telemetry.ATIVO:
+                    self._marcar_pedido("texto", time.perf_counter())
+                if salvar:
+                    memory_module.salvar_mensagem("user", text)
             except Exception as e:
                 self.on_text(f"⚠️ Sessão expirou. Reconectando...")
                 print(f"[AgentCore] Erro send_text: {e}")
@@ -328,6 +388,29 @@ class AgentCore:
         else:
             self.on_text("⚠️ Não conectado! Aguarde a reconexão ou clique INICIAR.")
 
+    def _tem_voz(self, pcm: bytes) -> bool:
+        amostras = array("h", pcm[:len(pcm) // 2 * 2])
+        return bool(amostras) and max(max(amostras), -min(amostras)) >= self.LIMIAR_VOZ
+
+    def _marcar_pedido(self, origem: str, instante: float):
+        """Início da medição de primeiro áudio. Fala durante a resposta (eco, barge-in) não reinicia."""
+        if not self._respondendo:
+            self._t_pedido = instante
+            self._origem_pedido = origem
+
+    def _on_job_concluido(self, job: dict):
+        """Chamado pela thread do job: leva o resultado para a sessão Live como um turno de texto."""
+        resultado = (job.get("resultado") or "")[:2000]
+        aviso = (
+            f"[SISTEMA] O job {job['id']} ({job['skill']}) terminou com estado '{job['estado']}'. "
+            f"Resultado: {resultado}\nInforme o usuário."
+        )
+        self.on_skill_log(f"📦 Job {job['id']} ({job['skill']}): {job['estado']}")
+        if self._loop and self.session and self._session_alive:
+            asyncio.run_coroutine_threadsafe(self.send_text(aviso, salvar=False), self._loop)
+        else:
+            self._avisos_pendentes.append(aviso)
+
     def stop(self):
         """Para o agente e previne reconexão."""
         self.running = False
@@ -4,9 +4,14 @@ Captura do microfone em 16-bit PCM 16kHz mono.
 Reproduz áudio de resposta a 24kHz.
 """
 
+import time
 import asyncio
 import pyaudio
 
+import telemetry
+
+_AUDIO_DESCARTADO = telemetry.contador("adk_audio_mic_descartado_total", "Chunks do microfone descartados com a fila cheia")
+
 
 class AudioCapture:
     """Gerencia entrada e saída de áudio com PyAudio."""
@@ -124,10 +129,12 @@ class AudioCapture:
                 )
                 # print(f"[DEBUG] Mic data read: {len(data)} bytes")
                 if not self.mic_muted:
-                    msg = {"data": data, "mime_type": "audio/pcm"}
+                    # "capturado" é retirado pelo AgentCore antes do envio (latência mic → envio)
+                    msg = {"data": data, "mime_type": "audio/pcm", "capturado": time.perf_counter()}
                     if queue.full():
                         try:
                             queue.get_nowait()
+                            _AUDIO_DESCARTADO.inc()
                         except asyncio.QueueEmpty:
                             pass
                     await queue.put(msg)
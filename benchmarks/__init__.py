@@ -0,0 +1,6 @@
+"""
+Benchmarks — Medições offline e reproduzíveis para o ADK Agent.
+Cada módulo roda com `python -m benchmarks.<nome>` a partir da raiz do projeto,
+grava um relatório JSON (benchmarks.relatorio) e, com --base, compara com um
+relatório anterior e sai com código 1 se algum p95 ou acurácia piorou além da tolerância.
+"""
@@ -0,0 +1,203 @@
+"""
+Relatório — Estatísticas, relatórios JSON e comparação entre execuções dos benchmarks.
+Todo relatório tem o formato {"benchmark", "ambiente", "config", "resultados"};
+qualquer dict dentro de "resultados" que tenha "p95" é um resumo de latência
+(resumir()) e qualquer um com "acuracia" (0-1) é uma medida de acerto: os dois
+entram na comparação com a base.
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import platform
+import threading
+import subprocess
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import psutil
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOLERANCIA_PADRAO = 0.20    # p95 até 20% pior não conta como regressão
+PISO_MS = 1.0               # diferenças abaixo disso são ruído de medição
+QUEDA_ACURACIA = 0.02       # acurácia até 2 pontos percentuais menor não conta como regressão
+INTERVALO_RSS = 0.005       # amostragem do RSS pelo PicoRSS
+MB = 1024 ** 2
+
+
+def garantir_raiz_no_path():
+    """Os benchmarks importam os módulos da raiz (agent_core, skills...) como o gui.py faz."""
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+
+
+def percentil(ordenados: List[float], q: float) -> float:
+    """Percentil com interpolação linear (q em 0-100) de uma lista já ordenada."""
+    if not ordenados:
+        return 0.0
+    pos = (len(ordenados) - 1) * q / 100
+    baixo, alto = math.floor(pos), math.ceil(pos)
+    return ordenados[baixo] + (ordenados[alto] - ordenados[baixo]) * (pos - baixo)
+
+
+def resumir(valores: Iterable[float], escala: float = 1000.0) -> Dict:
+    """n, média, p50/p95/p99, máximo e desvio padrão (jitter). Padrão: segundos → ms."""
+    ordenados = sorted(v * escala for v in valores)
+    n = len(ordenados)
+    if not n:
+        return {"n": 0}
+    media = sum(ordenados) / n
+    desvio = math.sqrt(sum((v - media) ** 2 for v in ordenados) / n)
+    return {
+        "n": n,
+        "media": round(media, 3),
+        "p50": round(percentil(ordenados, 50), 3),
+        "p95": round(percentil(ordenados, 95), 3),
+        "p99": round(percentil(ordenados, 99), 3),
+        "max": round(ordenados[-1], 3),
+        "desvio": round(desvio, 3),
+    }
+
+
+class PicoRSS:
+    """
+    Amostra o RSS do processo num thread enquanto o bloco `with` roda.
+    Depois: `pico_mb` (maior RSS visto) e `incremento_mb` (pico acima do RSS inicial).
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_RSS):
+        self.intervalo = intervalo
+        self._proc = psutil.Process()
+        self._parar = threading.Event()
+        self.pico_mb = self.incremento_mb = 0.0
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self._pico = max(self._pico, self._proc.memory_info().rss)
+
+    def __enter__(self):
+        self._inicio = self._pico = self._proc.memory_info().rss
+        self._thread = threading.Thread(target=self._amostrar, daemon=True, name="PicoRSS")
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        self._pico = max(self._pico, self._proc.memory_info().rss)
+        self.pico_mb = self._pico / MB
+        self.incremento_mb = (self._pico - self._inicio) / MB
+
+
+def _commit() -> str:
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                               capture_output=True, text=True, timeout=5)
+        return saida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def novo_relatorio(benchmark: str, config: Dict) -> Dict:
+    return {
+        "benchmark": benchmark,
+        "ambiente": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "commit": _commit(),
+        },
+        "config": config,
+        "resultados": {},
+    }
+
+
+def salvar(relatorio: Dict, caminho: str):
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"[Benchmark] Relatório salvo em {caminho}")
+
+
+def carregar(caminho: str) -> Dict:
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _medidas(dados: Dict, chave_medida: str, prefixo: Tuple[str, ...] = ()) -> Iterator[Tuple[str, Dict]]:
+    for chave, valor in dados.items():
+        if not isinstance(valor, dict):
+            continue
+        caminho = prefixo + (str(chave),)
+        if chave_medida in valor:
+            yield "/".join(caminho), valor
+        else:
+            yield from _medidas(valor, chave_medida, caminho)
+
+
+def comparar(atual: Dict, base: Dict, tolerancia: float = TOLERANCIA_PADRAO,
+             piso_ms: float = PISO_MS, queda_acuracia: float = QUEDA_ACURACIA) -> List[Dict]:
+    """
+    Resumos cujo p95 piorou mais que `tolerancia` (e mais que `piso_ms` em absoluto)
+    e medidas cuja acurácia caiu mais que `queda_acuracia`.
+    """
+    resultados, anteriores = atual.get("resultados", {}), base.get("resultados", {})
+    regressoes = []
+
+    antes = dict(_medidas(anteriores, "p95"))
+    for caminho, resumo in _medidas(resultados, "p95"):
+        anterior = antes.get(caminho)
+        if not anterior:
+            continue
+        a, b = anterior["p95"], resumo["p95"]
+        if b - a > piso_ms and b > a * (1 + tolerancia):
+            regressoes.append({"metrica": caminho, "medida": "p95", "base": a, "atual": b,
+                               "variacao": f"+{(b / a - 1) * 100:.0f}%" if a else "novo"})
+
+    antes = dict(_medidas(anteriores, "acuracia"))
+    for caminho, medida in _medidas(resultados, "acuracia"):
+        anterior = antes.get(caminho)
+        if not anterior or anterior["acuracia"] is None or medida["acuracia"] is None:
+            continue
+        a, b = anterior["acuracia"], medida["acuracia"]
+        if a - b > queda_acuracia:
+            regressoes.append({"metrica": caminho, "medida": "acuracia", "base": a, "atual": b,
+                               "variacao": f"-{(a - b) * 100:.1f} p.p."})
+    return regressoes
+
+
+def imprimir(titulo: str, resumos: Dict[str, Dict], unidade: str = "ms"):
+    """Tabela simples: uma linha por resumo, nas colunas n/p50/p95/p99/max/desvio."""
+    print(f"\n{titulo}")
+    print(f"{'':<28}{'n':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'desvio':>10}  ({unidade})")
+    for nome, r in resumos.items():
+        if not r.get("n"):
+            print(f"{nome:<28}{0:>7}")
+            continue
+        print(f"{nome:<28}{r['n']:>7}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['p99']:>10.2f}"
+              f"{r['max']:>10.2f}{r['desvio']:>10.2f}")
+
+
+def finalizar(relatorio: Dict, saida: str = None, base: str = None,
+              tolerancia: float = TOLERANCIA_PADRAO) -> int:
+    """Salva o relatório, compara com a base (se houver) e devolve o código de saída do CLI."""
+    if saida:
+        salvar(relatorio, saida)
+    if not base:
+        return 0
+    regressoes = comparar(relatorio, carregar(base), tolerancia)
+    relatorio["regressoes"] = regressoes
+    if saida:
+        salvar(relatorio, saida)
+    if not regressoes:
+        print(f"\n[Benchmark] Sem regressões em relação a {base} (tolerância {tolerancia:.0%})")
+        return 0
+    print(f"\n[Benchmark] {len(regressoes)} regressão(ões) em relação a {base}:")
+    for r in regressoes:
+        unidade = " ms" if r["medida"] == "p95" else ""
+        print(f"  {r['metrica']}: {r['medida']} {r['base']} → {r['atual']}{unidade} ({r['variacao']})")
+    return 1
@@ -0,0 +1,369 @@
+"""
+Skills Load — Micro-benchmark e carga das skills do ADK Agent.
+Carrega o skills.SKILLS_MAP e roda cada skill sem efeito colateral pelo
+executar_skill (o mesmo caminho do AgentCore), N vezes com C threads em
+paralelo, contra fixtures descartáveis: uma árvore de arquivos temporária, um
+servidor HTTP local e memórias sintéticas (notas, tarefas, aprendizados e
+conversas). Tudo que as skills gravariam em memoria/ (JSONs de memória,
+backups do file_editor, índice de arquivos) é redirecionado para o temporário.
+
+Por skill: vazão, latência p50/p95/p99, erros e pico de RSS. As skills de memória
+rodam uma chamada por vez (o memory.py regrava o JSON inteiro, sem lock). Se alguma
+skill der erro ou uma memória sintética deixar de ser JSON válido, o relatório sai
+marcado como inválido e o comando termina com código 1: os números mediriam o
+caminho de erro, não a skill.
+
+    python -m benchmarks.skills_load --iteracoes 200 --concorrencia 8 --saida memoria/benchmarks/skills.json
+    python -m benchmarks.skills_load --skills ler_arquivo,pesquisar_conteudo --base skills.json
+    python -m benchmarks.skills_load --listar
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import functools
+import tempfile
+import threading
+import contextlib
+import http.server
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from benchmarks import relatorio
+
+relatorio.garantir_raiz_no_path()
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+ESPERA_INDICE = 60          # segundos esperando o índice temporário ficar pronto
+PALAVRAS = ["agente", "memória", "tarefa", "arquivo", "rede", "backup", "relatório", "sessão",
+            "python", "gemini", "janela", "download", "processo", "configuração", "projeto"]
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Fixtures
+# ═══════════════════════════════════════════════════════════════════
+
+class _Silencioso(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Fixtures:
+    """Árvore de arquivos, servidor HTTP e memórias sintéticas dentro de `pasta`."""
+
+    def __init__(self, pasta: str, args, rng: random.Random):
+        self.pasta = pasta
+        self.raiz = os.path.join(pasta, "arvore")
+        self.saida = os.path.join(pasta, "saida")
+        self.memoria = os.path.join(pasta, "memoria")
+        self.web = os.path.join(pasta, "web")
+        for d in (self.raiz, self.saida, self.memoria, self.web):
+            os.makedirs(d, exist_ok=True)
+
+        self._criar_arvore(args.arquivos, rng)
+        self.grande = os.path.join(pasta, "grande.log")
+        self.linhas_grande = self._criar_grande(args.grande_mb, rng)
+        self.editaveis = []
+        for i in range(16):
+            caminho = os.path.join(self.saida, f"config_{i}.py")
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write("valor = 0\n" + "".join(f"opcao_{k} = {k}\n" for k in range(500)))
+            self.editaveis.append(caminho)
+        self._criar_memorias(args.memorias, rng)
+        self._criar_web(args.download_mb, rng)
+
+    def _criar_arvore(self, total: int, rng: random.Random):
+        """Pacotes de módulos .py com funções numeradas, mais .md/.txt (uns 20 arquivos por pasta)."""
+        for i in range(total):
+            pasta = os.path.join(self.raiz, f"pacote_{i // 20 // 10}", f"sub_{i // 20}")
+            os.makedirs(pasta, exist_ok=True)
+            if i % 5 == 4:
+                nome, conteudo = f"notas_{i}.md", "\n".join(" ".join(rng.choices(PALAVRAS, k=10)) for _ in range(40))
+            else:
+                nome = f"modulo_{i}.py"
+                conteudo = "".join(f"def funcao_{i}_{k}(x):\n    return x * {k}  # {rng.choice(PALAVRAS)}\n\n"
+                                   for k in range(30))
+            with open(os.path.join(pasta, nome), "w", encoding="utf-8") as f:
+                f.write(conteudo)
+
+    def _criar_grande(self, mb: float, rng: random.Random) -> int:
+        linhas = 0
+        with open(self.grande, "w", encoding="utf-8") as f:
+            while f.tell() < mb * 1024 ** 2:
+                linhas += 1
+                f.write(f"{linhas:08d} INFO {' '.join(rng.choices(PALAVRAS, k=8))}\n")
+        return linhas
+
+    def _criar_memorias(self, quantidade: int, rng: random.Random):
+        agora = datetime.now().isoformat()
+
+        def texto(palavras: int) -> str:
+            return " ".join(rng.choices(PALAVRAS, k=palavras))
+
+        stores = {
+            "notas.json": [{"id": i + 1, "titulo": texto(3), "conteudo": texto(40), "criada_em": agora}
+                           for i in range(quantidade)],
+            "tarefas.json": [{"id": i + 1, "descricao": texto(8), "concluida": i % 3 == 0, "criada_em": agora}
+                             for i in range(quantidade)],
+            "aprendizados.json": [{"id": i + 1, "conteudo": texto(30), "fonte": "benchmark", "criada_em": agora}
+                                  for i in range(quantidade)],
+            "conversas.json": [{"role": ("user", "agent")[i % 2], "conteudo": texto(25), "timestamp": agora}
+                               for i in range(200)],
+        }
+        for nome, dados in stores.items():
+            with open(os.path.join(self.memoria, nome), "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False)
+        self.memorias = quantidade
+
+    def memorias_invalidas(self) -> List[str]:
+        """Stores de memória que não são mais JSON válido (o memory.py lê como [] e segue)."""
+        invalidas = []
+        for nome in sorted(os.listdir(self.memoria)):
+            try:
+                with open(os.path.join(self.memoria, nome), "r", encoding="utf-8") as f:
+                    json.load(f)
+            except (OSError, ValueError):
+                invalidas.append(nome)
+        return invalidas
+
+    def _criar_web(self, download_mb: float, rng: random.Random):
+        paragrafos = "".join(f"<p>{' '.join(rng.choices(PALAVRAS, k=60))}</p>\n" for _ in range(300))
+        with open(os.path.join(self.web, "pagina.html"), "w", encoding="utf-8") as f:
+            f.write("<html><head><title>Página de teste</title><style>p{margin:0}</style></head><body>"
+                    "<header>menu</header><nav>links</nav><script>var x = 1;</script>"
+                    f"<main>{paragrafos}</main><footer>rodapé</footer></body></html>")
+        with open(os.path.join(self.web, "arquivo.bin"), "wb") as f:
+            f.write(rng.randbytes(int(download_mb * 1024 ** 2)))
+
+    @contextlib.contextmanager
+    def servidor(self):
+        """Servidor HTTP local (porta livre) servindo a pasta web; define self.url."""
+        servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Silencioso, directory=self.web))
+        thread = threading.Thread(target=servidor.serve_forever, daemon=True, name="SkillsLoadHTTP")
+        thread.start()
+        self.url = f"http://127.0.0.1:{servidor.server_address[1]}"
+        try:
+            yield self
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+
+
+@contextlib.contextmanager
+def _redirecionar_estado(skills, fx: Fixtures, usar_indice: bool):
+    """Troca os caminhos de estado em memoria/ pelos do temporário enquanto o benchmark roda."""
+    import file_editor
+    import file_index
+    trocas = [(file_editor, "PASTA_BACKUPS", os.path.join(fx.pasta, "backups"))]
+    for nome, arquivo in (("CONVERSAS_FILE", "conversas.json"), ("NOTAS_FILE", "notas.json"),
+                          ("TAREFAS_FILE", "tarefas.json"), ("APRENDIZADOS_FILE", "aprendizados.json")):
+        trocas.append((skills._memory_module, nome, os.path.join(fx.memoria, arquivo)))
+
+    if file_index.indice_carregado() is not None:
+        raise SystemExit("[SkillsLoad] O índice de arquivos já foi criado neste processo")
+    indice = file_index.IndiceArquivos(os.path.join(fx.pasta, "indice.db")) if usar_indice else None
+    trocas.append((file_index, "_indice", indice))
+
+    originais = [(modulo, nome, getattr(modulo, nome)) for modulo, nome, _ in trocas]
+    ambiente = os.environ.get("ADK_INDEX")
+    try:
+        for modulo, nome, valor in trocas:
+            setattr(modulo, nome, valor)
+        if not usar_indice:
+            os.environ["ADK_INDEX"] = "0"
+        yield indice
+    finally:
+        for modulo, nome, valor in originais:
+            setattr(modulo, nome, valor)
+        if ambiente is None:
+            os.environ.pop("ADK_INDEX", None)
+        else:
+            os.environ["ADK_INDEX"] = ambiente
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Casos (só skills sem efeito fora das fixtures)
+# ═══════════════════════════════════════════════════════════════════
+
+# nome da skill → params(fixtures, iteração). Skills do SKILLS_MAP fora daqui
+# (comandos, processos, mouse/teclado, tela, internet real, LLM, jobs) não rodam.
+CASOS: Dict[str, Callable[[Fixtures, int], Dict]] = {
+    "ler_arquivo": lambda fx, i: {"caminho": fx.grande,
+                                  "linha_inicio": (i * 7919) % max(1, fx.linhas_grande - 100) + 1,
+                                  "linha_fim": (i * 7919) % max(1, fx.linhas_grande - 100) + 100},
+    "listar_arquivos": lambda fx, i: {"diretorio": os.path.join(fx.raiz, f"pacote_{i % 2}"), "padrao": "*"},
+    "pesquisar_arquivos": lambda fx, i: {"diretorio": fx.raiz, "termo": f"modulo_{i % 100}", "extensoes": ".py"},
+    "pesquisar_conteudo": lambda fx, i: {"diretorio": fx.raiz, "texto": f"def funcao_{i % 100}_7(", "extensao": ".py"},
+    "criar_arquivo": lambda fx, i: {"caminho": os.path.join(fx.saida, f"novo_{i % 64}.txt"), "conteudo": "x" * 4096},
+    "editar_arquivo": lambda fx, i: {"caminho": fx.editaveis[i % len(fx.editaveis)], "texto_antigo": r"valor = -?\d+",
+                                     "texto_novo": f"valor = {i}", "regex": True},
+    "info_sistema": lambda fx, i: {},
+    "listar_processos": lambda fx, i: {"ordenar_por": "memoria"},
+    "ler_pagina_web": lambda fx, i: {"url": f"{fx.url}/pagina.html"},
+    "baixar_arquivo": lambda fx, i: {"url": f"{fx.url}/arquivo.bin",
+                                     "destino": os.path.join(fx.saida, f"download_{i % 64}.bin"), "conexoes": 1},
+    "salvar_nota": lambda fx, i: {"titulo": f"benchmark {i}", "conteudo": "nota sintética " * 20},
+    "buscar_notas": lambda fx, i: {"termo": PALAVRAS[i % len(PALAVRAS)]},
+    "listar_notas": lambda fx, i: {},
+    "salvar_tarefa": lambda fx, i: {"descricao": f"tarefa sintética {i}"},
+    "concluir_tarefa": lambda fx, i: {"tarefa_id": i % fx.memorias + 1},
+    "listar_tarefas": lambda fx, i: {},
+    "salvar_aprendizado": lambda fx, i: {"conteudo": f"aprendizado sintético {i}", "fonte": "benchmark"},
+    "buscar_aprendizados": lambda fx, i: {"termo": PALAVRAS[i % len(PALAVRAS)]},
+    "historico_conversa": lambda fx, i: {"quantidade": 50},
+}
+
+# Leem/regravam os JSONs de memória: em paralelo uma gravação pega a outra no meio
+CASOS_MEMORIA = {"salvar_nota", "buscar_notas", "listar_notas", "salvar_tarefa", "concluir_tarefa",
+                 "listar_tarefas", "salvar_aprendizado", "buscar_aprendizados", "historico_conversa"}
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Execução
+# ═══════════════════════════════════════════════════════════════════
+
+def _chamar(executar_skill, nome: str, params: Dict):
+    """(segundos, mensagem de erro ou None) de uma chamada pelo executar_skill."""
+    inicio = time.perf_counter()
+    saida = executar_skill(nome, params)
+    duracao = time.perf_counter() - inicio
+    try:
+        resultado = json.loads(saida)
+    except (TypeError, ValueError):
+        return duracao, None
+    if isinstance(resultado, dict) and resultado.get("sucesso") is False:
+        return duracao, str(resultado.get("mensagem") or resultado.get("erro") or "sucesso=false")[:200]
+    return duracao, None
+
+
+def medir_skill(executar_skill, nome: str, fx: Fixtures, iteracoes: int, concorrencia: int,
+                aquecimento: int) -> Dict:
+    caso = CASOS[nome]
+    primeira, erro_aquecimento = None, None
+    for i in range(aquecimento):
+        duracao, erro = _chamar(executar_skill, nome, caso(fx, -1 - i))
+        primeira = duracao if primeira is None else primeira
+        erro_aquecimento = erro_aquecimento or erro
+
+    latencias: List[float] = []
+    erros: List[str] = []
+    with relatorio.PicoRSS() as rss, ThreadPoolExecutor(max_workers=concorrencia) as pool:
+        inicio = time.perf_counter()
+        for duracao, erro in pool.map(lambda i: _chamar(executar_skill, nome, caso(fx, i)), range(iteracoes)):
+            latencias.append(duracao)
+            if erro:
+                erros.append(erro)
+        total = time.perf_counter() - inicio
+
+    return {
+        "latencia": relatorio.resumir(latencias),
+        "vazao_por_s": round(iteracoes / total, 1) if total else None,
+        "chamadas": iteracoes,
+        "concorrencia": concorrencia,
+        "erros": len(erros),
+        "erro_aquecimento": erro_aquecimento,
+        "primeiro_erro": erros[0] if erros else erro_aquecimento,
+        "primeira_chamada_ms": round(primeira * 1000, 2) if primeira is not None else None,
+        "pico_rss_mb": round(rss.pico_mb, 1),
+        "incremento_rss_mb": round(rss.incremento_mb, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Vazão, latência e RSS das skills sem efeito colateral")
+    parser.add_argument("--skills", help="lista separada por vírgula (padrão: todos os casos)")
+    parser.add_argument("--listar", action="store_true", help="mostra quais skills têm caso e quais ficam de fora")
+    parser.add_argument("--iteracoes", type=int, default=100)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--aquecimento", type=int, default=2, help="chamadas fora da medição (cache frio, imports)")
+    parser.add_argument("--arquivos", type=int, default=2000, help="arquivos na árvore temporária")
+    parser.add_argument("--grande-mb", type=float, default=20, help="tamanho do arquivo de log lido por ler_arquivo")
+    parser.add_argument("--download-mb", type=float, default=2)
+    parser.add_argument("--memorias", type=int, default=500, help="notas, tarefas e aprendizados sintéticos")
+    parser.add_argument("--sem-indice", action="store_true", help="ADK_INDEX=0: buscas por os.walk")
+    parser.add_argument("--semente", type=int, default=7)
+    parser.add_argument("--saida", help="arquivo JSON do relatório")
+    parser.add_argument("--base", help="relatório anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=relatorio.TOLERANCIA_PADRAO)
+    parser.add_argument("--verbose", action="store_true", help="mostra os prints das skills")
+    args = parser.parse_args(argv)
+
+    saida = sys.stdout if args.verbose else open(os.devnull, "w", encoding="utf-8")
+    with contextlib.redirect_stdout(saida):
+        import skills
+    disponiveis = [n for n in skills.SKILLS_MAP if n in CASOS]
+    sem_caso = sorted(n for n in skills.SKILLS_MAP if n not in CASOS)
+    if args.listar:
+        print(f"Com caso ({len(disponiveis)}): {', '.join(disponiveis)}")
+        print(f"Fora ({len(sem_caso)}): {', '.join(sem_caso)}")
+        return 0
+    escolhidas = disponiveis
+    if args.skills:
+        pedidas = [n.strip() for n in args.skills.split(",") if n.strip()]
+        desconhecidas = [n for n in pedidas if n not in disponiveis]
+        if desconhecidas:
+            print(f"[SkillsLoad] Sem caso seguro para: {', '.join(desconhecidas)} (veja --listar)")
+            return 2
+        escolhidas = pedidas
+
+    resultados = {"skills": {}, "sem_caso": sem_caso}
+    with tempfile.TemporaryDirectory(prefix="adk_skills_", ignore_cleanup_errors=True) as tmp:
+        print(f"[SkillsLoad] Criando fixtures em {tmp}...")
+        fx = Fixtures(tmp, args, random.Random(args.semente))
+        with fx.servidor(), _redirecionar_estado(skills, fx, not args.sem_indice) as indice:
+            if indice:
+                indice.adicionar_raiz(fx.raiz, explicita=True)
+                limite = time.time() + ESPERA_INDICE
+                while not indice.raiz_pronta(fx.raiz) and time.time() < limite:
+                    time.sleep(0.1)
+                resultados["indice"] = {"pronto": indice.raiz_pronta(fx.raiz), **indice.estatisticas()}
+            for nome in escolhidas:
+                concorrencia = 1 if nome in CASOS_MEMORIA else args.concorrencia
+                print(f"[SkillsLoad] {nome}: {args.iteracoes} chamadas, {concorrencia} em paralelo")
+                with contextlib.redirect_stdout(saida):
+                    r = medir_skill(skills.executar_skill, nome, fx, args.iteracoes,
+                                    concorrencia, args.aquecimento)
+                if nome in CASOS_MEMORIA:
+                    r["memorias_invalidas"] = fx.memorias_invalidas()
+                resultados["skills"][nome] = r
+            if indice:
+                indice.pausar()
+    if saida is not sys.stdout:
+        saida.close()
+
+    problemas = [f"{nome}: {r['erros']} erros" for nome, r in resultados["skills"].items() if r["erros"]]
+    problemas += [f"{nome}: erro no aquecimento" for nome, r in resultados["skills"].items()
+                  if r["erro_aquecimento"] and not r["erros"]]
+    problemas += [f"{nome}: {', '.join(r['memorias_invalidas'])} corrompido(s)"
+                  for nome, r in resultados["skills"].items() if r.get("memorias_invalidas")]
+
+    config = {k: v for k, v in vars(args).items() if k not in ("saida", "base", "listar", "verbose")}
+    rel = relatorio.novo_relatorio("skills_load", config)
+    rel["resultados"] = resultados
+    rel["valido"] = not problemas
+    rel["problemas"] = problemas
+    relatorio.imprimir("Latência por chamada", {n: r["latencia"] for n, r in resultados["skills"].items()})
+    print(f"\n{'':<28}{'vazão/s':>10}{'erros':>8}{'pico RSS MB':>14}{'+RSS MB':>10}")
+    for nome, r in resultados["skills"].items():
+        print(f"{nome:<28}{r['vazao_por_s']:>10}{r['erros']:>8}{r['pico_rss_mb']:>14}{r['incremento_rss_mb']:>10}")
+        if r["primeiro_erro"]:
+            print(f"{'':<28}↳ {r['primeiro_erro']}")
+    codigo = relatorio.finalizar(rel, args.saida, args.base, args.tolerancia)
+    if problemas:
+        print("\n[SkillsLoad] Relatório inválido (as latências medem o caminho de erro):")
+        for problema in problemas:
+            print(f"  {problema}")
+        return 1
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
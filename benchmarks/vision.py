@@ -0,0 +1,446 @@
+"""
+Vision — Benchmark offline de latência, memória e acerto do vision_utils.
+Roda detectar_texto_tela, encontrar_texto e localizar_elemento_visual sobre um
+corpus de screenshots salvos (capturar_tela_cv é trocado pelo quadro do disco,
+sem mss nem monitor) e confere contra o gabarito de textos e elementos.
+
+Corpus: uma pasta com manifesto.json, os quadros e os templates.
+    {"quadros": [{"arquivo": "quadros/x.png", "escala": 1.25,
+                  "textos": [{"texto": "Salvar", "bbox": [x1, y1, x2, y2]}],
+                  "elementos": [{"template": "templates/fechar.png", "bbox": [x1, y1, x2, y2]}],
+                  "ausentes": ["templates/pasta.png"]}]}
+Coordenadas em pixels físicos do quadro; "ausentes" são templates que não estão
+na tela (um "encontrado" neles é falso positivo). Screenshots reais entram no
+mesmo manifesto; --gerar-corpus cria um corpus sintético determinístico em
+várias resoluções e escalas de DPI (os templates são recortados a 100%).
+
+    python -m benchmarks.vision --gerar-corpus
+    python -m benchmarks.vision --repeticoes 3 --saida memoria/benchmarks/visao.json [--base anterior.json]
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import difflib
+import argparse
+import contextlib
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import psutil
+
+from benchmarks import relatorio
+
+relatorio.garantir_raiz_no_path()
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+CORPUS_PADRAO = os.path.join(relatorio.RAIZ, "memoria", "benchmarks", "corpus_visao")
+MANIFESTO = "manifesto.json"
+LIMIAR_SIMILARIDADE = 0.8       # texto lido x gabarito (difflib) para contar como acerto
+LIMIAR_IOU = 0.5                # caixa do elemento encontrado x gabarito
+
+# (resolução física, escala de DPI): a tela lógica é resolução / escala
+CENARIOS = [
+    (1366, 768, 1.0),
+    (1920, 1080, 1.0),
+    (1920, 1080, 1.25),
+    (2560, 1440, 1.5),
+    (2880, 1800, 2.0),
+]
+ICONES = ("fechar", "engrenagem", "pasta")
+TAMANHO_ICONE = 24              # px lógicos
+FUNDO_BARRA = (230, 232, 236)
+FONTES = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "C:\\Windows\\Fonts\\segoeui.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+]
+TITULOS = ["Relatório mensal — Planilha", "Configurações do sistema", "Caixa de entrada (12)",
+           "Projeto agente-pessoal", "Gerenciador de arquivos"]
+MENUS = ["Arquivo", "Editar", "Exibir", "Inserir", "Formatar", "Ferramentas", "Ajuda"]
+ITENS_LATERAIS = ["Início", "Documentos", "Downloads", "Imagens", "Música", "Vídeos",
+                  "Área de Trabalho", "Lixeira", "Rede", "Favoritos", "Recentes", "Nuvem"]
+BOTOES = ["Salvar", "Cancelar", "Abrir", "Enviar", "Próximo", "Voltar", "Concluir",
+          "Pesquisar", "Atualizar", "Sincronizar", "Exportar", "Imprimir"]
+PALAVRAS = ["conexão", "estável", "arquivo", "salvo", "sessão", "usuário", "tarefa", "pendente",
+            "relatório", "gerado", "backup", "concluído", "memória", "disponível", "atualização",
+            "instalada", "processo", "iniciado", "rede", "configurada", "erro", "corrigido",
+            "janela", "aberta", "download", "agendado", "senha", "alterada", "dados", "exportados"]
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Corpus sintético
+# ═══════════════════════════════════════════════════════════════════
+
+def _fonte(tamanho: int):
+    from PIL import ImageFont
+    for caminho in FONTES:
+        if os.path.exists(caminho):
+            return ImageFont.truetype(caminho, tamanho)
+    return ImageFont.load_default(size=tamanho)
+
+
+def _desenhar_icone(draw, nome: str, x: int, y: int, lado: int):
+    if nome == "fechar":
+        draw.ellipse([x, y, x + lado - 1, y + lado - 1], fill=(220, 60, 60))
+        m, largura = lado // 4, max(2, lado // 8)
+        draw.line([x + m, y + m, x + lado - 1 - m, y + lado - 1 - m], fill="white", width=largura)
+        draw.line([x + m, y + lado - 1 - m, x + lado - 1 - m, y + m], fill="white", width=largura)
+    elif nome == "engrenagem":
+        cx, cy, r = x + lado / 2, y + lado / 2, lado / 2 - 0.5
+        pontos = [(cx + (r if k % 2 == 0 else r * 0.7) * math.cos(math.pi * k / 8),
+                   cy + (r if k % 2 == 0 else r * 0.7) * math.sin(math.pi * k / 8)) for k in range(16)]
+        draw.polygon(pontos, fill=(90, 90, 100))
+        draw.ellipse([cx - r * 0.3, cy - r * 0.3, cx + r * 0.3, cy + r * 0.3], fill=FUNDO_BARRA)
+    elif nome == "pasta":
+        aba = lado // 3
+        draw.rectangle([x, y + lado // 6, x + lado // 2, y + lado // 6 + aba], fill=(214, 160, 40))
+        draw.rectangle([x, y + lado // 3, x + lado - 1, y + lado - 1 - lado // 8],
+                       fill=(240, 190, 60), outline=(214, 160, 40))
+
+
+def _escrever(draw, textos: List[Dict], x: int, y: int, texto: str, fonte, cor):
+    draw.text((x, y), texto, font=fonte, fill=cor)
+    textos.append({"texto": texto, "bbox": [int(v) for v in draw.textbbox((x, y), texto, font=fonte)]})
+
+
+def _gerar_quadro(largura: int, altura: int, escala: float, rng: random.Random, ausente: Optional[str]):
+    """Janela de aplicativo: barra de título, menu com ícones, barra lateral, botões e linhas de texto."""
+    from PIL import Image, ImageDraw
+
+    def P(v: float) -> int:
+        return int(round(v * escala))
+
+    lw, lh = largura / escala, altura / escala
+    img = Image.new("RGB", (largura, altura), (245, 246, 248))
+    draw = ImageDraw.Draw(img)
+    textos, elementos = [], []
+
+    draw.rectangle([0, 0, largura, P(30)], fill=(40, 44, 52))
+    _escrever(draw, textos, P(12), P(7), rng.choice(TITULOS), _fonte(P(14)), (255, 255, 255))
+
+    draw.rectangle([0, P(30), largura, P(66)], fill=FUNDO_BARRA)
+    x, fonte = P(12), _fonte(P(13))
+    for menu in MENUS:
+        _escrever(draw, textos, x, P(40), menu, fonte, (30, 30, 30))
+        x = draw.textbbox((x, P(40)), menu, font=fonte)[2] + P(18)
+    for i, nome in enumerate(ICONES):
+        if nome == ausente:
+            continue
+        ix, iy, lado = P(lw - 44 * (i + 1)), P(36), P(TAMANHO_ICONE)
+        _desenhar_icone(draw, nome, ix, iy, lado)
+        elementos.append({"template": f"templates/{nome}.png", "bbox": [ix, iy, ix + lado, iy + lado]})
+
+    draw.rectangle([0, P(66), P(200), altura], fill=(236, 238, 242))
+    fonte = _fonte(P(13))
+    for i, item in enumerate(ITENS_LATERAIS):
+        y = 84 + 34 * i
+        if y + 20 > lh:
+            break
+        _escrever(draw, textos, P(20), P(y), item, fonte, (50, 50, 60))
+
+    # Corpo: linhas de texto e botões em grade, sem sobreposição
+    colunas = max(1, int((lw - 240) // 260))
+    linhas = max(1, int((lh - 100) // 56))
+    for c in range(colunas):
+        for l in range(linhas):
+            if rng.random() < 0.35:
+                continue
+            x, y = P(230 + 260 * c), P(90 + 56 * l)
+            if rng.random() < 0.3:
+                rotulo = rng.choice(BOTOES)
+                fonte = _fonte(P(13))
+                caixa = draw.textbbox((0, 0), rotulo, font=fonte)
+                draw.rounded_rectangle([x, y, x + caixa[2] + P(28), y + P(32)], radius=P(6), fill=(52, 120, 246))
+                _escrever(draw, textos, x + P(14), y + P(8), rotulo, fonte, (255, 255, 255))
+            else:
+                frase = " ".join(rng.sample(PALAVRAS, rng.randint(2, 4)))
+                _escrever(draw, textos, x, y, frase, _fonte(P(rng.choice((12, 14, 16)))), (40, 40, 40))
+    return img, textos, elementos
+
+
+def gerar_corpus(pasta: str, semente: int = 7) -> Dict:
+    """Escreve quadros, templates (recortados a 100% de escala) e manifesto.json em `pasta`."""
+    from PIL import Image, ImageDraw
+    rng = random.Random(semente)
+    os.makedirs(os.path.join(pasta, "quadros"), exist_ok=True)
+    os.makedirs(os.path.join(pasta, "templates"), exist_ok=True)
+
+    borda = 3
+    for nome in ICONES:
+        tpl = Image.new("RGB", (TAMANHO_ICONE + 2 * borda,) * 2, FUNDO_BARRA)
+        _desenhar_icone(ImageDraw.Draw(tpl), nome, borda, borda, TAMANHO_ICONE)
+        tpl.save(os.path.join(pasta, "templates", f"{nome}.png"))
+
+    quadros = []
+    for i, (largura, altura, escala) in enumerate(CENARIOS):
+        ausente = ICONES[i % len(ICONES)] if i % 2 else None
+        img, textos, elementos = _gerar_quadro(largura, altura, escala, rng, ausente)
+        # O template tem borda: o gabarito é a caixa do ícone com a mesma borda
+        for elemento in elementos:
+            b = int(round(borda * escala))
+            x1, y1, x2, y2 = elemento["bbox"]
+            elemento["bbox"] = [x1 - b, y1 - b, x2 + b, y2 + b]
+        arquivo = f"quadros/janela_{largura}x{altura}@{int(escala * 100)}.png"
+        img.save(os.path.join(pasta, arquivo))
+        quadros.append({"arquivo": arquivo, "escala": escala, "textos": textos, "elementos": elementos,
+                        "ausentes": [f"templates/{ausente}.png"] if ausente else []})
+
+    manifesto = {"gerado": {"semente": semente, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                 "quadros": quadros}
+    with open(os.path.join(pasta, MANIFESTO), "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    print(f"[Vision] Corpus sintético com {len(quadros)} quadros em {pasta}")
+    return manifesto
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Medição
+# ═══════════════════════════════════════════════════════════════════
+
+class _Funcao:
+    """Latências (geral e por escala), picos de memória e contagem de acertos de uma função."""
+
+    def __init__(self):
+        self.latencias: List[float] = []
+        self.por_escala: Dict[str, List[float]] = defaultdict(list)
+        self.memoria: List[float] = []
+        self.acertos = 0
+        self.total = 0
+        self.extras: Dict = {}
+
+    def medir(self, escala: float, funcao, *args):
+        with relatorio.PicoRSS() as rss:
+            inicio = time.perf_counter()
+            resultado = funcao(*args)
+            duracao = time.perf_counter() - inicio
+        self.latencias.append(duracao)
+        self.por_escala[f"{escala:g}x"].append(duracao)
+        self.memoria.append(rss.incremento_mb)
+        return resultado
+
+    def resumo(self) -> Dict:
+        return {
+            "latencia": relatorio.resumir(self.latencias),
+            "por_escala": {e: relatorio.resumir(v) for e, v in sorted(self.por_escala.items())},
+            "memoria": {"pico_incremento_mb": round(max(self.memoria, default=0.0), 1),
+                        "rss_final_mb": round(psutil.Process().memory_info().rss / 1024 ** 2, 1)},
+            "acerto": {"acuracia": round(self.acertos / self.total, 4) if self.total else None,
+                       "acertos": self.acertos, "total": self.total, **self.extras},
+        }
+
+
+@contextlib.contextmanager
+def _tela(vision_utils, img):
+    """As funções chamam capturar_tela_cv() pelo módulo: troca pelo quadro salvo."""
+    original = vision_utils.capturar_tela_cv
+    vision_utils.capturar_tela_cv = lambda: img
+    try:
+        yield
+    finally:
+        vision_utils.capturar_tela_cv = original
+
+
+def _normalizar(texto: str) -> str:
+    return " ".join(texto.casefold().split())
+
+
+def _intersecao(a: List[int], b: List[int]) -> int:
+    return max(0, min(a[2], b[2]) - max(a[0], b[0])) * max(0, min(a[3], b[3]) - max(a[1], b[1]))
+
+
+def _area(b: List[int]) -> int:
+    return max(0, b[2] - b[0]) * max(0, b[3] - b[1])
+
+
+def _iou(a: List[int], b: List[int]) -> float:
+    inter = _intersecao(a, b)
+    uniao = _area(a) + _area(b) - inter
+    return inter / uniao if uniao else 0.0
+
+
+def _conferir_ocr(gabarito: List[Dict], detectados: List[Dict]) -> Dict:
+    """
+    Para cada texto do gabarito junta (em ordem de x) o que foi lido sobre a caixa dele.
+    O OCR pode partir uma frase ou juntar itens vizinhos de menu: um gabarito contido
+    no texto lido conta como acerto inteiro.
+    """
+    usados, acertos, similaridades = set(), 0, []
+    for item in gabarito:
+        candidatos = [i for i, d in enumerate(detectados)
+                      if _intersecao(item["bbox"], d["bbox"]) >= 0.5 * min(_area(item["bbox"]), _area(d["bbox"]))]
+        lido = _normalizar(" ".join(detectados[i]["texto"] for i in sorted(candidatos, key=lambda i: detectados[i]["bbox"][0])))
+        esperado = _normalizar(item["texto"])
+        similaridade = 1.0 if esperado and esperado in lido else difflib.SequenceMatcher(None, esperado, lido).ratio()
+        similaridades.append(similaridade)
+        if similaridade >= LIMIAR_SIMILARIDADE:
+            acertos += 1
+            usados.update(candidatos)
+    return {"acertos": acertos, "corretos": len(usados), "similaridades": similaridades}
+
+
+def _medir_quadro(vision_utils, quadro: Dict, img, corpus: str, args, funcoes: Dict[str, _Funcao],
+                  contagem_ocr: Dict) -> Dict:
+    escala = quadro.get("escala", 1.0)
+    altura, largura = img.shape[:2]
+    detalhe = {"arquivo": quadro["arquivo"], "resolucao": f"{largura}x{altura}", "escala": escala}
+
+    with _tela(vision_utils, img):
+        if not args.sem_ocr:
+            f = funcoes["detectar_texto_tela"]
+            for _ in range(args.repeticoes):
+                resultado = f.medir(escala, vision_utils.detectar_texto_tela, None, args.idiomas)
+            if not resultado.get("sucesso"):
+                raise RuntimeError(resultado.get("mensagem"))
+            conferido = _conferir_ocr(quadro.get("textos", []), resultado["textos"])
+            contagem_ocr["gabarito"] += len(quadro.get("textos", []))
+            contagem_ocr["detectados"] += resultado["total"]
+            contagem_ocr["acertos"] += conferido["acertos"]
+            contagem_ocr["corretos"] += conferido["corretos"]
+            contagem_ocr["similaridades"].extend(conferido["similaridades"])
+            detalhe["ocr"] = {"gabarito": len(quadro.get("textos", [])), "detectados": resultado["total"],
+                              "acertos": conferido["acertos"]}
+
+            # Cada encontrar_texto roda um OCR inteiro: só as primeiras N frases sem repetição no quadro
+            f = funcoes["encontrar_texto"]
+            repetidos = defaultdict(int)
+            for item in quadro.get("textos", []):
+                repetidos[_normalizar(item["texto"])] += 1
+            consultas = [t for t in quadro.get("textos", []) if repetidos[_normalizar(t["texto"])] == 1]
+            acertos = 0
+            for item in consultas[:args.consultas]:
+                resultado = f.medir(escala, vision_utils.encontrar_texto, item["texto"], None, args.idiomas)
+                x1, y1, x2, y2 = item["bbox"]
+                centro = resultado.get("centro") or (-1, -1)
+                if resultado.get("encontrado") and x1 <= centro[0] <= x2 and y1 <= centro[1] <= y2:
+                    acertos += 1
+                f.total += 1
+            f.acertos += acertos
+            detalhe["encontrar"] = {"consultas": min(len(consultas), args.consultas), "acertos": acertos}
+
+        f = funcoes["localizar_elemento_visual"]
+        acertos, falsos = 0, 0
+        for elemento in quadro.get("elementos", []):
+            template = os.path.join(corpus, elemento["template"])
+            for _ in range(args.repeticoes):
+                resultado = f.medir(escala, vision_utils.localizar_elemento_visual, template, args.confianca)
+            if resultado.get("encontrado") and _iou(resultado["bbox"], elemento["bbox"]) >= LIMIAR_IOU:
+                acertos += 1
+        for ausente in quadro.get("ausentes", []):
+            for _ in range(args.repeticoes):
+                resultado = f.medir(escala, vision_utils.localizar_elemento_visual,
+                                    os.path.join(corpus, ausente), args.confianca)
+            if resultado.get("encontrado"):
+                falsos += 1
+            else:
+                acertos += 1
+        f.acertos += acertos
+        f.total += len(quadro.get("elementos", [])) + len(quadro.get("ausentes", []))
+        f.extras["falsos_positivos"] = f.extras.get("falsos_positivos", 0) + falsos
+        detalhe["elementos"] = {"total": len(quadro.get("elementos", [])) + len(quadro.get("ausentes", [])),
+                                "acertos": acertos, "falsos_positivos": falsos}
+    return detalhe
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Latência, memória e acerto do vision_utils sobre screenshots salvos")
+    parser.add_argument("--corpus", default=CORPUS_PADRAO, help="pasta com manifesto.json, quadros e templates")
+    parser.add_argument("--gerar-corpus", action="store_true", help="(re)gera o corpus sintético e sai")
+    parser.add_argument("--semente", type=int, default=7)
+    parser.add_argument("--repeticoes", type=int, default=3, help="chamadas medidas por quadro/template")
+    parser.add_argument("--consultas", type=int, default=5, help="textos procurados com encontrar_texto por quadro")
+    parser.add_argument("--idiomas", default="pt,en")
+    parser.add_argument("--confianca", type=float, default=0.8, help="confianca_minima do template matching")
+    parser.add_argument("--sem-ocr", action="store_true", help="só template matching (sem EasyOCR)")
+    parser.add_argument("--saida", help="arquivo JSON do relatório")
+    parser.add_argument("--base", help="relatório anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=relatorio.TOLERANCIA_PADRAO)
+    args = parser.parse_args(argv)
+    args.idiomas = [i.strip() for i in args.idiomas.split(",") if i.strip()]
+
+    caminho_manifesto = os.path.join(args.corpus, MANIFESTO)
+    if args.gerar_corpus or not os.path.exists(caminho_manifesto):
+        try:
+            gerar_corpus(args.corpus, args.semente)
+        except ImportError as e:
+            print(f"[Vision] {e}: gerar o corpus precisa do Pillow")
+            return 2
+        if args.gerar_corpus:
+            return 0
+    with open(caminho_manifesto, "r", encoding="utf-8") as f:
+        manifesto = json.load(f)
+
+    try:
+        import cv2
+        import vision_utils
+    except ImportError as e:
+        print(f"[Vision] {e}: instale as dependências do vision_utils (opencv-python, numpy, mss)")
+        return 2
+
+    funcoes = {nome: _Funcao() for nome in ("detectar_texto_tela", "encontrar_texto", "localizar_elemento_visual")}
+    contagem_ocr = {"gabarito": 0, "detectados": 0, "acertos": 0, "corretos": 0, "similaridades": []}
+    resultados = {"quadros": []}
+
+    if not args.sem_ocr:
+        # Primeira chamada carrega o EasyOCR: medida à parte para não sujar os percentis
+        primeiro = cv2.imread(os.path.join(args.corpus, manifesto["quadros"][0]["arquivo"]))
+        with _tela(vision_utils, primeiro), relatorio.PicoRSS() as rss:
+            inicio = time.perf_counter()
+            resultado = vision_utils.detectar_texto_tela(None, args.idiomas)
+        if not resultado.get("sucesso"):
+            print(f"[Vision] OCR indisponível ({resultado.get('mensagem')}): medindo só o template matching")
+            args.sem_ocr = True
+        else:
+            resultados["carga_ocr"] = {"primeira_chamada_s": round(time.perf_counter() - inicio, 2),
+                                       "incremento_mb": round(rss.incremento_mb, 1)}
+
+    for quadro in manifesto["quadros"]:
+        img = cv2.imread(os.path.join(args.corpus, quadro["arquivo"]))
+        if img is None:
+            print(f"[Vision] Quadro ilegível, pulando: {quadro['arquivo']}")
+            continue
+        print(f"[Vision] {quadro['arquivo']}")
+        resultados["quadros"].append(_medir_quadro(vision_utils, quadro, img, args.corpus, args, funcoes, contagem_ocr))
+
+    for nome, f in funcoes.items():
+        if args.sem_ocr and nome != "localizar_elemento_visual":
+            continue
+        resultados[nome] = f.resumo()
+    if not args.sem_ocr:
+        gabarito, detectados = contagem_ocr["gabarito"], contagem_ocr["detectados"]
+        revocacao = contagem_ocr["acertos"] / gabarito if gabarito else 0.0
+        precisao = contagem_ocr["corretos"] / detectados if detectados else 0.0
+        similaridades = contagem_ocr["similaridades"]
+        resultados["detectar_texto_tela"]["acerto"] = {
+            "acuracia": round(2 * precisao * revocacao / (precisao + revocacao), 4) if precisao + revocacao else 0.0,
+            "precisao": round(precisao, 4),
+            "revocacao": round(revocacao, 4),
+            "similaridade_media": round(sum(similaridades) / len(similaridades), 4) if similaridades else None,
+            "gabarito": gabarito,
+            "detectados": detectados,
+        }
+
+    config = {k: v for k, v in vars(args).items() if k not in ("saida", "base", "gerar_corpus")}
+    config["corpus_gerado"] = manifesto.get("gerado")
+    rel = relatorio.novo_relatorio("vision", config)
+    rel["resultados"] = resultados
+    relatorio.imprimir("Latência por chamada", {n: resultados[n]["latencia"] for n in funcoes if n in resultados})
+    print()
+    for nome in funcoes:
+        if nome in resultados:
+            acerto, memoria = resultados[nome]["acerto"], resultados[nome]["memoria"]
+            print(f"{nome:<28} acurácia {acerto['acuracia']}  pico +{memoria['pico_incremento_mb']} MB")
+    return relatorio.finalizar(rel, args.saida, args.base, args.tolerancia)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
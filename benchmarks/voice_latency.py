@@ -0,0 +1,500 @@
+"""
+Voice Latency — Benchmark ponta a ponta do caminho de voz do ADK Agent, offline.
+Roda o AgentCore e os loops reais do AudioCapture (stream_mic/play_audio) contra
+um microfone, um alto-falante e uma sessão Live falsos: o microfone reproduz um
+WAV gravado (ou fala sintética) no ritmo do relógio, a sessão percebe o fim de
+cada fala e responde com áudio e chamadas de ferramenta roteirizados, e o
+alto-falante emula o buffer do dispositivo (write bloqueia como no PyAudio).
+
+Estágios medidos (ms):
+    mic            atraso da leitura do chunk em relação a quando o dispositivo o teria pronto
+    fila_entrada   leitura no mic → send_realtime_input (fila + _send_audio_loop)
+    envio          duração do send_realtime_input (inclui --latencia-rede-ms)
+    ferramenta     tool_call entregue → send_tool_response (skill real via executar_skill)
+    recebimento    mensagem entregue pelo receive() → audio_output_queue
+    fila_saida     audio_output_queue → write no alto-falante
+    alto_falante   write → início da reprodução do chunk (buffer do dispositivo)
+    lacunas        buracos na reprodução no meio de uma resposta (voz picotada)
+    ponta_a_ponta  último chunk com voz lido no mic → primeiro áudio da resposta tocando
+
+    python -m benchmarks.voice_latency --turnos 10 --saida memoria/benchmarks/voz.json
+    python -m benchmarks.voice_latency --entrada fala.wav --roteiro roteiro.json --base voz.json
+
+O --roteiro é uma lista JSON de turnos (usada em ciclo), por exemplo:
+    [{"ferramentas": [{"nome": "listar_tarefas", "args": {}}], "resposta_ms": 2000}, {"resposta_ms": 800}]
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import wave
+import random
+import struct
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from array import array
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks import relatorio
+
+relatorio.garantir_raiz_no_path()
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+TAXA_SAIDA = 24000              # Hz do áudio que o Gemini devolve (AudioCapture.RECEIVE_SAMPLE_RATE)
+CHUNK_RESPOSTA_S = 0.04         # duração de cada chunk de áudio da resposta
+SILENCIO_FIM_FALA_S = 0.5       # silêncio que separa duas falas num WAV gravado
+BUFFER_ALTO_FALANTE_S = 0.1     # quanto áudio o dispositivo aceita antes de o write bloquear
+FOLGA_FINAL_S = 30              # tempo extra, além do roteiro, antes de desistir da execução
+ESTAGIOS = ("mic", "fila_entrada", "envio", "ferramenta", "recebimento",
+            "fila_saida", "alto_falante", "lacunas", "ponta_a_ponta")
+
+
+def _cabecalho(dados: bytes) -> Tuple[int, int]:
+    """(turno, índice) gravados nas duas primeiras amostras de cada chunk da resposta."""
+    return struct.unpack_from("<HH", dados)
+
+
+def _pico(dados: bytes) -> int:
+    amostras = array("h", dados[:len(dados) // 2 * 2])
+    return max(max(amostras), -min(amostras)) if amostras else 0
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Áudio de entrada e de resposta
+# ═══════════════════════════════════════════════════════════════════
+
+def _fala_sintetica(amostras: int, taxa: int, rng: random.Random) -> array:
+    """Vogais sintéticas: duas senoides com envelope + ruído (determinístico pela semente)."""
+    f1, f2 = rng.uniform(110, 220), rng.uniform(600, 1200)
+    sinal = array("h")
+    for i in range(amostras):
+        t = i / taxa
+        envelope = 0.6 + 0.4 * math.sin(2 * math.pi * 3 * t)
+        valor = 6000 * envelope * (math.sin(2 * math.pi * f1 * t) + 0.5 * math.sin(2 * math.pi * f2 * t))
+        sinal.append(max(-32768, min(32767, int(valor + rng.gauss(0, 200)))))
+    return sinal
+
+
+def _silencio(amostras: int, rng: random.Random) -> array:
+    return array("h", (int(rng.gauss(0, 30)) for _ in range(amostras)))
+
+
+def _entrada_sintetica(turnos: int, fala_s: float, silencio_s: float, taxa: int, semente: int) -> bytes:
+    rng = random.Random(semente)
+    sinal = _silencio(int(0.5 * taxa), rng)
+    for _ in range(turnos):
+        sinal.extend(_fala_sintetica(int(fala_s * taxa), taxa, rng))
+        sinal.extend(_silencio(int(silencio_s * taxa), rng))
+    return sinal.tobytes()
+
+
+def _ler_wav(caminho: str, taxa: int) -> bytes:
+    with wave.open(caminho, "rb") as w:
+        if w.getnchannels() != 1 or w.getsampwidth() != 2 or w.getframerate() != taxa:
+            raise SystemExit(f"{caminho}: use WAV mono 16-bit a {taxa} Hz "
+                             f"(é {w.getnchannels()} canal(is), {w.getsampwidth() * 8}-bit, {w.getframerate()} Hz)")
+        return w.readframes(w.getnframes())
+
+
+def _fatiar(dados: bytes, tamanho: int) -> List[bytes]:
+    # Fatias são objetos distintos: o id() de cada chunk identifica o chunk ao longo do caminho
+    return [dados[i:i + tamanho] for i in range(0, len(dados) - tamanho + 1, tamanho)]
+
+
+def _segmentar(chunks: List[bytes], limiar: int, chunks_silencio: int) -> List[Tuple[int, int]]:
+    """(primeiro, último) chunk com voz de cada fala; falas separadas por `chunks_silencio` sem voz."""
+    falas, inicio, ultimo = [], None, None
+    for i, chunk in enumerate(chunks):
+        if _pico(chunk) >= limiar:
+            if inicio is None:
+                inicio = i
+            ultimo = i
+        elif inicio is not None and i - ultimo >= chunks_silencio:
+            falas.append((inicio, ultimo))
+            inicio = None
+    if inicio is not None:
+        falas.append((inicio, ultimo))
+    return falas
+
+
+def _audio_resposta(turno: int, duracao_s: float, base: Optional[bytes]) -> List[bytes]:
+    """Chunks da resposta do turno, cada um marcado com (turno, índice) no cabeçalho."""
+    amostras_chunk = int(CHUNK_RESPOSTA_S * TAXA_SAIDA)
+    if base is None:
+        total = int(duracao_s * TAXA_SAIDA)
+        base = array("h", (int(4000 * math.sin(2 * math.pi * 220 * i / TAXA_SAIDA)) for i in range(total))).tobytes()
+    chunks = []
+    for i, chunk in enumerate(_fatiar(base, amostras_chunk * 2)):
+        chunks.append(struct.pack("<HH", turno, i) + chunk[4:])
+    return chunks
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Medições
+# ═══════════════════════════════════════════════════════════════════
+
+class _Medicoes:
+    def __init__(self, turnos: int):
+        self.valores: Dict[str, List[float]] = defaultdict(list)
+        self.turnos = turnos
+        self.fim_fala: Dict[int, float] = {}            # turno → leitura do último chunk com voz
+        self.entregue: Dict[Tuple[int, int], float] = {}
+        self.na_fila: Dict[Tuple[int, int], float] = {}
+        self.chunks_resposta: Dict[int, int] = {}
+        self.tocados = set()
+        self.concluido = asyncio.Event()
+        self.lidos = 0
+        self.enviados = 0
+
+    def registrar(self, estagio: str, segundos: float):
+        self.valores[estagio].append(segundos)
+
+    def turno_tocado(self, turno: int, loop: asyncio.AbstractEventLoop):
+        self.tocados.add(turno)
+        if len(self.tocados) >= self.turnos:
+            loop.call_soon_threadsafe(self.concluido.set)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Dispositivos e sessão falsos
+# ═══════════════════════════════════════════════════════════════════
+
+class _MicrofoneFalso:
+    """Stream de entrada do PyAudio: cada chunk fica 'pronto' no ritmo do relógio real."""
+
+    def __init__(self, chunks: List[bytes], duracao_chunk: float, medicoes: _Medicoes):
+        self.chunks = chunks
+        self.duracao_chunk = duracao_chunk
+        self.medicoes = medicoes
+        self.lidos: Dict[int, Tuple[int, float]] = {}     # id(chunk) → (índice, instante da leitura)
+        self._silencio = bytes(len(chunks[0]))
+        self._t0 = None
+        self._k = 0
+
+    def read(self, num_frames: int, exception_on_overflow: bool = True) -> bytes:
+        if self._t0 is None:
+            self._t0 = time.perf_counter()
+        pronto = self._t0 + (self._k + 1) * self.duracao_chunk
+        espera = pronto - time.perf_counter()
+        if espera > 0:
+            time.sleep(espera)
+        agora = time.perf_counter()
+        self.medicoes.registrar("mic", agora - pronto)
+        if self._k >= len(self.chunks):
+            self._k += 1
+            return self._silencio
+        dados = self.chunks[self._k]
+        self.lidos[id(dados)] = (self._k, agora)
+        self.medicoes.lidos += 1
+        self._k += 1
+        return dados
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _AltoFalanteFalso:
+    """Stream de saída do PyAudio: toca em tempo real e bloqueia o write quando o buffer enche."""
+
+    def __init__(self, medicoes: _Medicoes, loop: asyncio.AbstractEventLoop):
+        self.medicoes = medicoes
+        self.loop = loop
+        self._fim = 0.0      # quando termina o áudio já aceito pelo dispositivo
+
+    def write(self, dados: bytes):
+        agora = time.perf_counter()
+        turno, indice = _cabecalho(dados)
+        colocado = self.medicoes.na_fila.pop((turno, indice), None)
+        if colocado is not None:
+            self.medicoes.registrar("fila_saida", agora - colocado)
+        inicio = max(agora, self._fim)
+        if indice > 0 and agora > self._fim:
+            self.medicoes.registrar("lacunas", agora - self._fim)
+        self.medicoes.registrar("alto_falante", inicio - agora)
+        if indice == 0 and turno in self.medicoes.fim_fala:
+            self.medicoes.registrar("ponta_a_ponta", inicio - self.medicoes.fim_fala[turno])
+        self._fim = inicio + (len(dados) // 2) / TAXA_SAIDA
+        if indice == self.medicoes.chunks_resposta.get(turno, -1) - 1:
+            self.medicoes.turno_tocado(turno, self.loop)
+        espera = self._fim - agora - BUFFER_ALTO_FALANTE_S
+        if espera > 0:
+            time.sleep(espera)
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _FilaCronometrada(asyncio.Queue):
+    """audio_output_queue do AgentCore, anotando quando cada chunk da resposta entrou."""
+
+    def __init__(self, medicoes: _Medicoes):
+        super().__init__()
+        self.medicoes = medicoes
+
+    def put_nowait(self, item):
+        if isinstance(item, bytes) and len(item) >= 4:
+            agora = time.perf_counter()
+            chave = _cabecalho(item)
+            entregue = self.medicoes.entregue.pop(chave, None)
+            if entregue is not None:
+                self.medicoes.registrar("recebimento", agora - entregue)
+            self.medicoes.na_fila[chave] = agora
+        super().put_nowait(item)
+
+
+class _SessaoFalsa:
+    """
+    Imita a sessão de client.aio.live.connect: recebe o áudio do mic, percebe o
+    fim de cada fala pelo índice do chunk e responde com o roteiro do turno.
+    """
+
+    def __init__(self, falas: List[Tuple[int, int]], roteiro: List[Dict], mic: _MicrofoneFalso,
+                 medicoes: _Medicoes, args, resposta_base: Optional[bytes]):
+        self.falas = falas
+        self.roteiro = roteiro
+        self.mic = mic
+        self.medicoes = medicoes
+        self.args = args
+        self.resposta_base = resposta_base
+        self._saida: asyncio.Queue = asyncio.Queue()
+        self._ferramentas: Dict[str, asyncio.Event] = {}
+        self._proximo = 0
+        self._tarefas = set()
+
+    async def send_realtime_input(self, audio=None, media=None, **_):
+        inicio = time.perf_counter()
+        if audio is not None:
+            self._audio_chegou(audio.get("data"), inicio)
+        if self.args.latencia_rede_ms:
+            await asyncio.sleep(self.args.latencia_rede_ms / 1000)
+        self.medicoes.registrar("envio", time.perf_counter() - inicio)
+
+    def _audio_chegou(self, dados: bytes, agora: float):
+        lido = self.mic.lidos.pop(id(dados), None)
+        if lido is None:
+            return
+        indice, leitura = lido
+        self.medicoes.enviados += 1
+        self.medicoes.registrar("fila_entrada", agora - leitura)
+        # Um chunk descartado na fila cheia não pode travar o turno: vale qualquer índice >= fim
+        while self._proximo < len(self.falas) and indice >= self.falas[self._proximo][1]:
+            turno = self._proximo
+            self._proximo += 1
+            if turno not in self.medicoes.fim_fala:
+                self.medicoes.fim_fala[turno] = leitura
+            tarefa = asyncio.get_running_loop().create_task(self._responder(turno))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+
+    async def send_client_content(self, turns=None, turn_complete=True, **_):
+        pass
+
+    async def send_tool_response(self, function_responses=None, **_):
+        for resposta in function_responses or []:
+            evento = self._ferramentas.pop(resposta.id, None)
+            if evento:
+                evento.set()
+
+    async def _responder(self, turno: int):
+        from google.genai import types
+        passo = self.roteiro[turno % len(self.roteiro)]
+        await asyncio.sleep(passo.get("atraso_servidor_ms", self.args.atraso_servidor_ms) / 1000)
+
+        for i, ferramenta in enumerate(passo.get("ferramentas", [])):
+            chamada_id = f"t{turno}-{i}"
+            evento = self._ferramentas[chamada_id] = asyncio.Event()
+            inicio = time.perf_counter()
+            self._saida.put_nowait(types.LiveServerMessage(tool_call=types.LiveServerToolCall(function_calls=[
+                types.FunctionCall(name=ferramenta["nome"], args=ferramenta.get("args", {}), id=chamada_id)])))
+            await evento.wait()
+            self.medicoes.registrar("ferramenta", time.perf_counter() - inicio)
+
+        chunks = _audio_resposta(turno, passo.get("resposta_ms", self.args.resposta_ms) / 1000, self.resposta_base)
+        self.medicoes.chunks_resposta[turno] = len(chunks)
+        for chunk in chunks:
+            self._saida.put_nowait(types.LiveServerMessage(server_content=types.LiveServerContent(
+                model_turn=types.Content(parts=[types.Part(inline_data=types.Blob(
+                    data=chunk, mime_type=f"audio/pcm;rate={TAXA_SAIDA}"))]))))
+            await asyncio.sleep(CHUNK_RESPOSTA_S / self.args.ritmo_resposta)
+        self._saida.put_nowait(types.LiveServerMessage(server_content=types.LiveServerContent(turn_complete=True)))
+
+    def receive(self):
+        return self._turno()
+
+    async def _turno(self):
+        """Um turno do modelo, como o receive() do SDK: termina no turn_complete."""
+        while True:
+            mensagem = await self._saida.get()
+            if mensagem is None:
+                return
+            conteudo = mensagem.server_content
+            if conteudo and conteudo.model_turn:
+                for parte in conteudo.model_turn.parts:
+                    if parte.inline_data:
+                        self.medicoes.entregue[_cabecalho(parte.inline_data.data)] = time.perf_counter()
+            yield mensagem
+            if conteudo and conteudo.turn_complete:
+                return
+
+    def encerrar(self):
+        self._saida.put_nowait(None)
+
+
+class _LiveFalso:
+    def __init__(self, sessao: _SessaoFalsa):
+        self.sessao = sessao
+
+    @contextlib.asynccontextmanager
+    async def connect(self, model=None, config=None):
+        yield self.sessao
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Execução
+# ═══════════════════════════════════════════════════════════════════
+
+def _carregar_roteiro(args) -> List[Dict]:
+    if args.roteiro:
+        with open(args.roteiro, "r", encoding="utf-8") as f:
+            roteiro = json.load(f)
+        if not isinstance(roteiro, list) or not roteiro:
+            raise SystemExit(f"{args.roteiro}: o roteiro deve ser uma lista JSON de turnos")
+        return roteiro
+    ferramenta = [{"nome": args.ferramenta, "args": {}}] if args.ferramenta else []
+    return [{"ferramentas": ferramenta if args.ferramenta_a_cada and i % args.ferramenta_a_cada == 0 else []}
+            for i in range(max(1, args.ferramenta_a_cada or 1))]
+
+
+async def _executar(args, agente, audio, chunks, falas, roteiro, resposta_base) -> _Medicoes:
+    loop = asyncio.get_running_loop()
+    medicoes = _Medicoes(len(falas))
+    mic = _MicrofoneFalso(chunks, audio.CHUNK_SIZE / audio.SEND_SAMPLE_RATE, medicoes)
+    sessao = _SessaoFalsa(falas, roteiro, mic, medicoes, args, resposta_base)
+
+    agente.client = SimpleNamespace(aio=SimpleNamespace(live=_LiveFalso(sessao)))
+    agente.audio_output_queue = _FilaCronometrada(medicoes)
+    audio.mic_stream = mic
+    audio.speaker_stream = _AltoFalanteFalso(medicoes, loop)
+
+    duracao_roteiro = len(chunks) * mic.duracao_chunk
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(agente.run_with_reconnect())
+        tg.create_task(audio.stream_mic(agente.audio_input_queue))
+        tg.create_task(audio.play_audio(agente.audio_output_queue))
+        try:
+            await asyncio.wait_for(medicoes.concluido.wait(), duracao_roteiro + FOLGA_FINAL_S)
+        except asyncio.TimeoutError:
+            print(f"[VoiceLatency] Tempo esgotado: {len(medicoes.tocados)}/{len(falas)} turnos tocados",
+                  file=sys.__stdout__)
+        audio.running = False
+        agente.stop()
+        sessao.encerrar()
+        agente.audio_output_queue.put_nowait(None)
+    return medicoes
+
+
+def _preparar_audio():
+    """AudioCapture sem abrir o PyAudio: os streams são trocados pelos falsos."""
+    from audio_capture import AudioCapture
+    audio = AudioCapture.__new__(AudioCapture)
+    audio.pya = None
+    audio.mic_stream = audio.speaker_stream = None
+    audio.running = False
+    audio.mic_muted = False
+    audio._open_mic = lambda: None
+    audio._open_speaker = lambda: None
+    return audio
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Latência ponta a ponta da voz contra uma sessão Live falsa")
+    parser.add_argument("--turnos", type=int, default=8, help="falas sintéticas (ignorado com --entrada)")
+    parser.add_argument("--entrada", help="WAV mono 16-bit 16 kHz com as falas gravadas")
+    parser.add_argument("--resposta", help="WAV mono 16-bit 24 kHz usado como áudio de cada resposta")
+    parser.add_argument("--roteiro", help="JSON com a lista de turnos (ferramentas, resposta_ms, atraso_servidor_ms)")
+    parser.add_argument("--fala-ms", type=int, default=1200)
+    parser.add_argument("--silencio-ms", type=int, default=2500)
+    parser.add_argument("--resposta-ms", type=int, default=1500)
+    parser.add_argument("--atraso-servidor-ms", type=int, default=300, help="VAD + modelo simulados antes de responder")
+    parser.add_argument("--latencia-rede-ms", type=float, default=0.0, help="atraso de cada send_realtime_input")
+    parser.add_argument("--ritmo-resposta", type=float, default=4.0, help="velocidade do streaming da resposta (x tempo real)")
+    parser.add_argument("--ferramenta", default="listar_tarefas", help="skill chamada nos turnos com ferramenta ('' desliga)")
+    parser.add_argument("--ferramenta-a-cada", type=int, default=2, help="um turno com ferramenta a cada N (0 desliga)")
+    parser.add_argument("--semente", type=int, default=7)
+    parser.add_argument("--saida", help="arquivo JSON do relatório")
+    parser.add_argument("--base", help="relatório anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=relatorio.TOLERANCIA_PADRAO)
+    parser.add_argument("--verbose", action="store_true", help="mostra os prints do agente (ficam fora da medição por padrão)")
+    args = parser.parse_args(argv)
+
+    try:
+        audio = _preparar_audio()
+    except ImportError as e:
+        print(f"[VoiceLatency] {e}: o benchmark usa os loops reais do audio_capture.py (pip install pyaudio)")
+        return 2
+    from agent_core import AgentCore
+
+    tamanho_chunk = audio.CHUNK_SIZE * 2
+    if args.entrada:
+        chunks = _fatiar(_ler_wav(args.entrada, audio.SEND_SAMPLE_RATE), tamanho_chunk)
+    else:
+        chunks = _fatiar(_entrada_sintetica(args.turnos, args.fala_ms / 1000, args.silencio_ms / 1000,
+                                            audio.SEND_SAMPLE_RATE, args.semente), tamanho_chunk)
+    chunks_silencio = max(1, int(SILENCIO_FIM_FALA_S * audio.SEND_SAMPLE_RATE / audio.CHUNK_SIZE))
+    falas = _segmentar(chunks, AgentCore.LIMIAR_VOZ, chunks_silencio)
+    if not falas:
+        print("[VoiceLatency] Nenhuma fala encontrada na entrada")
+        return 2
+    resposta_base = _ler_wav(args.resposta, TAXA_SAIDA) if args.resposta else None
+    roteiro = _carregar_roteiro(args)
+
+    print(f"[VoiceLatency] {len(falas)} falas, {len(chunks) * audio.CHUNK_SIZE / audio.SEND_SAMPLE_RATE:.1f}s de áudio")
+    saida = sys.stdout if args.verbose else open(os.devnull, "w", encoding="utf-8")
+    diretorio = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory(prefix="adk_voz_") as tmp, contextlib.redirect_stdout(saida):
+            # audio_debug.log e afins vão para o diretório temporário, não para o projeto
+            os.chdir(tmp)
+            agente = AgentCore(api_key="benchmark-offline")
+            medicoes = asyncio.run(_executar(args, agente, audio, chunks, falas, roteiro, resposta_base))
+            os.chdir(diretorio)     # antes de apagar o temporário (no Windows não se apaga o cwd)
+    finally:
+        os.chdir(diretorio)
+        if saida is not sys.stdout:
+            saida.close()
+
+    config = {k: v for k, v in vars(args).items() if k not in ("saida", "base")}
+    rel = relatorio.novo_relatorio("voice_latency", config)
+    rel["resultados"]["estagios"] = {e: relatorio.resumir(medicoes.valores.get(e, [])) for e in ESTAGIOS}
+    rel["resultados"]["contadores"] = {
+        "falas": len(falas),
+        "turnos_tocados": len(medicoes.tocados),
+        "chunks_lidos": medicoes.lidos,
+        "chunks_enviados": medicoes.enviados,
+        # Descartados pela fila cheia do stream_mic (mais os poucos ainda na fila ao parar)
+        "chunks_nao_enviados": medicoes.lidos - medicoes.enviados,
+        "lacunas": len(medicoes.valores.get("lacunas", [])),
+    }
+    relatorio.imprimir("Latência por estágio", rel["resultados"]["estagios"])
+    print(f"\n{json.dumps(rel['resultados']['contadores'], ensure_ascii=False)}")
+    return relatorio.finalizar(rel, args.saida, args.base, args.tolerancia)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
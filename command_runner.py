@@ -0,0 +1,240 @@
+"""
+Command Runner — Execução de comandos do terminal para o ADK Agent.
+Lê stdout/stderr enquanto o comando roda (buffer circular limitado), envia
+linhas de progresso para o log das skills, mata a árvore de processos inteira
+no timeout e mantém comandos em segundo plano consultáveis por id.
+"""
+
+import os
+import time
+import uuid
+import locale
+import threading
+import subprocess
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from modules.executor import kill_process_tree
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+LINHAS_SAIDA = 400          # últimas linhas de stdout guardadas
+LINHAS_ERRO = 200           # últimas linhas de stderr guardadas
+TAMANHO_MAX_LINHA = 1000    # caracteres por linha
+MAX_CHARS_SAIDA = 5000      # caracteres de stdout devolvidos por executar() (o fim da saída)
+MAX_CHARS_ERRO = 2000       # caracteres de stderr devolvidos por executar()
+INTERVALO_PROGRESSO = 2.0   # segundos entre linhas de progresso enviadas ao log
+MAX_CONCLUIDOS = 50         # comandos finalizados mantidos para consulta
+
+
+def _cortar_inicio(texto: str, limite: int) -> str:
+    if len(texto) <= limite:
+        return texto
+    return f"[... {len(texto) - limite} caracteres anteriores omitidos]\n" + texto[-limite:]
+
+
+class Comando:
+    """Um comando em execução (ou já terminado) com sua saída em buffers circulares."""
+
+    def __init__(self, comando: str, diretorio: Optional[str] = None, timeout: Optional[float] = None,
+                 on_progresso: Optional[Callable[[str], None]] = None):
+        self.id = uuid.uuid4().hex[:8]
+        self.comando = comando
+        self.diretorio = diretorio
+        self.timeout = timeout
+        self.on_progresso = on_progresso
+        self.estado = "executando"
+        self.codigo = None
+        self.inicio = time.time()
+        self.fim = None
+
+        self._saida = deque(maxlen=LINHAS_SAIDA)
+        self._erro = deque(maxlen=LINHAS_ERRO)
+        self._total = {"saida": 0, "erro": 0}
+        self._lock = threading.Lock()
+        self._ultimo_progresso = 0.0
+        self._terminou = threading.Event()
+
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True
+        self.processo = subprocess.Popen(
+            comando,
+            shell=True,
+            cwd=diretorio,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **kwargs,
+        )
+
+        self._leitores = [
+            threading.Thread(target=self._ler, args=(self.processo.stdout, self._saida, "saida"), daemon=True),
+            threading.Thread(target=self._ler, args=(self.processo.stderr, self._erro, "erro"), daemon=True),
+        ]
+        for t in self._leitores:
+            t.start()
+        threading.Thread(target=self._vigiar, daemon=True, name=f"Comando-{self.id}").start()
+
+    # ───────────── leitura ─────────────
+
+    def _ler(self, stream, buffer: deque, tipo: str):
+        codificacao = locale.getpreferredencoding(False) or "utf-8"
+        for bruto in iter(stream.readline, b""):
+            linha = bruto.decode(codificacao, errors="replace").rstrip("\r\n")
+            if len(linha) > TAMANHO_MAX_LINHA:
+                linha = linha[:TAMANHO_MAX_LINHA] + "…"
+            with self._lock:
+                buffer.append(linha)
+                self._total[tipo] += 1
+            self._progresso(linha)
+        stream.close()
+
+    def _progresso(self, linha: str):
+        if not self.on_progresso or not linha.strip():
+            return
+        agora = time.time()
+        if agora - self._ultimo_progresso < INTERVALO_PROGRESSO:
+            return
+        self._ultimo_progresso = agora
+        try:
+            self.on_progresso(f"⏳ [{self.id}] {linha[:200]}")
+        except Exception:
+            pass
+
+    def _vigiar(self):
+        try:
+            self.processo.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self.estado = "timeout"
+            kill_process_tree(self.processo.pid)
+            self.processo.wait()
+        for t in self._leitores:
+            t.join(timeout=5)
+        self.codigo = self.processo.returncode
+        self.fim = time.time()
+        if self.estado == "executando":
+            self.estado = "concluido" if self.codigo == 0 else "erro"
+        self._terminou.set()
+
+    # ───────────── controle ─────────────
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        return self._terminou.wait(timeout)
+
+    @property
+    def terminou(self) -> bool:
+        return self._terminou.is_set()
+
+    def cancelar(self):
+        if not self.terminou:
+            self.estado = "cancelado"
+            kill_process_tree(self.processo.pid)
+
+    def resumo(self, ultimas_linhas: Optional[int] = None, max_chars: Optional[tuple] = None) -> Dict:
+        """`max_chars` = (saída, erro): corta cada texto mantendo o final."""
+        with self._lock:
+            saida = list(self._saida)
+            erro = list(self._erro)
+            total = dict(self._total)
+        if ultimas_linhas:
+            saida, erro = saida[-ultimas_linhas:], erro[-ultimas_linhas:]
+        omitidas_saida = total["saida"] - len(saida)
+        omitidas_erro = total["erro"] - len(erro)
+        texto_saida = "\n".join(saida)
+        texto_erro = "\n".join(erro)
+        if omitidas_saida:
+            texto_saida = f"[... {omitidas_saida} linhas anteriores omitidas]\n" + texto_saida
+        if omitidas_erro:
+            texto_erro = f"[... {omitidas_erro} linhas anteriores omitidas]\n" + texto_erro
+        if max_chars:
+            texto_saida = _cortar_inicio(texto_saida, max_chars[0])
+            texto_erro = _cortar_inicio(texto_erro, max_chars[1])
+        if self.estado == "timeout":
+            texto_erro = f"{texto_erro}\nTimeout ({self.timeout}s): processo e subprocessos encerrados".lstrip()
+        return {
+            "sucesso": self.estado == "concluido",
+            "id": self.id,
+            "comando": self.comando,
+            "estado": self.estado,
+            "saida": texto_saida,
+            "erro": texto_erro,
+            "codigo": self.codigo if self.codigo is not None else -1,
+            "duracao": round((self.fim or time.time()) - self.inicio, 1),
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Registro de comandos em segundo plano
+# ═══════════════════════════════════════════════════════════════════
+
+_comandos: Dict[str, Comando] = {}
+_comandos_lock = threading.Lock()
+
+
+def _registrar(cmd: Comando):
+    with _comandos_lock:
+        _comandos[cmd.id] = cmd
+        concluidos = [c for c in _comandos.values() if c.terminou]
+        concluidos.sort(key=lambda c: c.fim)
+        for c in concluidos[:max(0, len(concluidos) - MAX_CONCLUIDOS)]:
+            del _comandos[c.id]
+
+
+def executar(comando: str, diretorio: str = None, timeout: float = 120,
+             on_progresso: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Executa e espera o comando terminar (ou estourar o timeout).
+    A saída volta limitada a MAX_CHARS_SAIDA/MAX_CHARS_ERRO; consultar() lê o buffer inteiro.
+    """
+    cmd = Comando(comando, diretorio, timeout, on_progresso)
+    cmd.aguardar()
+    return cmd.resumo(max_chars=(MAX_CHARS_SAIDA, MAX_CHARS_ERRO))
+
+
+def executar_em_segundo_plano(comando: str, diretorio: str = None, timeout: float = None,
+                              on_progresso: Optional[Callable[[str], None]] = None) -> Dict:
+    """Inicia o comando e retorna o id para consultar depois."""
+    cmd = Comando(comando, diretorio, timeout, on_progresso)
+    _registrar(cmd)
+    return {
+        "sucesso": True,
+        "id": cmd.id,
+        "mensagem": f"Comando iniciado em segundo plano (id {cmd.id}). Use consultar_comando para acompanhar.",
+    }
+
+
+def consultar(id_comando: str, ultimas_linhas: int = 50) -> Dict:
+    with _comandos_lock:
+        cmd = _comandos.get(id_comando)
+    if cmd is None:
+        return {"sucesso": False, "mensagem": f"Comando {id_comando} não encontrado"}
+    return cmd.resumo(ultimas_linhas)
+
+
+def cancelar(id_comando: str) -> Dict:
+    with _comandos_lock:
+        cmd = _comandos.get(id_comando)
+    if cmd is None:
+        return {"sucesso": False, "mensagem": f"Comando {id_comando} não encontrado"}
+    cmd.cancelar()
+    cmd.aguardar(5)
+    return {"sucesso": True, "mensagem": f"Comando {id_comando} cancelado"}
+
+
+def listar() -> Dict:
+    with _comandos_lock:
+        cmds = list(_comandos.values())
+    return {
+        "sucesso": True,
+        "comandos": [
+            {"id": c.id, "comando": c.comando[:100], "estado": c.estado,
+             "duracao": round((c.fim or time.time()) - c.inicio, 1)}
+            for c in cmds
+        ],
+    }
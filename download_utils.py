@@ -0,0 +1,367 @@
+"""
+Download Utils — Downloads rápidos e retomáveis para o ADK Agent.
+Detecta suporte a Range, baixa partes em paralelo num arquivo pré-alocado,
+retoma downloads interrompidos a partir de um arquivo de estado e verifica
+tamanho/hash no final.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+TAMANHO_BLOCO = 1024 * 1024          # 1 MB por leitura/escrita
+TAMANHO_MINIMO_PARALELO = 8 * 1024 * 1024  # Abaixo disso, uma conexão basta
+CONEXOES_PADRAO = 4
+TIMEOUT_CONEXAO = (10, 60)           # (connect, read) em segundos
+INTERVALO_PROGRESSO = 2.0            # segundos entre logs de progresso
+INTERVALO_ESTADO = 16 * 1024 * 1024  # bytes por segmento entre checkpoints do estado
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+def _caminho_parcial(destino: str) -> str:
+    return destino + ".part"
+
+
+def _caminho_estado(destino: str) -> str:
+    return destino + ".part.json"
+
+
+def _carregar_estado(destino: str) -> Optional[Dict]:
+    """Carrega o estado salvo de um download interrompido (se existir)."""
+    try:
+        with open(_caminho_estado(destino), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _salvar_estado(destino: str, estado: Dict):
+    """Salva o estado de forma atômica (tmp + replace)."""
+    caminho = _caminho_estado(destino)
+    tmp = caminho + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    os.replace(tmp, caminho)
+
+
+def _limpar_estado(destino: str):
+    for caminho in (_caminho_estado(destino), _caminho_estado(destino) + ".tmp"):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Progresso
+# ═══════════════════════════════════════════════════════════════════
+
+class _Progresso:
+    """Contador thread-safe de bytes com log periódico."""
+
+    def __init__(self, total: int, ja_baixado: int, on_progresso: Callable[[str], None] = None,
+                 nome: str = ""):
+        self.total = total
+        self.baixado = ja_baixado
+        self.on_progresso = on_progresso
+        self.nome = nome
+        self._lock = threading.Lock()
+        self._inicio = time.time()
+        self._inicial = ja_baixado
+        self._ultimo_log = 0.0
+
+    def somar(self, n: int):
+        with self._lock:
+            self.baixado += n
+            agora = time.time()
+            if agora - self._ultimo_log < INTERVALO_PROGRESSO:
+                return
+            self._ultimo_log = agora
+        self._log()
+
+    def _log(self):
+        if not self.on_progresso:
+            return
+        decorrido = max(time.time() - self._inicio, 1e-6)
+        velocidade = (self.baixado - self._inicial) / decorrido / (1024 * 1024)
+        if self.total:
+            pct = self.baixado * 100 / self.total
+            msg = f"⬇️ {self.nome}: {pct:.0f}% ({self.baixado / (1024 * 1024):.1f}/{self.total / (1024 * 1024):.1f} MB, {velocidade:.1f} MB/s)"
+        else:
+            msg = f"⬇️ {self.nome}: {self.baixado / (1024 * 1024):.1f} MB ({velocidade:.1f} MB/s)"
+        try:
+            self.on_progresso(msg)
+        except Exception:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Download
+# ═══════════════════════════════════════════════════════════════════
+
+def _sondar(sessao, url: str) -> Dict[str, Any]:
+    """Descobre tamanho, suporte a Range e ETag do recurso."""
+    info = {"tamanho": None, "ranges": False, "etag": None, "url_final": url}
+    try:
+        resp = sessao.head(url, allow_redirects=True, timeout=TIMEOUT_CONEXAO)
+        if resp.status_code < 400:
+            info["url_final"] = resp.url
+            if resp.headers.get("Content-Length", "").isdigit() and not resp.headers.get("Content-Encoding"):
+                info["tamanho"] = int(resp.headers["Content-Length"])
+            info["ranges"] = resp.headers.get("Accept-Ranges", "").lower() == "bytes"
+            info["etag"] = resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+    except Exception:
+        pass
+
+    if info["tamanho"] is None or not info["ranges"]:
+        # Alguns servidores não respondem HEAD corretamente: pedir 1 byte
+        try:
+            with sessao.get(url, headers={"Range": "bytes=0-0"}, stream=True,
+                            allow_redirects=True, timeout=TIMEOUT_CONEXAO) as resp:
+                info["url_final"] = resp.url
+                content_range = resp.headers.get("Content-Range", "")
+                if resp.status_code == 206 and "/" in content_range:
+                    total = content_range.rsplit("/", 1)[1]
+                    if total.isdigit():
+                        info["tamanho"] = int(total)
+                        info["ranges"] = True
+                info["etag"] = info["etag"] or resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+        except Exception:
+            pass
+    return info
+
+
+def _dividir_segmentos(tamanho: int, conexoes: int) -> List[Dict[str, int]]:
+    """Divide [0, tamanho) em segmentos contíguos."""
+    parte = -(-tamanho // conexoes)
+    segmentos = []
+    for inicio in range(0, tamanho, parte):
+        fim = min(inicio + parte, tamanho) - 1
+        segmentos.append({"inicio": inicio, "fim": fim, "baixado": 0})
+    return segmentos
+
+
+def _bytes_faltando(estado: Dict) -> int:
+    """Bytes que ainda não foram gravados, somando todos os segmentos."""
+    return sum(s["fim"] - s["inicio"] + 1 - s["baixado"] for s in estado["segmentos"])
+
+
+def _baixar_segmento(sessao, url: str, destino: str, segmento: Dict[str, int], estado: Dict,
+                     lock_estado: threading.Lock, progresso: _Progresso, cancelar: threading.Event,
+                     parar: threading.Event):
+    """Baixa um segmento via Range e escreve direto na posição certa do arquivo."""
+    inicio = segmento["inicio"] + segmento["baixado"]
+    if inicio > segmento["fim"]:
+        return
+    headers = {"Range": f"bytes={inicio}-{segmento['fim']}", "User-Agent": USER_AGENT}
+    with sessao.get(url, headers=headers, stream=True, timeout=TIMEOUT_CONEXAO) as resp:
+        if resp.status_code != 206:
+            raise IOError(f"Servidor ignorou Range (HTTP {resp.status_code})")
+        with open(_caminho_parcial(destino), "r+b", buffering=TAMANHO_BLOCO) as f:
+            f.seek(inicio)
+            nao_salvo = 0
+            for chunk in resp.iter_content(chunk_size=TAMANHO_BLOCO):
+                if cancelar.is_set() or parar.is_set():
+                    break
+                if not chunk:
+                    continue
+                f.write(chunk)
+                progresso.somar(len(chunk))
+                nao_salvo += len(chunk)
+                if nao_salvo >= INTERVALO_ESTADO:
+                    # Só marca como baixado o que já foi para o disco
+                    f.flush()
+                    with lock_estado:
+                        segmento["baixado"] += nao_salvo
+                        _salvar_estado(destino, estado)
+                    nao_salvo = 0
+            f.flush()
+            with lock_estado:
+                segmento["baixado"] += nao_salvo
+                _salvar_estado(destino, estado)
+
+
+def _baixar_paralelo(sessao, url: str, destino: str, info: Dict, conexoes: int,
+                     on_progresso: Callable[[str], None], cancelar: threading.Event) -> int:
+    """
+    Download em várias conexões num arquivo pré-alocado, com retomada.
+    Retorna quantos bytes ficaram faltando: o .part já tem o tamanho final desde
+    o início, então só a contagem por segmento mostra um stream que acabou antes.
+    """
+    tamanho = info["tamanho"]
+    estado = _carregar_estado(destino)
+    parcial = _caminho_parcial(destino)
+
+    valido = (
+        estado
+        and estado.get("url") == url
+        and estado.get("tamanho") == tamanho
+        and estado.get("etag") == info["etag"]
+        and os.path.exists(parcial)
+        and os.path.getsize(parcial) == tamanho
+    )
+    if not valido:
+        estado = {
+            "url": url,
+            "tamanho": tamanho,
+            "etag": info["etag"],
+            "segmentos": _dividir_segmentos(tamanho, conexoes),
+        }
+        # Pré-aloca o arquivo inteiro para as escritas paralelas
+        with open(parcial, "wb") as f:
+            f.truncate(tamanho)
+        _salvar_estado(destino, estado)
+    elif on_progresso:
+        ja = sum(s["baixado"] for s in estado["segmentos"])
+        on_progresso(f"⏯️ Retomando download de {os.path.basename(destino)} ({ja * 100 // max(tamanho, 1)}% já baixado)")
+
+    ja_baixado = sum(s["baixado"] for s in estado["segmentos"])
+    progresso = _Progresso(tamanho, ja_baixado, on_progresso, os.path.basename(destino))
+    lock_estado = threading.Lock()
+    parar = threading.Event()  # erro em um segmento para os outros (sem marcar como cancelado)
+
+    pendentes = [s for s in estado["segmentos"] if s["inicio"] + s["baixado"] <= s["fim"]]
+    with ThreadPoolExecutor(max_workers=max(1, min(conexoes, len(pendentes) or 1))) as pool:
+        futuros = [
+            pool.submit(_baixar_segmento, sessao, info["url_final"], destino, s, estado,
+                        lock_estado, progresso, cancelar, parar)
+            for s in pendentes
+        ]
+        try:
+            for fut in futuros:
+                fut.result()
+        except BaseException:
+            # Os outros segmentos param no próximo chunk e salvam o que já gravaram
+            parar.set()
+            raise
+    return _bytes_faltando(estado)
+
+
+def _baixar_sequencial(sessao, url: str, destino: str, info: Dict,
+                       on_progresso: Callable[[str], None], cancelar: threading.Event) -> None:
+    """Download em uma conexão. Retoma com Range quando o servidor permite."""
+    parcial = _caminho_parcial(destino)
+    estado = _carregar_estado(destino)
+    inicio = 0
+    if (info["ranges"] and estado and estado.get("url") == url
+            and estado.get("etag") == info["etag"] and os.path.exists(parcial)):
+        inicio = os.path.getsize(parcial)
+    else:
+        _salvar_estado(destino, {"url": url, "tamanho": info["tamanho"], "etag": info["etag"]})
+
+    headers = {"User-Agent": USER_AGENT}
+    if inicio:
+        headers["Range"] = f"bytes={inicio}-"
+    with sessao.get(info["url_final"], headers=headers, stream=True, timeout=TIMEOUT_CONEXAO) as resp:
+        resp.raise_for_status()
+        if inicio and resp.status_code != 206:
+            inicio = 0  # Servidor mandou tudo de novo
+        progresso = _Progresso(info["tamanho"], inicio, on_progresso, os.path.basename(destino))
+        with open(parcial, "ab" if inicio else "wb", buffering=TAMANHO_BLOCO) as f:
+            for chunk in resp.iter_content(chunk_size=TAMANHO_BLOCO):
+                if cancelar.is_set():
+                    break
+                if chunk:
+                    f.write(chunk)
+                    progresso.somar(len(chunk))
+
+
+def _hash_arquivo(caminho: str, algoritmo: str) -> str:
+    h = hashlib.new(algoritmo)
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def baixar(url: str, destino: str, conexoes: int = CONEXOES_PADRAO, hash_esperado: str = None,
+           algoritmo_hash: str = "sha256", on_progresso: Callable[[str], None] = None,
+           cancelar: threading.Event = None) -> Dict[str, Any]:
+    """
+    Baixa uma URL para `destino`, em paralelo quando o servidor suporta Range.
+
+    O conteúdo vai para `<destino>.part` e o estado para `<destino>.part.json`;
+    se o download for interrompido, a próxima chamada retoma de onde parou.
+
+    Args:
+        url: URL do arquivo
+        destino: Caminho final no disco
+        conexoes: Número de conexões paralelas (1 desativa o modo paralelo)
+        hash_esperado: Hash hex para verificação (opcional)
+        algoritmo_hash: Algoritmo do hash (sha256, md5, sha1...)
+        on_progresso: Callback que recebe mensagens de progresso
+        cancelar: Event que interrompe o download (o parcial fica salvo para retomar)
+
+    Returns:
+        {"sucesso": bool, "caminho": str, "tamanho": int, "paralelo": bool, "hash": str}
+    """
+    import requests
+
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    inicio = time.time()
+    cancelar = cancelar or threading.Event()
+
+    with requests.Session() as sessao:
+        sessao.headers["User-Agent"] = USER_AGENT
+        info = _sondar(sessao, url)
+        paralelo = (
+            info["ranges"]
+            and info["tamanho"]
+            and info["tamanho"] >= TAMANHO_MINIMO_PARALELO
+            and conexoes > 1
+        )
+        faltando = 0
+        if paralelo:
+            faltando = _baixar_paralelo(sessao, url, destino, info, conexoes, on_progresso, cancelar)
+        else:
+            _baixar_sequencial(sessao, url, destino, info, on_progresso, cancelar)
+
+    if cancelar.is_set():
+        return {"sucesso": False, "mensagem": "Download cancelado. Chame novamente para retomar.",
+                "caminho": _caminho_parcial(destino)}
+    if faltando:
+        return {
+            "sucesso": False,
+            "mensagem": f"Download incompleto: faltam {faltando} bytes em algum segmento. Chame novamente para retomar.",
+            "caminho": _caminho_parcial(destino),
+        }
+
+    parcial = _caminho_parcial(destino)
+    tamanho = os.path.getsize(parcial)
+    if info["tamanho"] is not None and tamanho != info["tamanho"]:
+        return {
+            "sucesso": False,
+            "mensagem": f"Tamanho incorreto: {tamanho} bytes (esperado {info['tamanho']}). Chame novamente para retomar.",
+            "caminho": parcial,
+        }
+
+    digest = None
+    if hash_esperado:
+        digest = _hash_arquivo(parcial, algoritmo_hash)
+        if digest.lower() != hash_esperado.strip().lower():
+            os.remove(parcial)
+            _limpar_estado(destino)
+            return {"sucesso": False, "mensagem": f"Hash {algoritmo_hash} não confere ({digest})"}
+
+    os.replace(parcial, destino)
+    _limpar_estado(destino)
+
+    resultado = {
+        "sucesso": True,
+        "caminho": destino,
+        "tamanho": tamanho,
+        "paralelo": bool(paralelo),
+        "segundos": round(time.time() - inicio, 2),
+    }
+    if digest:
+        resultado["hash"] = digest
+    return resultado
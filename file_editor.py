@@ -0,0 +1,377 @@
+"""
+File Editor — Edição segura de arquivos para o ADK Agent.
+Substitui texto (ou regex) em streaming, bloco a bloco, num arquivo temporário
+na mesma pasta e só troca o original no final com os.replace: um crash no meio
+nunca deixa o arquivo pela metade. Guarda backups automáticos com retenção
+limitada e aplica lotes de edições em vários arquivos de uma vez (tudo ou nada).
+"""
+
+import os
+import re
+import time
+import uuid
+import shutil
+import hashlib
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional
+
+from file_reader import detectar, AMOSTRA_DETECCAO
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+PASTA_BACKUPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memoria", "backups")
+MAX_BACKUPS_POR_ARQUIVO = int(os.getenv("ADK_BACKUPS_MAX", "10"))
+MAX_BACKUPS_MB = int(os.getenv("ADK_BACKUPS_MB", "500"))     # teto da pasta inteira
+TAMANHO_BLOCO = 1024 * 1024          # caracteres lidos por vez
+REGEX_ARQUIVO_INTEIRO = 32 * 1024 * 1024   # até aqui a regex vê o arquivo todo (casa entre linhas)
+
+
+class EdicaoError(Exception):
+    pass
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Backups
+# ═══════════════════════════════════════════════════════════════════
+
+def _pasta_backup(caminho: str) -> str:
+    chave = os.path.normcase(os.path.realpath(caminho))
+    return os.path.join(PASTA_BACKUPS, hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16])
+
+
+def _fazer_backup(caminho: str) -> Optional[str]:
+    """
+    Guarda a versão atual antes de ela ser substituída. Um hardlink basta (o os.replace
+    só troca a entrada do diretório, o conteúdo antigo continua no backup); se o backup
+    estiver em outro disco, copia.
+    """
+    if not os.path.isfile(caminho):
+        return None
+    pasta = _pasta_backup(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    with open(os.path.join(pasta, "origem.txt"), "w", encoding="utf-8") as f:
+        f.write(os.path.realpath(caminho))
+    # Nome ordenável mesmo com várias edições no mesmo segundo
+    carimbo = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}"
+    destino = os.path.join(pasta, f"{carimbo}_{os.path.basename(caminho)}")
+    try:
+        os.link(caminho, destino)
+    except OSError:
+        shutil.copy2(caminho, destino)
+    _podar(pasta)
+    return destino
+
+
+def _versoes(pasta: str) -> List[str]:
+    """Backups de um arquivo, do mais novo para o mais antigo."""
+    try:
+        nomes = [n for n in os.listdir(pasta) if n != "origem.txt"]
+    except OSError:
+        return []
+    return [os.path.join(pasta, n) for n in sorted(nomes, reverse=True)]
+
+
+def _podar(pasta: str):
+    for antigo in _versoes(pasta)[MAX_BACKUPS_POR_ARQUIVO:]:
+        _remover(antigo)
+    # Teto global: apaga os backups mais antigos de qualquer arquivo
+    todos = []
+    for entrada in os.scandir(PASTA_BACKUPS):
+        if entrada.is_dir():
+            for versao in _versoes(entrada.path):
+                try:
+                    st = os.stat(versao)
+                    todos.append((st.st_mtime, st.st_size, versao))
+                except OSError:
+                    pass
+    excesso = sum(t[1] for t in todos) - MAX_BACKUPS_MB * 1024 * 1024
+    for _, tamanho, versao in sorted(todos):
+        if excesso <= 0:
+            break
+        _remover(versao)
+        excesso -= tamanho
+
+
+def _remover(caminho: str):
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+
+def listar_backups(caminho: str) -> Dict:
+    versoes = _versoes(_pasta_backup(caminho))
+    return {
+        "sucesso": True,
+        "caminho": caminho,
+        "backups": [{"versao": i, "arquivo": v, "tamanho": os.path.getsize(v),
+                     "data": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(os.path.getmtime(v)))}
+                    for i, v in enumerate(versoes, 1)],
+    }
+
+
+def restaurar_backup(caminho: str, versao: int = 1) -> Dict:
+    """Volta o arquivo para um backup (1 = o mais recente). A versão atual vira backup também."""
+    caminho = os.path.realpath(caminho)
+    versoes = _versoes(_pasta_backup(caminho))
+    if not 1 <= versao <= len(versoes):
+        return {"sucesso": False, "mensagem": f"Backup {versao} não existe ({len(versoes)} disponíveis)"}
+    origem = versoes[versao - 1]
+    tmp = _caminho_temporario(caminho)
+    try:
+        shutil.copy2(origem, tmp)
+        _fazer_backup(caminho)
+        os.replace(tmp, caminho)
+    except OSError as e:
+        _remover(tmp)
+        return {"sucesso": False, "mensagem": str(e)}
+    return {"sucesso": True, "mensagem": f"{caminho} restaurado do backup {versao}"}
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Escrita atômica
+# ═══════════════════════════════════════════════════════════════════
+
+# Todas as funções públicas resolvem symlinks antes: o temporário nasce ao lado do
+# arquivo de verdade e o os.replace troca o alvo, sem transformar o link num arquivo comum.
+
+def _caminho_temporario(caminho: str) -> str:
+    pasta, nome = os.path.split(os.path.abspath(caminho))
+    return os.path.join(pasta, f".{nome}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def _confirmar(tmp: str, caminho: str, backup: bool) -> Optional[str]:
+    """Troca o original pelo temporário (mantendo as permissões) e devolve o backup feito."""
+    if os.path.exists(caminho):
+        shutil.copymode(caminho, tmp)
+    copia = _fazer_backup(caminho) if backup else None
+    os.replace(tmp, caminho)
+    return copia
+
+
+def _gravar(tmp: str, pedacos: Iterator[str], encoding: str, newline: str):
+    with open(tmp, "w", encoding=encoding, newline=newline) as f:
+        for pedaco in pedacos:
+            f.write(pedaco)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def escrever(caminho: str, conteudo: str, encoding: str = "utf-8", backup: bool = True) -> Dict:
+    """Cria ou sobrescreve um arquivo de forma atômica (backup da versão anterior, se existir)."""
+    caminho = os.path.realpath(caminho)
+    pasta = os.path.dirname(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    tmp = _caminho_temporario(caminho)
+    try:
+        _gravar(tmp, iter([conteudo]), encoding, None)
+        copia = _confirmar(tmp, caminho, backup)
+    except BaseException:
+        _remover(tmp)
+        raise
+    return {"sucesso": True, "mensagem": f"Arquivo criado: {caminho}", "backup": copia}
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Transformações em streaming
+# ═══════════════════════════════════════════════════════════════════
+
+def _ler_blocos(f) -> Iterator[str]:
+    for bloco in iter(lambda: f.read(TAMANHO_BLOCO), ""):
+        yield bloco
+
+
+# O arquivo é lido e gravado sem tradução de quebras de linha (linhas não editadas ficam
+# byte a byte iguais, mesmo com \r\n e \n misturados). A busca roda numa "vista" com \r\n
+# trocado por \n, que é o que o LLM manda; só os trechos substituídos saem da vista.
+
+def _vista_lf(texto: str):
+    r"""Texto com \r\n trocado por \n e as posições (na vista) dos \n que tinham \r antes."""
+    partes = texto.split("\r\n")
+    crs, pos = [], 0
+    for parte in partes[:-1]:
+        pos += len(parte)
+        crs.append(pos)
+        pos += 1
+    return "\n".join(partes), crs
+
+
+def _bruto(pos: int, crs: List[int]) -> int:
+    """Posição na vista -> posição no texto original."""
+    return pos + bisect_left(crs, pos)
+
+
+def _substituir_literal(blocos: Iterator[str], antigo: str, novo: str, maximo: int, contagem: Dict) -> Iterator[str]:
+    """Troca `antigo` por `novo` segurando só len(antigo)-1 caracteres entre um bloco e outro."""
+    resto = ""
+    for bloco in blocos:
+        buf = resto + bloco
+        vista, crs = _vista_lf(buf)
+        saida, i = [], 0
+        while not maximo or contagem["n"] < maximo:
+            j = vista.find(antigo, i)
+            if j == -1:
+                break
+            saida.append(buf[_bruto(i, crs):_bruto(j, crs)])
+            saida.append(novo)
+            i = j + len(antigo)
+            contagem["n"] += 1
+        if maximo and contagem["n"] >= maximo:
+            saida.append(buf[_bruto(i, crs):])
+            resto = ""
+        else:
+            inicio = _bruto(i, crs)
+            corte = _bruto(max(i, len(vista) - (len(antigo) - 1)), crs)
+            if corte == len(buf) > inicio and buf.endswith("\r"):
+                corte -= 1   # pode ser metade de um \r\n que termina no próximo bloco
+            saida.append(buf[inicio:corte])
+            resto = buf[corte:]
+        yield "".join(saida)
+    yield resto
+
+
+def _substituir_regex(blocos: Iterator[str], padrao: re.Pattern, novo: str, maximo: int,
+                      contagem: Dict, inteiro: bool, quebras: Callable[[str], str]) -> Iterator[str]:
+    """
+    Arquivo pequeno: a regex vê o texto todo (pode casar entre linhas).
+    Arquivo grande: linha a linha, com memória constante.
+    """
+    def trocar(texto: str) -> str:
+        if maximo and contagem["n"] >= maximo:
+            return texto
+        vista, crs = _vista_lf(texto)
+        saida, i = [], 0
+        for m in padrao.finditer(vista):
+            saida.append(texto[_bruto(i, crs):_bruto(m.start(), crs)])
+            saida.append(quebras(m.expand(novo)))
+            i = m.end()
+            contagem["n"] += 1
+            if maximo and contagem["n"] >= maximo:
+                break
+        saida.append(texto[_bruto(i, crs):])
+        return "".join(saida)
+
+    if inteiro:
+        yield trocar("".join(blocos))
+        return
+    resto = ""
+    for bloco in blocos:
+        linhas = (resto + bloco).split("\n")
+        resto = linhas.pop()
+        yield "".join(trocar(linha + "\n") for linha in linhas)
+    yield trocar(resto)
+
+
+def _abrir_texto(caminho: str):
+    """
+    Abre sem traduzir quebras de linha. Devolve também a quebra predominante,
+    usada nas linhas novas que o texto de substituição trouxer.
+    """
+    with open(caminho, "rb") as f:
+        amostra = f.read(AMOSTRA_DETECCAO)
+    encoding, binario = detectar(amostra)
+    if binario:
+        raise EdicaoError(f"{caminho} parece binário; edição de texto recusada")
+    newline = "\r\n" if b"\r\n" in amostra else "\n"
+    return open(caminho, "r", encoding=encoding, newline=""), encoding, newline
+
+
+def _preparar(caminho: str, edicoes: List[Dict]) -> Dict:
+    """
+    Aplica todas as edições de um arquivo numa única passada, num temporário.
+    Nada é trocado aqui: o chamador confirma com _confirmar ou descarta o temporário.
+    """
+    if not os.path.isfile(caminho):
+        raise EdicaoError(f"Arquivo não encontrado: {caminho}")
+    inteiro = os.path.getsize(caminho) <= REGEX_ARQUIVO_INTEIRO
+    f, encoding, newline = _abrir_texto(caminho)
+    tmp = _caminho_temporario(caminho)
+    contagens = []
+    try:
+        with f:
+            pedacos: Iterator[str] = _ler_blocos(f)
+            def quebras(texto: str) -> str:
+                return texto.replace("\r\n", "\n").replace("\n", newline)
+
+            for ed in edicoes:
+                antigo = ed.get("texto_antigo", "").replace("\r\n", "\n")
+                novo = ed.get("texto_novo", "")
+                if not antigo:
+                    raise EdicaoError("texto_antigo vazio")
+                maximo = 1 if ed.get("apenas_primeira") else 0
+                contagem = {"n": 0}
+                contagens.append(contagem)
+                if ed.get("regex"):
+                    try:
+                        padrao = re.compile(antigo, re.MULTILINE)
+                    except re.error as e:
+                        raise EdicaoError(f"Regex inválida '{antigo}': {e}")
+                    pedacos = _substituir_regex(pedacos, padrao, novo, maximo, contagem, inteiro, quebras)
+                else:
+                    pedacos = _substituir_literal(pedacos, antigo, quebras(novo), maximo, contagem)
+            _gravar(tmp, pedacos, encoding, "")
+        for ed, contagem in zip(edicoes, contagens):
+            if not contagem["n"]:
+                raise EdicaoError(f"Texto não encontrado no arquivo: {ed['texto_antigo'][:80]!r}")
+    except BaseException:
+        _remover(tmp)
+        raise
+    return {"tmp": tmp, "substituicoes": sum(c["n"] for c in contagens)}
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  API
+# ═══════════════════════════════════════════════════════════════════
+
+def editar(caminho: str, texto_antigo: str, texto_novo: str, regex: bool = False,
+           apenas_primeira: bool = False, backup: bool = True) -> Dict:
+    """Substitui todas as ocorrências (ou só a primeira) de um texto ou regex num arquivo."""
+    return editar_lote([{"caminho": caminho, "texto_antigo": texto_antigo, "texto_novo": texto_novo,
+                         "regex": regex, "apenas_primeira": apenas_primeira}], backup=backup)
+
+
+def editar_lote(edicoes: List[Dict], backup: bool = True,
+                on_progresso: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Aplica várias edições em vários arquivos. Cada arquivo é lido e escrito uma única vez,
+    com as edições dele na ordem dada. Se qualquer edição falhar, nenhum arquivo é alterado.
+
+    Args:
+        edicoes: [{"caminho", "texto_antigo", "texto_novo", "regex"?, "apenas_primeira"?}, ...]
+    """
+    por_arquivo: Dict[str, List[Dict]] = {}
+    for ed in edicoes:
+        if not ed.get("caminho"):
+            return {"sucesso": False, "mensagem": "Edição sem caminho"}
+        por_arquivo.setdefault(os.path.realpath(ed["caminho"]), []).append(ed)
+
+    preparados = {}
+    try:
+        for i, (caminho, eds) in enumerate(por_arquivo.items(), 1):
+            preparados[caminho] = _preparar(caminho, eds)
+            if on_progresso and len(por_arquivo) > 1:
+                on_progresso(f"✏️ {i}/{len(por_arquivo)} arquivos preparados")
+    except (EdicaoError, OSError, UnicodeError) as e:
+        for p in preparados.values():
+            _remover(p["tmp"])
+        return {"sucesso": False, "mensagem": f"{e} (nenhum arquivo foi alterado)"}
+
+    resultados = []
+    for caminho, p in preparados.items():
+        try:
+            copia = _confirmar(p["tmp"], caminho, backup)
+            resultados.append({"caminho": caminho, "substituicoes": p["substituicoes"], "backup": copia})
+        except OSError as e:
+            _remover(p["tmp"])
+            resultados.append({"caminho": caminho, "erro": str(e)})
+
+    erros = [r for r in resultados if "erro" in r]
+    total = sum(r.get("substituicoes", 0) for r in resultados)
+    if len(resultados) == 1 and not erros:
+        mensagem = f"Arquivo editado: {resultados[0]['caminho']} ({total} substituições)"
+    else:
+        mensagem = f"{len(resultados) - len(erros)} arquivos editados ({total} substituições)"
+    return {"sucesso": not erros, "mensagem": mensagem, "arquivos": resultados}
@@ -0,0 +1,501 @@
+"""
+File Index — Índice persistente de arquivos para as pesquisas do ADK Agent.
+Guarda nomes de arquivo e um índice de trigramas do conteúdo (arquivos de texto)
+em memoria/file_index.db (SQLite). As raízes são varridas em segundo plano e
+atualizadas pelo watchdog (eventos do sistema de arquivos) ou, sem ele, revarridas
+de forma incremental por mtime/tamanho quando passam de INTERVALO_REVARREDURA.
+Enquanto uma raiz não termina a primeira varredura, ou está sendo revarrida por
+estar velha, as consultas retornam None e quem chamou usa o os.walk de sempre.
+
+A primeira pesquisa num diretório o registra como raiz: a árvore inteira é varrida
+(nomes de todos os arquivos e trigramas dos arquivos de texto até CONTEUDO_MAX_BYTES).
+Raízes automáticas com mais de MAX_ARQUIVOS_RAIZ arquivos são abandonadas e seguem no
+os.walk; só as de ADK_INDEX_RAIZES são indexadas sem limite.
+"""
+
+import os
+import time
+import queue
+import sqlite3
+import zlib
+from array import array
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from grep_engine import ignorar_diretorio
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+ARQUIVO_INDICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memoria", "file_index.db")
+INTERVALO_REVARREDURA = 30           # segundos até uma raiz sem watchdog ser considerada velha
+CONTEUDO_MAX_BYTES = 512 * 1024      # arquivos maiores não entram no índice de conteúdo
+MAX_ARQUIVOS_RAIZ = int(os.getenv("ADK_INDEX_MAX_ARQUIVOS", "100000"))  # por raiz automática
+LOTE_COMMIT = 500                    # arquivos por transação durante a varredura
+MAX_TRIGRAMAS_CONSULTA = 32          # trigramas usados para filtrar candidatos
+EXTENSOES_TEXTO = {
+    ".py", ".txt", ".md", ".rst", ".js", ".jsx", ".ts", ".tsx", ".vue", ".json", ".html", ".htm",
+    ".css", ".scss", ".csv", ".xml", ".yml", ".yaml", ".ini", ".cfg", ".toml", ".conf", ".env",
+    ".java", ".kt", ".c", ".h", ".cpp", ".hpp", ".cs", ".go", ".rs", ".php", ".rb", ".lua",
+    ".sh", ".bat", ".cmd", ".ps1", ".sql", ".log", ".mq4", ".mq5", ".mqh", ".tex", ".r",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS raizes (
+    chave TEXT PRIMARY KEY,
+    caminho TEXT NOT NULL,
+    ultima_varredura REAL
+);
+CREATE TABLE IF NOT EXISTS arquivos (
+    id INTEGER PRIMARY KEY,
+    chave TEXT UNIQUE NOT NULL,
+    caminho TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    tamanho INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    visto REAL NOT NULL,
+    tris BLOB
+);
+CREATE TABLE IF NOT EXISTS trigramas (
+    tri INTEGER NOT NULL,
+    arquivo_id INTEGER NOT NULL,
+    PRIMARY KEY (tri, arquivo_id)
+) WITHOUT ROWID;
+"""
+
+
+def _chave(caminho: str) -> str:
+    return os.path.normcase(os.path.abspath(caminho))
+
+
+def _intervalo(chave_dir: str):
+    """Faixa [início, fim) de chaves dentro de um diretório (usa o índice UNIQUE de chave)."""
+    prefixo = chave_dir.rstrip(os.sep) + os.sep
+    return prefixo, prefixo + "\uffff"
+
+
+def trigramas(texto: str) -> set:
+    """
+    Trigramas do texto em minúsculas, como inteiros (bem menores no SQLite que TEXT):
+    caracteres Latin-1 viram exatamente 24 bits; o resto cai num hash (falso positivo
+    possível, mas todo candidato é conferido no arquivo).
+    """
+    texto = texto.lower()
+    ids = set()
+    for tri in {texto[i:i + 3] for i in range(len(texto) - 2)}:
+        a, b, c = map(ord, tri)
+        if a < 256 and b < 256 and c < 256:
+            ids.add((a << 16) | (b << 8) | c)
+        else:
+            ids.add(0x1000000 | (zlib.crc32(tri.encode("utf-8")) & 0xFFFFFF))
+    return ids
+
+
+def _normalizar_extensoes(extensoes: Iterable[str]) -> List[str]:
+    exts = [e.strip().lower().replace("%", "").replace("*", "") for e in (extensoes or [])]
+    return [e if e.startswith(".") else "." + e for e in exts if e]
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Índice
+# ═══════════════════════════════════════════════════════════════════
+
+class IndiceArquivos:
+    """Índice de nomes + trigramas de conteúdo, com um único thread escritor."""
+
+    def __init__(self, caminho_db: str = ARQUIVO_INDICE):
+        self.caminho_db = caminho_db
+        os.makedirs(os.path.dirname(caminho_db), exist_ok=True)
+        with self._conectar() as con:
+            con.executescript(SCHEMA)
+        self._local = threading.local()
+        self._fila = queue.Queue()
+        self._em_varredura = set()
+        self._explicitas = set()             # raízes de ADK_INDEX_RAIZES: sem MAX_ARQUIVOS_RAIZ
+        self._grandes = set()                # raízes automáticas abandonadas por tamanho
+        self._lock = threading.Lock()
+        self._observador = None
+        self._liberado = threading.Event()   # limpo enquanto o watchdog pausa o indexador
+        self._liberado.set()
+        threading.Thread(target=self._trabalhar, daemon=True, name="FileIndexer").start()
+
+    def _conectar(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.caminho_db, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    def _leitura(self) -> sqlite3.Connection:
+        """Conexão de leitura por thread (o WAL permite ler enquanto o indexador escreve)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = self._local.con = self._conectar()
+        return con
+
+    # ───────────── raízes ─────────────
+
+    def adicionar_raiz(self, diretorio: str, explicita: bool = False):
+        """Registra um diretório para indexar (a varredura roda em segundo plano)."""
+        chave = _chave(diretorio)
+        # Raiz de disco inteira não é indexada automaticamente (só via ADK_INDEX_RAIZES)
+        if not os.path.isdir(chave) or (not explicita and os.path.dirname(chave) == chave):
+            return
+        if explicita:
+            self._explicitas.add(chave)
+        elif chave in self._grandes or self._em_varredura_dentro(chave):
+            return
+        self._agendar(chave, diretorio)
+
+    def _agendar(self, chave: str, diretorio: str):
+        with self._lock:
+            if chave in self._em_varredura:
+                return
+            self._em_varredura.add(chave)
+        con = self._leitura()
+        con.execute("INSERT OR IGNORE INTO raizes (chave, caminho) VALUES (?, ?)",
+                    (chave, os.path.abspath(diretorio)))
+        con.commit()
+        self._fila.put(("raiz", chave))
+
+    def _em_varredura_dentro(self, chave: str) -> bool:
+        """True se uma raiz que contém `chave` já está na fila de varredura."""
+        with self._lock:
+            return any(chave == raiz or chave.startswith(raiz.rstrip(os.sep) + os.sep)
+                       for raiz in self._em_varredura)
+
+    def raiz_pronta(self, diretorio: str) -> bool:
+        """
+        True se `diretorio` está dentro de uma raiz já varrida e atualizada.
+        Sem watchdog, uma raiz velha é revarrida e, até terminar, não conta como pronta:
+        a pesquisa vai para o os.walk em vez de responder com linhas desatualizadas.
+        """
+        chave = _chave(diretorio)
+        linhas = self._leitura().execute("SELECT chave, ultima_varredura FROM raizes").fetchall()
+        pronta = False
+        for raiz, ultima in linhas:
+            if ultima and (chave == raiz or chave.startswith(raiz.rstrip(os.sep) + os.sep)):
+                if not self._observador and time.time() - ultima > INTERVALO_REVARREDURA:
+                    self._agendar(raiz, raiz)
+                    return False
+                pronta = True
+        return pronta and not self._em_varredura_dentro(chave)
+
+    def _na_raiz(self, chave: str) -> bool:
+        return any(chave == raiz or chave.startswith(raiz.rstrip(os.sep) + os.sep)
+                   for (raiz,) in self._leitura().execute("SELECT chave FROM raizes"))
+
+    def notificar(self, caminho: str):
+        """
+        Agenda a reindexação de um caminho alterado fora do watchdog (ex.: pelas skills).
+        Diretórios entram arquivo por arquivo; caminhos que sumiram levam junto o que estava embaixo.
+        """
+        chave = _chave(caminho)
+        if not self._na_raiz(chave):
+            return
+        if os.path.isdir(chave):
+            for atual, dirs, nomes in os.walk(chave):
+                dirs[:] = [d for d in dirs if not ignorar_diretorio(d)]
+                for nome in nomes:
+                    self._fila.put(("arquivo", os.path.join(atual, nome)))
+            return
+        if not os.path.exists(chave):
+            de, ate = _intervalo(chave)
+            for (antigo,) in self._leitura().execute(
+                    "SELECT caminho FROM arquivos WHERE chave >= ? AND chave < ?", (de, ate)):
+                self._fila.put(("arquivo", antigo))
+        self._fila.put(("arquivo", chave))
+
+    # ───────────── indexador ─────────────
+
+    def pausar(self):
+        """Suspende a indexação entre diretórios (as consultas continuam respondendo)."""
+        self._liberado.clear()
+
+    def retomar(self):
+        self._liberado.set()
+
+    def _trabalhar(self):
+        con = self._conectar()
+        while True:
+            tipo, alvo = self._fila.get()
+            self._liberado.wait()
+            try:
+                if tipo == "raiz":
+                    self._varrer(con, alvo)
+                elif tipo == "arquivo":
+                    self._atualizar_arquivo(con, alvo)
+                    con.commit()
+            except Exception as e:
+                print(f"[FileIndex] Erro indexando {alvo}: {e}")
+            finally:
+                if tipo == "raiz":
+                    with self._lock:
+                        self._em_varredura.discard(alvo)
+
+    def _listar(self, raiz: str, limite: Optional[int]):
+        """(caminho, stat) de cada arquivo sob `raiz`; None se passar de `limite`."""
+        arquivos = []
+        pilha = [raiz]
+        while pilha:
+            self._liberado.wait()
+            try:
+                entradas = list(os.scandir(pilha.pop()))
+            except OSError:
+                continue
+            for e in entradas:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        if not ignorar_diretorio(e.name):
+                            pilha.append(e.path)
+                    elif e.is_file(follow_symlinks=False):
+                        arquivos.append((e.path, e.stat()))
+                except OSError:
+                    continue
+            if limite and len(arquivos) > limite:
+                return None
+        return arquivos
+
+    def _varrer(self, con: sqlite3.Connection, raiz: str):
+        inicio = time.time()
+        # Listar antes de indexar: uma árvore grande demais é descartada sem gravar nada
+        arquivos = self._listar(raiz, None if raiz in self._explicitas else MAX_ARQUIVOS_RAIZ)
+        if arquivos is None:
+            self._grandes.add(raiz)
+            self._descartar_raiz(con, raiz)
+            print(f"[FileIndex] {raiz}: mais de {MAX_ARQUIVOS_RAIZ} arquivos, não será indexado "
+                  f"(use ADK_INDEX_RAIZES para forçar)")
+            return
+        novos = 0
+        pendentes = 0
+        for caminho, st in arquivos:
+            if not self._liberado.is_set():
+                con.commit()
+                pendentes = 0
+                self._liberado.wait()
+            if self._atualizar_arquivo(con, caminho, st, inicio):
+                novos += 1
+            pendentes += 1
+            if pendentes >= LOTE_COMMIT:
+                con.commit()
+                pendentes = 0
+
+        # O que não foi visto nesta varredura foi apagado do disco
+        de, ate = _intervalo(raiz)
+        sumidos = [r[0] for r in con.execute(
+            "SELECT id FROM arquivos WHERE chave >= ? AND chave < ? AND visto < ?", (de, ate, inicio))]
+        for arquivo_id in sumidos:
+            self._remover(con, arquivo_id)
+        con.execute("UPDATE raizes SET ultima_varredura = ? WHERE chave = ?", (time.time(), raiz))
+        con.commit()
+        print(f"[FileIndex] {raiz}: {novos} arquivos (re)indexados, {len(sumidos)} removidos "
+              f"em {time.time() - inicio:.1f}s")
+        self._observar(raiz)
+
+    def _descartar_raiz(self, con: sqlite3.Connection, raiz: str):
+        """Tira a raiz do índice; raízes menores dentro dela voltam a precisar de varredura."""
+        de, ate = _intervalo(raiz)
+        for (arquivo_id,) in con.execute(
+                "SELECT id FROM arquivos WHERE chave >= ? AND chave < ?", (de, ate)).fetchall():
+            self._remover(con, arquivo_id)
+        con.execute("DELETE FROM raizes WHERE chave = ?", (raiz,))
+        con.execute("UPDATE raizes SET ultima_varredura = NULL WHERE chave >= ? AND chave < ?", (de, ate))
+        con.commit()
+
+    def _atualizar_arquivo(self, con: sqlite3.Connection, caminho: str, st=None, visto: float = None) -> bool:
+        """Atualiza um arquivo no índice. Retorna True se o conteúdo foi (re)indexado."""
+        chave = _chave(caminho)
+        visto = visto or time.time()
+        if st is None:
+            try:
+                st = os.stat(caminho)
+            except OSError:
+                linha = con.execute("SELECT id FROM arquivos WHERE chave = ?", (chave,)).fetchone()
+                if linha:
+                    self._remover(con, linha[0])
+                return False
+
+        linha = con.execute("SELECT id, tamanho, mtime FROM arquivos WHERE chave = ?", (chave,)).fetchone()
+        if linha and linha[1] == st.st_size and linha[2] == st.st_mtime:
+            con.execute("UPDATE arquivos SET visto = ? WHERE id = ?", (visto, linha[0]))
+            return False
+
+        nome = os.path.basename(caminho)
+        ext = os.path.splitext(nome)[1].lower()
+        if linha:
+            arquivo_id = linha[0]
+            con.execute("UPDATE arquivos SET tamanho = ?, mtime = ?, visto = ? WHERE id = ?",
+                        (st.st_size, st.st_mtime, visto, arquivo_id))
+            self._apagar_trigramas(con, arquivo_id)
+        else:
+            arquivo_id = con.execute(
+                "INSERT INTO arquivos (chave, caminho, nome, ext, tamanho, mtime, visto) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chave, os.path.abspath(caminho), nome.lower(), ext, st.st_size, st.st_mtime, visto),
+            ).lastrowid
+
+        if ext in EXTENSOES_TEXTO and st.st_size <= CONTEUDO_MAX_BYTES:
+            texto = self._ler_texto(caminho)
+            if texto:
+                tris = array("I", sorted(trigramas(texto)))
+                con.executemany("INSERT INTO trigramas (tri, arquivo_id) VALUES (?, ?)",
+                                ((t, arquivo_id) for t in tris))
+                con.execute("UPDATE arquivos SET tris = ? WHERE id = ?", (tris.tobytes(), arquivo_id))
+        return True
+
+    @staticmethod
+    def _apagar_trigramas(con: sqlite3.Connection, arquivo_id: int):
+        """
+        Remove as entradas de um arquivo pela chave primária (tri, arquivo_id).
+        A lista de trigramas fica num BLOB no próprio arquivo: bem mais barato que
+        um segundo índice por arquivo_id em cima de milhões de linhas.
+        """
+        linha = con.execute("SELECT tris FROM arquivos WHERE id = ?", (arquivo_id,)).fetchone()
+        if linha and linha[0]:
+            tris = array("I")
+            tris.frombytes(linha[0])
+            con.executemany("DELETE FROM trigramas WHERE tri = ? AND arquivo_id = ?",
+                            ((t, arquivo_id) for t in tris))
+            con.execute("UPDATE arquivos SET tris = NULL WHERE id = ?", (arquivo_id,))
+
+    def _remover(self, con: sqlite3.Connection, arquivo_id: int):
+        self._apagar_trigramas(con, arquivo_id)
+        con.execute("DELETE FROM arquivos WHERE id = ?", (arquivo_id,))
+
+    @staticmethod
+    def _ler_texto(caminho: str) -> Optional[str]:
+        try:
+            with open(caminho, "rb") as f:
+                dados = f.read(CONTEUDO_MAX_BYTES)
+        except OSError:
+            return None
+        if b"\x00" in dados[:8192]:
+            return None
+        return dados.decode("utf-8", errors="ignore")
+
+    def _observar(self, raiz: str):
+        """Atualização por eventos do sistema de arquivos (opcional: pip install watchdog)."""
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return
+        fila = self._fila
+        notificar = self.notificar
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                for caminho in (event.src_path, getattr(event, "dest_path", None)):
+                    if not caminho or any(ignorar_diretorio(p) for p in caminho.split(os.sep)[:-1] if p):
+                        continue
+                    if event.is_directory:
+                        # Diretório movido/apagado: o que estava embaixo vai junto
+                        if event.event_type in ("moved", "deleted"):
+                            notificar(caminho)
+                    else:
+                        fila.put(("arquivo", caminho))
+
+        with self._lock:
+            if self._observador is None:
+                self._observador = Observer()
+                self._observador.daemon = True
+                self._observador.start()
+            observados = getattr(self, "_observados", set())
+            if raiz in observados:
+                return
+            self._observador.schedule(_Handler(), raiz, recursive=True)
+            observados.add(raiz)
+            self._observados = observados
+
+    # ───────────── consultas ─────────────
+
+    def buscar_nomes(self, diretorio: str, termo: str, extensoes: Iterable[str] = None,
+                     limite: int = 50) -> Optional[List[Dict]]:
+        """Arquivos cujo nome contém `termo`. None se o diretório ainda não está indexado."""
+        if not self.raiz_pronta(diretorio):
+            self.adicionar_raiz(diretorio)
+            return None
+        de, ate = _intervalo(_chave(diretorio))
+        sql = "SELECT caminho, tamanho FROM arquivos WHERE chave >= ? AND chave < ? AND instr(nome, ?) > 0"
+        params = [de, ate, termo.lower()]
+        exts = _normalizar_extensoes(extensoes)
+        if exts:
+            sql += " AND (" + " OR ".join("nome LIKE ?" for _ in exts) + ")"
+            params += ["%" + e for e in exts]
+        sql += " LIMIT ?"
+        params.append(limite)
+        return [
+            {"nome": os.path.basename(c), "caminho": c, "tamanho_kb": round(t / 1024, 1)}
+            for c, t in self._leitura().execute(sql, params)
+        ]
+
+    def candidatos_conteudo(self, diretorio: str, texto: str,
+                            extensoes: Iterable[str] = None) -> Optional[List[str]]:
+        """
+        Arquivos que podem conter `texto` (todos os seus trigramas aparecem no arquivo).
+        None quando o índice não ajuda: diretório não indexado ou texto com menos de 3 caracteres.
+        """
+        # Um subconjunto dos trigramas já é condição necessária (e mantém a consulta pequena)
+        tris = sorted(trigramas(texto))[:MAX_TRIGRAMAS_CONSULTA]
+        if not tris:
+            return None
+        if not self.raiz_pronta(diretorio):
+            self.adicionar_raiz(diretorio)
+            return None
+        exts = _normalizar_extensoes(extensoes)
+        # Arquivos de outras extensões não têm trigramas: o índice não os cobre
+        if any(e not in EXTENSOES_TEXTO for e in exts) or not exts:
+            return None
+        de, ate = _intervalo(_chave(diretorio))
+        marcadores = ",".join("?" for _ in tris)
+        marcadores_ext = ",".join("?" for _ in exts)
+        sql = (
+            "SELECT a.caminho FROM trigramas t JOIN arquivos a ON a.id = t.arquivo_id "
+            f"WHERE t.tri IN ({marcadores}) AND a.chave >= ? AND a.chave < ? "
+            f"AND a.ext IN ({marcadores_ext}) "
+            "GROUP BY a.id HAVING COUNT(*) = ? "
+            # Arquivos acima do limite de conteúdo não têm trigramas: sempre candidatos
+            "UNION ALL SELECT caminho FROM arquivos WHERE chave >= ? AND chave < ? "
+            f"AND ext IN ({marcadores_ext}) AND tamanho > ?"
+        )
+        params = list(tris) + [de, ate] + exts + [len(tris)] + [de, ate] + exts + [CONTEUDO_MAX_BYTES]
+        return [r[0] for r in self._leitura().execute(sql, params)]
+
+    def estatisticas(self) -> Dict:
+        con = self._leitura()
+        return {
+            "raizes": [r[0] for r in con.execute("SELECT caminho FROM raizes")],
+            "arquivos": con.execute("SELECT COUNT(*) FROM arquivos").fetchone()[0],
+            "na_fila": self._fila.qsize(),
+            "pausado": not self._liberado.is_set(),
+        }
+
+
+_indice: Optional[IndiceArquivos] = None
+_indice_lock = threading.Lock()
+
+
+def obter_indice() -> Optional[IndiceArquivos]:
+    """
+    Índice compartilhado (None se ADK_INDEX=0). Raízes em ADK_INDEX_RAIZES
+    (separadas por os.pathsep) começam a ser indexadas na primeira chamada.
+    """
+    global _indice
+    if os.getenv("ADK_INDEX", "1") == "0":
+        return None
+    with _indice_lock:
+        if _indice is None:
+            try:
+                _indice = IndiceArquivos()
+            except sqlite3.Error as e:
+                print(f"[FileIndex] Índice indisponível: {e}")
+                return None
+            for raiz in filter(None, os.getenv("ADK_INDEX_RAIZES", "").split(os.pathsep)):
+                _indice.adicionar_raiz(raiz, explicita=True)
+        return _indice
+
+
+def indice_carregado() -> Optional[IndiceArquivos]:
+    """O índice compartilhado se já foi criado (sem criar, ao contrário de obter_indice)."""
+    return _indice
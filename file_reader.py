@@ -0,0 +1,399 @@
+"""
+File Reader — Leitura paginada de arquivos para o ADK Agent.
+Lê só o trecho pedido (offset em bytes, faixa de linhas ou as últimas linhas)
+com memória constante, mesmo em logs de vários GB. Detecta a codificação,
+mantém um índice esparso de offsets de linha para leituras paginadas
+repetidas e mostra arquivos binários como resumo + hexdump.
+"""
+
+import os
+import codecs
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+MAX_CARACTERES = 10000               # padrão de caracteres devolvidos por leitura
+MAX_CARACTERES_ABSOLUTO = 200000     # teto mesmo quando o limite é pedido
+LINHAS_PADRAO = 200                  # linhas devolvidas quando só linha_inicio é dado
+TAMANHO_BLOCO = 1024 * 1024          # leitura em blocos de 1 MB ao varrer/seek
+PASSO_INDICE = 1000                  # um offset guardado a cada N linhas
+MAX_INDICES = 32                     # arquivos com índice de linhas em cache
+AMOSTRA_DETECCAO = 64 * 1024         # bytes usados para detectar codificação/binário
+HEX_PADRAO = 512                     # bytes mostrados no hexdump de binários
+HEX_MAX = 16 * 1024
+
+CODIFICACOES_LATINAS = {
+    "cp1250", "cp1252", "cp1254", "cp1257", "cp437", "cp850", "mac-roman", "mac-latin2",
+    "mac-iceland", "mac-turkish", "iso8859-1", "iso8859-2", "iso8859-3", "iso8859-4",
+    "iso8859-9", "iso8859-10", "iso8859-13", "iso8859-14", "iso8859-15", "iso8859-16",
+}
+
+ASSINATURAS = [
+    (b"\x89PNG\r\n\x1a\n", "imagem PNG"),
+    (b"\xff\xd8\xff", "imagem JPEG"),
+    (b"GIF8", "imagem GIF"),
+    (b"%PDF", "documento PDF"),
+    (b"PK\x03\x04", "arquivo ZIP (ou docx/xlsx/jar)"),
+    (b"Rar!", "arquivo RAR"),
+    (b"7z\xbc\xaf\x27\x1c", "arquivo 7z"),
+    (b"\x1f\x8b", "arquivo gzip"),
+    (b"MZ", "executável Windows (PE)"),
+    (b"\x7fELF", "executável ELF"),
+    (b"SQLite format 3\x00", "banco SQLite"),
+    (b"ID3", "áudio MP3"),
+    (b"OggS", "áudio/vídeo Ogg"),
+    (b"RIFF", "RIFF (WAV/AVI/WEBP)"),
+]
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Codificação
+# ═══════════════════════════════════════════════════════════════════
+
+def _cortar_utf8_incompleto(dados: bytes) -> bytes:
+    """Remove um caractere UTF-8 cortado no fim da amostra (senão a decodificação falha à toa)."""
+    for i in range(1, min(4, len(dados)) + 1):
+        byte = dados[-i]
+        if byte & 0xC0 == 0x80:
+            continue
+        if byte & 0x80:
+            necessario = 2 if byte & 0xE0 == 0xC0 else 3 if byte & 0xF0 == 0xE0 else 4
+            return dados[:-i] if necessario > i else dados
+        return dados
+    return dados
+
+
+def detectar(amostra: bytes) -> Tuple[str, bool]:
+    """
+    (codificação, binário?) a partir do início do arquivo.
+    BOM > UTF-8 > palpite do charset_normalizer (se instalado) > cp1252.
+    Quando o palpite é alguma codificação latina, fica cp1252: em amostras curtas
+    ele troca fácil por cp1250/cp1257 e estraga os acentos do português.
+    """
+    if amostra.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig", False
+    # Endianness explícita: sem BOM implícito na codificação, offsets em bytes batem certo
+    if amostra.startswith(codecs.BOM_UTF16_LE):
+        return "utf-16-le", False
+    if amostra.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16-be", False
+    if b"\x00" in amostra[:8192]:
+        return "", True
+    # UTF-8 com alguns bytes quebrados ainda é UTF-8: texto latino quase nunca forma
+    # sequências multibyte válidas por acaso
+    texto = _cortar_utf8_incompleto(amostra).decode("utf-8", errors="replace")
+    invalidos = texto.count("\ufffd")
+    if not invalidos or sum(1 for c in texto if ord(c) > 127) - invalidos > invalidos:
+        return "utf-8", False
+    candidatos = []
+    try:
+        from charset_normalizer import from_bytes
+        # Sem BOM e sem NUL não é UTF-16/32 (NUL já teria virado binário acima)
+        candidatos = [codecs.lookup(m.encoding).name for m in from_bytes(amostra)]
+        candidatos = [c for c in candidatos if _compativel_ascii(c)]
+    except ImportError:
+        pass
+    if not candidatos or any(c in CODIFICACOES_LATINAS for c in candidatos):
+        try:
+            amostra.decode("cp1252")
+            return "cp1252", False
+        except UnicodeDecodeError:
+            return "latin-1", False
+    return candidatos[0], False
+
+
+def _compativel_ascii(encoding: str) -> bool:
+    """Codificações onde b"\\n" é sempre fim de linha (dá para indexar por bytes)."""
+    return not encoding.lower().replace("-", "").startswith(("utf16", "utf32"))
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Índice de linhas
+# ═══════════════════════════════════════════════════════════════════
+
+class IndiceLinhas:
+    """
+    Offsets (em bytes) do início das linhas 1, 1+PASSO, 1+2*PASSO, ... de um arquivo.
+    Construído sob demanda: só varre até a linha pedida, e continua de onde parou.
+    """
+
+    def __init__(self, caminho: str, assinatura: Tuple[int, float]):
+        self.caminho = caminho
+        self.assinatura = assinatura
+        self.offsets = array("Q", [0])
+        self.varrido_ate = 0        # byte até onde as linhas já foram contadas
+        self.linhas_varridas = 0    # quebras de linha encontradas até varrido_ate
+        self.fim_ultima_quebra = 0  # byte logo depois do último \n visto
+        self.completo = False
+        self.lock = threading.Lock()
+
+    @property
+    def total_linhas(self) -> Optional[int]:
+        if not self.completo:
+            return None
+        # Última linha sem \n no final também conta
+        return self.linhas_varridas + (1 if self.assinatura[0] > self.fim_ultima_quebra else 0)
+
+    def _varrer_ate(self, f, linha: int):
+        """Conta linhas até conhecer o checkpoint da `linha` (1-based) ou chegar ao fim."""
+        alvo = (linha - 1) // PASSO_INDICE
+        f.seek(self.varrido_ate)
+        while len(self.offsets) <= alvo and not self.completo:
+            bloco = f.read(TAMANHO_BLOCO)
+            if not bloco:
+                self.completo = True
+                break
+            base = self.varrido_ate
+            proximo = len(self.offsets) * PASSO_INDICE
+            quebras = bloco.count(b"\n")
+            if self.linhas_varridas + quebras >= proximo:
+                pos = -1
+                for n in range(self.linhas_varridas + 1, self.linhas_varridas + quebras + 1):
+                    pos = bloco.find(b"\n", pos + 1)
+                    if n == proximo:
+                        self.offsets.append(base + pos + 1)
+                        proximo += PASSO_INDICE
+            self.linhas_varridas += quebras
+            self.varrido_ate += len(bloco)
+            if quebras:
+                self.fim_ultima_quebra = base + bloco.rfind(b"\n") + 1
+
+    def posicao(self, f, linha: int) -> Optional[int]:
+        """Offset do início da `linha` (1-based), ou None se o arquivo tem menos linhas."""
+        with self.lock:
+            self._varrer_ate(f, linha)
+            checkpoint = min((linha - 1) // PASSO_INDICE, len(self.offsets) - 1)
+            pos, atual = self.offsets[checkpoint], checkpoint * PASSO_INDICE + 1
+        f.seek(pos)
+        while atual < linha:
+            if not f.readline():
+                return None
+            atual += 1
+        return f.tell()
+
+
+_indices: "OrderedDict[str, IndiceLinhas]" = OrderedDict()
+_indices_lock = threading.Lock()
+
+
+def _indice_de(caminho: str, st: os.stat_result) -> IndiceLinhas:
+    chave = os.path.normcase(os.path.abspath(caminho))
+    assinatura = (st.st_size, st.st_mtime)
+    with _indices_lock:
+        indice = _indices.get(chave)
+        if indice is None or indice.assinatura != assinatura:
+            indice = IndiceLinhas(caminho, assinatura)
+            _indices[chave] = indice
+        _indices.move_to_end(chave)
+        while len(_indices) > MAX_INDICES:
+            _indices.popitem(last=False)
+        return indice
+
+
+def limpar_indices(manter: int = 0) -> int:
+    """Descarta os índices de linhas menos usados, mantendo `manter`. Retorna quantos saíram."""
+    with _indices_lock:
+        removidos = max(0, len(_indices) - manter)
+        for _ in range(removidos):
+            _indices.popitem(last=False)
+        return removidos
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Modos de leitura
+# ═══════════════════════════════════════════════════════════════════
+
+def _decodificar(dados: bytes, encoding: str) -> str:
+    if encoding.startswith("utf-8"):
+        dados = _cortar_utf8_incompleto(dados)
+    return dados.decode(encoding, errors="replace")
+
+
+def _ler_bytes(f, offset: int, limite: int, encoding: str, tamanho: int) -> Dict:
+    if _compativel_ascii(encoding):
+        # Começo no meio de um caractere UTF-8: avança até o próximo início
+        if encoding.startswith("utf-8") and offset:
+            f.seek(offset)
+            inicio = f.read(3)
+            while inicio[:1] and inicio[0] & 0xC0 == 0x80:
+                inicio, offset = inicio[1:], offset + 1
+    else:
+        unidade = 2 if "16" in encoding else 4
+        offset -= offset % unidade
+    # O BOM só é tirado no começo do arquivo; no meio, utf-8-sig é utf-8
+    if encoding == "utf-8-sig" and offset:
+        encoding = "utf-8"
+    f.seek(offset)
+    pedido = limite * 4
+    dados = f.read(pedido)
+    if encoding.startswith("utf-8") and len(dados) == pedido:
+        dados = _cortar_utf8_incompleto(dados)
+    if _compativel_ascii(encoding):
+        # surrogateescape guarda os bytes inválidos: ao recodificar, o tamanho consumido é exato
+        texto = dados.decode(encoding, errors="surrogateescape")[:limite]
+        proximo = offset + len(texto.encode(encoding, errors="surrogateescape"))
+        texto = texto.encode("utf-8", errors="surrogateescape").decode("utf-8", errors="replace")
+    else:
+        texto = dados[:len(dados) - len(dados) % unidade].decode(encoding, errors="replace")[:limite]
+        # Tamanho em bytes não depende da ordem dos bytes (e "-le" não soma um BOM)
+        proximo = offset + len(texto.encode("utf-16-le" if unidade == 2 else "utf-32-le", errors="surrogatepass"))
+    return {
+        "conteudo": texto.lstrip("\ufeff"),
+        "offset": offset,
+        "proximo_offset": proximo if proximo < tamanho else None,
+        "truncado": proximo < tamanho,
+    }
+
+
+def _ler_linhas(f, caminho: str, st, inicio: int, fim: int, limite: int, encoding: str) -> Dict:
+    indice = _indice_de(caminho, st)
+    pos = indice.posicao(f, inicio)
+    if pos is None:
+        return {"conteudo": "", "linha_inicio": inicio, "linha_fim": inicio - 1,
+                "total_linhas": indice.total_linhas, "truncado": False}
+    f.seek(pos)
+    partes, chars, linha, cortado = [], 0, inicio - 1, False
+    while linha < fim:
+        bruto = f.readline()
+        if not bruto:
+            break
+        texto = _decodificar(bruto, encoding)
+        if chars + len(texto) > limite:
+            # Linha gigante sozinha: devolve o pedaço que cabe
+            if not partes:
+                partes.append(texto[:limite])
+                linha += 1
+            cortado = True
+            break
+        partes.append(texto)
+        chars += len(texto)
+        linha += 1
+    return {
+        "conteudo": "".join(partes),
+        "linha_inicio": inicio,
+        "linha_fim": linha,
+        "total_linhas": indice.total_linhas,
+        "truncado": cortado or (linha >= fim and bool(f.readline())),
+    }
+
+
+def _ler_linhas_texto(caminho: str, inicio: int, fim: int, limite: int, encoding: str) -> Dict:
+    """Faixa de linhas para UTF-16/32 (sem índice por bytes): leitura sequencial."""
+    partes, chars, linha = [], 0, 0
+    with open(caminho, "r", encoding=encoding, errors="replace") as f:
+        for texto in f:
+            linha += 1
+            if linha < inicio:
+                continue
+            if linha > fim or chars + len(texto) > limite:
+                return {"conteudo": "".join(partes), "linha_inicio": inicio, "linha_fim": linha - 1,
+                        "total_linhas": None, "truncado": True}
+            partes.append(texto)
+            chars += len(texto)
+    return {"conteudo": "".join(partes), "linha_inicio": inicio, "linha_fim": linha,
+            "total_linhas": linha, "truncado": False}
+
+
+def _ler_cauda(f, tamanho: int, n: int, limite: int, encoding: str) -> Dict:
+    """Últimas `n` linhas lendo blocos de trás para frente."""
+    f.seek(max(0, tamanho - 1))
+    quebra_final = tamanho > 0 and f.read(1) == b"\n"
+    pos, dados = tamanho, b""
+    while pos > 0:
+        passo = min(TAMANHO_BLOCO, pos)
+        pos -= passo
+        f.seek(pos)
+        dados = f.read(passo) + dados
+        corpo = dados[:-1] if quebra_final else dados
+        # n quebras antes do fim = a n-ésima última linha está inteira
+        if corpo.count(b"\n") >= n or len(dados) > limite * 4:
+            break
+    corpo = dados[:-1] if quebra_final else dados
+    linhas = corpo.split(b"\n")
+    incompleta = pos > 0 and len(linhas) <= n
+    texto = _decodificar(b"\n".join(linhas[-n:]) + (b"\n" if quebra_final else b""), encoding)
+    if len(texto) > limite:
+        texto, incompleta = texto[-limite:], True
+    return {"conteudo": texto.lstrip("\ufeff"), "ultimas_linhas": n, "truncado": incompleta}
+
+
+def _resumo_binario(f, tamanho: int, offset: int, limite: int) -> Dict:
+    f.seek(0)
+    cabecalho = f.read(32)
+    tipo = next((nome for assinatura, nome in ASSINATURAS if cabecalho.startswith(assinatura)), "binário desconhecido")
+    f.seek(offset)
+    dados = f.read(min(limite, HEX_MAX))
+    linhas = []
+    for i in range(0, len(dados), 16):
+        trecho = dados[i:i + 16]
+        hexa = " ".join(f"{b:02x}" for b in trecho)
+        ascii_ = "".join(chr(b) if 32 <= b < 127 else "." for b in trecho)
+        linhas.append(f"{offset + i:08x}  {hexa:<47}  {ascii_}")
+    fim = offset + len(dados)
+    return {
+        "binario": True,
+        "tipo": tipo,
+        "conteudo": "\n".join(linhas),
+        "offset": offset,
+        "proximo_offset": fim if fim < tamanho else None,
+        "truncado": fim < tamanho,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  API
+# ═══════════════════════════════════════════════════════════════════
+
+def ler(caminho: str, offset: int = None, limite: int = None, linha_inicio: int = None,
+        linha_fim: int = None, ultimas_linhas: int = None, encoding: str = None) -> Dict:
+    """
+    Lê um trecho de um arquivo sem carregá-lo inteiro.
+
+    Modos (o primeiro que se aplicar):
+        ultimas_linhas=N           → cauda do arquivo
+        linha_inicio[, linha_fim]  → faixa de linhas (1-based, inclusiva)
+        offset                     → a partir de um byte (use proximo_offset para continuar)
+        nada                       → começo do arquivo
+
+    `limite` é o máximo de caracteres devolvidos (bytes no hexdump de binários).
+    """
+    st = os.stat(caminho)
+    tamanho = st.st_size
+    with open(caminho, "rb") as f:
+        amostra = f.read(AMOSTRA_DETECCAO)
+        detectado, binario = detectar(amostra)
+        info = {"sucesso": True, "caminho": caminho, "tamanho": tamanho}
+
+        if binario and not encoding:
+            info.update(_resumo_binario(f, tamanho, max(0, offset or 0), limite or HEX_PADRAO))
+            return info
+
+        encoding = codecs.lookup(encoding or detectado).name
+        # "utf-16" genérico engole o BOM e atrapalha a conta dos offsets: usa a ordem detectada
+        if encoding in ("utf-16", "utf-32") and detectado.startswith(encoding):
+            encoding = detectado
+        limite = max(1, min(limite or MAX_CARACTERES, MAX_CARACTERES_ABSOLUTO))
+        info["encoding"] = encoding
+
+        if ultimas_linhas:
+            if not _compativel_ascii(encoding):
+                return {"sucesso": False, "mensagem": f"ultimas_linhas não suporta {encoding}; use linha_inicio"}
+            info.update(_ler_cauda(f, tamanho, max(1, int(ultimas_linhas)), limite, encoding))
+        elif linha_inicio or linha_fim:
+            inicio = max(1, int(linha_inicio or 1))
+            fim = int(linha_fim) if linha_fim else inicio + LINHAS_PADRAO - 1
+            if fim < inicio:
+                return {"sucesso": False, "mensagem": "linha_fim menor que linha_inicio"}
+            if _compativel_ascii(encoding):
+                info.update(_ler_linhas(f, caminho, st, inicio, fim, limite, encoding))
+            else:
+                info.update(_ler_linhas_texto(caminho, inicio, fim, limite, encoding))
+        else:
+            info.update(_ler_bytes(f, max(0, min(int(offset or 0), tamanho)), limite, encoding, tamanho))
+    return info
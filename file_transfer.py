@@ -0,0 +1,472 @@
+"""
+File Transfer — Cópia e movimentação de arquivos/pastas para o ADK Agent.
+Copia muitos arquivos pequenos em paralelo, usa cópia sem passar pelo Python
+(copy_file_range/sendfile) ou buffers grandes nos arquivos grandes, aceita
+globs de inclusão/exclusão, manda progresso para o log das skills e guarda
+um manifesto em memoria/transferencias para retomar uma cópia interrompida.
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import shutil
+import fnmatch
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+PASTA_MANIFESTOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memoria", "transferencias")
+WORKERS = int(os.getenv("ADK_COPIA_WORKERS", "8"))
+ARQUIVO_GRANDE = 32 * 1024 * 1024    # acima disso: cópia em blocos, com progresso e retomada
+TAMANHO_BLOCO = 8 * 1024 * 1024      # bytes por chamada de cópia
+INTERVALO_PROGRESSO = 2.0            # segundos entre logs de progresso
+INTERVALO_MANIFESTO = 5.0            # segundos entre gravações do manifesto
+MAX_ERROS_LISTADOS = 20
+
+
+class TransferenciaCancelada(Exception):
+    pass
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Manifesto (retomada)
+# ═══════════════════════════════════════════════════════════════════
+
+class _Manifesto:
+    """
+    Arquivos já copiados (tamanho + mtime da origem) e quantos bytes de cada arquivo
+    grande já estão no .part. Some quando a transferência termina sem erros.
+    """
+
+    def __init__(self, origem: str, destino: str):
+        chave = f"{os.path.normcase(os.path.abspath(origem))}|{os.path.normcase(os.path.abspath(destino))}"
+        self.caminho = os.path.join(PASTA_MANIFESTOS, hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16] + ".json")
+        self.dados = {"origem": origem, "destino": destino, "concluidos": {}, "parciais": {}}
+        self._lock = threading.Lock()
+        self._ultimo_salvo = 0.0
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                salvo = json.load(f)
+            self.dados["concluidos"] = salvo.get("concluidos", {})
+            self.dados["parciais"] = salvo.get("parciais", {})
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def retomando(self) -> bool:
+        return bool(self.dados["concluidos"] or self.dados["parciais"])
+
+    def concluido(self, rel: str, st: os.stat_result, dst: str) -> bool:
+        """Já copiado numa execução anterior e o destino continua lá, inteiro."""
+        marca = self.dados["concluidos"].get(rel)
+        if marca != [st.st_size, st.st_mtime]:
+            return False
+        try:
+            return os.path.getsize(dst) == st.st_size
+        except OSError:
+            return False
+
+    def parcial(self, rel: str, st: os.stat_result) -> int:
+        marca = self.dados["parciais"].get(rel)
+        if not marca or marca[:2] != [st.st_size, st.st_mtime]:
+            return 0
+        return marca[2]
+
+    def marcar(self, rel: str, st: os.stat_result, copiado: Optional[int] = None):
+        with self._lock:
+            if copiado is None:
+                self.dados["parciais"].pop(rel, None)
+                self.dados["concluidos"][rel] = [st.st_size, st.st_mtime]
+            else:
+                self.dados["parciais"][rel] = [st.st_size, st.st_mtime, copiado]
+
+    def salvar(self, forcar: bool = False):
+        agora = time.time()
+        with self._lock:
+            if not forcar and agora - self._ultimo_salvo < INTERVALO_MANIFESTO:
+                return
+            self._ultimo_salvo = agora
+            texto = json.dumps(self.dados, ensure_ascii=False)
+        try:
+            os.makedirs(PASTA_MANIFESTOS, exist_ok=True)
+            tmp = self.caminho + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(texto)
+            os.replace(tmp, self.caminho)
+        except OSError as e:
+            print(f"[FileTransfer] Erro ao salvar manifesto: {e}")
+
+    def apagar(self):
+        try:
+            os.remove(self.caminho)
+        except OSError:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Progresso
+# ═══════════════════════════════════════════════════════════════════
+
+class _Progresso:
+    """Bytes e arquivos copiados, com log periódico."""
+
+    def __init__(self, total_bytes: int, total_arquivos: int, acao: str,
+                 on_progresso: Callable[[str], None] = None, manifesto: _Manifesto = None):
+        self.total_bytes = total_bytes
+        self.total_arquivos = total_arquivos
+        self.acao = acao
+        self.bytes = 0
+        self.arquivos = 0
+        self.on_progresso = on_progresso
+        self.manifesto = manifesto
+        self._lock = threading.Lock()
+        self._inicio = time.time()
+        self._ultimo_log = 0.0
+
+    def somar(self, n_bytes: int = 0, n_arquivos: int = 0):
+        with self._lock:
+            self.bytes += n_bytes
+            self.arquivos += n_arquivos
+            agora = time.time()
+            if agora - self._ultimo_log < INTERVALO_PROGRESSO:
+                return
+            self._ultimo_log = agora
+        if self.manifesto:
+            self.manifesto.salvar()
+        self._log()
+
+    def velocidade(self) -> float:
+        return self.bytes / max(time.time() - self._inicio, 1e-6) / (1024 * 1024)
+
+    def _log(self):
+        if not self.on_progresso:
+            return
+        pct = self.bytes * 100 / self.total_bytes if self.total_bytes else 100
+        msg = (f"📦 {self.acao}: {pct:.0f}% ({self.arquivos}/{self.total_arquivos} arquivos, "
+               f"{self.bytes / (1024 * 1024):.1f}/{self.total_bytes / (1024 * 1024):.1f} MB, "
+               f"{self.velocidade():.1f} MB/s)")
+        try:
+            self.on_progresso(msg)
+        except Exception:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Seleção de arquivos
+# ═══════════════════════════════════════════════════════════════════
+
+def _casa(rel: str, padroes: List[str]) -> bool:
+    """Glob contra o caminho relativo (com /) ou só contra o nome."""
+    nome = rel.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel, p) or fnmatch.fnmatch(nome, p) for p in padroes)
+
+
+def _listar(origem: str, incluir: List[str], excluir: List[str]
+            ) -> Tuple[List[Tuple[str, os.stat_result]], List[str], List[Tuple[str, str]]]:
+    """
+    O que copiar, com caminhos relativos: (arquivo, stat) de cada arquivo, as pastas
+    (inclusive as vazias) e os links de pasta com o alvo (copiados como link, como o
+    shutil.move faz, sem percorrer o que fica do outro lado). Pastas excluídas nem são
+    percorridas; com `incluir`, só as pastas que casam com ele são criadas vazias.
+    """
+    if os.path.isfile(origem):
+        return [(os.path.basename(origem), os.stat(origem))], [], []
+    arquivos, pastas, links = [], [], []
+    for root, dirs, files in os.walk(origem):
+        base = os.path.relpath(root, origem).replace(os.sep, "/")
+        base = "" if base == "." else base + "/"
+        dirs[:] = [d for d in dirs if not _casa(base + d, excluir)]
+        for nome in list(dirs):
+            rel = base + nome
+            if incluir and not _casa(rel, incluir):
+                continue
+            caminho = os.path.join(root, nome)
+            if os.path.islink(caminho):
+                try:
+                    links.append((rel, os.readlink(caminho)))
+                except OSError:
+                    pass
+            else:
+                pastas.append(rel)
+        dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+        for nome in files:
+            rel = base + nome
+            if (incluir and not _casa(rel, incluir)) or _casa(rel, excluir):
+                continue
+            try:
+                arquivos.append((rel, os.stat(os.path.join(root, nome))))
+            except OSError:
+                pass  # link quebrado ou sumiu durante a listagem
+    return arquivos, pastas, links
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Cópia de um arquivo
+# ═══════════════════════════════════════════════════════════════════
+
+def _copiar_blocos(fsrc, fdst, pos: int, tamanho: int, somar: Callable[[int], None],
+                   cancelar: Optional[threading.Event]):
+    """
+    Copia de `pos` até `tamanho`. No Linux os bytes vão de arquivo para arquivo no
+    kernel (copy_file_range, ou sendfile); no resto, readinto num buffer reaproveitado.
+    """
+    entrada, saida = fsrc.fileno(), fdst.fileno()
+    zero_copia = sys.platform.startswith("linux")
+    buffer = None
+    while pos < tamanho:
+        if cancelar is not None and cancelar.is_set():
+            raise TransferenciaCancelada()
+        n = min(TAMANHO_BLOCO, tamanho - pos)
+        copiado = 0
+        if zero_copia:
+            try:
+                if hasattr(os, "copy_file_range"):
+                    copiado = os.copy_file_range(entrada, saida, n, pos, pos)
+                else:
+                    os.lseek(saida, pos, os.SEEK_SET)
+                    copiado = os.sendfile(saida, entrada, pos, n)
+            except OSError:
+                zero_copia = False   # ex.: sistemas de arquivos diferentes em kernels antigos
+        if not zero_copia:
+            if buffer is None:
+                buffer = memoryview(bytearray(TAMANHO_BLOCO))
+            fsrc.seek(pos)
+            copiado = fsrc.readinto(buffer[:n])
+            fdst.seek(pos)
+            fdst.write(buffer[:copiado])
+        if not copiado:
+            raise OSError(f"origem encolheu durante a cópia ({pos}/{tamanho} bytes)")
+        pos += copiado
+        somar(copiado)
+
+
+def _copiar_link(alvo: str, dst: str):
+    """Recria um link de pasta; um link igual que já está no destino conta como copiado."""
+    if os.path.islink(dst) and os.readlink(dst) == alvo:
+        return
+    if os.path.lexists(dst):
+        raise OSError(f"já existe no destino e não é o mesmo link ({dst})")
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    os.symlink(alvo, dst, target_is_directory=True)
+
+
+def _apagar(caminho: str):
+    try:
+        os.remove(caminho)
+    except (IsADirectoryError, PermissionError):
+        if not os.path.islink(caminho):
+            raise
+        os.rmdir(caminho)   # link de pasta no Windows
+
+
+def _copiar_arquivo(src: str, dst: str, rel: str, st: os.stat_result, manifesto: _Manifesto,
+                    progresso: _Progresso, cancelar: Optional[threading.Event]):
+    """Copia para dst.part e só renomeia no fim: um arquivo pela metade nunca parece pronto."""
+    # Cancelado: o que ainda está na fila do pool sai sem fazer nada
+    if cancelar is not None and cancelar.is_set():
+        raise TransferenciaCancelada()
+    parte = dst + ".part"
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if st.st_size < ARQUIVO_GRANDE:
+        shutil.copyfile(src, parte)
+        progresso.somar(st.st_size)
+    else:
+        inicio = manifesto.parcial(rel, st) if os.path.exists(parte) else 0
+        inicio = min(inicio, os.path.getsize(parte)) if inicio else 0
+        if inicio:
+            progresso.somar(inicio)
+
+        def somar(n: int):
+            nonlocal inicio
+            inicio += n
+            manifesto.marcar(rel, st, inicio)
+            progresso.somar(n)
+
+        with open(src, "rb") as fsrc, open(parte, "r+b" if inicio else "wb") as fdst:
+            _copiar_blocos(fsrc, fdst, inicio, st.st_size, somar, cancelar)
+            fdst.truncate(st.st_size)
+    shutil.copystat(src, parte)
+    os.replace(parte, dst)
+    manifesto.marcar(rel, st)
+    progresso.somar(n_arquivos=1)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  API
+# ═══════════════════════════════════════════════════════════════════
+
+def _alvo(origem: str, destino: str) -> str:
+    """Como o cp: arquivo copiado para uma pasta existente vai para dentro dela."""
+    if os.path.isfile(origem) and os.path.isdir(destino):
+        return os.path.join(destino, os.path.basename(origem))
+    return destino
+
+
+def copiar(origem: str, destino: str, incluir: List[str] = None, excluir: List[str] = None,
+           on_progresso: Callable[[str], None] = None, cancelar: threading.Event = None,
+           acao: str = "Cópia") -> Dict:
+    """
+    Copia um arquivo ou uma pasta (mesclando com o destino, se já existir).
+
+    Args:
+        origem: Arquivo ou pasta
+        destino: Caminho final (arquivo para uma pasta existente vai para dentro dela)
+        incluir: Globs do que copiar (ex: ["*.py", "docs/*"]); vazio = tudo
+        excluir: Globs ignorados (ex: ["node_modules", "*.log", ".git"])
+        on_progresso: Callback de log
+        cancelar: Event que interrompe a cópia (o manifesto permite retomar)
+
+    Returns:
+        {"sucesso": bool, "mensagem": str, "arquivos": int, "bytes": int, "pulados": int, "erros": [...]}
+    """
+    return _copiar(origem, destino, incluir, excluir, on_progresso, cancelar, acao)[0]
+
+
+def _copiar(origem: str, destino: str, incluir: Optional[List[str]], excluir: Optional[List[str]],
+            on_progresso: Optional[Callable[[str], None]], cancelar: Optional[threading.Event],
+            acao: str) -> Tuple[Dict, List[Tuple[str, os.stat_result]]]:
+    """
+    copiar() + a lista (caminho na origem, stat usado na cópia) dos arquivos e links
+    de pasta que estão no destino (o stat dos links é o do próprio link).
+    """
+    if not os.path.exists(origem):
+        return {"sucesso": False, "mensagem": f"Origem não encontrada: {origem}"}, []
+    destino = _alvo(origem, destino)
+    if os.path.isdir(origem) and os.path.normcase(os.path.abspath(destino)).startswith(
+            os.path.normcase(os.path.abspath(origem)) + os.sep):
+        return {"sucesso": False, "mensagem": "O destino não pode ficar dentro da origem"}, []
+    inicio = time.time()
+    arquivos, pastas, links = _listar(origem, incluir or [], excluir or [])
+    um_arquivo = os.path.isfile(origem)
+
+    manifesto = _Manifesto(origem, destino)
+    pendentes, pulados, transferidos = [], 0, []
+    for rel, st in arquivos:
+        src = origem if um_arquivo else os.path.join(origem, rel)
+        dst = destino if um_arquivo else os.path.join(destino, rel)
+        if manifesto.concluido(rel, st, dst):
+            pulados += 1
+            transferidos.append((src, st))
+        else:
+            pendentes.append((src, dst, rel, st))
+    if manifesto.retomando and on_progresso:
+        on_progresso(f"⏯️ Retomando {acao.lower()}: {pulados} arquivos já copiados")
+
+    total = sum(p[3].st_size for p in pendentes)
+    progresso = _Progresso(total, len(pendentes), acao, on_progresso, manifesto)
+    erros = []
+    if not um_arquivo:
+        os.makedirs(destino, exist_ok=True)
+        for rel in pastas:
+            try:
+                os.makedirs(os.path.join(destino, rel), exist_ok=True)
+            except OSError as e:
+                erros.append(f"{rel}: {e}")
+        for rel, alvo in links:
+            src = os.path.join(origem, rel)
+            try:
+                _copiar_link(alvo, os.path.join(destino, rel))
+                transferidos.append((src, os.lstat(src)))
+            except OSError as e:
+                erros.append(f"{rel}: {e}")
+
+    # Arquivos grandes primeiro: não sobram sozinhos no fim com os outros workers parados
+    pendentes.sort(key=lambda p: -p[3].st_size)
+    with ThreadPoolExecutor(max_workers=max(1, min(WORKERS, len(pendentes)))) as pool:
+        futuros = {pool.submit(_copiar_arquivo, *p, manifesto, progresso, cancelar): p for p in pendentes}
+        for futuro, (src, _, rel, st) in futuros.items():
+            try:
+                futuro.result()
+                transferidos.append((src, st))
+            except TransferenciaCancelada:
+                pass
+            except Exception as e:
+                erros.append(f"{rel}: {e}")
+
+    cancelado = cancelar is not None and cancelar.is_set()
+    if erros or cancelado:
+        manifesto.salvar(forcar=True)
+    else:
+        manifesto.apagar()
+    duracao = round(time.time() - inicio, 1)
+    resumo = f"{progresso.arquivos} arquivos, {progresso.bytes / (1024 * 1024):.1f} MB em {duracao}s"
+    if pulados:
+        resumo += f", {pulados} já estavam copiados"
+    if cancelado:
+        mensagem = f"{acao} cancelada ({resumo}). Repita o comando para retomar."
+    elif erros:
+        mensagem = f"{acao} terminou com {len(erros)} erros ({resumo}). Repita o comando para retomar."
+    else:
+        mensagem = f"{acao}: {origem} → {destino} ({resumo})"
+    return {
+        "sucesso": not erros and not cancelado,
+        "mensagem": mensagem,
+        "destino": destino,
+        "arquivos": progresso.arquivos,
+        "bytes": progresso.bytes,
+        "pulados": pulados,
+        "duracao": duracao,
+        "velocidade_mb_s": round(progresso.velocidade(), 1),
+        "erros": erros[:MAX_ERROS_LISTADOS],
+    }, transferidos
+
+
+def mover(origem: str, destino: str, incluir: List[str] = None, excluir: List[str] = None,
+          on_progresso: Callable[[str], None] = None, cancelar: threading.Event = None) -> Dict:
+    """
+    Move/renomeia. No mesmo disco (e sem filtros) é um rename instantâneo; entre discos
+    copia com copiar() e só apaga da origem o que foi copiado, depois que tudo deu certo.
+    """
+    if not os.path.exists(origem):
+        return {"sucesso": False, "mensagem": f"Origem não encontrada: {origem}"}
+    if os.path.isdir(destino):
+        destino = os.path.join(destino, os.path.basename(os.path.normpath(origem)))
+    if os.path.exists(destino):
+        return {"sucesso": False, "mensagem": f"Destino já existe: {destino}"}
+    if not incluir and not excluir:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+            os.rename(origem, destino)
+            return {"sucesso": True, "mensagem": f"Movido: {origem} → {destino}", "destino": destino}
+        except OSError:
+            pass  # outro disco (EXDEV) ou rename negado: copia + apaga
+
+    resultado, transferidos = _copiar(origem, destino, incluir, excluir, on_progresso, cancelar, "Movimentação")
+    if not resultado["sucesso"]:
+        return resultado
+    # Só sai da origem o que foi copiado, e só se não mudou desde a cópia
+    alterados = []
+    for src, st in transferidos:
+        try:
+            atual = os.lstat(src) if stat.S_ISLNK(st.st_mode) else os.stat(src)
+            if (atual.st_size, atual.st_mtime) != (st.st_size, st.st_mtime):
+                alterados.append(src)
+                continue
+            _apagar(src)
+        except OSError:
+            pass
+    if os.path.isdir(origem):
+        # Pastas que ficaram vazias e existem no destino (as com arquivos excluídos
+        # pelos filtros, ou que os filtros não levaram, continuam)
+        for root, dirs, files in os.walk(origem, topdown=False):
+            rel = os.path.relpath(root, origem)
+            if not os.path.isdir(os.path.normpath(os.path.join(destino, rel))):
+                continue
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+    resultado["mensagem"] = resultado["mensagem"].replace("Movimentação:", "Movido:")
+    if alterados:
+        resultado["mensagem"] += (f". {len(alterados)} arquivos mudaram durante a cópia e ficaram na origem "
+                                  "(o destino tem a versão anterior)")
+        resultado["alterados_na_origem"] = alterados[:MAX_ERROS_LISTADOS]
+    return resultado
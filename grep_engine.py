@@ -0,0 +1,311 @@
+"""
+Grep Engine — Busca de conteúdo em arquivos para o ADK Agent.
+Distribui os arquivos num pool de processos, lê cada um via mmap e casa o
+padrão direto nos bytes (sem decodificar nem baixar a caixa linha a linha).
+Pula binários e arquivos grandes demais, aceita várias extensões, globs e
+regex, e entrega os resultados conforme aparecem, até um limite.
+"""
+
+import os
+import re
+import mmap
+import fnmatch
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+TAMANHO_MAX_ARQUIVO = int(os.getenv("ADK_GREP_MAX_MB", "64")) * 1024 * 1024
+BYTES_DETECCAO_BINARIO = 8192       # NUL nesse trecho inicial = binário
+ARQUIVOS_POR_LOTE = 32              # arquivos por tarefa enviada ao pool
+MIN_ARQUIVOS_PROCESSOS = 200        # abaixo disso a busca roda no próprio thread
+LOTES_EM_VOO_POR_WORKER = 4         # limita o que fica enfileirado depois de atingir o limite
+TAMANHO_MAX_LINHA = 200             # caracteres de cada linha devolvida
+# Usado também por file_index e skills.pesquisar_arquivos (mesmos resultados com ou sem índice)
+DIRETORIOS_IGNORADOS = {"node_modules", "__pycache__", "venv", ".venv", "$Recycle.Bin"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pool_em_uso = 0                    # buscas usando o pool agora (encerrar_pool espera zerar)
+
+
+def _num_workers() -> int:
+    return int(os.getenv("ADK_GREP_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+
+def _obter_pool() -> ProcessPoolExecutor:
+    """
+    Pool compartilhado: criar processos (spawn no Windows) custa mais que a busca em si.
+    Cada chamada precisa de um _devolver_pool() quando a busca terminar.
+    """
+    global _pool, _pool_em_uso
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_num_workers())
+        _pool_em_uso += 1
+        return _pool
+
+
+def _devolver_pool():
+    global _pool_em_uso
+    with _pool_lock:
+        _pool_em_uso -= 1
+
+
+def encerrar_pool() -> bool:
+    """
+    Encerra os processos do pool (recriado na próxima busca grande). True se encerrou;
+    com uma busca em andamento o pool fica (derrubá-lo faria a busca perder lotes).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool_em_uso:
+            return False
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        return True
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Padrões e filtros
+# ═══════════════════════════════════════════════════════════════════
+
+def compilar_padrao(texto: str, regex: bool = False, ignorar_maiusculas: bool = True) -> Tuple[bytes, int]:
+    """
+    Converte o texto buscado num padrão de bytes (UTF-8) + flags.
+    re.IGNORECASE em bytes só cobre ASCII, então letras acentuadas de um texto
+    literal viram alternativas explícitas (ç|Ç). Em regex, a caixa é ignorada só no ASCII.
+    Levanta re.error se a regex for inválida.
+    """
+    flags = re.MULTILINE
+    if regex:
+        padrao = texto.encode("utf-8")
+        if ignorar_maiusculas:
+            flags |= re.IGNORECASE
+    elif not ignorar_maiusculas or texto.isascii():
+        padrao = re.escape(texto.encode("utf-8"))
+        if ignorar_maiusculas:
+            flags |= re.IGNORECASE
+    else:
+        partes = []
+        for c in texto:
+            variantes = sorted({re.escape(v.encode("utf-8")) for v in (c, c.lower(), c.upper())})
+            partes.append(variantes[0] if len(variantes) == 1 else b"(?:" + b"|".join(variantes) + b")")
+        padrao = b"".join(partes)
+        flags |= re.IGNORECASE
+    re.compile(padrao, flags)
+    return padrao, flags
+
+
+def separar_filtros(filtros: str) -> Tuple[List[str], List[str]]:
+    """
+    ".py, .md, test_*" → (extensões, globs). "*.py" conta como extensão;
+    vazio ou "*" significa qualquer arquivo.
+    """
+    extensoes, globs = [], []
+    for item in re.split(r"[,;\s]+", filtros or ""):
+        item = item.strip()
+        if not item or item in ("*", "*.*"):
+            continue
+        if item.startswith("*.") and not any(c in item[2:] for c in "*?["):
+            item = item[1:]
+        if any(c in item for c in "*?["):
+            globs.append(item.lower())
+        else:
+            extensoes.append((item if item.startswith(".") else "." + item).lower())
+    return extensoes, globs
+
+
+def aceita_arquivo(nome: str, extensoes: List[str], globs: List[str]) -> bool:
+    if not extensoes and not globs:
+        return True
+    nome = nome.lower()
+    if extensoes and nome.endswith(tuple(extensoes)):
+        return True
+    return any(fnmatch.fnmatchcase(nome, g) for g in globs)
+
+
+def ignorar_diretorio(nome: str) -> bool:
+    """Diretórios que nenhuma pesquisa percorre: ocultos (.git, .cache...) e DIRETORIOS_IGNORADOS."""
+    return nome.startswith(".") or nome in DIRETORIOS_IGNORADOS
+
+
+def listar_arquivos(diretorio: str, extensoes: List[str], globs: List[str]) -> Iterator[str]:
+    """os.walk com os mesmos diretórios ignorados das outras pesquisas."""
+    for root, dirs, files in os.walk(diretorio):
+        dirs[:] = [d for d in dirs if not ignorar_diretorio(d)]
+        for name in files:
+            if aceita_arquivo(name, extensoes, globs):
+                yield os.path.join(root, name)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Busca num arquivo (roda nos processos do pool)
+# ═══════════════════════════════════════════════════════════════════
+
+def _buscar_arquivo(caminho: str, padrao: re.Pattern, limite: int, contagem: Dict[str, int]) -> List[Dict]:
+    try:
+        tamanho = os.path.getsize(caminho)
+    except OSError:
+        contagem["erros"] += 1
+        return []
+    if tamanho == 0:
+        contagem["lidos"] += 1
+        return []
+    if tamanho > TAMANHO_MAX_ARQUIVO:
+        contagem["grandes"] += 1
+        return []
+
+    resultados = []
+    try:
+        with open(caminho, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\x00", 0, BYTES_DETECCAO_BINARIO) != -1:
+                contagem["binarios"] += 1
+                return []
+            contagem["lidos"] += 1
+            linha_num, contado_ate, pos = 1, 0, 0
+            while len(resultados) < limite:
+                m = padrao.search(mm, pos)
+                if not m:
+                    break
+                inicio = mm.rfind(b"\n", 0, m.start()) + 1
+                fim = mm.find(b"\n", m.start())
+                fim = tamanho if fim == -1 else fim
+                linha_num += mm[contado_ate:inicio].count(b"\n")
+                contado_ate = inicio
+                linha = mm[inicio:fim].decode("utf-8", errors="replace").strip()
+                resultados.append({"arquivo": caminho, "linha": linha_num, "conteudo": linha[:TAMANHO_MAX_LINHA]})
+                # Uma ocorrência por linha, como no grep
+                pos = fim + 1
+                if pos > tamanho:
+                    break
+    except (OSError, ValueError):
+        contagem["erros"] += 1
+    return resultados
+
+
+def _buscar_lote(caminhos: List[str], padrao: bytes, flags: int, limite: int) -> Tuple[List[Dict], Dict[str, int]]:
+    compilado = re.compile(padrao, flags)
+    contagem = {"lidos": 0, "binarios": 0, "grandes": 0, "erros": 0}
+    resultados = []
+    for caminho in caminhos:
+        resultados.extend(_buscar_arquivo(caminho, compilado, limite - len(resultados), contagem))
+        if len(resultados) >= limite:
+            break
+    return resultados, contagem
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  API
+# ═══════════════════════════════════════════════════════════════════
+
+class Busca:
+    """
+    Busca iterável: `for r in Busca(arquivos, "texto"): ...` entrega cada
+    ocorrência assim que o lote do arquivo termina. Depois da iteração,
+    `estatisticas()` diz quantos arquivos foram lidos e quantos foram pulados.
+    """
+
+    def __init__(self, arquivos: Iterable[str], texto: str, regex: bool = False,
+                 ignorar_maiusculas: bool = True, max_resultados: int = 30):
+        self.arquivos = arquivos
+        self.padrao, self.flags = compilar_padrao(texto, regex, ignorar_maiusculas)
+        self.max_resultados = max_resultados
+        self.total = 0
+        self.truncado = False
+        self.contagem = {"lidos": 0, "binarios": 0, "grandes": 0, "erros": 0}
+
+    def _somar(self, contagem: Dict[str, int]):
+        for k, v in contagem.items():
+            self.contagem[k] += v
+
+    def _lotes(self, arquivos: Iterator[str]) -> Iterator[List[str]]:
+        lote = []
+        for caminho in arquivos:
+            lote.append(caminho)
+            if len(lote) >= ARQUIVOS_POR_LOTE:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    def __iter__(self) -> Iterator[Dict]:
+        arquivos = iter(self.arquivos)
+        # Poucos arquivos: o custo de mandar para outro processo não compensa
+        inicio = []
+        for caminho in arquivos:
+            inicio.append(caminho)
+            if len(inicio) >= MIN_ARQUIVOS_PROCESSOS:
+                break
+        lotes = self._lotes(_encadear(inicio, arquivos))
+        if len(inicio) < MIN_ARQUIVOS_PROCESSOS or _num_workers() < 2:
+            origem = self._no_thread(lotes)
+        else:
+            origem = self._no_pool(lotes)
+        try:
+            for resultado in origem:
+                if self.total >= self.max_resultados:
+                    self.truncado = True
+                    break
+                self.total += 1
+                yield resultado
+        finally:
+            origem.close()
+
+    def _no_thread(self, lotes: Iterator[List[str]]) -> Iterator[Dict]:
+        for lote in lotes:
+            resultados, contagem = _buscar_lote(lote, self.padrao, self.flags, self.max_resultados - self.total + 1)
+            self._somar(contagem)
+            yield from resultados
+
+    def _no_pool(self, lotes: Iterator[List[str]]) -> Iterator[Dict]:
+        pool = _obter_pool()
+        em_voo = set()
+        max_em_voo = _num_workers() * LOTES_EM_VOO_POR_WORKER
+        try:
+            for lote in lotes:
+                em_voo.add(pool.submit(_buscar_lote, lote, self.padrao, self.flags, self.max_resultados + 1))
+                if len(em_voo) < max_em_voo:
+                    continue
+                prontos, em_voo = wait(em_voo, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    yield from self._coletar(futuro)
+            while em_voo:
+                prontos, em_voo = wait(em_voo, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    yield from self._coletar(futuro)
+        finally:
+            # Limite atingido (ou consumidor parou): lotes ainda na fila não rodam
+            for futuro in em_voo:
+                futuro.cancel()
+            _devolver_pool()
+
+    def _coletar(self, futuro) -> List[Dict]:
+        try:
+            resultados, contagem = futuro.result()
+        except Exception as e:
+            print(f"[GrepEngine] Erro num lote: {e}")
+            return []
+        self._somar(contagem)
+        return resultados
+
+    def estatisticas(self) -> Dict:
+        return {"total": self.total, "truncado": self.truncado, "arquivos_lidos": self.contagem["lidos"],
+                "binarios_pulados": self.contagem["binarios"], "grandes_pulados": self.contagem["grandes"]}
+
+
+def _encadear(inicio: List[str], resto: Iterator[str]) -> Iterator[str]:
+    yield from inicio
+    yield from resto
+
+
+def buscar(arquivos: Iterable[str], texto: str, regex: bool = False,
+           ignorar_maiusculas: bool = True, max_resultados: int = 30) -> Dict:
+    """Versão não-streaming: roda a busca inteira e devolve resultados + estatísticas."""
+    busca = Busca(arquivos, texto, regex, ignorar_maiusculas, max_resultados)
+    resultados = list(busca)
+    return {"sucesso": True, "resultados": resultados, **busca.estatisticas()}
@@ -16,6 +16,7 @@ from dotenv import load_dotenv
 from agent_core import AgentCore
 from audio_capture import AudioCapture
 from screen_capture import ScreenCapture
+from resource_watchdog import obter_vigia, FPS_ECONOMICO, RESOLUCAO_ECONOMICA
 
 
 class AgentGUI:
@@ -47,6 +48,8 @@ class AgentGUI:
         self.mic_muted = False
         self.screen_enabled = True
         self.preview_image = None
+        # Uma só captura para o preview (5 FPS, 320x200): é ela que o watchdog limita
+        self.preview_capture = ScreenCapture(fps=5.0, resolution=320)
         
         # Referências para o backend
         self.agent_loop_thread = None
@@ -67,6 +70,11 @@ class AgentGUI:
         
         # Carregar variáveis de ambiente
         load_dotenv()
+
+        # Watchdog de recursos: sob pressão segura a tela e avisa na barra de status
+        self.vigia = obter_vigia()
+        self.vigia.registrar_acao("tela", self._economizar_tela, self._restaurar_tela)
+        self.vigia.ao_mudar(self._on_pressao)
         
         # Iniciar loop de preview da câmera
         self.update_preview_loop()
@@ -472,19 +480,40 @@ class AgentGUI:
     def update_preview_loop(self):
         """Loop independente para atualizar o preview da tela na GUI."""
         if self.is_connected and self.screen_enabled:
-            # Usar ScreenCapture estático para preview (não precisa da instância do agente)
+            # Preview usa a própria instância (não precisa da do agente)
             try:
-                # Criar instância temporária só para um frame é ineficiente, 
-                # mas o ScreenCapture atual cria mss() a cada chamada, então ok.
-                # Melhor usar o método estático ou criar uma instância global de preview.
-                preview_capture = ScreenCapture() 
-                img = preview_capture.capture_frame_pil() # Retorna PIL Image
+                img = self.preview_capture.capture_frame_pil() # Retorna PIL Image
                 self.update_preview(img)
             except Exception:
                 pass
         
-        # Reagendar
-        self.root.after(200, self.update_preview_loop) # 5 FPS no preview
+        # Reagendar (relido a cada frame: o watchdog pode ter limitado o fps)
+        self.root.after(int(1000 / self.preview_capture.fps), self.update_preview_loop)
+
+    def _capturas(self):
+        """Capturas ativas: o preview e, se o agente estiver enviando a tela, a dele."""
+        return [c for c in (self.preview_capture, self.screen) if c is not None]
+
+    def _economizar_tela(self, motivo: str):
+        """Ação do watchdog: capturas de tela (preview e a enviada ao Gemini) mais lentas e menores."""
+        for captura in self._capturas():
+            captura.limitar(FPS_ECONOMICO, RESOLUCAO_ECONOMICA)
+
+    def _restaurar_tela(self):
+        for captura in self._capturas():
+            captura.restaurar()
+
+    def _on_pressao(self, evento: dict):
+        """Eventos do watchdog (thread do watchdog) → barra de status + log de skills."""
+        self.add_skill_log(evento["mensagem"])
+        def _update():
+            if evento["tipo"] == "pressao":
+                self.status_label.config(text=evento["mensagem"], fg=self.ACCENT_ORANGE)
+            elif self.is_connected:
+                self.status_label.config(text="🟢 Conectado", fg=self.ACCENT_GREEN)
+            else:
+                self.status_label.config(text="⚫ Desconectado", fg=self.TEXT_SECONDARY)
+        self.root.after(0, _update)
 
     # ═══════════════════════════════════════════════════
     # Callbacks da UI (Acionadores)
@@ -0,0 +1,274 @@
+"""
+Job Manager — Tarefas longas em segundo plano para o ADK Agent.
+Roda skills demoradas (downloads, instalações, agentes autônomos) num pool
+limitado, devolve um id na hora e guarda o estado em memoria/jobs.json.
+Quando um job termina, o callback registrado (AgentCore) avisa a sessão Live.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Any
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+ARQUIVO_JOBS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memoria", "jobs.json")
+MAX_JOBS_SIMULTANEOS = int(os.getenv("ADK_JOBS_MAX", "3"))
+MAX_HISTORICO = 100          # jobs finalizados mantidos no arquivo
+TAMANHO_MAX_RESULTADO = 8000 # caracteres do resultado guardados
+
+ESTADOS_ATIVOS = ("na_fila", "executando")
+
+_jobs: Dict[str, Dict[str, Any]] = {}
+_futuros: Dict[str, Any] = {}
+_cancelamentos: Dict[str, threading.Event] = {}
+_lock = threading.RLock()
+_executor: Optional[ThreadPoolExecutor] = None
+_callback_concluido: Optional[Callable[[Dict], None]] = None
+_carregado = False
+_local = threading.local()
+_fila_liberada = threading.Event()   # limpo enquanto o watchdog segura a fila
+_fila_liberada.set()
+_motivo_adiamento: Optional[str] = None
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Persistência
+# ═══════════════════════════════════════════════════════════════════
+
+def _carregar():
+    """Carrega o histórico. Jobs que estavam rodando quando o processo morreu viram 'interrompido'."""
+    global _carregado
+    if _carregado:
+        return
+    _carregado = True
+    try:
+        with open(ARQUIVO_JOBS, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return
+    for job in dados.get("jobs", []):
+        if job.get("estado") in ESTADOS_ATIVOS:
+            job["estado"] = "interrompido"
+            job["fim"] = job.get("fim") or time.time()
+        _jobs[job["id"]] = job
+
+
+def _salvar():
+    finalizados = sorted(
+        (j for j in _jobs.values() if j["estado"] not in ESTADOS_ATIVOS),
+        key=lambda j: j.get("fim") or 0,
+    )
+    for job in finalizados[:max(0, len(finalizados) - MAX_HISTORICO)]:
+        del _jobs[job["id"]]
+    try:
+        os.makedirs(os.path.dirname(ARQUIVO_JOBS), exist_ok=True)
+        tmp = ARQUIVO_JOBS + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"jobs": list(_jobs.values())}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, ARQUIVO_JOBS)
+    except OSError as e:
+        print(f"[JobManager] Erro ao salvar jobs: {e}")
+
+
+def _obter_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_JOBS_SIMULTANEOS, thread_name_prefix="job")
+    return _executor
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  API
+# ═══════════════════════════════════════════════════════════════════
+
+def registrar_callback(callback: Callable[[Dict], None]):
+    """Registra quem é avisado quando um job termina (recebe o dict do job)."""
+    global _callback_concluido
+    _callback_concluido = callback
+
+
+def cancelamento_solicitado() -> bool:
+    """Para skills longas checarem dentro do próprio loop se o job atual foi cancelado."""
+    evento = getattr(_local, "cancelar", None)
+    return bool(evento and evento.is_set())
+
+
+def evento_cancelamento() -> Optional[threading.Event]:
+    """Event de cancelamento do job que roda nesta thread (None fora de um job)."""
+    return getattr(_local, "cancelar", None)
+
+
+def adiar_fila(motivo: str):
+    """
+    Segura os jobs que ainda não começaram (os que já rodam continuam).
+    Eles ficam 'na_fila' até liberar_fila(); cancelar() continua valendo.
+    """
+    global _motivo_adiamento
+    _motivo_adiamento = motivo
+    _fila_liberada.clear()
+    print(f"[JobManager] Fila adiada: {motivo}")
+
+
+def liberar_fila():
+    global _motivo_adiamento
+    if not _fila_liberada.is_set():
+        print("[JobManager] Fila liberada")
+    _motivo_adiamento = None
+    _fila_liberada.set()
+
+
+def iniciar(skill: str, params: Dict, executar: Callable[[str, Dict], str]) -> Dict:
+    """
+    Agenda `executar(skill, params)` no pool e retorna o id imediatamente.
+
+    Args:
+        skill: Nome da skill a executar
+        params: Parâmetros da skill
+        executar: Função que executa uma skill (skills.executar_skill)
+
+    Returns:
+        {"sucesso": bool, "id": str, "mensagem": str}
+    """
+    job_id = uuid.uuid4().hex[:8]
+    cancelar = threading.Event()
+    with _lock:
+        _carregar()
+        _jobs[job_id] = {
+            "id": job_id,
+            "skill": skill,
+            "params": params,
+            "estado": "na_fila",
+            "criado": time.time(),
+            "inicio": None,
+            "fim": None,
+            "resultado": None,
+        }
+        _cancelamentos[job_id] = cancelar
+        _salvar()
+        _futuros[job_id] = _obter_executor().submit(_rodar, job_id, skill, params, executar, cancelar)
+    return {
+        "sucesso": True,
+        "id": job_id,
+        "mensagem": f"Job {job_id} ({skill}) iniciado em segundo plano. Você será avisado quando terminar.",
+    }
+
+
+def _rodar(job_id: str, skill: str, params: Dict, executar: Callable[[str, Dict], str],
+           cancelar: threading.Event):
+    while not _fila_liberada.wait(1.0):
+        if cancelar.is_set():
+            return
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or cancelar.is_set():
+            return
+        job["estado"] = "executando"
+        job["inicio"] = time.time()
+        _salvar()
+
+    _local.cancelar = cancelar
+    try:
+        resultado = executar(skill, params)
+        estado = "cancelado" if cancelar.is_set() else _estado_do_resultado(resultado)
+    except Exception as e:
+        resultado = json.dumps({"sucesso": False, "mensagem": str(e)}, ensure_ascii=False)
+        estado = "erro"
+    finally:
+        _local.cancelar = None
+
+    with _lock:
+        job["estado"] = estado
+        job["fim"] = time.time()
+        job["resultado"] = str(resultado)[:TAMANHO_MAX_RESULTADO]
+        _futuros.pop(job_id, None)
+        _cancelamentos.pop(job_id, None)
+        _salvar()
+        copia = dict(job)
+
+    print(f"[JobManager] Job {job_id} ({skill}) terminou: {estado}")
+    if _callback_concluido and estado != "cancelado":
+        try:
+            _callback_concluido(copia)
+        except Exception as e:
+            print(f"[JobManager] Erro no callback: {e}")
+
+
+def _estado_do_resultado(resultado: Any) -> str:
+    try:
+        dados = json.loads(resultado) if isinstance(resultado, str) else resultado
+        if isinstance(dados, dict) and dados.get("sucesso") is False:
+            return "erro"
+    except (TypeError, ValueError):
+        pass
+    return "concluido"
+
+
+def _resumo(job: Dict) -> Dict:
+    agora = time.time()
+    inicio = job.get("inicio")
+    return {
+        "id": job["id"],
+        "skill": job["skill"],
+        "estado": job["estado"],
+        "segundos": round((job.get("fim") or agora) - inicio, 1) if inicio else 0,
+    }
+
+
+def status(job_id: str = None) -> Dict:
+    """Estado de um job, ou a lista de todos (ativos primeiro)."""
+    with _lock:
+        _carregar()
+        if job_id:
+            job = _jobs.get(job_id)
+            if not job:
+                return {"sucesso": False, "mensagem": f"Job {job_id} não encontrado"}
+            return {"sucesso": True, **_resumo(job)}
+        jobs = sorted(_jobs.values(), key=lambda j: (j["estado"] not in ESTADOS_ATIVOS, -j["criado"]))
+        dados = {"sucesso": True, "jobs": [_resumo(j) for j in jobs[:20]]}
+        if _motivo_adiamento:
+            dados["fila_adiada"] = _motivo_adiamento
+        return dados
+
+
+def resultado(job_id: str) -> Dict:
+    with _lock:
+        _carregar()
+        job = _jobs.get(job_id)
+        if not job:
+            return {"sucesso": False, "mensagem": f"Job {job_id} não encontrado"}
+        if job["estado"] in ESTADOS_ATIVOS:
+            return {"sucesso": False, "mensagem": f"Job {job_id} ainda está {job['estado']}", **_resumo(job)}
+        return {"sucesso": True, **_resumo(job), "resultado": job["resultado"]}
+
+
+def cancelar(job_id: str) -> Dict:
+    """
+    Cancela um job. Na fila: sai na hora. Executando: o cancelamento é cooperativo
+    (skills que checam cancelamento_solicitado() param; as outras terminam e o resultado é descartado).
+    """
+    with _lock:
+        _carregar()
+        job = _jobs.get(job_id)
+        if not job:
+            return {"sucesso": False, "mensagem": f"Job {job_id} não encontrado"}
+        if job["estado"] not in ESTADOS_ATIVOS:
+            return {"sucesso": False, "mensagem": f"Job {job_id} já terminou ({job['estado']})"}
+        _cancelamentos[job_id].set()
+        futuro = _futuros.get(job_id)
+        if job["estado"] == "na_fila" or (futuro and futuro.cancel()):
+            job["estado"] = "cancelado"
+            job["fim"] = time.time()
+            _futuros.pop(job_id, None)
+            _cancelamentos.pop(job_id, None)
+            _salvar()
+            return {"sucesso": True, "mensagem": f"Job {job_id} cancelado antes de começar"}
+        job["estado_pedido"] = "cancelado"
+        _salvar()
+    return {"sucesso": True, "mensagem": f"Cancelamento do job {job_id} solicitado; ele para no próximo ponto seguro"}
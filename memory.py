@@ -9,6 +9,8 @@ import json
 import time
 from datetime import datetime
 
+import telemetry
+
 # Diretório de memória
 MEMORIA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memoria")
 os.makedirs(MEMORIA_DIR, exist_ok=True)
@@ -18,6 +20,8 @@ NOTAS_FILE = os.path.join(MEMORIA_DIR, "notas.json")
 TAREFAS_FILE = os.path.join(MEMORIA_DIR, "tarefas.json")
 APRENDIZADOS_FILE = os.path.join(MEMORIA_DIR, "aprendizados.json")
 
+_IO_SEGUNDOS = telemetry.histograma("adk_memoria_io_segundos", "Leitura/gravação dos JSON de memória")
+
 
 def _carregar_json(filepath: str, default=None):
     """Carrega um arquivo JSON."""
@@ -25,8 +29,9 @@ def _carregar_json(filepath: str, default=None):
         default = []
     try:
         if os.path.exists(filepath):
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with telemetry.span("memoria_io", _IO_SEGUNDOS, op="ler", arquivo=os.path.basename(filepath)):
+                with open(filepath, "r", encoding="utf-8") as f:
+                    return json.load(f)
     except Exception as e:
         print(f"[Memória] Erro ao carregar {filepath}: {e}")
     return default
@@ -36,8 +41,9 @@ def _salvar_json(filepath: str, data):
     """Salva dados em JSON."""
     try:
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with telemetry.span("memoria_io", _IO_SEGUNDOS, op="gravar", arquivo=os.path.basename(filepath)):
+            with open(filepath, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
     except Exception as e:
         print(f"[Memória] Erro ao salvar {filepath}: {e}")
 
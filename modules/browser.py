@@ -1,25 +1,75 @@
-import os
-import time
-import json
-import re
 import markdownify
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 
 import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 
 from .llm_bridge import LLMBridge
+from .page_wait import PageWaiter
+from .dom_snapshot import DomSnapshot, SNAPSHOT_JS, RESOLVE_JS
+from .page_state import PageStateTracker, RollingHistory
+
+ACTION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "pensamento": {"type": "STRING"},
+        "anotacoes": {"type": "STRING"},
+        "acao": {"type": "STRING", "enum": ["clicar", "digitar", "google", "finalizar"]},
+        "detalhe": {"type": "STRING"},
+    },
+    "required": ["pensamento", "acao", "detalhe"],
+    "property_ordering": ["pensamento", "anotacoes", "acao", "detalhe"],
+}
+
+# Modo "pesquisa de texto": get_markdown só lê o HTML, então nada disso precisa ser baixado
+TEXT_MODE_BLOCKED_EXTENSIONS = [
+    # Imagens, mídia e fontes
+    "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp",
+    "mp4", "webm", "m3u8", "mp3", "ogg", "wav", "m4a",
+    "woff", "woff2", "ttf", "otf", "eot",
+]
+
+TEXT_MODE_BLOCKED_URLS = [
+    pattern
+    for ext in TEXT_MODE_BLOCKED_EXTENSIONS
+    for pattern in (f"*.{ext}", f"*.{ext}?*")
+] + [
+    # Anúncios e rastreadores (scripts de terceiros)
+    "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*googletagservices.com*",
+    "*adservice.google.*", "*connect.facebook.net*", "*facebook.com/tr*",
+    "*hotjar.com*", "*clarity.ms*", "*scorecardresearch.com*", "*quantserve.com*",
+    "*taboola.com*", "*outbrain.com*", "*criteo.*", "*amazon-adsystem.com*",
+    "*adnxs.com*", "*segment.io*", "*segment.com/analytics*", "*newrelic.com*",
+    "*nr-data.net*", "*mixpanel.com*", "*tiktok.com/i18n/pixel*", "*ads-twitter.com*",
+]
+
+TEXT_MODE_ARGS = [
+    "--window-size=1280,800",
+    "--blink-settings=imagesEnabled=false",
+    "--mute-audio",
+    "--autoplay-policy=user-gesture-required",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-notifications",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication,InterestFeedContentSuggestions",
+]
 
 class Browser:
-    def __init__(self, headless=False):
-        self.driver = self._create_driver(headless)
+    def __init__(self, headless=False, text_mode=False):
+        self.text_mode = text_mode
+        self.driver = self._create_driver(headless, text_mode)
         self.wait = WebDriverWait(self.driver, 10)
+        self.waiter = PageWaiter(self.driver)
+        self.waiter.install()
+        if text_mode:
+            self._block_resources()
 
-    def _create_driver(self, headless):
+    def _create_driver(self, headless, text_mode=False):
         options = Options()
         if headless:
             options.add_argument("--headless=new")
@@ -29,7 +79,21 @@ class Browser:
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-blink-features=AutomationControlled")
         options.add_argument("--disable-infobars")
-        options.add_argument("--window-size=1920,1080")
+        # Eventos Network do CDP (usados pelo PageWaiter para detectar rede ociosa)
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+        if text_mode:
+            # Render leve: viewport menor, sem imagens/mídia/notificações
+            for arg in TEXT_MODE_ARGS:
+                options.add_argument(arg)
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.managed_default_content_settings.media_stream": 2,
+                "profile.default_content_setting_values.notifications": 2,
+                "profile.default_content_setting_values.geolocation": 2,
+            })
+        else:
+            options.add_argument("--window-size=1920,1080")
 
         try:
             driver = uc.Chrome(options=options)
@@ -40,24 +104,32 @@ class Browser:
         
         return driver
 
+    def _block_resources(self):
+        """Bloqueia imagens, mídia, fontes e rastreadores via CDP (Network.setBlockedURLs)."""
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": TEXT_MODE_BLOCKED_URLS})
+        except Exception as e:
+            print(f"[Browser] Não consegui ativar bloqueio de recursos: {e}")
+
     def go_to(self, url):
         try:
             if not url.startswith("http"):
                 url = "https://" + url
+            self.waiter.begin()
             self.driver.get(url)
-            self._wait_for_load()
+            self._wait_for_load("navegar")
             return True
         except Exception as e:
             return f"Erro ao navegar: {e}"
 
-    def _wait_for_load(self):
-        time.sleep(2)
-        try:
-            WebDriverWait(self.driver, 5).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-        except:
-            pass
+    def _wait_for_load(self, label="load", target=None):
+        """Espera rede ociosa + DOM estável (ou o seletor `target`) em vez de sleep fixo."""
+        return self.waiter.wait(label, target)
+
+    def wait_stats(self):
+        """Tempos de espera por etapa registrados pelo PageWaiter."""
+        return self.waiter.stats()
 
     def get_markdown(self):
         try:
@@ -74,124 +146,163 @@ class Browser:
         except Exception as e:
             return f"Erro ao ler página: {e}"
 
+    def snapshot(self):
+        """Todos os elementos interativos (texto, atributos, visibilidade, bbox) em um único round-trip."""
+        elements = self.driver.execute_script(SNAPSHOT_JS)
+        return DomSnapshot(elements, self.driver.current_url)
+
+    def element(self, handle):
+        """Resolve o handle de um elemento do snapshot para um WebElement (None se sumiu do DOM)."""
+        return self.driver.execute_script(RESOLVE_JS, handle)
+
     def get_links(self):
-        links = []
-        elements = self.driver.find_elements(By.TAG_NAME, "a")
-        for el in elements:
-            try:
-                if el.is_displayed():
-                    href = el.get_attribute("href")
-                    text = el.text.strip()
-                    if href and text and len(text) > 3:
-                        links.append(f"[{text}]({href})")
-            except:
-                continue
-        return links[:50] # Limit links
+        try:
+            return self.snapshot().links(min_text=4, limit=50)
+        except Exception:
+            return []
 
     def click_text(self, text):
         try:
-            elements = self.driver.find_elements(By.TAG_NAME, "a") + self.driver.find_elements(By.TAG_NAME, "button")
-            for el in elements:
-                if text.lower() in el.text.lower():
-                    el.click()
-                    self._wait_for_load()
-                    return f"Cliquei em '{text}'"
-            return f"Não encontrei elemento com texto '{text}'"
+            match = self.snapshot().find_clickable(text)
+            el = self.element(match["handle"]) if match else None
+            if el is None:
+                return f"Não encontrei elemento com texto '{text}'"
+            self.waiter.begin()
+            el.click()
+            self._wait_for_load("clicar")
+            return f"Cliquei em '{text}'"
         except Exception as e:
             return f"Erro ao clicar: {e}"
             
     def fill_input(self, placeholder_or_name, value):
         try:
-            inputs = self.driver.find_elements(By.TAG_NAME, "input")
-            for inp in inputs:
-                attr = (inp.get_attribute("placeholder") or inp.get_attribute("name") or inp.get_attribute("id") or "").lower()
-                if placeholder_or_name.lower() in attr:
-                    inp.clear()
-                    inp.send_keys(value)
-                    return f"Digitei '{value}' em '{placeholder_or_name}'"
-            return f"Input '{placeholder_or_name}' não encontrado"
+            match = self.snapshot().find_input(placeholder_or_name)
+            inp = self.element(match["handle"]) if match else None
+            if inp is None:
+                return f"Input '{placeholder_or_name}' não encontrado"
+            inp.clear()
+            inp.send_keys(value)
+            return f"Digitei '{value}' em '{placeholder_or_name}'"
         except Exception as e:
             return f"Erro ao digitar: {e}"
 
+    def is_alive(self):
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def reset(self):
+        """Limpa estado entre usos (abas extras, cookies, storage) e volta para about:blank."""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.driver.get("about:blank")
+        # delete_all_cookies()/localStorage.clear() só alcançam a origem da página atual:
+        # pelo CDP limpa cookies, cache e storage de todos os domínios visitados no empréstimo
+        try:
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            self.driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            self.driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": "*", "storageTypes": "all"})
+        except Exception as e:
+            print(f"[Browser] Erro limpando estado pelo CDP: {e}")
+            self.driver.delete_all_cookies()
+        self.waiter.reset()
+
     def close(self):
         self.driver.quit()
 
 
 class AutonomousBrowser:
-    def __init__(self):
-        self.browser = None
-        self.llm = LLMBridge()
+    def __init__(self, llm=None, pool=None):
+        self.llm = llm or LLMBridge()
+        self.pool = pool
 
-    def start_research(self, goal):
-        if not self.browser:
-            self.browser = Browser(headless=True) # Default headless for background work
-        
-        history = []
+    def start_research(self, goal, contexto=None):
+        """`contexto` (resultados de passos anteriores) só vai para os prompts, nunca para a busca/URL."""
+        # Navegadores headless vêm do pool compartilhado (sem cold start do Chrome a cada pesquisa)
+        from .browser_pool import get_browser_pool
+        pool = self.pool or get_browser_pool()
+        with pool.lease() as browser:
+            return self._research(browser, goal, contexto)
+
+    def _research(self, browser, goal, contexto=None):
+        # Só o que mudou na página vai para o prompt; o histórico é um resumo rolante
+        page_state = PageStateTracker(max_chars=4000)
+        history = RollingHistory()
         max_steps = 10
         current_step = 0
         final_answer = ""
+        context_block = f"\nContexto de passos anteriores:\n{contexto}\n" if contexto else ""
 
         # Step 1: Initial search (if not URL)
         if "http" not in goal:
             search_url = f"https://www.google.com/search?q={goal.replace(' ', '+')}"
-            self.browser.go_to(search_url)
+            browser.go_to(search_url)
             history.append(f"Search: {goal}")
         else:
-            self.browser.go_to(goal)
+            browser.go_to(goal)
             history.append(f"Navigated to: {goal}")
 
         while current_step < max_steps:
-            content = self.browser.get_markdown()
-            current_url = self.browser.driver.current_url
+            content = browser.get_markdown()
+            current_url = browser.driver.current_url
+            page_view = page_state.update(current_url, content)
             
             prompt = f"""
             Você é um Agente de Navegação Autônomo.
             Objetivo: {goal}
-            
+            {context_block}
             URL Atual: {current_url}
             
-            Conteúdo da Página (resumo):
-            {content[:4000]}
+            Conteúdo da Página (só o que você ainda não viu nesta URL):
+            {page_view}
             
-            Histórico de ações:
-            {history}
+            Histórico de ações e anotações:
+            {history.render()}
             
-            Decida o próximo passo. Responda APENAS UM JSON no formato:
-            {{
-                "pensamento": "Seu raciocínio aqui",
-                "acao": "clicar" | "digitar" | "google" | "finalizar",
-                "detalhe": "texto do link" | "input_name:valor" | "novo termo busca" | "resumo final da resposta"
-            }}
+            Decida o próximo passo e responda em JSON:
+            - "pensamento": seu raciocínio
+            - "anotacoes": fatos úteis para o objetivo vistos nesta página (curto, pode ser vazio)
+            - "acao": "clicar" | "digitar" | "google" | "finalizar"
+            - "detalhe": texto do link | "input_name:valor" | novo termo de busca | resumo final da resposta
             """
             
-            response = self.llm.chat(prompt)
-            print(f"[AutonomousBrowser] Step {current_step}: {response}")
+            # Conteúdo da web é "ao vivo": não reaproveitar respostas antigas
+            plan = self.llm.chat_json(prompt, ACTION_SCHEMA, use_cache=False)
+            print(f"[AutonomousBrowser] Step {current_step}: {plan}")
+            if plan is None:
+                # O formato é garantido pela API; None é falha da chamada (já com retries no LLMBridge)
+                break
             
             try:
-                # Extract JSON
-                json_str = re.search(r'\{.*\}', response, re.DOTALL).group(0)
-                plan = json.loads(json_str)
-                
                 action = plan.get("acao")
                 detail = plan.get("detalhe")
+                notes = (plan.get("anotacoes") or "").strip()
+                if notes:
+                    # O LLM não guarda estado entre chamadas: as anotações carregam o que já foi lido
+                    history.add_note(f"({current_url}) {notes}")
                 
                 if action == "finalizar":
                     final_answer = detail
                     break
                 
                 elif action == "clicar":
-                    res = self.browser.click_text(detail)
+                    res = browser.click_text(detail)
                     history.append(f"Clicou em '{detail}': {res}")
                 
                 elif action == "digitar":
                     if ":" in detail:
                         field, val = detail.split(":", 1)
-                        res = self.browser.fill_input(field, val)
+                        res = browser.fill_input(field, val)
                         history.append(f"Digitou '{val}' em '{field}': {res}")
                 
                 elif action == "google":
                     url = f"https://www.google.com/search?q={detail.replace(' ', '+')}"
-                    self.browser.go_to(url)
+                    browser.go_to(url)
                     history.append(f"Google Search: {detail}")
                 
                 current_step += 1
@@ -200,6 +311,4 @@ class AutonomousBrowser:
                 print(f"[AutonomousBrowser] Erro no loop: {e}")
                 current_step += 1
                 
-        self.browser.close()
-        self.browser = None
         return final_answer or "Não consegui encontrar uma resposta conclusiva."
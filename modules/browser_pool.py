@@ -0,0 +1,192 @@
+import os
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+
+from .browser import Browser
+
+try:
+    import psutil
+except ImportError:  # Sem psutil, só reciclamos por número de usos
+    psutil = None
+
+
+class BrowserPool:
+    """
+    Mantém N instâncias headless do Chrome aquecidas entre chamadas.
+    Cada pesquisa pega um Browser emprestado (lease), que é resetado ao ser
+    devolvido e reciclado depois de `max_uses` usos ou se a memória crescer demais.
+    """
+
+    def __init__(self, size=2, max_uses=25, max_growth_mb=700, headless=True, text_mode=True):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_growth_mb = max_growth_mb
+        self.headless = headless
+        self.text_mode = text_mode  # Pesquisa só lê texto: bloqueia imagens/mídia/rastreadores
+
+        self._idle = queue.LifoQueue()  # LIFO: reaproveita a instância mais "quente"
+        self._meta = {}                 # id(browser) -> {"uses", "rss_base"}
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()  # uc.Chrome não gosta de criação concorrente
+        self._count = 0
+        self._closed = False
+
+    # ───────────── ciclo de vida ─────────────
+
+    def _create(self):
+        with self._create_lock:
+            browser = Browser(headless=self.headless, text_mode=self.text_mode)
+        self._meta[id(browser)] = {"uses": 0, "rss_base": self._rss_mb(browser)}
+        return browser
+
+    def _destroy(self, browser):
+        self._meta.pop(id(browser), None)
+        try:
+            browser.close()
+        except Exception as e:
+            print(f"[BrowserPool] Erro ao fechar navegador: {e}")
+        with self._lock:
+            self._count -= 1
+
+    def _rss_mb(self, browser):
+        """Memória (RSS) do chromedriver + processos Chrome filhos, em MB."""
+        if psutil is None:
+            return 0.0
+        try:
+            proc = psutil.Process(browser.driver.service.process.pid)
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            return total / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def warmup(self, background=True):
+        """Cria instâncias até completar o tamanho do pool."""
+        def _fill():
+            while True:
+                with self._lock:
+                    if self._closed or self._count >= self.size:
+                        return
+                    self._count += 1
+                try:
+                    self._idle.put(self._create())
+                except Exception as e:
+                    print(f"[BrowserPool] Erro ao aquecer navegador: {e}")
+                    with self._lock:
+                        self._count -= 1
+                    return
+
+        if background:
+            threading.Thread(target=_fill, daemon=True, name="BrowserPoolWarmup").start()
+        else:
+            _fill()
+
+    def shutdown(self):
+        """Fecha todas as instâncias ociosas e impede novos empréstimos."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._destroy(browser)
+
+    # ───────────── empréstimo ─────────────
+
+    def _acquire(self, timeout):
+        if self._closed:
+            raise RuntimeError("BrowserPool encerrado")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._count < self.size
+            if can_create:
+                self._count += 1
+        if can_create:
+            try:
+                return self._create()
+            except Exception:
+                with self._lock:
+                    self._count -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Nenhum navegador livre no pool após {timeout}s")
+
+    def _release(self, browser, healthy):
+        meta = self._meta.get(id(browser), {"uses": 0, "rss_base": 0.0})
+        meta["uses"] += 1
+
+        recycle = not healthy or self._closed or meta["uses"] >= self.max_uses
+        if not recycle and psutil is not None:
+            growth = self._rss_mb(browser) - meta["rss_base"]
+            if growth > self.max_growth_mb:
+                print(f"[BrowserPool] Reciclando navegador (+{growth:.0f} MB desde a criação)")
+                recycle = True
+
+        if not recycle:
+            try:
+                browser.reset()
+            except Exception as e:
+                print(f"[BrowserPool] Reset falhou, reciclando: {e}")
+                recycle = True
+
+        if recycle:
+            self._destroy(browser)
+            if not self._closed:
+                self.warmup()
+        else:
+            self._idle.put(browser)
+
+    @contextmanager
+    def lease(self, timeout=120):
+        """Empresta um Browser: `with pool.lease() as browser: ...`"""
+        browser = self._acquire(timeout)
+        healthy = True
+        try:
+            yield browser
+        except Exception:
+            healthy = browser.is_alive()
+            raise
+        finally:
+            self._release(browser, healthy)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Pool compartilhado pelo processo (criado e aquecido no primeiro uso)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                size=int(os.getenv("ADK_BROWSER_POOL", "2")),
+                max_uses=int(os.getenv("ADK_BROWSER_MAX_USOS", "25")),
+                text_mode=os.getenv("ADK_BROWSER_MODO_TEXTO", "1") != "0",
+            )
+            _pool.warmup()
+            atexit.register(shutdown_browser_pool)
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Encerra o pool compartilhado (chamado automaticamente no exit)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -1,36 +1,68 @@
 import os
-import subprocess
 import time
-import re
+import uuid
 from .llm_bridge import LLMBridge
+from .executor import get_executor, cleanup_workspace
+from .patching import (PatchError, apply_fix, validate, code_window, error_lines,
+                       error_signature, get_fix_cache)
+
+# Limites de cada execução de script gerado
+RUN_TIMEOUT = 120
+RUN_MEMORY_MB = 1024
+
+CODE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"codigo": {"type": "STRING"}},
+    "required": ["codigo"],
+}
+
+FIX_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "edicoes": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {"buscar": {"type": "STRING"}, "substituir": {"type": "STRING"}},
+                "required": ["buscar", "substituir"],
+            },
+        },
+        "diff": {"type": "STRING"},
+        "codigo": {"type": "STRING"},
+    },
+}
 
 class CoderAgent:
-    def __init__(self):
-        self.llm = LLMBridge()
+    def __init__(self, llm=None, executor=None):
+        self.llm = llm or LLMBridge()
+        self.executor = executor or get_executor()
+        self.fixes = get_fix_cache()
         self.work_dir = os.path.join(os.getcwd(), "workspace")
         os.makedirs(self.work_dir, exist_ok=True)
+        cleanup_workspace(self.work_dir)
 
-    def write_code(self, task):
-        prompt = f"""
+    @staticmethod
+    def _code_prompt(task):
+        return f"""
         Você é um Programador Python Especialista.
         Tarefa: {task}
         
         Escreva um script Python completo que resolva esta tarefa.
         O script deve ser auto-contido e imprimir o resultado final no stdout.
         
-        Responda APENAS com o código Python dentro de blocos ```python ... ```.
-        Não explique nada.
+        Responda em JSON com o código completo no campo "codigo". Não explique nada.
         """
-        response = self.llm.chat(prompt)
-        
-        # Extract code
-        code_match = re.search(r'```python(.*?)```', response, re.DOTALL)
-        if code_match:
-            code = code_match.group(1).strip()
-        else:
-            code = response # Fallback if no block
+
+    def write_code(self, task):
+        """Grava o script gerado no workspace e retorna o caminho (None se o LLM não devolveu código)."""
+        data = self.llm.chat_json(self._code_prompt(task), CODE_SCHEMA)
+        code = (data or {}).get("codigo")
+        if not code:
+            print("[CoderAgent] O LLM não retornou código")
+            return None
             
-        filename = os.path.join(self.work_dir, f"script_{int(time.time())}.py")
+        # Sufixo aleatório: o Planner pode rodar vários passos de código ao mesmo tempo
+        filename = os.path.join(self.work_dir, f"script_{int(time.time())}_{uuid.uuid4().hex[:6]}.py")
         with open(filename, "w", encoding="utf-8") as f:
             f.write(code)
             
@@ -38,45 +70,114 @@ class CoderAgent:
 
     def run_with_correction(self, task, max_attempts=3):
         filename = self.write_code(task)
+        if filename is None:
+            return "Falha: o LLM não retornou código para a tarefa."
+        with open(filename, "r", encoding="utf-8") as f:
+            code = f.read()
+        # Correção aplicada aguardando a próxima execução confirmar: (assinatura, correção, veio_do_cache)
+        pending_fix = None
         
         for attempt in range(max_attempts):
             print(f"[CoderAgent] Executando {filename} (Tentativa {attempt+1}/{max_attempts})")
             
-            result = subprocess.run(
-                ["python", filename],
-                capture_output=True,
-                text=True,
-                encoding="utf-8"
-            )
+            # Interpretador já aquecido no pool do executor, com limites de tempo/CPU/memória
+            result = self.executor.run(code, filename=filename, timeout=RUN_TIMEOUT, memory_mb=RUN_MEMORY_MB)
             
-            if result.returncode == 0:
-                return f"Sucesso!\nOutput:\n{result.stdout}"
+            if result["codigo_saida"] == 0:
+                # Só correções pontuais entram no cache (uma reescrita não serve para outro script)
+                if pending_fix and not pending_fix[2] and "codigo" not in pending_fix[1]:
+                    self.fixes.put(pending_fix[0], pending_fix[1])
+                return f"Sucesso!\nOutput:\n{result['stdout']}"
             
             # Failed, try to fix
-            error_msg = result.stderr
+            error_msg = result["stderr"]
             print(f"[CoderAgent] Erro na execução: {error_msg}")
+            if attempt == 0:
+                # O script original (talvez vindo do cache) falhou: não reaproveitá-lo na próxima vez
+                self.llm.forget_json(self._code_prompt(task), CODE_SCHEMA)
+            if pending_fix and pending_fix[2]:
+                self.fixes.discard(pending_fix[0])
             
-            fix_prompt = f"""
-            O script Python gerado falhou ao executar.
-            Tarefa Original: {task}
-            
-            Código Atual:
-            {open(filename, 'r', encoding='utf-8').read()}
-            
-            Erro Capturado (Stderr):
-            {error_msg}
-            
-            Corrija o código para resolver o erro.
-            Responda APENAS com o código Python corrigido dentro de ```python ... ```.
-            """
-            
-            response = self.llm.chat(fix_prompt)
-            code_match = re.search(r'```python(.*?)```', response, re.DOTALL)
-            if code_match:
-                code = code_match.group(1).strip()
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(code)
-            else:
+            signature = error_signature(error_msg, code, filename)
+            new_code, fix, from_cache = self._repair(task, code, error_msg, filename, signature, attempt)
+            if new_code is None:
+                # Rodar de novo o mesmo código só repetiria o erro
                 print("[CoderAgent] Não consegui extrair código na correção.")
+                return f"Falha: nenhuma correção aplicável na tentativa {attempt+1}. Último erro: {error_msg}"
+            code = new_code
+            pending_fix = (signature, fix, from_cache)
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(code)
         
         return f"Falha após {max_attempts} tentativas. Último erro: {error_msg}"
+
+    def _repair(self, task, code, error_msg, filename, signature, attempt):
+        """
+        Corrige o script com edições pontuais (validadas antes de rodar).
+        Retorna (novo_código, correção, veio_do_cache) ou (None, None, False).
+        """
+        cached = self.fixes.get(signature)
+        if cached:
+            new_code = self._try_fix(code, cached, filename)
+            if new_code:
+                print("[CoderAgent] Reaproveitando correção conhecida para este erro")
+                return new_code, cached, True
+        
+        # Só o trecho ao redor das linhas do traceback vai no prompt
+        window = code_window(code, error_lines(error_msg, filename))
+        fix_prompt = f"""
+        O script Python gerado falhou ao executar.
+        Tarefa Original: {task}
+        
+        Código Atual (linhas numeradas; os números NÃO fazem parte do código):
+        {window}
+        
+        Erro Capturado (Stderr):
+        {error_msg[-3000:]}
+        
+        Corrija o erro com edições pontuais e responda em JSON:
+        - "edicoes": lista de {{"buscar": trecho exato do código atual (linhas inteiras, único no arquivo),
+          "substituir": novo trecho}}
+        - ou "diff": um diff unificado do arquivo
+        Use "codigo" (script completo) apenas se for preciso reescrever quase tudo.
+        """
+        
+        # Se a correção em cache já falhou uma vez, pedir uma nova ao LLM
+        data = self.llm.chat_json(fix_prompt, FIX_SCHEMA, use_cache=(attempt == 0))
+        if data:
+            new_code = self._try_fix(code, data, filename)
+            if new_code:
+                return new_code, data, False
+        
+        # Patch inválido: volta para a reescrita completa
+        print("[CoderAgent] Patch não aplicável, pedindo o script completo")
+        full_prompt = f"""
+        O script Python gerado falhou ao executar.
+        Tarefa Original: {task}
+        
+        Código Atual:
+        {code}
+        
+        Erro Capturado (Stderr):
+        {error_msg[-3000:]}
+        
+        Corrija o código para resolver o erro.
+        Responda em JSON com o código corrigido completo no campo "codigo".
+        """
+        data = self.llm.chat_json(full_prompt, CODE_SCHEMA, use_cache=False)
+        new_code = (data or {}).get("codigo")
+        if new_code and not validate(new_code, filename):
+            return new_code, {"codigo": new_code}, False
+        return None, None, False
+
+    def _try_fix(self, code, fix, filename):
+        try:
+            new_code = apply_fix(code, fix)
+        except PatchError as e:
+            print(f"[CoderAgent] Patch não aplicado: {e}")
+            return None
+        error = validate(new_code, filename)
+        if error:
+            print(f"[CoderAgent] Patch gera código inválido: {error}")
+            return None
+        return new_code
@@ -0,0 +1,104 @@
+# Coleta todos os elementos interativos em UM execute_script.
+# Cada elemento ganha um handle estável (válido enquanto o documento não muda),
+# guardado em window.__adkEls sem alterar o DOM.
+SNAPSHOT_JS = """
+var SEL = 'a, button, input, textarea, select, [role="button"], [role="link"], [onclick]';
+if (!window.__adkEls) {
+    window.__adkEls = new Map();
+    window.__adkIds = new WeakMap();
+    window.__adkNext = 1;
+}
+var hasWeakRef = typeof WeakRef !== 'undefined';
+var out = [];
+var nodes = document.querySelectorAll(SEL);
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    var h = window.__adkIds.get(el);
+    if (!h) {
+        h = String(window.__adkNext++);
+        window.__adkIds.set(el, h);
+        window.__adkEls.set(h, hasWeakRef ? new WeakRef(el) : el);
+    }
+    var r = el.getBoundingClientRect();
+    var st = window.getComputedStyle(el);
+    var visible = r.width > 0 && r.height > 0 && st.visibility !== 'hidden'
+        && st.display !== 'none' && parseFloat(st.opacity || '1') > 0;
+    out.push({
+        handle: h,
+        tag: el.tagName.toLowerCase(),
+        text: visible ? (el.innerText || '').trim().slice(0, 300) : '',
+        href: el.tagName === 'A' ? (el.href || '') : '',
+        placeholder: el.getAttribute('placeholder') || '',
+        name: el.getAttribute('name') || '',
+        id: el.id || '',
+        type: el.getAttribute('type') || '',
+        aria_label: el.getAttribute('aria-label') || '',
+        role: el.getAttribute('role') || '',
+        visible: visible,
+        box: [Math.round(r.x), Math.round(r.y), Math.round(r.width), Math.round(r.height)]
+    });
+}
+return out;
+"""
+
+RESOLVE_JS = """
+if (!window.__adkEls) return null;
+var ref = window.__adkEls.get(arguments[0]);
+if (!ref) return null;
+var el = (typeof WeakRef !== 'undefined' && ref instanceof WeakRef) ? ref.deref() : ref;
+return (el && el.isConnected) ? el : null;
+"""
+
+
+class DomSnapshot:
+    """Fotografia dos elementos interativos da página; buscas rodam localmente, sem round-trips."""
+
+    def __init__(self, elements, url=""):
+        self.elements = elements or []
+        self.url = url
+
+    def __len__(self):
+        return len(self.elements)
+
+    def by_tag(self, *tags):
+        return [e for e in self.elements if e["tag"] in tags]
+
+    def links(self, min_text=4, limit=50):
+        """Links visíveis com texto, no formato markdown [texto](href)."""
+        links = []
+        for e in self.by_tag("a"):
+            text = e["text"].strip()
+            if e["visible"] and e["href"] and len(text) >= min_text:
+                links.append(f"[{text}]({e['href']})")
+                if len(links) >= limit:
+                    break
+        return links
+
+    def find_clickable(self, text):
+        """Primeiro link, depois botão, depois outros clicáveis cujo texto contém `text`."""
+        needle = text.lower()
+        groups = (
+            self.by_tag("a"),
+            self.by_tag("button"),
+            [e for e in self.elements if e["role"] in ("button", "link") and e["tag"] not in ("a", "button")],
+        )
+        for group in groups:
+            for e in group:
+                if needle in e["text"].lower():
+                    return e
+        return None
+
+    def find_input(self, key):
+        """Campo cujo placeholder (ou name, ou id) contém `key`."""
+        needle = key.lower()
+        fields = self.by_tag("input") + self.by_tag("textarea")
+        # Campos visíveis primeiro (inputs hidden com o mesmo name não aceitam digitação)
+        fields.sort(key=lambda e: not e["visible"])
+        for e in fields:
+            attr = (e["placeholder"] or e["name"] or e["id"]).lower()
+            if needle in attr:
+                return e
+        return None
+
+    def to_dict(self):
+        return {"url": self.url, "elements": self.elements}
@@ -0,0 +1,294 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import subprocess
+
+import psutil
+
+# Bibliotecas carregadas antes do código chegar (as que não existirem são ignoradas)
+DEFAULT_PREIMPORT = [
+    "json", "math", "re", "datetime", "collections", "itertools", "statistics",
+    "csv", "random", "decimal", "pathlib", "urllib.request",
+    "requests", "numpy", "pandas",
+]
+MEMORY_MSG = "MemoryError: limite de memória atingido"
+MAX_OUTPUT = 20000  # caracteres guardados de stdout/stderr (início + fim)
+
+# Processo worker: importa as bibliotecas e fica bloqueado no stdin.
+# Protocolo: 1ª linha = JSON com limites e metadados; o resto = código Python.
+WORKER_CODE = r'''
+import sys, json, importlib
+MEMORY_MSG = "MemoryError: limite de memória atingido"
+for _mod in json.loads(sys.argv[1]):
+    try:
+        importlib.import_module(_mod)
+    except Exception:
+        pass
+_header = json.loads(sys.stdin.readline())
+_code = sys.stdin.read()
+try:
+    import resource
+    if _header.get("cpu"):
+        resource.setrlimit(resource.RLIMIT_CPU, (_header["cpu"], _header["cpu"] + 1))
+    if _header.get("mem_mb"):
+        # O limite vale para o que o código alocar além das bibliotecas já carregadas
+        try:
+            with open("/proc/self/statm") as _f:
+                _base = int(_f.read().split()[0]) * resource.getpagesize()
+        except (OSError, ValueError):
+            _base = 0
+        _limit = _base + _header["mem_mb"] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (_limit, _limit))
+except (ImportError, ValueError, OSError):
+    pass
+import os, traceback
+if _header.get("cwd"):
+    os.chdir(_header["cwd"])
+_file = _header.get("arquivo") or "<codigo>"
+sys.argv = [_file]
+sys.path.insert(0, os.path.dirname(os.path.abspath(_file)) if _header.get("arquivo") else os.getcwd())
+_globals = {"__name__": "__main__", "__file__": _file, "__builtins__": __builtins__}
+try:
+    exec(compile(_code, _file, "exec"), _globals)
+except SystemExit as _e:
+    _status = _e.code
+    if _status is None or isinstance(_status, int):
+        sys.exit(_status)
+    print(_status, file=sys.stderr)
+    sys.exit(1)
+except MemoryError:
+    print(MEMORY_MSG, file=sys.stderr)
+    sys.exit(1)
+except BaseException:
+    # Pula o frame do próprio worker: o traceback começa no código do usuário
+    _t, _v, _tb = sys.exc_info()
+    traceback.print_exception(_t, _v, _tb.tb_next)
+    sys.exit(1)
+'''
+
+
+def kill_process_tree(pid, timeout=3):
+    """
+    Encerra um processo e todos os seus descendentes.
+    Só os descendentes são aguardados aqui: o processo raiz é um Popen e quem
+    o criou precisa colher o código de saída (senão o returncode vira 0).
+    """
+    try:
+        parent = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return
+    children = parent.children(recursive=True)
+    for p in children + [parent]:
+        try:
+            p.kill()
+        except psutil.NoSuchProcess:
+            pass
+    psutil.wait_procs(children, timeout=timeout)
+
+
+def _clip(text, limit=MAX_OUTPUT):
+    if len(text) <= limit:
+        return text
+    half = limit // 2
+    return text[:half] + f"\n... [{len(text) - limit} caracteres omitidos] ...\n" + text[-half:]
+
+
+def cleanup_workspace(path, max_age_days=7, max_files=200, pattern_prefix="script_"):
+    """
+    Política de retenção do workspace: apaga scripts vazios, os mais velhos que
+    `max_age_days` e, acima de `max_files`, os mais antigos. Retorna quantos removeu.
+    """
+    try:
+        entries = [e for e in os.scandir(path) if e.is_file() and e.name.startswith(pattern_prefix)]
+    except FileNotFoundError:
+        return 0
+    now = time.time()
+    keep, removed = [], 0
+    for e in entries:
+        st = e.stat()
+        if st.st_size == 0 or now - st.st_mtime > max_age_days * 86400:
+            try:
+                os.remove(e.path)
+                removed += 1
+            except OSError:
+                pass
+        else:
+            keep.append((st.st_mtime, e.path))
+    keep.sort()
+    for _, p in keep[:max(0, len(keep) - max_files)]:
+        try:
+            os.remove(p)
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        print(f"[Executor] Workspace: {removed} scripts antigos removidos")
+    return removed
+
+
+class PythonExecutor:
+    """
+    Pool de interpretadores Python "quentes" (já iniciados e com bibliotecas
+    importadas) para rodar código do CoderAgent sem pagar o startup a cada tentativa.
+    Cada worker executa um único código e morre (sem estado vazando entre execuções);
+    um substituto é criado em segundo plano.
+    Limites por execução: tempo de parede, CPU e memória (setrlimit no POSIX,
+    monitoramento via psutil em qualquer sistema), com a árvore de processos morta ao estourar.
+    """
+
+    def __init__(self, size=2, preimport=None, python=None):
+        self.size = size
+        self.preimport = DEFAULT_PREIMPORT if preimport is None else preimport
+        self.python = python or sys.executable
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.runs = 0
+        self.cold_starts = 0
+        atexit.register(self.shutdown)
+
+    # ───────────── workers ─────────────
+
+    def _spawn(self):
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True
+        return subprocess.Popen(
+            [self.python, "-u", "-c", WORKER_CODE, json.dumps(self.preimport)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **kwargs,
+        )
+
+    def _refill(self):
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) >= self.size:
+                    return
+            proc = self._spawn()
+            with self._lock:
+                if self._closed:
+                    proc.kill()
+                    return
+                self._idle.append(proc)
+
+    def warmup(self):
+        threading.Thread(target=self._refill, daemon=True, name="ExecutorWarmup").start()
+
+    def _take(self):
+        with self._lock:
+            while self._idle:
+                proc = self._idle.pop(0)
+                if proc.poll() is None:
+                    break
+            else:
+                proc = None
+        if proc is None:
+            self.cold_starts += 1
+            proc = self._spawn()
+        self.warmup()
+        return proc
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for proc in idle:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+    # ───────────── execução ─────────────
+
+    def run(self, code, filename=None, timeout=60, cpu_seconds=None, memory_mb=1024, cwd=None):
+        """
+        Executa `code` num worker e retorna:
+        {"codigo_saida", "stdout", "stderr", "duracao", "motivo"}
+        motivo: "ok", "erro", "timeout" ou "memoria".
+        """
+        header = {
+            "arquivo": filename,
+            # Sem `cwd`, fica no diretório do processo (como um `python script.py` rodado daqui)
+            "cwd": cwd or os.getcwd(),
+            "cpu": cpu_seconds or timeout,
+            "mem_mb": memory_mb,
+        }
+        start = time.time()
+        proc = self._take()
+        self.runs += 1
+
+        # Monitor de memória (cobre o Windows, onde não há RLIMIT_AS)
+        exceeded = threading.Event()
+        finished = threading.Event()
+
+        def _watch():
+            try:
+                ps = psutil.Process(proc.pid)
+                while not finished.wait(0.2):
+                    rss = ps.memory_info().rss
+                    for child in ps.children(recursive=True):
+                        try:
+                            rss += child.memory_info().rss
+                        except psutil.NoSuchProcess:
+                            pass
+                    if memory_mb and rss > memory_mb * 1024 * 1024:
+                        exceeded.set()
+                        kill_process_tree(proc.pid)
+                        return
+            except psutil.NoSuchProcess:
+                pass
+
+        threading.Thread(target=_watch, daemon=True, name="ExecutorWatch").start()
+        payload = (json.dumps(header) + "\n" + code).encode("utf-8")
+        reason = None
+        try:
+            out, err = proc.communicate(payload, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            reason = "timeout"
+            kill_process_tree(proc.pid)
+            out, err = proc.communicate()
+        finally:
+            finished.set()
+
+        stdout = _clip(out.decode("utf-8", "replace"))
+        stderr = _clip(err.decode("utf-8", "replace"))
+        if exceeded.is_set() or stderr.rstrip().endswith(MEMORY_MSG):
+            reason = "memoria"
+        if reason == "timeout":
+            stderr += f"\nTimeoutError: execução interrompida após {timeout}s"
+        elif exceeded.is_set():
+            stderr += f"\nMemoryError: execução interrompida ao passar de {memory_mb} MB"
+
+        return {
+            "codigo_saida": proc.returncode,
+            "stdout": stdout,
+            "stderr": stderr,
+            "duracao": round(time.time() - start, 3),
+            "motivo": reason or ("ok" if proc.returncode == 0 else "erro"),
+        }
+
+    def stats(self):
+        with self._lock:
+            idle = len(self._idle)
+        return {"execucoes": self.runs, "partidas_a_frio": self.cold_starts, "workers_prontos": idle}
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Executor compartilhado pelo processo (ADK_EXECUTOR_WORKERS define o tamanho do pool)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = PythonExecutor(size=int(os.getenv("ADK_EXECUTOR_WORKERS", "2")))
+            _executor.warmup()
+        return _executor
@@ -0,0 +1,108 @@
+import json
+
+
+class JsonArrayStream:
+    """
+    Parser incremental: recebe pedaços de um JSON em streaming e devolve cada
+    elemento do array `key` assim que ele fecha, sem esperar o resto da resposta.
+    Ex.: com key="plano", o passo 1 de {"plano": [{...}, {...}]} sai antes do passo 2 chegar.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None   # última string fechada (candidata a chave)
+        self._array_depth = None   # profundidade do array alvo, quando dentro dele
+        self._item_start = None
+        self.finished = False
+
+    def feed(self, chunk):
+        """Adiciona texto e retorna a lista de elementos completados por ele."""
+        self.text += chunk
+        items = []
+        text = self.text
+        while self._pos < len(text):
+            i = self._pos
+            c = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start:i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i + 1
+                if self._array_depth is not None and self._depth == self._array_depth and self._item_start is None:
+                    self._item_start = i
+            elif c in "{[":
+                if c == "[" and self._array_depth is None and not self.finished and self._after_key(i):
+                    self._array_depth = self._depth + 1
+                elif self._array_depth is not None and self._depth == self._array_depth and self._item_start is None:
+                    self._item_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._array_depth is not None:
+                    if self._depth == self._array_depth and self._item_start is not None and c == "}":
+                        items.extend(self._emit(i + 1))
+                    elif self._depth < self._array_depth:
+                        items.extend(self._emit(i))   # escalar sem vírgula depois
+                        self._array_depth = None
+                        self.finished = True
+            elif c == "," and self._array_depth is not None and self._depth == self._array_depth:
+                items.extend(self._emit(i))
+            elif self._array_depth is not None and self._depth == self._array_depth \
+                    and self._item_start is None and not c.isspace():
+                self._item_start = i   # número, true/false/null
+        return items
+
+    def _after_key(self, i):
+        """O '[' na posição i é o valor de "key": ...?"""
+        if self._last_string != self.key:
+            return False
+        between = self.text[self.text.rfind('"', 0, i) + 1:i]
+        return between.strip() == ":"
+
+    def _emit(self, end):
+        if self._item_start is None:
+            return []
+        raw = self.text[self._item_start:end].strip()
+        self._item_start = None
+        if not raw:
+            return []
+        try:
+            return [json.loads(raw)]
+        except ValueError:
+            print(f"[JsonStream] Elemento inválido ignorado: {raw[:80]}")
+            return []
+
+    def parse(self):
+        """Documento completo (depois de todo o stream) ou None se não for JSON válido."""
+        try:
+            return json.loads(self.text)
+        except ValueError:
+            return None
+
+
+def iter_json_array(chunks, key):
+    """
+    Gera os elementos do array `key` a partir de um iterável de pedaços de texto.
+    Levanta ValueError se o stream acabar antes de o array fechar (resposta truncada).
+    """
+    stream = JsonArrayStream(key)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    if not stream.finished:
+        raise ValueError(f"JSON truncado: o array '{key}' não foi fechado")
@@ -1,37 +1,405 @@
 import os
+import re
+import json
+import time
+import random
+import asyncio
+import itertools
+import threading
+from collections import deque
+
 import google.genai as genai
 from google.genai import types
 from dotenv import load_dotenv
 
+from .llm_cache import get_response_cache, cache_enabled, normalize_prompt
+from .json_stream import iter_json_array
+
 load_dotenv()
 
+# Limite de chamadas simultâneas ao Gemini (todas as instâncias do processo)
+MAX_CONCURRENT = int(os.getenv("ADK_LLM_CONCORRENCIA", "4"))
+MAX_RETRIES = 4
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+EMBEDDING_MODEL = "text-embedding-004"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_shared_client(api_key):
+    """Um único genai.Client por processo (reaproveita conexões HTTP)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = genai.Client(api_key=api_key)
+        return _client
+
+
+class _Limite:
+    """
+    Um só limite de concorrência para chamadas síncronas e assíncronas.
+    `with _limite:` em threads; `async with _limite:` em corrotinas (a espera
+    vai para uma thread, então o event loop não trava).
+    """
+
+    def __init__(self, maximo):
+        self._sem = threading.BoundedSemaphore(maximo)
+
+    def __enter__(self):
+        self._sem.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._sem.release()
+
+    async def __aenter__(self):
+        if self._sem.acquire(blocking=False):
+            return self
+        espera = asyncio.ensure_future(asyncio.to_thread(self._sem.acquire))
+        try:
+            await asyncio.shield(espera)
+        except asyncio.CancelledError:
+            # A thread ainda vai conseguir a vaga: devolve assim que conseguir
+            espera.add_done_callback(lambda f: f.cancelled() or self._sem.release())
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._sem.release()
+
+
+_limite = _Limite(MAX_CONCURRENT)
+
+
+def _error_code(exc):
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code
+    match = re.search(r"\b(429|50[0234])\b", str(exc))
+    return int(match.group(1)) if match else None
+
+
+def _is_retryable(exc):
+    text = str(exc)
+    return (_error_code(exc) in RETRYABLE_CODES
+            or "RESOURCE_EXHAUSTED" in text or "UNAVAILABLE" in text)
+
+
+def _loads(text):
+    try:
+        return json.loads(text) if text else None
+    except ValueError:
+        return None
+
+
+def _schema_scope(system_instruction, schema):
+    """O schema faz parte da chave do cache: o mesmo prompt com outro formato é outra resposta."""
+    return f"{system_instruction or ''}\n#schema {json.dumps(schema, sort_keys=True)}"
+
+
+def _retry_delay(exc, attempt):
+    """Respeita o retryDelay sugerido pela API (rate limit); senão, backoff exponencial com jitter."""
+    match = re.search(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", str(exc))
+    if match:
+        return min(float(match.group(1)), 60.0)
+    return min(2 ** attempt + random.uniform(0, 1), 30.0)
+
+
+class LLMMetrics:
+    """Latência e tokens por chamada (thread-safe)."""
+
+    def __init__(self, keep=200):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.total_latency = 0.0
+        self.recent = deque(maxlen=keep)
+
+    def record(self, model, latency, response=None, first_chunk=None, error=None):
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+        output_tokens = getattr(usage, "candidates_token_count", None) or 0
+        with self._lock:
+            self.calls += 1
+            self.total_latency += latency
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+            if error:
+                self.errors += 1
+            self.recent.append({
+                "modelo": model,
+                "latencia": round(latency, 3),
+                "primeiro_chunk": round(first_chunk, 3) if first_chunk is not None else None,
+                "tokens_prompt": prompt_tokens,
+                "tokens_resposta": output_tokens,
+                "erro": str(error)[:200] if error else None,
+            })
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "chamadas": self.calls,
+                "erros": self.errors,
+                "retries": self.retries,
+                "latencia_media": round(self.total_latency / self.calls, 3) if self.calls else 0.0,
+                "tokens_prompt": self.prompt_tokens,
+                "tokens_resposta": self.output_tokens,
+                "ultimas": list(self.recent)[-10:],
+            }
+
+
+METRICS = LLMMetrics()
+
+
 class LLMBridge:
     """
     Ponte para que os módulos (Browser, Planner, Coder) possam chamar o Gemini
     diretamente para seus loops de raciocínio.
+    Todas as instâncias compartilham o mesmo cliente, o mesmo limite de
+    concorrência e as mesmas métricas. Há versões síncronas, assíncronas e de streaming.
     """
-    def __init__(self):
+    def __init__(self, model="gemini-2.5-flash", temperature=0.7):
         self.api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY não encontrada no .env")
-        self.client = genai.Client(api_key=self.api_key)
-        self.model = "gemini-2.5-flash" # Modelo disponível no ambiente do usuário
+        self.client = get_shared_client(self.api_key)
+        self.model = model # Modelo disponível no ambiente do usuário
+        self.temperature = temperature
+
+    def _config(self, system_instruction=None, **overrides):
+        params = {"temperature": self.temperature, "system_instruction": system_instruction}
+        params.update(overrides)
+        return types.GenerateContentConfig(**params)
+
+    @staticmethod
+    def metrics():
+        return METRICS.snapshot()
 
-    def chat(self, prompt: str, system_instruction: str = None) -> str:
-        """Envia um prompt simples e retorna a resposta texto."""
+    # ───────────── cache ─────────────
+
+    def _embed(self, prompt):
+        """Embedding do prompt (só usado quando o cache semântico está ligado)."""
         try:
-            config = types.GenerateContentConfig(
-                temperature=0.7,
-                system_instruction=system_instruction
-            )
-            
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=config
+            result = self.client.models.embed_content(
+                model=EMBEDDING_MODEL, contents=normalize_prompt(prompt)[:8000]
             )
-            
+            return list(result.embeddings[0].values)
+        except Exception as e:
+            print(f"[LLMBridge] Embedding indisponível: {e}")
+            return None
+
+    def _cache_lookup(self, prompt, system_instruction, use_cache):
+        """Retorna (cache, embedding, resposta_em_cache)."""
+        if not (use_cache and cache_enabled()):
+            return None, None, None
+        cache = get_response_cache()
+        embedding = self._embed(prompt) if cache.semantic else None
+        cached = cache.get(self.model, system_instruction, self.temperature, prompt, embedding)
+        return cache, embedding, cached
+
+    # ───────────── síncrono ─────────────
+
+    def chat(self, prompt: str, system_instruction: str = None, use_cache: bool = True) -> str:
+        """Envia um prompt simples e retorna a resposta texto (use_cache=False ignora o cache)."""
+        cache, embedding, cached = self._cache_lookup(prompt, system_instruction, use_cache)
+        if cached is not None:
+            return cached
+        start = time.time()
+        try:
+            response = self._generate(prompt, self._config(system_instruction))
+            METRICS.record(self.model, time.time() - start, response)
+            if cache is not None and response.text:
+                cache.put(self.model, system_instruction, self.temperature, prompt, response.text, embedding)
             return response.text
         except Exception as e:
+            METRICS.record(self.model, time.time() - start, error=e)
             print(f"[LLMBridge] Erro: {e}")
             return f"Erro ao chamar LLM: {e}"
+
+    def _generate(self, prompt, config):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with _limite:
+                    return self.client.models.generate_content(
+                        model=self.model,
+                        contents=prompt,
+                        config=config
+                    )
+            except Exception as e:
+                if attempt >= MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(e, attempt)
+                METRICS.add_retry()
+                print(f"[LLMBridge] Limite/instabilidade ({_error_code(e)}), nova tentativa em {delay:.1f}s")
+                time.sleep(delay)
+
+    def chat_stream(self, prompt: str, system_instruction: str = None, config=None):
+        """
+        Gera os pedaços de texto conforme chegam (generate_content_stream).
+        A vaga do limite de concorrência só é ocupada até o primeiro pedaço
+        chegar: quem consome devagar não segura as outras chamadas.
+        """
+        config = config or self._config(system_instruction)
+        start = time.time()
+        first_chunk = None
+        last = None
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with _limite:
+                    # A requisição só sai no primeiro next()
+                    stream = iter(self.client.models.generate_content_stream(
+                        model=self.model, contents=prompt, config=config
+                    ))
+                    head = list(itertools.islice(stream, 1))
+                for chunk in itertools.chain(head, stream):
+                    last = chunk
+                    if chunk.text:
+                        if first_chunk is None:
+                            first_chunk = time.time() - start
+                        yield chunk.text
+                break
+            except Exception as e:
+                # Só dá para repetir se nada foi entregue ainda
+                if first_chunk is not None or attempt >= MAX_RETRIES or not _is_retryable(e):
+                    METRICS.record(self.model, time.time() - start, error=e)
+                    raise
+                METRICS.add_retry()
+                time.sleep(_retry_delay(e, attempt))
+        METRICS.record(self.model, time.time() - start, last, first_chunk)
+
+    # ───────────── JSON estruturado ─────────────
+
+    def _json_config(self, system_instruction, schema):
+        return self._config(system_instruction, response_mime_type="application/json", response_schema=schema)
+
+    def chat_json(self, prompt: str, schema: dict, system_instruction: str = None, use_cache: bool = True):
+        """
+        Resposta em JSON garantida pela API (response_mime_type + response_schema),
+        já decodificada. Retorna None se a chamada falhar ou o JSON vier inválido.
+        """
+        scope = _schema_scope(system_instruction, schema)
+        cache, embedding, cached = self._cache_lookup(prompt, scope, use_cache)
+        if cached is not None and _loads(cached) is not None:
+            return _loads(cached)
+        start = time.time()
+        try:
+            response = self._generate(prompt, self._json_config(system_instruction, schema))
+            METRICS.record(self.model, time.time() - start, response)
+        except Exception as e:
+            METRICS.record(self.model, time.time() - start, error=e)
+            print(f"[LLMBridge] Erro: {e}")
+            return None
+        data = _loads(response.text)
+        if data is None:
+            print(f"[LLMBridge] JSON inválido na resposta: {(response.text or '')[:200]}")
+            return None
+        if cache is not None:
+            cache.put(self.model, scope, self.temperature, prompt, response.text, embedding)
+        return data
+
+    def forget_json(self, prompt: str, schema: dict, system_instruction: str = None):
+        """Tira do cache a resposta de chat_json para este prompt (ela se mostrou ruim)."""
+        if cache_enabled():
+            get_response_cache().discard(self.model, _schema_scope(system_instruction, schema),
+                                         self.temperature, prompt)
+
+    def stream_json(self, prompt: str, schema: dict, key: str, system_instruction: str = None,
+                    use_cache: bool = True):
+        """
+        Gera cada elemento do array `key` da resposta JSON assim que ele termina de chegar.
+        Usa o mesmo cache de chat_json: num acerto os elementos saem direto da resposta
+        guardada; senão a resposta montada é guardada quando o stream termina inteiro.
+        """
+        scope = _schema_scope(system_instruction, schema)
+        cache, embedding, cached = self._cache_lookup(prompt, scope, use_cache)
+        data = _loads(cached) if cached is not None else None
+        if isinstance(data, dict) and isinstance(data.get(key), list):
+            yield from data[key]
+            return
+        received = []
+
+        def chunks():
+            for text in self.chat_stream(prompt, config=self._json_config(system_instruction, schema)):
+                received.append(text)
+                yield text
+
+        yield from iter_json_array(chunks(), key)
+        text = "".join(received)
+        if cache is not None and _loads(text) is not None:
+            cache.put(self.model, scope, self.temperature, prompt, text, embedding)
+
+    # ───────────── assíncrono ─────────────
+
+    async def achat(self, prompt: str, system_instruction: str = None, use_cache: bool = True) -> str:
+        """Versão assíncrona de chat (não bloqueia threads)."""
+        cache, embedding, cached = await asyncio.to_thread(
+            self._cache_lookup, prompt, system_instruction, use_cache
+        )
+        if cached is not None:
+            return cached
+        start = time.time()
+        try:
+            response = await self._agenerate(prompt, self._config(system_instruction))
+            METRICS.record(self.model, time.time() - start, response)
+            if cache is not None and response.text:
+                await asyncio.to_thread(
+                    cache.put, self.model, system_instruction, self.temperature, prompt, response.text, embedding
+                )
+            return response.text
+        except Exception as e:
+            METRICS.record(self.model, time.time() - start, error=e)
+            print(f"[LLMBridge] Erro: {e}")
+            return f"Erro ao chamar LLM: {e}"
+
+    async def _agenerate(self, prompt, config):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with _limite:
+                    return await self.client.aio.models.generate_content(
+                        model=self.model,
+                        contents=prompt,
+                        config=config
+                    )
+            except Exception as e:
+                if attempt >= MAX_RETRIES or not _is_retryable(e):
+                    raise
+                METRICS.add_retry()
+                await asyncio.sleep(_retry_delay(e, attempt))
+
+    async def achat_stream(self, prompt: str, system_instruction: str = None, config=None):
+        """
+        Versão assíncrona de chat_stream: `async for texto in llm.achat_stream(...)`.
+        Como lá, a vaga é devolvida assim que o stream está aberto.
+        """
+        config = config or self._config(system_instruction)
+        start = time.time()
+        first_chunk = None
+        last = None
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with _limite:
+                    stream = await self.client.aio.models.generate_content_stream(
+                        model=self.model, contents=prompt, config=config
+                    )
+                async for chunk in stream:
+                    last = chunk
+                    if chunk.text:
+                        if first_chunk is None:
+                            first_chunk = time.time() - start
+                        yield chunk.text
+                break
+            except Exception as e:
+                if first_chunk is not None or attempt >= MAX_RETRIES or not _is_retryable(e):
+                    METRICS.record(self.model, time.time() - start, error=e)
+                    raise
+                METRICS.add_retry()
+                await asyncio.sleep(_retry_delay(e, attempt))
+        METRICS.record(self.model, time.time() - start, last, first_chunk)
@@ -0,0 +1,217 @@
+import os
+import json
+import math
+import time
+import atexit
+import hashlib
+import threading
+
+CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "memoria", "llm_cache.json"
+)
+
+SAVE_INTERVAL = 5.0  # segundos entre gravações em disco
+LOG_EVERY = 20       # consultas entre logs de hit rate
+
+
+def normalize_prompt(prompt):
+    """Só as bordas são ignoradas: a indentação de código no meio do prompt muda a resposta."""
+    return (prompt or "").strip()
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a))
+    nb = math.sqrt(sum(y * y for y in b))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+class ResponseCache:
+    """
+    Cache persistente de respostas do LLM (memoria/llm_cache.json).
+    Chave = modelo + system instruction + temperatura + hash do prompt normalizado.
+    Entradas expiram após `ttl` segundos; acima de `max_entries` sai a menos usada recentemente.
+    Opcionalmente casa prompts quase iguais por similaridade de embeddings.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=7 * 24 * 3600, max_entries=500,
+                 semantic=False, threshold=0.97):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.semantic = semantic
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._entries = None
+        self._dirty = False
+        self._last_save = 0.0
+        self.hits = 0
+        self.misses = 0
+        atexit.register(self.flush)
+
+    # ───────────── persistência ─────────────
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _save(self, force=False):
+        if not self._dirty or (not force and time.time() - self._last_save < SAVE_INTERVAL):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+            self._last_save = time.time()
+        except Exception as e:
+            print(f"[LLMCache] Erro ao salvar cache: {e}")
+
+    def flush(self):
+        with self._lock:
+            if self._entries is not None:
+                self._save(force=True)
+
+    def release(self):
+        """Grava e solta as entradas da memória; a próxima consulta relê o arquivo."""
+        with self._lock:
+            if self._entries is None:
+                return False
+            self._save(force=True)
+            if self._dirty:
+                return False  # não gravou: manter em memória para não perder entradas
+            self._entries = None
+            return True
+
+    # ───────────── chaves ─────────────
+
+    @staticmethod
+    def scope(model, system_instruction, temperature):
+        raw = json.dumps([model, normalize_prompt(system_instruction), temperature])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def key(cls, model, system_instruction, temperature, prompt):
+        digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        return f"{cls.scope(model, system_instruction, temperature)}:{digest}"
+
+    # ───────────── consulta ─────────────
+
+    def _expired(self, entry, now):
+        return now - entry["criado"] > self.ttl
+
+    def get(self, model, system_instruction, temperature, prompt, embedding=None):
+        """Retorna a resposta em cache ou None. `embedding` habilita o casamento semântico."""
+        key = self.key(model, system_instruction, temperature, prompt)
+        now = time.time()
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry and self._expired(entry, now):
+                del self._entries[key]
+                self._dirty = True
+                entry = None
+
+            if entry is None and self.semantic and embedding:
+                scope = key.split(":", 1)[0]
+                best, best_score = None, self.threshold
+                for k, e in self._entries.items():
+                    if not k.startswith(scope) or not e.get("emb") or self._expired(e, now):
+                        continue
+                    score = _cosine(embedding, e["emb"])
+                    if score >= best_score:
+                        best, best_score = e, score
+                entry = best
+
+            if entry:
+                entry["acesso"] = now
+                self._dirty = True
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._log_rate()
+            return entry["resposta"] if entry else None
+
+    def put(self, model, system_instruction, temperature, prompt, response, embedding=None):
+        key = self.key(model, system_instruction, temperature, prompt)
+        now = time.time()
+        with self._lock:
+            self._load()
+            entry = {"resposta": response, "criado": now, "acesso": now}
+            if self.semantic and embedding:
+                entry["emb"] = [round(x, 5) for x in embedding]
+            self._entries[key] = entry
+            self._evict(now)
+            self._dirty = True
+            self._save()
+
+    def discard(self, model, system_instruction, temperature, prompt):
+        """Remove a entrada do prompt (ex.: o código em cache falhou ao rodar). Retorna se existia."""
+        key = self.key(model, system_instruction, temperature, prompt)
+        with self._lock:
+            self._load()
+            if self._entries.pop(key, None) is None:
+                return False
+            self._dirty = True
+            self._save()
+            return True
+
+    def _evict(self, now):
+        expired = [k for k, e in self._entries.items() if self._expired(e, now)]
+        for k in expired:
+            del self._entries[k]
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(self._entries, key=lambda k: self._entries[k]["acesso"])[:overflow]
+            for k in oldest:
+                del self._entries[k]
+
+    # ───────────── estatísticas ─────────────
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _log_rate(self):
+        total = self.hits + self.misses
+        if total % LOG_EVERY == 0:
+            print(f"[LLMCache] Hit rate: {self.hit_rate():.0%} ({self.hits}/{total}), {len(self._entries)} entradas")
+
+    def stats(self):
+        with self._lock:
+            self._load()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hit_rate(), 3),
+                "entradas": len(self._entries),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Cache compartilhado pelo processo (configurável por variáveis de ambiente)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                ttl=float(os.getenv("ADK_LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                max_entries=int(os.getenv("ADK_LLM_CACHE_MAX", "500")),
+                semantic=os.getenv("ADK_LLM_CACHE_SEMANTICO", "0") == "1",
+            )
+        return _cache
+
+
+def cache_enabled():
+    return os.getenv("ADK_LLM_CACHE", "1") != "0"
@@ -0,0 +1,106 @@
+import hashlib
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8", "ignore")).hexdigest()
+
+
+class PageStateTracker:
+    """
+    Acompanha os snapshots em markdown de uma página ao longo dos passos do
+    AutonomousBrowser e devolve só o que o LLM ainda não viu: blocos novos ou
+    alterados, mais uma impressão digital compacta da página.
+    """
+
+    def __init__(self, max_chars=4000):
+        self.max_chars = max_chars
+        self._url = None
+        self._sent = set()      # hashes dos blocos já enviados ao LLM nesta URL
+        self._current = set()   # hashes dos blocos do snapshot anterior
+
+    def update(self, url, markdown):
+        """Registra o snapshot atual e retorna o texto a colocar no prompt."""
+        blocks = [b for b in markdown.splitlines() if b.strip()]
+        hashes = [_hash(b) for b in blocks]
+        fingerprint = _hash(markdown)[:10]
+
+        if url != self._url:
+            self._url = url
+            self._sent = set()
+            self._current = set()
+
+        added = sum(1 for h in set(hashes) if h not in self._current)
+        removed = len(self._current - set(hashes))
+        first_view = not self._sent
+        self._current = set(hashes)
+
+        pending = [(h, b) for h, b in zip(hashes, blocks) if h not in self._sent]
+        body, used = [], 0
+        for h, b in pending:
+            if used + len(b) + 1 > self.max_chars:
+                if body:
+                    continue  # blocos menores adiante ainda podem caber
+                # Bloco sozinho maior que o orçamento (parágrafo longo, texto minificado): vai cortado
+                b = b[:self.max_chars - 2] + "…"
+            body.append(b)
+            used += len(b) + 1
+            self._sent.add(h)
+
+        header = f"[página {fingerprint} | {len(blocks)} blocos"
+        if not first_view:
+            header += f" | +{added} / -{removed} desde o último passo"
+        header += "]"
+
+        if not body:
+            return header + "\n(sem conteúdo novo desde o último passo)"
+        if not first_view:
+            header += f"\nApenas blocos novos/ainda não vistos ({len(body)} de {len(pending)}):"
+        return header + "\n" + "\n".join(body)
+
+
+class RollingHistory:
+    """
+    Histórico de ações com as últimas entradas completas e as antigas resumidas.
+    Anotações (fatos já extraídos das páginas) ficam à parte, com orçamento próprio,
+    porque são a única memória do LLM entre chamadas.
+    """
+
+    def __init__(self, keep_recent=4, summary_chars=600, entry_chars=80, notes_chars=1500):
+        self.keep_recent = keep_recent
+        self.summary_chars = summary_chars
+        self.entry_chars = entry_chars
+        self.notes_chars = notes_chars
+        self.entries = []
+        self.notes = []
+
+    def append(self, entry):
+        self.entries.append(entry)
+
+    def add_note(self, note):
+        self.notes.append(note)
+        # Descarta as anotações mais antigas quando estoura o orçamento
+        while len(self.notes) > 1 and sum(len(n) for n in self.notes) > self.notes_chars:
+            self.notes.pop(0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def render(self):
+        parts = []
+        if self.notes:
+            parts.append("Anotações acumuladas:")
+            parts.extend(f"* {n}" for n in self.notes)
+        if not self.entries:
+            parts.append("(nenhuma ação ainda)")
+            return "\n".join(parts)
+        old = self.entries[:-self.keep_recent]
+        recent = self.entries[-self.keep_recent:]
+
+        if old:
+            short = [e if len(e) <= self.entry_chars else e[:self.entry_chars - 1] + "…" for e in old]
+            summary = "; ".join(short)
+            if len(summary) > self.summary_chars:
+                summary = "…" + summary[-(self.summary_chars - 1):]
+            parts.append(f"Resumo de {len(old)} ações anteriores: {summary}")
+        parts.extend(f"- {e}" for e in recent)
+        return "\n".join(parts)
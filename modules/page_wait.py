@@ -0,0 +1,195 @@
+import json
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+
+# Instalado em todo documento novo (via CDP) para medir quando o DOM parou de mudar
+DOM_OBSERVER_JS = """
+(function() {
+    if (window.__adkObserver) return;
+    window.__adkLastMutation = Date.now();
+    window.__adkObserver = new MutationObserver(function() { window.__adkLastMutation = Date.now(); });
+    window.__adkObserver.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+})();
+"""
+
+# Um único round-trip por iteração de polling
+POLL_JS = """
+var sel = arguments[0];
+if (!window.__adkObserver) {
+    window.__adkLastMutation = Date.now();
+    window.__adkObserver = new MutationObserver(function() { window.__adkLastMutation = Date.now(); });
+    window.__adkObserver.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return {
+    ready: document.readyState,
+    quiet: Date.now() - window.__adkLastMutation,
+    target: sel ? !!document.querySelector(sel) : false
+};
+"""
+
+
+class PageWaiter:
+    """
+    Espera orientada a eventos para o Browser, no lugar de sleeps fixos.
+    Considera a página pronta quando a rede está ociosa (eventos Network do
+    CDP lidos do log de performance), o DOM parou de mudar (MutationObserver)
+    ou o elemento alvo apareceu. Páginas que nunca param de mutar (carrosséis,
+    anúncios, feeds ao vivo) valem como prontas `busy_fallback` segundos depois
+    do readyState "complete". O timeout se adapta ao histórico de cada domínio.
+    """
+
+    def __init__(self, driver, idle_ms=500, quiet_ms=400, max_inflight=2,
+                 min_timeout=2.0, max_timeout=15.0, poll=0.1, busy_fallback=3.0, inflight_ttl=10.0):
+        self.driver = driver
+        self.idle_ms = idle_ms
+        self.quiet_ms = quiet_ms
+        self.max_inflight = max_inflight  # tolera long-polling/analytics (estilo "networkidle2")
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.poll = poll
+        self.busy_fallback = busy_fallback
+        self.inflight_ttl = inflight_ttl  # requests sem loadingFinished não seguram a espera para sempre
+
+        self.history = deque(maxlen=200)  # tempos de espera por etapa
+        self._avg = {}                    # domínio -> média móvel (EWMA) da espera
+        self._inflight = {}               # requestId -> timestamp de início
+        self._last_net_activity = time.time()
+        self._cdp = False
+
+    def install(self):
+        """Ativa eventos de rede e o observador de DOM (ignora se o driver não suportar CDP)."""
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": DOM_OBSERVER_JS})
+            self.driver.get_log("performance")
+            self._cdp = True
+        except Exception as e:
+            print(f"[PageWaiter] CDP indisponível, usando só DOM/readyState: {e}")
+            self._cdp = False
+
+    def begin(self):
+        """Chamar antes de uma ação (navegar/clicar): descarta eventos de rede antigos."""
+        self._drain_network()
+        self._inflight.clear()
+        self._last_net_activity = time.time()
+
+    def reset(self):
+        self.begin()
+
+    # ───────────── rede ─────────────
+
+    def _drain_network(self):
+        if not self._cdp:
+            return
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            self._cdp = False
+            return
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = msg.get("method", "")
+            if not method.startswith("Network."):
+                continue
+            request_id = msg.get("params", {}).get("requestId")
+            if method == "Network.requestWillBeSent":
+                self._inflight[request_id] = time.time()
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                self._inflight.pop(request_id, None)
+            else:
+                continue
+            self._last_net_activity = time.time()
+
+    def _network_idle(self):
+        if not self._cdp:
+            return True
+        self._drain_network()
+        expired = time.time() - self.inflight_ttl
+        for request_id in [r for r, t in self._inflight.items() if t < expired]:
+            del self._inflight[request_id]
+        if len(self._inflight) > self.max_inflight:
+            return False
+        return (time.time() - self._last_net_activity) * 1000 >= self.idle_ms
+
+    # ───────────── timeout adaptativo ─────────────
+
+    def _domain(self):
+        try:
+            return urlparse(self.driver.current_url).netloc
+        except Exception:
+            return ""
+
+    def _timeout_for(self, domain):
+        avg = self._avg.get(domain)
+        if avg is None:
+            return self.max_timeout
+        return max(self.min_timeout, min(self.max_timeout, avg * 3 + 1))
+
+    def _record(self, label, domain, seconds, reason):
+        # Timeouts também entram (limitados ao teto): senão um domínio que sempre
+        # estoura nunca ganha média e toda espera nele paga o max_timeout inteiro
+        seconds_avg = min(seconds, self.max_timeout)
+        prev = self._avg.get(domain)
+        self._avg[domain] = seconds_avg if prev is None else prev * 0.7 + seconds_avg * 0.3
+        self.history.append({
+            "etapa": label,
+            "dominio": domain,
+            "segundos": round(seconds, 3),
+            "motivo": reason,
+        })
+
+    # ───────────── espera ─────────────
+
+    def wait(self, label="load", target=None, timeout=None):
+        """
+        Espera a página estabilizar.
+        target: seletor CSS; se aparecer (com o documento já parseado), encerra a espera na hora.
+        Retorna o tempo esperado em segundos.
+        """
+        start = time.time()
+        domain = self._domain()
+        limit = timeout or self._timeout_for(domain)
+        reason = "timeout"
+        complete_since = None
+
+        while time.time() - start < limit:
+            try:
+                state = self.driver.execute_script(POLL_JS, target)
+            except Exception:
+                # Documento trocando durante a navegação
+                time.sleep(self.poll)
+                continue
+
+            if target and state["target"] and state["ready"] != "loading":
+                reason = "alvo"
+                break
+            if state["ready"] == "complete":
+                complete_since = complete_since or time.time()
+                if state["quiet"] >= self.quiet_ms and self._network_idle():
+                    reason = "ocioso"
+                    break
+                if time.time() - complete_since >= self.busy_fallback:
+                    # DOM/rede em atividade contínua: o documento carregado basta
+                    reason = "carregado"
+                    break
+            else:
+                complete_since = None
+            time.sleep(self.poll)
+
+        elapsed = time.time() - start
+        self._record(label, domain, elapsed, reason)
+        return elapsed
+
+    def stats(self):
+        """Resumo dos tempos de espera registrados."""
+        total = sum(h["segundos"] for h in self.history)
+        return {
+            "etapas": list(self.history),
+            "total_segundos": round(total, 3),
+            "media_por_dominio": {d: round(v, 3) for d, v in self._avg.items()},
+        }
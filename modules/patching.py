@@ -0,0 +1,249 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+FIX_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "memoria", "coder_fixes.json"
+)
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(Exception):
+    pass
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Aplicação de edições
+# ═══════════════════════════════════════════════════════════════
+
+def _find_block(lines, block, hint, loose=False):
+    """Posição de `block` em `lines` mais próxima de `hint` (ou -1)."""
+    if not block:
+        return min(max(hint, 0), len(lines))
+    norm = (lambda s: s.rstrip()) if loose else (lambda s: s)
+    target = [norm(b) for b in block]
+    candidates = [
+        i for i in range(len(lines) - len(block) + 1)
+        if [norm(l) for l in lines[i:i + len(block)]] == target
+    ]
+    if not candidates:
+        return -1
+    return min(candidates, key=lambda i: abs(i - hint))
+
+
+def apply_unified_diff(code, diff):
+    """Aplica um diff unificado (um arquivo) ao código; o contexto pode ter se deslocado."""
+    lines = code.splitlines()
+    hunks = []
+    current = None
+    for raw in diff.splitlines():
+        m = HUNK_RE.match(raw)
+        if m:
+            current = {"start": int(m.group(1)) - 1, "old": [], "new": []}
+            hunks.append(current)
+        elif current is None or raw.startswith(("---", "+++")):
+            continue
+        elif raw.startswith("-"):
+            current["old"].append(raw[1:])
+        elif raw.startswith("+"):
+            current["new"].append(raw[1:])
+        elif raw.startswith(" ") or raw == "":
+            current["old"].append(raw[1:])
+            current["new"].append(raw[1:])
+        # "\ No newline at end of file" e lixo são ignorados
+    if not hunks:
+        raise PatchError("diff sem hunks")
+
+    offset = 0
+    for n, hunk in enumerate(hunks, 1):
+        hint = hunk["start"] + offset
+        pos = _find_block(lines, hunk["old"], hint)
+        if pos < 0:
+            pos = _find_block(lines, hunk["old"], hint, loose=True)
+        if pos < 0:
+            raise PatchError(f"hunk {n} não encontrado no código")
+        lines[pos:pos + len(hunk["old"])] = hunk["new"]
+        offset += len(hunk["new"]) - len(hunk["old"])
+    return "\n".join(lines) + "\n"
+
+
+def apply_edits(code, edits):
+    """
+    Aplica edições {"buscar": trecho, "substituir": novo}. Cada trecho precisa
+    aparecer exatamente uma vez (comparação exata; depois ignorando espaços no fim das linhas).
+    """
+    for n, edit in enumerate(edits, 1):
+        old = edit.get("buscar") or ""
+        new = edit.get("substituir") or ""
+        if not old:
+            raise PatchError(f"edição {n} sem trecho a buscar")
+        count = code.count(old)
+        if count == 1:
+            code = code.replace(old, new, 1)
+            continue
+        if count > 1:
+            raise PatchError(f"edição {n}: trecho aparece {count} vezes")
+        lines = code.splitlines()
+        block = old.splitlines()
+        pos = _find_block(lines, block, 0, loose=True)
+        if pos < 0:
+            raise PatchError(f"edição {n}: trecho não encontrado")
+        lines[pos:pos + len(block)] = new.splitlines()
+        code = "\n".join(lines) + "\n"
+    return code
+
+
+def validate(code, filename="<codigo>"):
+    """Checagem rápida (AST + bytecode, como o py_compile) sem executar. Retorna o erro ou None."""
+    try:
+        compile(code, filename, "exec")
+        return None
+    except (SyntaxError, ValueError) as e:
+        return f"{type(e).__name__}: {e}"
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Contexto do erro
+# ═══════════════════════════════════════════════════════════════
+
+def error_lines(traceback_text, filename):
+    """Números de linha do script citados no traceback (do mais externo ao mais interno)."""
+    name = re.escape(os.path.basename(filename))
+    pattern = re.compile(r'File "[^"]*' + name + r'", line (\d+)')
+    lines = [int(m.group(1)) for m in pattern.finditer(traceback_text)]
+    # SyntaxError não tem frame do script, mas cita a linha
+    if not lines:
+        m = re.search(r"line (\d+)", traceback_text)
+        if m:
+            lines.append(int(m.group(1)))
+    return lines
+
+
+def code_window(code, lines, context=6, max_lines=120):
+    """Trechos numerados do código ao redor das linhas do erro (o script todo se for pequeno)."""
+    source = code.splitlines()
+    if len(source) <= max_lines or not lines:
+        ranges = [(1, min(len(source), max_lines))]
+    else:
+        ranges = []
+        for line in sorted(set(lines)):
+            lo, hi = max(1, line - context), min(len(source), line + context)
+            if ranges and lo <= ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], max(hi, ranges[-1][1]))
+            else:
+                ranges.append((lo, hi))
+    parts = []
+    for lo, hi in ranges:
+        if parts or lo > 1:
+            parts.append("...")
+        parts.extend(f"{n:4d}| {source[n - 1]}" for n in range(lo, hi + 1))
+    if ranges and ranges[-1][1] < len(source):
+        parts.append("...")
+    return "\n".join(parts)
+
+
+def error_signature(traceback_text, code, filename):
+    """Assinatura estável de um erro: exceção (sem números) + linhas de código envolvidas."""
+    last = [l for l in traceback_text.strip().splitlines() if l.strip()]
+    exc = re.sub(r"\d+", "#", last[-1]) if last else ""
+    source = code.splitlines()
+    involved = [source[n - 1].strip() for n in error_lines(traceback_text, filename) if 0 < n <= len(source)]
+    raw = exc + "\n" + "\n".join(involved)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+# ═══════════════════════════════════════════════════════════════
+#  Cache traceback -> correção
+# ═══════════════════════════════════════════════════════════════
+
+class FixCache:
+    """
+    Correções que funcionaram, indexadas pela assinatura do erro
+    (memoria/coder_fixes.json). Só entra no cache a correção cuja execução seguinte passou.
+    """
+
+    def __init__(self, path=FIX_CACHE_FILE, max_entries=300):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def get(self, signature):
+        with self._lock:
+            self._load()
+            entry = self._entries.get(signature)
+            if entry:
+                entry["usos"] = entry.get("usos", 0) + 1
+                entry["acesso"] = time.time()
+            return entry["correcao"] if entry else None
+
+    def put(self, signature, fix):
+        with self._lock:
+            self._load()
+            self._entries[signature] = {"correcao": fix, "usos": 0, "acesso": time.time()}
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                for k in sorted(self._entries, key=lambda k: self._entries[k]["acesso"])[:overflow]:
+                    del self._entries[k]
+            self._save()
+
+    def release(self):
+        """Grava (get só atualiza contadores em memória) e solta as entradas; o próximo uso relê o arquivo."""
+        with self._lock:
+            if self._entries is None:
+                return False
+            self._save()
+            self._entries = None
+            return True
+
+    def discard(self, signature):
+        """Remove uma correção que deixou de funcionar."""
+        with self._lock:
+            self._load()
+            if self._entries.pop(signature, None) is not None:
+                self._save()
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[FixCache] Erro ao salvar: {e}")
+
+
+def apply_fix(code, fix):
+    """Aplica uma correção no formato do CoderAgent (edições, diff ou código completo)."""
+    if fix.get("edicoes"):
+        return apply_edits(code, fix["edicoes"])
+    if fix.get("diff"):
+        return apply_unified_diff(code, fix["diff"])
+    if fix.get("codigo"):
+        return fix["codigo"]
+    raise PatchError("correção vazia")
+
+
+_fix_cache = None
+_fix_cache_lock = threading.Lock()
+
+
+def get_fix_cache():
+    global _fix_cache
+    with _fix_cache_lock:
+        if _fix_cache is None:
+            _fix_cache = FixCache()
+        return _fix_cache
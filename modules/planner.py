@@ -1,65 +1,219 @@
-import json
-import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from .llm_bridge import LLMBridge
 from .browser import AutonomousBrowser
 from .coder import CoderAgent
 
+# Workers por tipo de agente (browser limitado pelo BrowserPool, coder por CPU)
+WORKERS = {"browser": 2, "coder": 2, "casual": 4}
+UPSTREAM_CHARS = 2000  # por resultado de dependência repassado adiante
+
+PLAN_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "plano": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "passo": {"type": "INTEGER"},
+                    "agente": {"type": "STRING", "enum": ["browser", "coder", "casual"]},
+                    "tarefa": {"type": "STRING"},
+                    "depende_de": {"type": "ARRAY", "items": {"type": "INTEGER"}},
+                },
+                "required": ["passo", "agente", "tarefa", "depende_de"],
+                "property_ordering": ["passo", "agente", "tarefa", "depende_de"],
+            },
+        }
+    },
+    "required": ["plano"],
+}
+
+
+class PlanStreamError(RuntimeError):
+    """O plano parou de chegar no meio; `executed` tem os passos que rodaram mesmo assim."""
+
+    def __init__(self, error, executed):
+        super().__init__(f"plano incompleto ({error})")
+        self.executed = executed
+
+
+class PlanScheduler:
+    """
+    Executa os passos de um plano como um DAG: cada passo roda assim que os
+    passos de que ele depende (`depende_de`) terminam, em pools separados por
+    tipo de agente. Passos sem o campo `depende_de` dependem de todos os
+    anteriores (mantém o comportamento sequencial para planos antigos).
+    Aceita qualquer iterável de passos, inclusive um que ainda está chegando;
+    se ele falhar no meio, os passos recebidos terminam e run() levanta PlanStreamError.
+    """
+
+    def __init__(self, run_step, workers=None):
+        self.run_step = run_step
+        self.workers = workers or WORKERS
+
+    def run(self, steps):
+        events = queue.Queue()
+        feed_error = []
+
+        def _feed():
+            try:
+                for step in steps:
+                    events.put(("passo", step))
+            except Exception as e:
+                print(f"[Planner] Erro lendo plano: {e}")
+                feed_error.append(e)
+            finally:
+                events.put(("fim", None))
+
+        threading.Thread(target=_feed, daemon=True, name="PlanFeeder").start()
+
+        pools = {kind: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"plan-{kind}")
+                 for kind, n in self.workers.items()}
+        order = []        # ids na ordem em que chegaram
+        steps_by_id = {}
+        deps = {}
+        pending = set()
+        running = set()
+        results = {}
+        source_done = False
+
+        def _submit(step_id):
+            step = steps_by_id[step_id]
+            upstream = [(d, steps_by_id[d]["agente"], results[d]) for d in deps[step_id] if d in results]
+            kind = step["agente"] if step["agente"] in pools else "casual"
+            pending.discard(step_id)
+            running.add(step_id)
+            future = pools[kind].submit(self._safe_run, step, upstream)
+            future.add_done_callback(lambda f, i=step_id: events.put(("feito", (i, f.result()))))
+
+        def _dispatch():
+            known = set(steps_by_id)
+            for step_id in sorted(pending, key=order.index):
+                missing = [d for d in deps[step_id] if d not in results]
+                if source_done:
+                    # Dependências que nunca vão existir são descartadas
+                    unknown = [d for d in missing if d not in known]
+                    if unknown:
+                        print(f"[Planner] Passo {step_id}: ignorando dependências inexistentes {unknown}")
+                        deps[step_id] = [d for d in deps[step_id] if d in known]
+                        missing = [d for d in missing if d in known]
+                if not missing:
+                    _submit(step_id)
+            if source_done and pending and not running:
+                # Ciclo no grafo: destrava pelo primeiro passo pendente
+                step_id = min(pending, key=order.index)
+                print(f"[Planner] Ciclo de dependências detectado, executando passo {step_id} mesmo assim")
+                _submit(step_id)
+
+        try:
+            while not source_done or pending or running:
+                kind, payload = events.get()
+                if kind == "passo":
+                    step_id = payload.get("passo", len(order) + 1)
+                    if step_id in steps_by_id:
+                        step_id = max(steps_by_id) + 1
+                    payload["passo"] = step_id
+                    payload.setdefault("agente", "casual")
+                    if "depende_de" in payload:
+                        raw = payload.get("depende_de") or []
+                        raw = raw if isinstance(raw, list) else [raw]
+                        deps[step_id] = [d for d in raw if d != step_id]
+                    else:
+                        deps[step_id] = list(order)
+                    steps_by_id[step_id] = payload
+                    order.append(step_id)
+                    pending.add(step_id)
+                elif kind == "feito":
+                    step_id, result = payload
+                    running.discard(step_id)
+                    results[step_id] = result
+                else:
+                    source_done = True
+                _dispatch()
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=False)
+
+        executed = [(steps_by_id[i], results[i]) for i in order if i in results]
+        if feed_error:
+            raise PlanStreamError(feed_error[0], executed)
+        return executed
+
+    def _safe_run(self, step, upstream):
+        try:
+            return self.run_step(step, upstream)
+        except Exception as e:
+            return f"Erro no passo {step.get('passo')}: {e}"
+
+
 class PlannerAgent:
-    def __init__(self):
-        self.llm = LLMBridge()
-        self.browser = AutonomousBrowser()
-        self.coder = CoderAgent()
+    def __init__(self, llm=None, browser=None, coder=None):
+        self.llm = llm or LLMBridge()
+        self.browser = browser or AutonomousBrowser(llm=self.llm)
+        self.coder = coder or CoderAgent(llm=self.llm)
+        self.scheduler = PlanScheduler(self._run_step)
 
     def execute_plan(self, goal):
         prompt = f"""
         Você é um Planejador Mestre de IA.
         Objetivo Complexo: {goal}
-        
-        Sua tarefa é quebrar este objetivo em uma lista de passos SEQUENCIAIS.
+
+        Sua tarefa é quebrar este objetivo em uma lista de passos.
         Para cada passo, escolha o agente mais adequado:
         - "browser": Para pesquisar na internet, ler sites, buscar informações.
         - "coder": Para escrever scripts Python, fazer cálculos, processar arquivos, gerar gráficos.
         - "casual": Para responder perguntas simples ou sumarizar informações finais.
-        
-        Formato de Resposta (JSON):
-        {{
-            "plano": [
-                {{
-                    "passo": 1,
-                    "agente": "browser" | "coder" | "casual",
-                    "tarefa": "Descrição detalhada do que este agente deve fazer neste passo"
-                }},
-                ...
-            ]
-        }}
+
+        Indique em "depende_de" os números dos passos cujo resultado este passo precisa.
+        Passos independentes (ex: pesquisas sobre assuntos diferentes) devem ter "depende_de": []
+        para rodarem em paralelo. O passo final de resumo deve depender de todos os que ele resume.
+
+        Responda com o JSON {{"plano": [...]}}, um objeto por passo com "passo", "agente",
+        "tarefa" (descrição detalhada do que o agente deve fazer) e "depende_de".
         """
-        response = self.llm.chat(prompt)
-        
         try:
-            json_str = re.search(r'\{.*\}', response, re.DOTALL).group(0)
-            plan_data = json.loads(json_str)
-            plan = plan_data.get("plano", [])
-            
-            results = []
-            
-            for step in plan:
-                agent_type = step["agente"]
-                task_desc = step["tarefa"]
-                
-                print(f"[Planner] Executando Passo {step['passo']} ({agent_type}): {task_desc}")
-                
-                step_result = ""
-                if agent_type == "browser":
-                    step_result = self.browser.start_research(task_desc)
-                elif agent_type == "coder":
-                    step_result = self.coder.run_with_correction(task_desc)
-                else: # casual
-                    context = "\n".join(results)
-                    step_result = self.llm.chat(f"Contexto anterior:\n{context}\n\nTarefa atual: {task_desc}")
-                
-                results.append(f"Passo {step['passo']} ({agent_type}): {step_result}")
-                
-            return "\n\n".join(results)
+            # Os passos chegam em streaming: os primeiros já rodam enquanto o resto do plano é gerado
+            plan = self.llm.stream_json(prompt, PLAN_SCHEMA, "plano")
+            try:
+                executed = self.scheduler.run(plan)
+            except PlanStreamError as e:
+                if not e.executed:
+                    return f"Erro no planejamento: {e}"
+                return f"Erro no planejamento: {e}. Passos executados antes da falha:\n\n" + self._report(e.executed)
+            if not executed:
+                return "Erro no planejamento: o LLM não retornou nenhum passo."
+            return self._report(executed)
 
         except Exception as e:
             return f"Erro no planejamento: {e}"
+
+    @staticmethod
+    def _report(executed):
+        executed = sorted(executed, key=lambda item: item[0]["passo"])
+        return "\n\n".join(
+            f"Passo {step['passo']} ({step['agente']}): {result}" for step, result in executed
+        )
+
+    def _run_step(self, step, upstream):
+        """Executa um passo recebendo apenas os resultados dos passos de que depende."""
+        agent_type = step["agente"]
+        task_desc = step["tarefa"]
+
+        print(f"[Planner] Executando Passo {step['passo']} ({agent_type}): {task_desc}")
+
+        context = "\n".join(
+            f"Passo {dep_id} ({dep_agent}): {str(result)[:UPSTREAM_CHARS]}"
+            for dep_id, dep_agent, result in upstream
+        )
+
+        if agent_type == "browser":
+            # O contexto não entra na tarefa: ela vira a busca no Google (ou a URL)
+            return self.browser.start_research(task_desc, contexto=context or None)
+        elif agent_type == "coder":
+            task = f"{task_desc}\n\nDados de passos anteriores:\n{context}" if context else task_desc
+            return self.coder.run_with_correction(task)
+        else: # casual
+            return self.llm.chat(f"Contexto anterior:\n{context}\n\nTarefa atual: {task_desc}")
@@ -0,0 +1,288 @@
+"""
+Resource Watchdog — Modo econômico sob pressão de memória/CPU para o ADK Agent.
+Lê o snapshot do system_metrics e, quando a RAM, a CPU ou a memória do próprio
+agente passam do limite por algumas amostras seguidas, degrada o que não é a
+conversa: captura de tela mais lenta e menor, OCR e indexação de segundo plano
+pausados, caches soltos e jobs da fila adiados. Quando a pressão baixa (com
+margem, para não ficar oscilando), restaura tudo. Cada mudança vira um evento
+para a barra de status da GUI.
+"""
+
+import os
+import gc
+import sys
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from system_metrics import obter_amostrador, INTERVALO_AMOSTRA
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+RAM_LIMITE = float(os.getenv("ADK_WATCHDOG_RAM", "85"))                # % da RAM do sistema
+CPU_LIMITE = float(os.getenv("ADK_WATCHDOG_CPU", "90"))                # % da CPU do sistema
+AGENTE_LIMITE_MB = float(os.getenv("ADK_WATCHDOG_AGENTE_MB", "2048"))  # RSS do próprio agente
+MARGEM = 10.0              # pontos percentuais abaixo do limite para sair do modo econômico
+AMOSTRAS_ENTRAR = 2        # amostras seguidas acima do limite para degradar
+AMOSTRAS_SAIR = 5          # amostras seguidas abaixo de (limite - margem) para restaurar
+INTERVALO_LIMPEZA = 60     # enquanto a pressão durar, solta os caches de novo a cada N segundos
+FPS_ECONOMICO = 0.5
+RESOLUCAO_ECONOMICA = 512
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Ações padrão (só mexem no que já foi carregado pelo processo)
+# ═══════════════════════════════════════════════════════════════════
+
+def _adiar_jobs(motivo: str):
+    job_manager = sys.modules.get("job_manager")
+    if job_manager:
+        job_manager.adiar_fila(motivo)
+
+
+def _liberar_jobs():
+    job_manager = sys.modules.get("job_manager")
+    if job_manager:
+        job_manager.liberar_fila()
+
+
+def _pausar_ocr(motivo: str):
+    vision_utils = sys.modules.get("vision_utils")
+    if vision_utils:
+        vision_utils.pausar_ocr_segundo_plano()
+        if vision_utils.liberar_ocr():
+            print("[Watchdog] EasyOCR descarregado")
+
+
+def _retomar_ocr():
+    vision_utils = sys.modules.get("vision_utils")
+    if vision_utils:
+        vision_utils.retomar_ocr()
+
+
+def _pausar_indexador(motivo: str):
+    file_index = sys.modules.get("file_index")
+    indice = file_index.indice_carregado() if file_index else None
+    if indice:
+        indice.pausar()
+
+
+def _retomar_indexador():
+    file_index = sys.modules.get("file_index")
+    indice = file_index.indice_carregado() if file_index else None
+    if indice:
+        indice.retomar()
+
+
+def _soltar_caches(motivo: str):
+    """Caches são recriados sob demanda: não há o que restaurar depois."""
+    soltos = []
+    llm_cache = sys.modules.get("modules.llm_cache")
+    if llm_cache and llm_cache.get_response_cache().release():
+        soltos.append("LLM")
+    patching = sys.modules.get("modules.patching")
+    if patching and patching.get_fix_cache().release():
+        soltos.append("correções")
+    file_reader = sys.modules.get("file_reader")
+    if file_reader and file_reader.limpar_indices():
+        soltos.append("índices de linhas")
+    grep_engine = sys.modules.get("grep_engine")
+    if grep_engine and grep_engine.encerrar_pool():
+        soltos.append("pool do grep")
+    gc.collect()
+    if soltos:
+        print(f"[Watchdog] Caches soltos: {', '.join(soltos)}")
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Vigia
+# ═══════════════════════════════════════════════════════════════════
+
+class Vigia:
+    """
+    Thread que avalia cada amostra do system_metrics e liga/desliga o modo econômico.
+    Subsistemas se registram com registrar_acao(nome, degradar, restaurar); a GUI
+    escuta com ao_mudar(callback), que recebe o dict do evento.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_AMOSTRA):
+        self.intervalo = intervalo
+        self.sob_pressao = False
+        self.motivos: List[str] = []
+        self.eventos = deque(maxlen=50)
+        self._acima = 0
+        self._abaixo = 0
+        self._desde = None
+        self._ultima_limpeza = 0.0
+        self._ultima_amostra = None
+        self._acoes: Dict[str, tuple] = {}
+        self._ouvintes: List[Callable[[Dict], None]] = []
+        self._lock = threading.RLock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.registrar_acao("jobs", _adiar_jobs, _liberar_jobs)
+        self.registrar_acao("ocr", _pausar_ocr, _retomar_ocr, repetir=True)
+        self.registrar_acao("indexador", _pausar_indexador, _retomar_indexador)
+        self.registrar_acao("caches", _soltar_caches, repetir=True)
+
+    # ───────────── registro ─────────────
+
+    def registrar_acao(self, nome: str, degradar: Callable[[str], None],
+                       restaurar: Callable[[], None] = None, repetir: bool = False):
+        """
+        degradar(motivo) roda ao entrar no modo econômico (na hora, se já estiver nele);
+        restaurar() ao sair. repetir=True reaplica a cada INTERVALO_LIMPEZA enquanto durar.
+        """
+        with self._lock:
+            self._acoes[nome] = (degradar, restaurar, repetir)
+            if self.sob_pressao:
+                self._executar(nome, degradar, self._motivo())
+
+    def remover_acao(self, nome: str, restaurar: bool = True):
+        with self._lock:
+            acao = self._acoes.pop(nome, None)
+            if acao and restaurar and self.sob_pressao and acao[1]:
+                self._executar(nome, acao[1])
+
+    def ao_mudar(self, callback: Callable[[Dict], None]):
+        with self._lock:
+            if callback not in self._ouvintes:
+                self._ouvintes.append(callback)
+
+    def remover_ouvinte(self, callback: Callable[[Dict], None]):
+        with self._lock:
+            if callback in self._ouvintes:
+                self._ouvintes.remove(callback)
+
+    # ───────────── ciclo ─────────────
+
+    def iniciar(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="ResourceWatchdog")
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _loop(self):
+        amostrador = obter_amostrador()
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.avaliar(amostrador.snapshot())
+            except Exception as e:
+                print(f"[Watchdog] Erro avaliando pressão: {e}")
+
+    @staticmethod
+    def _excessos(snapshot: Dict, folga: float) -> List[str]:
+        """Métricas acima do limite (menos `folga` pontos percentuais) como texto legível."""
+        motivos = []
+        ram = snapshot.get("ram_percent")
+        if ram is not None and ram >= RAM_LIMITE - folga:
+            motivos.append(f"RAM {ram:.0f}%")
+        cpu = snapshot.get("cpu_percent")
+        if cpu is not None and cpu >= CPU_LIMITE - folga:
+            motivos.append(f"CPU {cpu:.0f}%")
+        rss = snapshot.get("agente_rss_mb")
+        if rss is not None and rss >= AGENTE_LIMITE_MB * (1 - folga / 100):
+            motivos.append(f"agente {rss:.0f} MB")
+        return motivos
+
+    def avaliar(self, snapshot: Dict):
+        """Aplica a histerese a uma amostra. Público para poder ser alimentado sem o thread."""
+        # A mesma amostra lida duas vezes não conta como "amostras seguidas"
+        if not snapshot:
+            return
+        timestamp = snapshot.get("timestamp")
+        if timestamp is not None and timestamp == self._ultima_amostra:
+            return
+        self._ultima_amostra = timestamp
+        with self._lock:
+            if not self.sob_pressao:
+                motivos = self._excessos(snapshot, 0.0)
+                self._acima = self._acima + 1 if motivos else 0
+                if self._acima >= AMOSTRAS_ENTRAR:
+                    self._degradar(motivos)
+                return
+            motivos = self._excessos(snapshot, MARGEM)
+            self._abaixo = 0 if motivos else self._abaixo + 1
+            if motivos:
+                self.motivos = motivos
+            if self._abaixo >= AMOSTRAS_SAIR:
+                self._restaurar()
+            elif time.time() - self._ultima_limpeza >= INTERVALO_LIMPEZA:
+                self._ultima_limpeza = time.time()
+                for nome, (degradar, _, repetir) in list(self._acoes.items()):
+                    if repetir:
+                        self._executar(nome, degradar, self._motivo())
+
+    def _motivo(self) -> str:
+        return ", ".join(self.motivos) or "pressão de recursos"
+
+    def _executar(self, nome: str, funcao: Callable, *args):
+        try:
+            funcao(*args)
+        except Exception as e:
+            print(f"[Watchdog] Erro na ação '{nome}': {e}")
+
+    def _degradar(self, motivos: List[str]):
+        self.sob_pressao = True
+        self.motivos = motivos
+        self._acima = self._abaixo = 0
+        self._desde = self._ultima_limpeza = time.time()
+        motivo = self._motivo()
+        print(f"[Watchdog] Modo econômico ativado: {motivo}")
+        for nome, (degradar, _, _) in list(self._acoes.items()):
+            self._executar(nome, degradar, motivo)
+        self._emitir("pressao", f"🟠 Modo econômico: {motivo}")
+
+    def _restaurar(self):
+        duracao = time.time() - (self._desde or time.time())
+        self.sob_pressao = False
+        self.motivos = []
+        self._acima = self._abaixo = 0
+        self._desde = None
+        print(f"[Watchdog] Pressão normalizada após {duracao:.0f}s, restaurando")
+        for nome, (_, restaurar, _) in list(self._acoes.items()):
+            if restaurar:
+                self._executar(nome, restaurar)
+        self._emitir("normal", f"🟢 Recursos normalizados ({duracao:.0f}s em modo econômico)")
+
+    def _emitir(self, tipo: str, mensagem: str):
+        evento = {"tipo": tipo, "mensagem": mensagem, "motivos": list(self.motivos), "timestamp": time.time()}
+        self.eventos.append(evento)
+        for ouvinte in list(self._ouvintes):
+            try:
+                ouvinte(evento)
+            except Exception as e:
+                print(f"[Watchdog] Erro no ouvinte: {e}")
+
+    def estado(self) -> Dict:
+        with self._lock:
+            return {
+                "modo_economico": self.sob_pressao,
+                "motivos": list(self.motivos),
+                "desde_s": round(time.time() - self._desde, 1) if self._desde else None,
+                "limites": {"ram_percent": RAM_LIMITE, "cpu_percent": CPU_LIMITE, "agente_mb": AGENTE_LIMITE_MB},
+            }
+
+
+_vigia: Optional[Vigia] = None
+_vigia_lock = threading.Lock()
+
+
+def obter_vigia() -> Vigia:
+    """Vigia compartilhado, iniciado na primeira chamada (ADK_WATCHDOG=0 só registra, sem vigiar)."""
+    global _vigia
+    with _vigia_lock:
+        if _vigia is None:
+            _vigia = Vigia()
+            if os.getenv("ADK_WATCHDOG", "1") != "0":
+                _vigia.iniciar()
+        return _vigia
@@ -17,6 +17,7 @@ class ScreenCapture:
         self.fps = fps
         self.resolution = resolution
         self.running = False
+        self._original = None  # (fps, resolution) enquanto estiver limitado
 
     def capture_frame(self) -> str:
         """Captura um frame da tela e retorna como base64 JPEG.
@@ -37,7 +38,7 @@ class ScreenCapture:
             return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
     def capture_frame_pil(self) -> Image.Image:
-        """Captura frame e retorna como PIL Image (para preview GUI).
+        """Captura frame e retorna como PIL Image (para preview GUI), `resolution` x 5/8 (16:10).
         Cria nova instância MSS a cada chamada.
         """
         import mss
@@ -45,12 +46,11 @@ class ScreenCapture:
             monitor = sct.monitors[0]
             screenshot = sct.grab(monitor)
             img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-            return img.resize((320, 200), Image.LANCZOS)
+            return img.resize((self.resolution, self.resolution * 5 // 8), Image.LANCZOS)
 
     async def stream_frames(self, queue: asyncio.Queue):
         """Loop assíncrono que coloca frames na fila."""
         self.running = True
-        interval = 1.0 / self.fps
         while self.running:
             try:
                 frame_b64 = await asyncio.to_thread(self.capture_frame)
@@ -63,7 +63,21 @@ class ScreenCapture:
                 await queue.put(frame_b64)
             except Exception as e:
                 print(f"[ScreenCapture] Erro: {e}")
-            await asyncio.sleep(interval)
+            # Relido a cada frame: o watchdog pode limitar o fps com a captura rodando
+            await asyncio.sleep(1.0 / self.fps)
+
+    def limitar(self, fps: float, resolution: int):
+        """Reduz fps/resolução (só para baixo) até restaurar() ser chamado."""
+        if self._original is None:
+            self._original = (self.fps, self.resolution)
+        self.fps = min(self._original[0], fps)
+        self.resolution = min(self._original[1], resolution)
+
+    def restaurar(self):
+        """Volta ao fps/resolução de antes de limitar()."""
+        if self._original is not None:
+            self.fps, self.resolution = self._original
+            self._original = None
 
     def stop(self):
         """Para a captura."""
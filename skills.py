@@ -26,16 +26,21 @@ import time
 
 import tempfile
 
+import threading
+
 from datetime import datetime
 
 import sys
 
 import importlib.util
 
+import telemetry
+
 try:
     from modules.browser import AutonomousBrowser
     from modules.planner import PlannerAgent
     from modules.coder import CoderAgent
+    from modules.llm_bridge import LLMBridge
 except ImportError:
     print("Módulos de agente não encontrados ou erro de importação.")
     # Fallback ou ignora se não conseguir importar (para não quebrar o script principal)
@@ -81,6 +86,52 @@ obter_historico = _memory_module.obter_historico
 
 
 
+
+
+# Callback de progresso para skills longas (registrado pelo AgentCore -> on_skill_log)
+
+
+
+_log_skill_callback = None
+
+
+
+
+
+
+
+def registrar_log_skill(callback):
+
+    """Registra o callback que recebe mensagens de progresso das skills."""
+
+    global _log_skill_callback
+
+    _log_skill_callback = callback
+
+
+
+
+
+
+
+def _log_skill(mensagem: str):
+
+    """Envia uma mensagem de progresso ao log de skills (se houver callback)."""
+
+    if _log_skill_callback:
+
+        try:
+
+            _log_skill_callback(mensagem)
+
+        except Exception:
+
+            pass
+
+
+
+
+
 # " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " 
 
 #  SKILL 1: Executar comandos no terminal
@@ -89,47 +140,61 @@ obter_historico = _memory_module.obter_historico
 
 
 
-def executar_comando(comando: str, diretorio: str = None) -> dict:
+def executar_comando(comando: str, diretorio: str = None, timeout: int = 120,
 
-    """Executa um comando no terminal (PowerShell/CMD)."""
+                     em_segundo_plano: bool = False) -> dict:
 
-    try:
+    """
 
-        result = subprocess.run(
+    Executa um comando no terminal (PowerShell/CMD).
 
-            comando,
+    A saída é lida enquanto o comando roda (progresso vai para o log) e, no timeout,
 
-            shell=True,
+    o processo e todos os subprocessos são encerrados.
 
-            capture_output=True,
+    Com em_segundo_plano=True retorna um id na hora; acompanhe com consultar_comando.
 
-            text=True,
+    """
 
-            cwd=diretorio,
+    from command_runner import executar, executar_em_segundo_plano
 
-            timeout=120
+    if not timeout and not em_segundo_plano:
 
-        )
+        return {"sucesso": False, "saida": "",
 
-        return {
+                "erro": "timeout=0 (sem limite) só é aceito com em_segundo_plano=True", "codigo": -1}
 
-            "sucesso": result.returncode == 0,
+    try:
 
-            "saida": result.stdout[:5000] if result.stdout else "",
+        if em_segundo_plano:
 
-            "erro": result.stderr[:2000] if result.stderr else "",
+            return executar_em_segundo_plano(comando, diretorio, timeout=timeout or None, on_progresso=_log_skill)
 
-            "codigo": result.returncode
+        return executar(comando, diretorio, timeout=timeout, on_progresso=_log_skill)
 
-        }
+    except Exception as e:
 
-    except subprocess.TimeoutExpired:
+        return {"sucesso": False, "saida": "", "erro": str(e), "codigo": -1}
 
-        return {"sucesso": False, "saida": "", "erro": "Timeout (120s)", "codigo": -1}
 
-    except Exception as e:
 
-        return {"sucesso": False, "saida": "", "erro": str(e), "codigo": -1}
+
+
+def consultar_comando(id_comando: str = None, ultimas_linhas: int = 50, cancelar: bool = False) -> dict:
+
+    """Consulta (ou cancela) um comando iniciado em segundo plano. Sem id, lista todos."""
+
+    from command_runner import consultar, listar, cancelar as cancelar_comando
+
+    if not id_comando:
+
+        return listar()
+
+    if cancelar:
+
+        return cancelar_comando(id_comando)
+
+    return consultar(id_comando, ultimas_linhas)
 
 
 
@@ -143,19 +208,41 @@ def executar_comando(comando: str, diretorio: str = None) -> dict:
 
 
 
-def criar_arquivo(caminho: str, conteudo: str) -> dict:
+def _avisar_indice(resultado: dict, *caminhos) -> dict:
+
+    """Agenda no índice de arquivos (se já carregado) o que a skill criou, alterou ou removeu."""
+
+    from file_index import indice_carregado
 
-    """Cria ou sobrescreve um arquivo."""
+    indice = indice_carregado()
 
     try:
 
-        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        for caminho in caminhos if indice else ():
+
+            if caminho:
+
+                indice.notificar(caminho)
+
+    except Exception as e:
+
+        print(f"Erro ao avisar o índice de arquivos: {e}")
+
+    return resultado
 
-        with open(caminho, "w", encoding="utf-8") as f:
 
-            f.write(conteudo)
 
-        return {"sucesso": True, "mensagem": f"Arquivo criado: {caminho}"}
+
+
+def criar_arquivo(caminho: str, conteudo: str) -> dict:
+
+    """Cria ou sobrescreve um arquivo (escrita atômica; a versão anterior vira backup)."""
+
+    try:
+
+        from file_editor import escrever
+
+        return _avisar_indice(escrever(caminho, conteudo), caminho)
 
     except Exception as e:
 
@@ -165,17 +252,19 @@ def criar_arquivo(caminho: str, conteudo: str) -> dict:
 
 
 
-def ler_arquivo(caminho: str) -> dict:
+def ler_arquivo(caminho: str, offset: int = None, limite: int = None, linha_inicio: int = None,
+
+                linha_fim: int = None, ultimas_linhas: int = None, encoding: str = None) -> dict:
 
-    """Lê conteúdo de um arquivo."""
+    """Lê um trecho de um arquivo (começo, offset, faixa de linhas ou últimas linhas) sem carregá-lo inteiro."""
 
     try:
 
-        with open(caminho, "r", encoding="utf-8") as f:
+        from file_reader import ler
 
-            conteudo = f.read()
+        return ler(caminho, offset=offset, limite=limite, linha_inicio=linha_inicio,
 
-        return {"sucesso": True, "conteudo": conteudo[:10000], "tamanho": len(conteudo)}
+                   linha_fim=linha_fim, ultimas_linhas=ultimas_linhas, encoding=encoding)
 
     except Exception as e:
 
@@ -185,27 +274,61 @@ def ler_arquivo(caminho: str) -> dict:
 
 
 
-def editar_arquivo(caminho: str, texto_antigo: str, texto_novo: str) -> dict:
+def editar_arquivo(caminho: str, texto_antigo: str, texto_novo: str, regex: bool = False,
 
-    """Edita arquivo substituindo texto."""
+                   apenas_primeira: bool = False) -> dict:
+
+    """Edita arquivo substituindo texto (ou regex), em streaming e com troca atômica + backup."""
 
     try:
 
-        with open(caminho, "r", encoding="utf-8") as f:
+        from file_editor import editar
+
+        return _avisar_indice(editar(caminho, texto_antigo, texto_novo, regex=regex,
 
-            conteudo = f.read()
+                                     apenas_primeira=apenas_primeira), caminho)
 
-        if texto_antigo not in conteudo:
+    except Exception as e:
 
-            return {"sucesso": False, "mensagem": "Texto não encontrado no arquivo"}
+        return {"sucesso": False, "mensagem": str(e)}
 
-        conteudo = conteudo.replace(texto_antigo, texto_novo)
 
-        with open(caminho, "w", encoding="utf-8") as f:
 
-            f.write(conteudo)
 
-        return {"sucesso": True, "mensagem": f"Arquivo editado: {caminho}"}
+
+def editar_arquivos(edicoes: list) -> dict:
+
+    """Várias edições em vários arquivos numa chamada. Se uma falhar, nenhum arquivo muda."""
+
+    try:
+
+        from file_editor import editar_lote
+
+        resultado = editar_lote(edicoes or [], on_progresso=_log_skill)
+
+        return _avisar_indice(resultado, *[e.get("caminho") for e in edicoes or [] if isinstance(e, dict)])
+
+    except Exception as e:
+
+        return {"sucesso": False, "mensagem": str(e)}
+
+
+
+
+
+def backups_arquivo(caminho: str, restaurar_versao: int = None) -> dict:
+
+    """Lista os backups automáticos de um arquivo ou restaura um deles (1 = o mais recente)."""
+
+    try:
+
+        from file_editor import listar_backups, restaurar_backup
+
+        if restaurar_versao:
+
+            return restaurar_backup(caminho, int(restaurar_versao))
+
+        return listar_backups(caminho)
 
     except Exception as e:
 
@@ -225,13 +348,13 @@ def deletar_arquivo(caminho: str) -> dict:
 
             os.remove(caminho)
 
-            return {"sucesso": True, "mensagem": f"Arquivo deletado: {caminho}"}
+            return _avisar_indice({"sucesso": True, "mensagem": f"Arquivo deletado: {caminho}"}, caminho)
 
         elif os.path.isdir(caminho):
 
             shutil.rmtree(caminho)
 
-            return {"sucesso": True, "mensagem": f"Pasta deletada: {caminho}"}
+            return _avisar_indice({"sucesso": True, "mensagem": f"Pasta deletada: {caminho}"}, caminho)
 
         else:
 
@@ -283,17 +406,35 @@ def listar_arquivos(diretorio: str, padrao: str = "*") -> dict:
 
 
 
-def mover_arquivo(origem: str, destino: str) -> dict:
+def _lista_globs(padroes) -> list:
+
+    """Aceita lista ou texto separado por vírgulas ("*.log, node_modules")."""
+
+    if isinstance(padroes, str):
+
+        padroes = padroes.split(",")
+
+    return [p.strip() for p in (padroes or []) if p and p.strip()]
+
+
+
 
-    """Move ou renomeia arquivo/pasta."""
+
+def mover_arquivo(origem: str, destino: str, incluir=None, excluir=None) -> dict:
+
+    """Move ou renomeia arquivo/pasta (rename no mesmo disco; cópia com progresso + remoção entre discos)."""
 
     try:
 
-        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        from file_transfer import mover
 
-        shutil.move(origem, destino)
+        from job_manager import evento_cancelamento
 
-        return {"sucesso": True, "mensagem": f"Movido: {origem}     {destino}"}
+        resultado = mover(origem, destino, _lista_globs(incluir), _lista_globs(excluir),
+
+                          on_progresso=_log_skill, cancelar=evento_cancelamento())
+
+        return _avisar_indice(resultado, origem, destino)
 
     except Exception as e:
 
@@ -303,23 +444,21 @@ def mover_arquivo(origem: str, destino: str) -> dict:
 
 
 
-def copiar_arquivo(origem: str, destino: str) -> dict:
+def copiar_arquivo(origem: str, destino: str, incluir=None, excluir=None) -> dict:
 
-    """Copia arquivo/pasta."""
+    """Copia arquivo/pasta em paralelo, com progresso; repetir após uma falha retoma de onde parou."""
 
     try:
 
-        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        from file_transfer import copiar
 
-        if os.path.isdir(origem):
+        from job_manager import evento_cancelamento
 
-            shutil.copytree(origem, destino)
+        resultado = copiar(origem, destino, _lista_globs(incluir), _lista_globs(excluir),
 
-        else:
-
-            shutil.copy2(origem, destino)
+                           on_progresso=_log_skill, cancelar=evento_cancelamento())
 
-        return {"sucesso": True, "mensagem": f"Copiado: {origem}     {destino}"}
+        return _avisar_indice(resultado, destino)
 
     except Exception as e:
 
@@ -383,83 +522,69 @@ def instalar_programa(comando_instalacao: str) -> dict:
 
 
 
-def info_sistema() -> dict:
+def _usuario_atual() -> str:
 
-    """Informações do sistema."""
+    """os.getlogin() falha sem terminal (serviço, agendador); getpass cai nas variáveis de ambiente."""
 
     try:
 
-        return {
-
-            "sucesso": True,
-
-            "cpu_percent": psutil.cpu_percent(interval=1),
-
-            "ram_total_gb": round(psutil.virtual_memory().total / (1024**3), 1),
+        return os.getlogin()
 
-            "ram_usada_gb": round(psutil.virtual_memory().used / (1024**3), 1),
+    except OSError:
 
-            "ram_percent": psutil.virtual_memory().percent,
+        import getpass
 
-            "disco_total_gb": round(psutil.disk_usage('C:\\').total / (1024**3), 1),
+        return getpass.getuser()
 
-            "disco_usado_gb": round(psutil.disk_usage('C:\\').used / (1024**3), 1),
 
-            "disco_percent": psutil.disk_usage('C:\\').percent,
 
-            "processos_ativos": len(psutil.pids()),
 
-            "usuario": os.getlogin(),
 
-            "diretorio_atual": os.getcwd()
-
-        }
+def info_sistema() -> dict:
 
-    except Exception as e:
-
-        return {"sucesso": False, "mensagem": str(e)}
+    """Informações do sistema (snapshot do amostrador em segundo plano, com médias de 1/5/15 min)."""
 
+    try:
 
+        from system_metrics import obter_amostrador
 
+        from resource_watchdog import obter_vigia
 
+        dados = obter_amostrador().snapshot()
 
-def listar_processos(filtro: str = None) -> dict:
+        dados.pop("timestamp", None)
 
-    """Lista processos em execução."""
+        return {
 
-    try:
+            "sucesso": True,
 
-        processos = []
+            **dados,
 
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+            "watchdog": obter_vigia().estado(),
 
-            try:
+            "usuario": _usuario_atual(),
 
-                info = proc.info
+            "diretorio_atual": os.getcwd()
 
-                if filtro and filtro.lower() not in info['name'].lower():
+        }
 
-                    continue
+    except Exception as e:
 
-                processos.append({
+        return {"sucesso": False, "mensagem": str(e)}
 
-                    "pid": info['pid'],
 
-                    "nome": info['name'],
 
-                    "cpu": info['cpu_percent'],
 
-                    "memoria": round(info['memory_percent'], 1)
 
-                })
+def listar_processos(filtro: str = None, ordenar_por: str = "cpu") -> dict:
 
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
+    """Lista processos em execução (CPU medida entre varreduras do amostrador, 0-100% do total)."""
 
-                pass
+    try:
 
-        processos.sort(key=lambda x: x.get('cpu', 0), reverse=True)
+        from system_metrics import obter_amostrador
 
-        return {"sucesso": True, "processos": processos[:50], "total": len(processos)}
+        return {"sucesso": True, **obter_amostrador().processos(filtro, ordenar_por)}
 
     except Exception as e:
 
@@ -563,7 +688,15 @@ def abrir_url(url: str) -> dict:
 
 def pesquisar_arquivos(diretorio: str, termo: str, extensoes: str = None) -> dict:
 
-    """Pesquisa arquivos por nome."""
+    """
+
+    Pesquisa arquivos por nome (pelo índice de file_index.py; os.walk enquanto ele não fica pronto).
+
+    A primeira busca num diretório agenda a indexação da árvore inteira em segundo plano
+
+    (até file_index.MAX_ARQUIVOS_RAIZ arquivos).
+
+    """
 
     try:
 
@@ -571,9 +704,23 @@ def pesquisar_arquivos(diretorio: str, termo: str, extensoes: str = None) -> dic
 
         ext_list = extensoes.split(",") if extensoes else None
 
+        from file_index import obter_indice
+
+        from grep_engine import ignorar_diretorio
+
+        indice = obter_indice()
+
+        if indice:
+
+            indexados = indice.buscar_nomes(diretorio, termo, ext_list, limite=50)
+
+            if indexados is not None:
+
+                return {"sucesso": True, "resultados": indexados, "total": len(indexados), "fonte": "indice"}
+
         for root, dirs, files in os.walk(diretorio):
 
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
+            dirs[:] = [d for d in dirs if not ignorar_diretorio(d)]
 
             for name in files:
 
@@ -613,61 +760,67 @@ def pesquisar_arquivos(diretorio: str, termo: str, extensoes: str = None) -> dic
 
 
 
-def pesquisar_conteudo(diretorio: str, texto: str, extensao: str = ".py") -> dict:
+def _arquivos_para_conteudo(diretorio: str, texto: str, extensoes: list, globs: list, regex: bool):
 
-    """Pesquisa texto dentro de arquivos."""
+    """Arquivos a abrir: só os candidatos do índice de trigramas, ou todos via os.walk."""
 
-    try:
+    from file_index import obter_indice
 
-        resultados = []
+    from grep_engine import listar_arquivos
 
-        for root, dirs, files in os.walk(diretorio):
+    # O índice só filtra texto literal em extensões conhecidas (globs de nome ficam no os.walk)
 
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
+    indice = obter_indice() if not regex and not globs else None
 
-            for name in files:
+    candidatos = indice.candidatos_conteudo(diretorio, texto, extensoes) if indice else None
 
-                if not name.endswith(extensao):
+    if candidatos is not None:
 
-                    continue
+        yield from candidatos
 
-                caminho = os.path.join(root, name)
+        return
 
-                try:
+    yield from listar_arquivos(diretorio, extensoes, globs)
 
-                    with open(caminho, "r", encoding="utf-8", errors="ignore") as f:
 
-                        for i, linha in enumerate(f, 1):
 
-                            if texto.lower() in linha.lower():
 
-                                resultados.append({
 
-                                    "arquivo": caminho,
+def pesquisar_conteudo(diretorio: str, texto: str, extensao: str = ".py", regex: bool = False,
 
-                                    "linha": i,
+                       max_resultados: int = 30) -> dict:
 
-                                    "conteudo": linha.strip()[:200]
+    """Pesquisa texto (ou regex) dentro de arquivos. `extensao` aceita várias: ".py,.md,test_*"."""
 
-                                })
+    try:
 
-                                if len(resultados) >= 30:
+        import re
 
-                                    break
+        from grep_engine import Busca, separar_filtros
 
-                except Exception:
+        extensoes, globs = separar_filtros(extensao)
 
-                    pass
+        try:
 
-                if len(resultados) >= 30:
+            busca = Busca(_arquivos_para_conteudo(diretorio, texto, extensoes, globs, regex), texto,
 
-                    break
+                          regex=regex, max_resultados=max_resultados)
 
-            if len(resultados) >= 30:
+        except re.error as e:
 
-                break
+            return {"sucesso": False, "resultados": [], "mensagem": f"Regex inválida: {e}"}
 
-        return {"sucesso": True, "resultados": resultados, "total": len(resultados)}
+        resultados = []
+
+        for r in busca:
+
+            resultados.append(r)
+
+            if len(resultados) % 10 == 0:
+
+                _log_skill(f"🔎 {len(resultados)} ocorrências até agora...")
+
+        return {"sucesso": True, "resultados": resultados, **busca.estatisticas()}
 
     except Exception as e:
 
@@ -769,13 +922,15 @@ def pesquisar_internet(query: str, num_resultados: int = 5) -> dict:
 
 
 
-def baixar_arquivo(url: str, destino: str = None) -> dict:
+def baixar_arquivo(url: str, destino: str = None, conexoes: int = 4, hash_sha256: str = None) -> dict:
 
-    """Baixa um arquivo de uma URL para o disco."""
+    """Baixa um arquivo de uma URL para o disco (paralelo e retomável, usa download_utils.py)."""
 
     try:
 
-        import requests
+        from download_utils import baixar
+
+        from job_manager import evento_cancelamento
 
 
 
@@ -787,31 +942,29 @@ def baixar_arquivo(url: str, destino: str = None) -> dict:
 
 
 
-        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        resultado = baixar(url, destino, conexoes=conexoes, hash_esperado=hash_sha256, on_progresso=_log_skill,
 
+                           cancelar=evento_cancelamento())
 
+        if not resultado["sucesso"]:
 
-        resp = requests.get(url, timeout=60, stream=True)
-
-        resp.raise_for_status()
-
+            return resultado
 
 
-        with open(destino, "wb") as f:
 
-            for chunk in resp.iter_content(chunk_size=8192):
-
-                f.write(chunk)
+        tamanho_kb = round(resultado["tamanho"] / 1024, 1)
 
+        resultado["mensagem"] = f"Baixado: {destino} ({tamanho_kb}KB em {resultado['segundos']}s)"
 
+        return resultado
 
-        tamanho_kb = round(os.path.getsize(destino) / 1024, 1)
+    except ImportError:
 
-        return {"sucesso": True, "mensagem": f"Baixado: {destino} ({tamanho_kb}KB)", "caminho": destino}
+        return {"sucesso": False, "mensagem": "Instale: pip install requests"}
 
     except Exception as e:
 
-        return {"sucesso": False, "mensagem": str(e)}
+        return {"sucesso": False, "mensagem": f"{e} (chame novamente para retomar o download)"}
 
 
 
@@ -1551,12 +1704,18 @@ SKILLS_MAP = {
 
     "executar_comando": executar_comando,
 
+    "consultar_comando": consultar_comando,
+
     "criar_arquivo": criar_arquivo,
 
     "ler_arquivo": ler_arquivo,
 
     "editar_arquivo": editar_arquivo,
 
+    "editar_arquivos": editar_arquivos,
+
+    "backups_arquivo": backups_arquivo,
+
     "deletar_arquivo": deletar_arquivo,
 
     "listar_arquivos": listar_arquivos,
@@ -4209,9 +4368,35 @@ TOOL_DECLARATIONS = [
 
 
 
+_SKILL_SEGUNDOS = telemetry.histograma("adk_skill_segundos", "Duração de cada skill executada")
+
+_SKILL_ERROS = telemetry.contador("adk_skill_erros_total", "Skills que levantaram exceção ou receberam parâmetros inválidos")
+
+
+
+
+
+
+
+
+
 def executar_skill(nome: str, params: dict) -> str:
 
-    """Executa uma skill pelo nome."""
+    """Executa uma skill pelo nome (duração e erros vão para a telemetria)."""
+
+    with telemetry.span("skill", _SKILL_SEGUNDOS, skill=nome):
+
+        return _executar_skill(nome, params)
+
+
+
+
+
+
+
+
+
+def _executar_skill(nome: str, params: dict) -> str:
 
     if nome in SKILLS_MAP:
 
@@ -4247,6 +4432,8 @@ def executar_skill(nome: str, params: dict) -> str:
 
         except TypeError as e:
 
+             _SKILL_ERROS.inc(skill=nome)
+
              import json
 
              return json.dumps({
@@ -4261,6 +4448,8 @@ def executar_skill(nome: str, params: dict) -> str:
 
         except Exception as e:
 
+            _SKILL_ERROS.inc(skill=nome)
+
             import json
 
             return json.dumps({"sucesso": False, "mensagem": f"Erro ao executar '{nome}': {str(e)}"}, ensure_ascii=False)
@@ -4293,7 +4482,11 @@ TOOL_DECLARATIONS = [
 
                 "comando": {"type": "string", "description": "Comando a ser executado"},
 
-                "diretorio": {"type": "string", "description": "Diretório de execução (opcional)"}
+                "diretorio": {"type": "string", "description": "Diretório de execução (opcional)"},
+
+                "timeout": {"type": "integer", "description": "Tempo máximo em segundos (padrão 120; 0 = sem limite, só com em_segundo_plano)"},
+
+                "em_segundo_plano": {"type": "boolean", "description": "Se true, retorna um id na hora e o comando continua rodando (builds, instalações longas)"}
 
             },
 
@@ -4303,6 +4496,30 @@ TOOL_DECLARATIONS = [
 
     },
 
+    {
+
+        "name": "consultar_comando",
+
+        "description": "Consulta a saída e o estado de um comando iniciado em segundo plano (ou cancela). Sem id, lista os comandos.",
+
+        "parameters": {
+
+            "type": "object",
+
+            "properties": {
+
+                "id_comando": {"type": "string", "description": "Id retornado por executar_comando"},
+
+                "ultimas_linhas": {"type": "integer", "description": "Quantas linhas finais da saída retornar (padrão 50)"},
+
+                "cancelar": {"type": "boolean", "description": "Se true, encerra o comando e seus subprocessos"}
+
+            }
+
+        }
+
+    },
+
     {
 
         "name": "criar_arquivo",
@@ -4331,7 +4548,7 @@ TOOL_DECLARATIONS = [
 
         "name": "ler_arquivo",
 
-        "description": "Lê o conteúdo de um arquivo texto.",
+        "description": "Lê um trecho de um arquivo (até 10000 caracteres por vez). Para arquivos grandes, pagine com proximo_offset, leia uma faixa de linhas ou só as últimas linhas (logs). Binários retornam tipo + hexdump.",
 
         "parameters": {
 
@@ -4339,7 +4556,19 @@ TOOL_DECLARATIONS = [
 
             "properties": {
 
-                "caminho": {"type": "string", "description": "Caminho absoluto do arquivo"}
+                "caminho": {"type": "string", "description": "Caminho absoluto do arquivo"},
+
+                "offset": {"type": "integer", "description": "Byte onde começar (use o proximo_offset da leitura anterior)"},
+
+                "limite": {"type": "integer", "description": "Máximo de caracteres retornados (padrão 10000)"},
+
+                "linha_inicio": {"type": "integer", "description": "Primeira linha a ler (1 = primeira)"},
+
+                "linha_fim": {"type": "integer", "description": "Última linha a ler (padrão linha_inicio + 199)"},
+
+                "ultimas_linhas": {"type": "integer", "description": "Lê só as últimas N linhas (bom para logs)"},
+
+                "encoding": {"type": "string", "description": "Força uma codificação (padrão: detectada)"}
 
             },
 
@@ -4353,7 +4582,7 @@ TOOL_DECLARATIONS = [
 
         "name": "editar_arquivo",
 
-        "description": "Substitui um trecho de texto em um arquivo (search & replace).",
+        "description": "Substitui um trecho de texto em um arquivo (search & replace). A troca é atômica e a versão anterior fica em backup.",
 
         "parameters": {
 
@@ -4363,9 +4592,13 @@ TOOL_DECLARATIONS = [
 
                 "caminho": {"type": "string", "description": "Caminho do arquivo"},
 
-                "texto_antigo": {"type": "string", "description": "Texto exato a ser substituído"},
+                "texto_antigo": {"type": "string", "description": "Texto exato a ser substituído (ou regex se regex=true)"},
 
-                "texto_novo": {"type": "string", "description": "Novo texto"}
+                "texto_novo": {"type": "string", "description": "Novo texto (em regex aceita \\1, \\g<nome>)"},
+
+                "regex": {"type": "boolean", "description": "Trata texto_antigo como expressão regular (padrão false)"},
+
+                "apenas_primeira": {"type": "boolean", "description": "Substitui só a primeira ocorrência (padrão: todas)"}
 
             },
 
@@ -4375,6 +4608,80 @@ TOOL_DECLARATIONS = [
 
     },
 
+    {
+
+        "name": "editar_arquivos",
+
+        "description": "Aplica várias edições (search & replace) em um ou mais arquivos numa única chamada. Se alguma falhar, nenhum arquivo é alterado.",
+
+        "parameters": {
+
+            "type": "object",
+
+            "properties": {
+
+                "edicoes": {
+
+                    "type": "array",
+
+                    "description": "Lista de edições, aplicadas na ordem dada",
+
+                    "items": {
+
+                        "type": "object",
+
+                        "properties": {
+
+                            "caminho": {"type": "string", "description": "Caminho do arquivo"},
+
+                            "texto_antigo": {"type": "string", "description": "Texto exato (ou regex)"},
+
+                            "texto_novo": {"type": "string", "description": "Novo texto"},
+
+                            "regex": {"type": "boolean", "description": "texto_antigo é regex"},
+
+                            "apenas_primeira": {"type": "boolean", "description": "Só a primeira ocorrência"}
+
+                        },
+
+                        "required": ["caminho", "texto_antigo", "texto_novo"]
+
+                    }
+
+                }
+
+            },
+
+            "required": ["edicoes"]
+
+        }
+
+    },
+
+    {
+
+        "name": "backups_arquivo",
+
+        "description": "Lista os backups automáticos de um arquivo (feitos ao criar/editar) ou restaura um deles.",
+
+        "parameters": {
+
+            "type": "object",
+
+            "properties": {
+
+                "caminho": {"type": "string", "description": "Caminho do arquivo"},
+
+                "restaurar_versao": {"type": "integer", "description": "Versão a restaurar (1 = mais recente). Omita para só listar."}
+
+            },
+
+            "required": ["caminho"]
+
+        }
+
+    },
+
     {
 
         "name": "deletar_arquivo",
@@ -4425,7 +4732,7 @@ TOOL_DECLARATIONS = [
 
         "name": "mover_arquivo",
 
-        "description": "Move ou renomeia arquivo/pasta.",
+        "description": "Move ou renomeia arquivo/pasta. Entre discos diferentes copia (com progresso) e depois apaga a origem.",
 
         "parameters": {
 
@@ -4435,7 +4742,11 @@ TOOL_DECLARATIONS = [
 
                 "origem": {"type": "string", "description": "Caminho origem"},
 
-                "destino": {"type": "string", "description": "Caminho destino"}
+                "destino": {"type": "string", "description": "Caminho destino"},
+
+                "incluir": {"type": "array", "description": "Globs do que mover (ex: ['*.jpg']). Padrão: tudo", "items": {"type": "string"}},
+
+                "excluir": {"type": "array", "description": "Globs a ignorar (ex: ['node_modules', '*.tmp'])", "items": {"type": "string"}}
 
             },
 
@@ -4449,7 +4760,7 @@ TOOL_DECLARATIONS = [
 
         "name": "copiar_arquivo",
 
-        "description": "Copia arquivo ou pasta.",
+        "description": "Copia arquivo ou pasta (em paralelo, com progresso). Se for interrompida, chamar de novo retoma de onde parou. Para pastas enormes, rode via iniciar_job.",
 
         "parameters": {
 
@@ -4459,7 +4770,11 @@ TOOL_DECLARATIONS = [
 
                 "origem": {"type": "string", "description": "Caminho origem"},
 
-                "destino": {"type": "string", "description": "Caminho destino"}
+                "destino": {"type": "string", "description": "Caminho destino"},
+
+                "incluir": {"type": "array", "description": "Globs do que copiar (ex: ['*.py', 'docs/*']). Padrão: tudo", "items": {"type": "string"}},
+
+                "excluir": {"type": "array", "description": "Globs a ignorar (ex: ['node_modules', '.git', '*.log'])", "items": {"type": "string"}}
 
             },
 
@@ -4527,7 +4842,7 @@ TOOL_DECLARATIONS = [
 
         "name": "info_sistema",
 
-        "description": "Retorna informações sobre CPU, RAM, Disco e Processos.",
+        "description": "Retorna informações sobre CPU, RAM, Disco, rede e Processos, com médias de 1/5/15 minutos. Responde na hora.",
 
         "parameters": {"type": "object", "properties": {}}
 
@@ -4537,13 +4852,19 @@ TOOL_DECLARATIONS = [
 
         "name": "listar_processos",
 
-        "description": "Lista processos rodando no sistema.",
+        "description": "Lista processos rodando no sistema, com CPU (% do total) e memória.",
 
         "parameters": {
 
             "type": "object",
 
-            "properties": {"filtro": {"type": "string", "description": "Filtrar por nome (opcional)"}}
+            "properties": {
+
+                "filtro": {"type": "string", "description": "Filtrar por nome (opcional)"},
+
+                "ordenar_por": {"type": "string", "description": "cpu (padrão), memoria ou rss_mb"}
+
+            }
 
         }
 
@@ -4637,7 +4958,7 @@ TOOL_DECLARATIONS = [
 
         "name": "pesquisar_conteudo",
 
-        "description": "Pesquisa TEXTO dentro de arquivos.",
+        "description": "Pesquisa TEXTO (ou regex) dentro de arquivos, ignorando maiúsculas. Pula binários e arquivos enormes.",
 
         "parameters": {
 
@@ -4647,9 +4968,13 @@ TOOL_DECLARATIONS = [
 
                 "diretorio": {"type": "string", "description": "Onde pesquisar"},
 
-                "texto": {"type": "string", "description": "Texto a procurar"},
+                "texto": {"type": "string", "description": "Texto a procurar (ou expressão regular se regex=true)"},
 
-                "extensao": {"type": "string", "description": "Extensão dos arquivos (padrão .py)"}
+                "extensao": {"type": "string", "description": "Extensões e/ou globs separados por vírgula: '.py', '.py,.md', 'test_*', '*' (padrão .py)"},
+
+                "regex": {"type": "boolean", "description": "Trata 'texto' como expressão regular (padrão false)"},
+
+                "max_resultados": {"type": "integer", "description": "Máximo de ocorrências retornadas (padrão 30)"}
 
             },
 
@@ -4687,7 +5012,7 @@ TOOL_DECLARATIONS = [
 
         "name": "baixar_arquivo",
 
-        "description": "Baixa arquivo de uma URL.",
+        "description": "Baixa arquivo de uma URL. Usa várias conexões quando o servidor permite e retoma downloads interrompidos (basta chamar de novo com o mesmo destino).",
 
         "parameters": {
 
@@ -4697,7 +5022,11 @@ TOOL_DECLARATIONS = [
 
                 "url": {"type": "string", "description": "URL do arquivo"},
 
-                "destino": {"type": "string", "description": "Caminho destino (opcional)"}
+                "destino": {"type": "string", "description": "Caminho destino (opcional)"},
+
+                "conexoes": {"type": "integer", "description": "Conexões paralelas (padrão: 4)"},
+
+                "hash_sha256": {"type": "string", "description": "SHA-256 esperado para verificar o arquivo (opcional)"}
 
             },
 
@@ -5105,6 +5434,50 @@ TOOL_DECLARATIONS = [
             },
             "required": ["descricao_tarefa"]
         }
+    },
+    {
+        "name": "iniciar_job",
+        "description": "Roda uma skill demorada em segundo plano (baixar_arquivo, instalar_pacote_pip, skill_planejador_mestre, skill_programador_autonomo...) e retorna um id na hora. Você recebe uma mensagem quando o job terminar; continue conversando enquanto isso.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "skill": {"type": "string", "description": "Nome da skill a executar"},
+                "params": {"type": "string", "description": "Parâmetros da skill em JSON, ex: {\"url\": \"https://...\"}"}
+            },
+            "required": ["skill"]
+        }
+    },
+    {
+        "name": "status_job",
+        "description": "Mostra o estado de um job em segundo plano (ou lista os jobs recentes, sem id).",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "id_job": {"type": "string", "description": "Id retornado por iniciar_job"}
+            }
+        }
+    },
+    {
+        "name": "resultado_job",
+        "description": "Retorna o resultado completo de um job finalizado.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "id_job": {"type": "string", "description": "Id retornado por iniciar_job"}
+            },
+            "required": ["id_job"]
+        }
+    },
+    {
+        "name": "cancelar_job",
+        "description": "Cancela um job em segundo plano.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "id_job": {"type": "string", "description": "Id retornado por iniciar_job"}
+            },
+            "required": ["id_job"]
+        }
     }
 ]
 
@@ -5112,10 +5485,34 @@ TOOL_DECLARATIONS = [
 #  SKILL: AGENTES AUTÔNOMOS (MÓDULOS)
 # " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " 
 
+# Instâncias compartilhadas: o Chrome fica no BrowserPool e o cliente Gemini é reaproveitado
+_agentes = {}
+_agentes_lock = threading.RLock()
+
+def _obter_agente(tipo: str):
+    """Retorna (criando na primeira vez) a instância compartilhada de um agente."""
+    with _agentes_lock:
+        if tipo not in _agentes:
+            if tipo == "llm":
+                _agentes[tipo] = LLMBridge()
+            elif tipo == "navegador":
+                _agentes[tipo] = AutonomousBrowser(llm=_obter_agente("llm"))
+            elif tipo == "programador":
+                _agentes[tipo] = CoderAgent(llm=_obter_agente("llm"))
+            elif tipo == "planejador":
+                _agentes[tipo] = PlannerAgent(
+                    llm=_obter_agente("llm"),
+                    browser=_obter_agente("navegador"),
+                    coder=_obter_agente("programador"),
+                )
+            else:
+                raise ValueError(f"Agente desconhecido: {tipo}")
+        return _agentes[tipo]
+
 def skill_navegacao_avancada(objetivo: str) -> dict:
     """Aciona o Agente de Navegação (Browser Agent)."""
     try:
-        browser_agent = AutonomousBrowser()
+        browser_agent = _obter_agente("navegador")
         resultado = browser_agent.start_research(objetivo)
         return {"sucesso": True, "resultado": resultado}
     except Exception as e:
@@ -5124,7 +5521,7 @@ def skill_navegacao_avancada(objetivo: str) -> dict:
 def skill_planejador_mestre(objetivo_complexo: str) -> dict:
     """Aciona o Planejador Mestre (Planner Agent)."""
     try:
-        planner = PlannerAgent()
+        planner = _obter_agente("planejador")
         resultado = planner.execute_plan(objetivo_complexo)
         return {"sucesso": True, "resultado": resultado}
     except Exception as e:
@@ -5133,19 +5530,57 @@ def skill_planejador_mestre(objetivo_complexo: str) -> dict:
 def skill_programador_autonomo(descricao_tarefa: str) -> dict:
     """Aciona o Programador Autônomo (Coder Agent)."""
     try:
-        coder = CoderAgent()
+        coder = _obter_agente("programador")
         resultado = coder.run_with_correction(descricao_tarefa)
         return {"sucesso": True, "resultado": resultado}
     except Exception as e:
         return {"sucesso": False, "erro": str(e)}
 
+# " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " 
+#  SKILL: JOBS EM SEGUNDO PLANO (usam job_manager.py)
+# " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " " 
+_SKILLS_DE_JOB = {"iniciar_job", "status_job", "resultado_job", "cancelar_job"}
+
+def iniciar_job(skill: str, params=None) -> dict:
+    """Roda qualquer skill em segundo plano e retorna o id na hora; o resultado chega como mensagem ao terminar."""
+    from job_manager import iniciar
+    if isinstance(params, str):
+        try:
+            params = json.loads(params) if params.strip() else {}
+        except ValueError:
+            return {"sucesso": False, "mensagem": "params precisa ser um JSON válido"}
+    if skill in _SKILLS_DE_JOB:
+        return {"sucesso": False, "mensagem": f"{skill} não pode rodar como job"}
+    if skill not in SKILLS_MAP:
+        return {"sucesso": False, "mensagem": f"Skill '{skill}' não encontrada"}
+    return iniciar(skill, params or {}, executar_skill)
+
+def status_job(id_job: str = None) -> dict:
+    """Estado de um job (ou lista dos jobs recentes)."""
+    from job_manager import status
+    return status(id_job)
+
+def resultado_job(id_job: str) -> dict:
+    """Resultado completo de um job finalizado."""
+    from job_manager import resultado
+    return resultado(id_job)
+
+def cancelar_job(id_job: str) -> dict:
+    """Cancela um job na fila ou pede a parada de um job em execução."""
+    from job_manager import cancelar
+    return cancelar(id_job)
+
 # Atualizar Mapa de Skills
 try:
     if 'SKILLS_MAP' in globals():
         SKILLS_MAP.update({
             "skill_navegacao_avancada": skill_navegacao_avancada,
             "skill_planejador_mestre": skill_planejador_mestre,
-            "skill_programador_autonomo": skill_programador_autonomo
+            "skill_programador_autonomo": skill_programador_autonomo,
+            "iniciar_job": iniciar_job,
+            "status_job": status_job,
+            "resultado_job": resultado_job,
+            "cancelar_job": cancelar_job
         })
     else:
         # Fallback
@@ -0,0 +1,226 @@
+"""
+System Metrics — Amostragem contínua de CPU/RAM/disco/rede para o ADK Agent.
+Um thread em segundo plano lê o psutil a cada poucos segundos e guarda a
+última amostra + um histórico circular de 15 minutos. As skills leem o
+snapshot na hora (sem o cpu_percent(interval=1) que travava a chamada) e a
+CPU por processo vem de deltas entre varreduras (nada de 0% na primeira leitura).
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import psutil
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+INTERVALO_AMOSTRA = float(os.getenv("ADK_METRICAS_INTERVALO", "2"))   # segundos
+INTERVALO_PROCESSOS = 5.0       # varrer todos os processos custa mais: com menos frequência
+JANELA_HISTORICO = 15 * 60      # segundos guardados no buffer circular
+ESPERA_PRIMEIRA_AMOSTRA = 1.5   # quanto um snapshot pode esperar logo na partida
+GB = 1024 ** 3
+MB = 1024 ** 2
+
+
+def _raiz_disco() -> str:
+    if os.name == "nt":
+        return os.environ.get("SystemDrive", "C:") + "\\"
+    return "/"
+
+
+class AmostradorSistema:
+    """Thread que mantém o snapshot atual e o histórico das métricas do sistema."""
+
+    def __init__(self, intervalo: float = INTERVALO_AMOSTRA):
+        self.intervalo = intervalo
+        self.historico = deque(maxlen=max(1, int(JANELA_HISTORICO / intervalo)))
+        self._snapshot: Dict = {}
+        self._processos: List[Dict] = []
+        self._procs: Dict[int, psutil.Process] = {}
+        self._proprio = psutil.Process()
+        self._num_cpus = psutil.cpu_count() or 1
+        self._ultima_varredura = 0.0
+        self._anterior = None          # (tempo, disco_io, rede_io) para calcular taxas
+        self._pronto = threading.Event()
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # ───────────── ciclo ─────────────
+
+    def iniciar(self):
+        if self._thread and self._thread.is_alive():
+            return
+        # Primeira chamada só zera os contadores internos do psutil (sempre retorna 0.0)
+        psutil.cpu_percent(None)
+        self._proprio.cpu_percent(None)
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="SystemMetrics")
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _loop(self):
+        # Uma varredura só para registrar os processos; meio segundo depois já há deltas úteis
+        try:
+            self._varrer_processos(psutil.virtual_memory().total)
+        except Exception as e:
+            print(f"[SystemMetrics] Erro na varredura inicial: {e}")
+        self._parar.wait(0.5)
+        while not self._parar.is_set():
+            try:
+                self._amostrar()
+            except Exception as e:
+                print(f"[SystemMetrics] Erro na amostragem: {e}")
+            self._pronto.set()
+            self._parar.wait(self.intervalo)
+
+    def _amostrar(self):
+        agora = time.time()
+        vm = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        try:
+            disco = psutil.disk_usage(_raiz_disco())
+        except OSError:
+            disco = None
+        disco_io = psutil.disk_io_counters()
+        rede_io = psutil.net_io_counters()
+
+        taxas = {"disco_leitura_mb_s": 0.0, "disco_escrita_mb_s": 0.0, "rede_rx_kb_s": 0.0, "rede_tx_kb_s": 0.0}
+        if self._anterior:
+            t0, d0, r0 = self._anterior
+            dt = max(agora - t0, 1e-6)
+            if disco_io and d0:
+                taxas["disco_leitura_mb_s"] = round((disco_io.read_bytes - d0.read_bytes) / dt / MB, 2)
+                taxas["disco_escrita_mb_s"] = round((disco_io.write_bytes - d0.write_bytes) / dt / MB, 2)
+            if rede_io and r0:
+                taxas["rede_rx_kb_s"] = round((rede_io.bytes_recv - r0.bytes_recv) / dt / 1024, 1)
+                taxas["rede_tx_kb_s"] = round((rede_io.bytes_sent - r0.bytes_sent) / dt / 1024, 1)
+        self._anterior = (agora, disco_io, rede_io)
+
+        try:
+            agente = {
+                "agente_rss_mb": round(self._proprio.memory_info().rss / MB, 1),
+                "agente_cpu": round(self._proprio.cpu_percent(None) / self._num_cpus, 1),
+                "agente_threads": self._proprio.num_threads(),
+            }
+        except psutil.Error:
+            agente = {}
+
+        snapshot = {
+            "timestamp": agora,
+            "cpu_percent": psutil.cpu_percent(None),
+            "ram_total_gb": round(vm.total / GB, 1),
+            "ram_usada_gb": round(vm.used / GB, 1),
+            "ram_disponivel_gb": round(vm.available / GB, 1),
+            "ram_percent": vm.percent,
+            "swap_percent": swap.percent,
+            "disco_total_gb": round(disco.total / GB, 1) if disco else None,
+            "disco_usado_gb": round(disco.used / GB, 1) if disco else None,
+            "disco_percent": disco.percent if disco else None,
+            **taxas,
+            **agente,
+        }
+
+        if agora - self._ultima_varredura >= INTERVALO_PROCESSOS:
+            self._varrer_processos(vm.total)
+            self._ultima_varredura = agora
+        snapshot["processos_ativos"] = len(self._procs)
+
+        with self._lock:
+            self._snapshot = snapshot
+            self.historico.append((agora, snapshot["cpu_percent"], vm.percent,
+                                   taxas["rede_rx_kb_s"], taxas["rede_tx_kb_s"]))
+
+    def _varrer_processos(self, ram_total: int):
+        """
+        Reaproveita o mesmo psutil.Process por pid: cpu_percent(None) compara com a
+        chamada anterior no mesmo objeto, então a CPU é a média desde a última varredura.
+        """
+        vistos, processos = {}, []
+        for pid in psutil.pids():
+            proc = self._procs.get(pid)
+            try:
+                novo = proc is None
+                if novo:
+                    proc = psutil.Process(pid)
+                with proc.oneshot():
+                    if novo:
+                        # Ainda não há delta: usa a média desde que o processo nasceu
+                        proc.cpu_percent(None)
+                        tempos = proc.cpu_times()
+                        vida = max(time.time() - proc.create_time(), 1e-3)
+                        cpu = (tempos.user + tempos.system) / vida * 100
+                    else:
+                        cpu = proc.cpu_percent(None)
+                    nome = proc.name()
+                    rss = proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            vistos[pid] = proc
+            processos.append({"pid": pid, "nome": nome, "cpu": round(min(cpu / self._num_cpus, 100.0), 1),
+                              "memoria": round(rss * 100 / ram_total, 1), "rss_mb": round(rss / MB, 1)})
+        with self._lock:
+            self._procs = vistos
+            self._processos = processos
+
+    # ───────────── leitura ─────────────
+
+    def _aguardar(self):
+        if not self._pronto.is_set():
+            self.iniciar()
+            self._pronto.wait(ESPERA_PRIMEIRA_AMOSTRA)
+
+    def snapshot(self) -> Dict:
+        """Última amostra + médias de 1/5/15 minutos (cópia; pode ser usada livremente)."""
+        self._aguardar()
+        with self._lock:
+            dados = dict(self._snapshot)
+            historico = list(self.historico)
+        if dados:
+            dados["idade_s"] = round(time.time() - dados["timestamp"], 1)
+            for minutos in (1, 5, 15):
+                limite = time.time() - minutos * 60
+                janela = [h for h in historico if h[0] >= limite]
+                if janela:
+                    dados[f"cpu_media_{minutos}m"] = round(sum(h[1] for h in janela) / len(janela), 1)
+                    dados[f"ram_media_{minutos}m"] = round(sum(h[2] for h in janela) / len(janela), 1)
+        return dados
+
+    def processos(self, filtro: str = None, ordenar_por: str = "cpu", limite: int = 50) -> Dict:
+        """Processos da última varredura, com CPU já calculada por delta (0-100% do total)."""
+        self._aguardar()
+        with self._lock:
+            processos = list(self._processos)
+        if filtro:
+            filtro = filtro.lower()
+            processos = [p for p in processos if filtro in p["nome"].lower()]
+        chave = ordenar_por if ordenar_por in ("cpu", "memoria", "rss_mb") else "cpu"
+        processos.sort(key=lambda p: p[chave], reverse=True)
+        return {"processos": processos[:limite], "total": len(processos)}
+
+    def historico_recente(self, segundos: int = 300) -> List[Dict]:
+        limite = time.time() - segundos
+        with self._lock:
+            return [{"t": round(t, 1), "cpu": cpu, "ram": ram, "rx_kb_s": rx, "tx_kb_s": tx}
+                    for t, cpu, ram, rx, tx in self.historico if t >= limite]
+
+
+_amostrador: Optional[AmostradorSistema] = None
+_amostrador_lock = threading.Lock()
+
+
+def obter_amostrador() -> AmostradorSistema:
+    """Amostrador compartilhado, iniciado na primeira chamada."""
+    global _amostrador
+    with _amostrador_lock:
+        if _amostrador is None:
+            _amostrador = AmostradorSistema()
+            _amostrador.iniciar()
+        return _amostrador
@@ -0,0 +1,388 @@
+"""
+Telemetry — Métricas e tracing do pipeline para o ADK Agent.
+Registro em processo de contadores, medidores e histogramas (com rótulos) e
+spans com trace/pai, exportados num endpoint local no formato texto do
+Prometheus e num JSONL rotativo em memoria/telemetria/. Desligado por padrão
+(ADK_TELEMETRIA=1 liga): nesse caso as fábricas devolvem um objeto nulo cujos
+métodos não fazem nada, e span() devolve sempre o mesmo contexto vazio.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+import contextvars
+from bisect import bisect_left
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Configuração
+# ═══════════════════════════════════════════════════════════════════
+
+ATIVO = os.getenv("ADK_TELEMETRIA", "0") == "1"
+PORTA_PROMETHEUS = int(os.getenv("ADK_TELEMETRIA_PORTA", "9464"))   # 0 desliga o endpoint
+PASTA_JSONL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memoria", "telemetria")
+JSONL_MAX_MB = int(os.getenv("ADK_TELEMETRIA_MB", "10"))
+JSONL_ARQUIVOS = 5                 # arquivos antigos mantidos na rotação
+INTERVALO_EXPORTACAO = float(os.getenv("ADK_TELEMETRIA_INTERVALO", "15"))   # segundos entre snapshots
+MAX_SPANS_PENDENTES = 5000         # spans esperando a próxima gravação (os mais antigos saem)
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _chave(rotulos: Dict[str, str]) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+
+def _formatar_rotulos(chave: Tuple, extra: Tuple = ()) -> str:
+    pares = chave + extra
+    if not pares:
+        return ""
+    texto = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                     for k, v in pares)
+    return "{" + texto + "}"
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Métricas
+# ═══════════════════════════════════════════════════════════════════
+
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str):
+        self.nome, self.ajuda = nome, ajuda
+        self._valores: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor: float = 1, **rotulos):
+        chave = _chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def amostras(self):
+        with self._lock:
+            return [(self.nome, chave, v) for chave, v in self._valores.items()]
+
+    def resumo(self) -> Dict:
+        with self._lock:
+            return {_formatar_rotulos(c) or "_": v for c, v in self._valores.items()}
+
+
+class Medidor:
+    """Gauge: valor definido com definir() ou lido de uma função na hora de exportar."""
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str):
+        self.nome, self.ajuda = nome, ajuda
+        self._valores: Dict[Tuple, float] = {}
+        self._funcoes: Dict[Tuple, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def definir(self, valor: float, **rotulos):
+        with self._lock:
+            self._valores[_chave(rotulos)] = valor
+
+    def definir_funcao(self, funcao: Callable[[], float], **rotulos):
+        with self._lock:
+            self._funcoes[_chave(rotulos)] = funcao
+
+    def amostras(self):
+        with self._lock:
+            valores = dict(self._valores)
+            funcoes = list(self._funcoes.items())
+        for chave, funcao in funcoes:
+            try:
+                valores[chave] = float(funcao())
+            except Exception:
+                continue
+        return [(self.nome, chave, v) for chave, v in valores.items()]
+
+    def resumo(self) -> Dict:
+        return {_formatar_rotulos(c) or "_": v for _, c, v in self.amostras()}
+
+
+class Histograma:
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, buckets: Tuple[float, ...] = BUCKETS_LATENCIA):
+        self.nome, self.ajuda = nome, ajuda
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, list] = {}   # chave -> [contagens por bucket..., +Inf, soma]
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **rotulos):
+        chave = _chave(rotulos)
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [0] * (len(self.buckets) + 1) + [0.0]
+            serie[i] += 1
+            serie[-1] += valor
+
+    def amostras(self):
+        with self._lock:
+            series = {c: list(s) for c, s in self._series.items()}
+        linhas = []
+        for chave, serie in series.items():
+            acumulado = 0
+            for limite, n in zip(self.buckets + (float("inf"),), serie[:-1]):
+                acumulado += n
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                linhas.append((self.nome + "_bucket", chave, acumulado, (("le", le),)))
+            linhas.append((self.nome + "_count", chave, acumulado))
+            linhas.append((self.nome + "_sum", chave, serie[-1]))
+        return linhas
+
+    def resumo(self) -> Dict:
+        """Contagem, média e p50/p95/p99 estimados pelos buckets (limite superior do bucket)."""
+        with self._lock:
+            series = {c: list(s) for c, s in self._series.items()}
+        dados = {}
+        for chave, serie in series.items():
+            total = sum(serie[:-1])
+            item = {"n": total, "media": round(serie[-1] / total, 4) if total else 0.0}
+            for q in (50, 95, 99):
+                alvo, acumulado = total * q / 100, 0
+                for limite, n in zip(self.buckets + (float("inf"),), serie[:-1]):
+                    acumulado += n
+                    if acumulado >= alvo:
+                        item[f"p{q}"] = limite
+                        break
+            dados[_formatar_rotulos(chave) or "_"] = item
+        return dados
+
+
+class _MetricaNula:
+    """Devolvida com a telemetria desligada: qualquer chamada é um no-op."""
+
+    def inc(self, valor: float = 1, **rotulos):
+        pass
+
+    def definir(self, valor: float, **rotulos):
+        pass
+
+    def definir_funcao(self, funcao, **rotulos):
+        pass
+
+    def observar(self, valor: float, **rotulos):
+        pass
+
+
+_NULA = _MetricaNula()
+_metricas: Dict[str, object] = {}
+_metricas_lock = threading.Lock()
+
+
+def _registrar(classe, nome: str, ajuda: str, *args):
+    if not ATIVO:
+        return _NULA
+    with _metricas_lock:
+        metrica = _metricas.get(nome)
+        if metrica is None:
+            metrica = _metricas[nome] = classe(nome, ajuda, *args)
+        return metrica
+
+
+def contador(nome: str, ajuda: str = ""):
+    return _registrar(Contador, nome, ajuda)
+
+
+def medidor(nome: str, ajuda: str = ""):
+    return _registrar(Medidor, nome, ajuda)
+
+
+def histograma(nome: str, ajuda: str = "", buckets: Tuple[float, ...] = BUCKETS_LATENCIA):
+    return _registrar(Histograma, nome, ajuda, buckets)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Spans
+# ═══════════════════════════════════════════════════════════════════
+
+_span_atual: contextvars.ContextVar = contextvars.ContextVar("adk_span", default=None)
+_spans = deque(maxlen=MAX_SPANS_PENDENTES)
+
+
+class Span:
+    """
+    `with span("skill", HIST, skill=nome):` mede a duração, guarda o span (trace, pai,
+    atributos, erro) para o JSONL e, se houver histograma, observa a duração nele
+    com os atributos como rótulos. O pai vem de contextvars (vale entre tasks asyncio).
+    """
+
+    __slots__ = ("nome", "histograma", "atributos", "id", "pai", "trace", "inicio", "_t0", "_token")
+
+    def __init__(self, nome: str, histograma: Optional[Histograma], atributos: Dict):
+        self.nome, self.histograma, self.atributos = nome, histograma, atributos
+
+    def __enter__(self):
+        pai = _span_atual.get()
+        self.id = f"{random.getrandbits(64):016x}"
+        self.pai = pai.id if pai else None
+        self.trace = pai.trace if pai else f"{random.getrandbits(128):032x}"
+        self.inicio = time.time()
+        self._t0 = time.perf_counter()
+        self._token = _span_atual.set(self)
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        duracao = time.perf_counter() - self._t0
+        _span_atual.reset(self._token)
+        if self.histograma is not None:
+            self.histograma.observar(duracao, **self.atributos)
+        registro = {"tipo": "span", "nome": self.nome, "trace": self.trace, "id": self.id, "pai": self.pai,
+                    "inicio": round(self.inicio, 6), "duracao_ms": round(duracao * 1000, 3), **self.atributos}
+        if tipo is not None:
+            registro["erro"] = tipo.__name__
+        _spans.append(registro)
+        return False
+
+
+class _SpanNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        return False
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+def span(nome: str, histograma=None, **atributos):
+    if not ATIVO:
+        return _SPAN_NULO
+    return Span(nome, histograma if isinstance(histograma, Histograma) else None, atributos)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  Exportação
+# ═══════════════════════════════════════════════════════════════════
+
+def texto_prometheus() -> str:
+    """Todas as métricas no formato de exposição texto do Prometheus (0.0.4)."""
+    with _metricas_lock:
+        metricas = list(_metricas.values())
+    linhas = []
+    for m in metricas:
+        if m.ajuda:
+            linhas.append(f"# HELP {m.nome} {m.ajuda}")
+        linhas.append(f"# TYPE {m.nome} {m.tipo}")
+        for amostra in m.amostras():
+            nome, chave, valor = amostra[:3]
+            extra = amostra[3] if len(amostra) > 3 else ()
+            linhas.append(f"{nome}{_formatar_rotulos(chave, extra)} {valor}")
+    return "\n".join(linhas) + "\n"
+
+
+def snapshot() -> Dict:
+    """Resumo de todas as métricas (histogramas com n/média/percentis)."""
+    with _metricas_lock:
+        metricas = list(_metricas.values())
+    return {m.nome: m.resumo() for m in metricas}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        corpo = texto_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+_servidor: Optional[ThreadingHTTPServer] = None
+_logger: Optional[logging.Logger] = None
+_parar = threading.Event()
+_thread: Optional[threading.Thread] = None
+_iniciar_lock = threading.Lock()
+
+
+def _abrir_jsonl() -> logging.Logger:
+    os.makedirs(PASTA_JSONL, exist_ok=True)
+    handler = RotatingFileHandler(os.path.join(PASTA_JSONL, "telemetria.jsonl"), encoding="utf-8",
+                                  maxBytes=JSONL_MAX_MB * 1024 * 1024, backupCount=JSONL_ARQUIVOS)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("adk.telemetria")
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def gravar_jsonl():
+    """Grava os spans pendentes e um snapshot das métricas (chamado pelo thread de exportação)."""
+    if _logger is None:
+        return
+    while _spans:
+        try:
+            registro = _spans.popleft()
+        except IndexError:
+            break
+        _logger.info(json.dumps(registro, ensure_ascii=False, default=str))
+    _logger.info(json.dumps({"tipo": "metricas", "timestamp": round(time.time(), 3), "metricas": snapshot()},
+                            ensure_ascii=False, default=str))
+
+
+def _loop_exportacao():
+    while not _parar.wait(INTERVALO_EXPORTACAO):
+        try:
+            gravar_jsonl()
+        except Exception as e:
+            print(f"[Telemetry] Erro gravando JSONL: {e}")
+
+
+def iniciar():
+    """Sobe o endpoint Prometheus (127.0.0.1) e o thread do JSONL. No-op se desligada ou já iniciada."""
+    global _servidor, _logger, _thread
+    if not ATIVO:
+        return
+    with _iniciar_lock:
+        if _thread and _thread.is_alive():
+            return
+        try:
+            _logger = _abrir_jsonl()
+        except OSError as e:
+            print(f"[Telemetry] JSONL indisponível: {e}")
+        if PORTA_PROMETHEUS and _servidor is None:
+            try:
+                _servidor = ThreadingHTTPServer(("127.0.0.1", PORTA_PROMETHEUS), _Handler)
+                _servidor.daemon_threads = True
+                threading.Thread(target=_servidor.serve_forever, daemon=True, name="TelemetryHTTP").start()
+                print(f"[Telemetry] Métricas em http://127.0.0.1:{PORTA_PROMETHEUS}/metrics")
+            except OSError as e:
+                _servidor = None
+                print(f"[Telemetry] Endpoint Prometheus indisponível na porta {PORTA_PROMETHEUS}: {e}")
+        _parar.clear()
+        _thread = threading.Thread(target=_loop_exportacao, daemon=True, name="TelemetryExport")
+        _thread.start()
+
+
+def parar():
+    global _servidor
+    _parar.set()
+    with _iniciar_lock:
+        if _servidor is not None:
+            _servidor.shutdown()
+            _servidor.server_close()
+            _servidor = None
+    try:
+        gravar_jsonl()
+    except Exception as e:
+        print(f"[Telemetry] Erro gravando JSONL: {e}")
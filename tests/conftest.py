@@ -0,0 +1,8 @@
+"""Os testes importam os módulos da raiz (skills, file_editor...) como o gui.py faz."""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+from modules.browser import AutonomousBrowser, Browser
+
+
+class _DriverFalso:
+    def __init__(self):
+        self.window_handles = ["principal", "aba"]
+        self.chamadas = []
+        self.switch_to = SimpleNamespace(window=lambda h: self.chamadas.append(("janela", h)))
+
+    def close(self):
+        self.chamadas.append(("fechar",))
+
+    def get(self, url):
+        self.chamadas.append(("get", url))
+
+    def execute_cdp_cmd(self, comando, params):
+        self.chamadas.append(("cdp", comando, params))
+
+    def delete_all_cookies(self):
+        self.chamadas.append(("cookies_da_origem",))
+
+
+def _browser(driver):
+    browser = Browser.__new__(Browser)
+    browser.driver = driver
+    browser.waiter = SimpleNamespace(reset=lambda: None)
+    return browser
+
+
+def test_reset_limpa_cookies_e_storage_de_todas_as_origens():
+    driver = _DriverFalso()
+    _browser(driver).reset()
+    cdp = {c[1]: c[2] for c in driver.chamadas if c[0] == "cdp"}
+    assert "Network.clearBrowserCookies" in cdp
+    assert cdp["Storage.clearDataForOrigin"] == {"origin": "*", "storageTypes": "all"}
+    assert ("fechar",) in driver.chamadas
+    assert ("get", "about:blank") in driver.chamadas
+
+
+class _LLMFinaliza:
+    def __init__(self):
+        self.prompts = []
+
+    def chat_json(self, prompt, schema, use_cache=True):
+        self.prompts.append(prompt)
+        return {"acao": "finalizar", "detalhe": "resposta"}
+
+
+def test_contexto_vai_para_o_prompt_e_nao_para_a_busca():
+    visitadas = []
+    navegador = SimpleNamespace(
+        go_to=visitadas.append,
+        get_markdown=lambda: "conteúdo",
+        driver=SimpleNamespace(current_url="https://www.google.com/search"),
+    )
+    llm = _LLMFinaliza()
+    agente = AutonomousBrowser(llm=llm, pool=object())
+    contexto = "Passo 1 (browser): veja http://exemplo.com/dados"
+    assert agente._research(navegador, "preço do café", contexto) == "resposta"
+    assert visitadas == ["https://www.google.com/search?q=preço+do+café"]
+    assert contexto in llm.prompts[0]
+
+
+def test_modo_texto_desliga_imagens_e_bloqueia_recursos(monkeypatch):
+    from fnmatch import fnmatch
+    from modules import browser as modulo
+
+    criadas = []
+    monkeypatch.setattr(modulo.uc, "Chrome", lambda options: criadas.append(options) or _DriverFalso())
+    navegador = Browser.__new__(Browser)
+    driver = navegador._create_driver(headless=True, text_mode=True)
+    opcoes = criadas[0]
+    assert "--blink-settings=imagesEnabled=false" in opcoes.arguments
+    assert "--window-size=1280,800" in opcoes.arguments
+    assert opcoes.experimental_options["prefs"]["profile.managed_default_content_settings.images"] == 2
+
+    navegador.driver = driver
+    navegador._block_resources()
+    bloqueadas = {c[1]: c[2] for c in driver.chamadas if c[0] == "cdp"}["Network.setBlockedURLs"]["urls"]
+    assert any(fnmatch("https://cdn.exemplo.com/foto.jpg?v=2", p) for p in bloqueadas)
+    assert any(fnmatch("https://www.googletagmanager.com/gtm.js", p) for p in bloqueadas)
+    assert not any(fnmatch("https://exemplo.com/artigo.html", p) for p in bloqueadas)
+
+    navegador._create_driver(headless=False)
+    assert "--blink-settings=imagesEnabled=false" not in criadas[1].arguments
@@ -0,0 +1,61 @@
+from modules.coder import CoderAgent
+from modules.patching import FixCache
+
+
+class _LLM:
+    def __init__(self, respostas):
+        self.respostas = list(respostas)
+        self.esquecidos = []
+
+    def chat_json(self, prompt, schema, use_cache=True):
+        return self.respostas.pop(0) if self.respostas else None
+
+    def forget_json(self, prompt, schema):
+        self.esquecidos.append(prompt)
+
+
+class _Executor:
+    def __init__(self, saidas):
+        self.saidas = list(saidas)
+        self.codigos = []
+
+    def run(self, code, filename=None, **kwargs):
+        self.codigos.append(code)
+        codigo, stderr = self.saidas.pop(0)
+        return {"codigo_saida": codigo, "stdout": "ok\n" if codigo == 0 else "", "stderr": stderr}
+
+
+def _coder(tmp_path, llm, executor=None):
+    coder = CoderAgent.__new__(CoderAgent)
+    coder.llm = llm
+    coder.executor = executor or _Executor([])
+    coder.fixes = FixCache(path=str(tmp_path / "fixes.json"))
+    coder.work_dir = str(tmp_path)
+    return coder
+
+
+def test_sem_codigo_do_llm_e_falha_e_nao_roda_nada(tmp_path):
+    executor = _Executor([])
+    coder = _coder(tmp_path, _LLM([None]), executor)
+    assert coder.write_code("somar") is None
+    coder.llm = _LLM([{"codigo": ""}])
+    resultado = coder.run_with_correction("somar")
+    assert resultado.startswith("Falha")
+    assert executor.codigos == []
+
+
+def test_script_que_falha_sai_do_cache_de_respostas(tmp_path):
+    llm = _LLM([{"codigo": "print(1/0)"}, {"edicoes": [{"buscar": "print(1/0)", "substituir": "print(1)"}]}])
+    executor = _Executor([(1, "ZeroDivisionError"), (0, "")])
+    coder = _coder(tmp_path, llm, executor)
+    assert coder.run_with_correction("dividir").startswith("Sucesso!")
+    assert executor.codigos == ["print(1/0)", "print(1)"]
+    assert len(llm.esquecidos) == 1 and "dividir" in llm.esquecidos[0]
+
+
+def test_sem_correcao_aplicavel_para_sem_rodar_o_mesmo_codigo(tmp_path):
+    llm = _LLM([{"codigo": "print(1/0)"}, {"edicoes": [{"buscar": "nao existe", "substituir": "x"}]}, None])
+    executor = _Executor([(1, "ZeroDivisionError"), (1, "ZeroDivisionError")])
+    resultado = _coder(tmp_path, llm, executor).run_with_correction("dividir")
+    assert resultado.startswith("Falha") and "ZeroDivisionError" in resultado
+    assert executor.codigos == ["print(1/0)"]
@@ -0,0 +1,25 @@
+import sys
+
+import command_runner
+import skills
+
+
+def test_executar_limita_a_saida_e_consultar_le_o_buffer_inteiro(monkeypatch):
+    monkeypatch.setattr(command_runner, "MAX_CHARS_SAIDA", 100)
+    comando = f'"{sys.executable}" -c "for i in range(50): print(i * 10)"'
+    resultado = command_runner.executar(comando, timeout=30)
+    assert resultado["sucesso"]
+    assert resultado["saida"].startswith("[... ")
+    assert resultado["saida"].endswith("490")
+    assert len(resultado["saida"]) < 160
+
+    inicio = command_runner.executar_em_segundo_plano(comando, timeout=30)
+    id_comando = inicio["id"]
+    command_runner._comandos[id_comando].aguardar(30)
+    completo = command_runner.consultar(id_comando, ultimas_linhas=None)
+    assert completo["saida"].split("\n") == [str(i * 10) for i in range(50)]
+
+
+def test_timeout_zero_so_em_segundo_plano():
+    resultado = skills.executar_comando("echo oi", timeout=0)
+    assert not resultado["sucesso"] and "em_segundo_plano" in resultado["erro"]
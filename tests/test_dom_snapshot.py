@@ -0,0 +1,42 @@
+from modules.dom_snapshot import DomSnapshot
+
+
+def _el(tag, text="", visible=True, **attrs):
+    base = {"handle": str(id(attrs)), "tag": tag, "text": text, "href": "", "placeholder": "",
+            "name": "", "id": "", "type": "", "aria_label": "", "role": "", "visible": visible,
+            "box": [0, 0, 10, 10]}
+    base.update(attrs)
+    return base
+
+
+SNAPSHOT = DomSnapshot([
+    _el("button", "Entrar na conta"),
+    _el("a", "Entrar", href="https://exemplo.com/login"),
+    _el("a", "oi", href="https://exemplo.com/curto"),
+    _el("a", "Oculto demais", visible=False, href="https://exemplo.com/oculto"),
+    _el("div", "Entrar agora", role="button"),
+    _el("input", visible=False, name="q"),
+    _el("input", placeholder="Pesquisar", name="q"),
+    _el("textarea", id="comentario"),
+], url="https://exemplo.com")
+
+
+def test_links_visiveis_com_texto_minimo_e_limite():
+    assert SNAPSHOT.links() == ["[Entrar](https://exemplo.com/login)"]
+    assert len(SNAPSHOT.links(min_text=1)) == 2
+    assert SNAPSHOT.links(min_text=1, limit=1) == ["[Entrar](https://exemplo.com/login)"]
+
+
+def test_clicavel_prefere_link_depois_botao_depois_role():
+    assert SNAPSHOT.find_clickable("entrar")["tag"] == "a"
+    assert SNAPSHOT.find_clickable("na conta")["tag"] == "button"
+    assert SNAPSHOT.find_clickable("agora")["tag"] == "div"
+    assert SNAPSHOT.find_clickable("inexistente") is None
+
+
+def test_input_visivel_primeiro_por_placeholder_name_ou_id():
+    assert SNAPSHOT.find_input("q")["placeholder"] == "Pesquisar"
+    assert SNAPSHOT.find_input("pesquis")["visible"]
+    assert SNAPSHOT.find_input("coment")["tag"] == "textarea"
+    assert SNAPSHOT.find_input("senha") is None
+    assert len(SNAPSHOT) == 8 and SNAPSHOT.to_dict()["url"] == "https://exemplo.com"
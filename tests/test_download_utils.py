@@ -0,0 +1,82 @@
+import os
+import re
+import threading
+import http.server
+
+import pytest
+
+import download_utils
+
+
+CONTEUDO = bytes(range(256)) * 64     # 16 KB
+
+
+class _ServidorRange(http.server.BaseHTTPRequestHandler):
+    """Serve CONTEUDO com Range; `curto` faz um segmento terminar antes (sem erro de protocolo)."""
+    curto = set()
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTEUDO)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+    def do_GET(self):
+        faixa = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if not faixa:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(CONTEUDO)))
+            self.end_headers()
+            self.wfile.write(CONTEUDO)
+            return
+        inicio = int(faixa.group(1))
+        fim = int(faixa.group(2)) if faixa.group(2) else len(CONTEUDO) - 1
+        corpo = CONTEUDO[inicio:fim + 1]
+        if inicio in self.curto:
+            self.curto.discard(inicio)
+            corpo = corpo[:len(corpo) // 2]
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {inicio}-{inicio + len(corpo) - 1}/{len(CONTEUDO)}")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+@pytest.fixture
+def servidor():
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ServidorRange)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}/arquivo.bin"
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture(autouse=True)
+def paralelo_pequeno(monkeypatch):
+    monkeypatch.setattr(download_utils, "TAMANHO_MINIMO_PARALELO", 1024)
+
+
+def test_download_paralelo_completo(servidor, tmp_path):
+    destino = str(tmp_path / "arquivo.bin")
+    resultado = download_utils.baixar(servidor, destino, conexoes=4)
+    assert resultado["sucesso"] and resultado["paralelo"]
+    assert open(destino, "rb").read() == CONTEUDO
+    assert not os.path.exists(destino + ".part.json")
+
+
+def test_segmento_curto_nao_vira_sucesso_e_retoma(servidor, tmp_path):
+    destino = str(tmp_path / "arquivo.bin")
+    _ServidorRange.curto = {len(CONTEUDO) // 4}       # segundo de quatro segmentos
+    resultado = download_utils.baixar(servidor, destino, conexoes=4)
+    assert not resultado["sucesso"]
+    assert "retomar" in resultado["mensagem"]
+    assert not os.path.exists(destino)
+
+    resultado = download_utils.baixar(servidor, destino, conexoes=4)
+    assert resultado["sucesso"]
+    assert open(destino, "rb").read() == CONTEUDO
@@ -0,0 +1,16 @@
+import os
+
+from modules.executor import PythonExecutor
+
+
+def test_script_roda_no_diretorio_do_processo(tmp_path):
+    executor = PythonExecutor(size=0, preimport=[])
+    try:
+        script = str(tmp_path / "script.py")
+        resultado = executor.run("import os; print(os.getcwd())", filename=script, timeout=30)
+        assert resultado["codigo_saida"] == 0, resultado["stderr"]
+        assert resultado["stdout"].strip() == os.getcwd()
+        outro = executor.run("import os; print(os.getcwd())", filename=script, timeout=30, cwd=str(tmp_path))
+        assert outro["stdout"].strip() == str(tmp_path)
+    finally:
+        executor.shutdown()
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+import file_editor
+from file_editor import editar, editar_lote, escrever, listar_backups
+
+
+@pytest.fixture(autouse=True)
+def _backups_temporarios(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_editor, "PASTA_BACKUPS", str(tmp_path / "backups"))
+
+
+def _arquivo(tmp_path, conteudo: bytes, nome="a.txt"):
+    caminho = tmp_path / nome
+    caminho.write_bytes(conteudo)
+    return str(caminho)
+
+
+def test_quebras_de_linha_misturadas_ficam_como_estao(tmp_path):
+    caminho = _arquivo(tmp_path, b"um\r\ndois\ntres\r\n")
+    assert editar(caminho, "dois", "DOIS")["sucesso"]
+    with open(caminho, "rb") as f:
+        assert f.read() == b"um\r\nDOIS\ntres\r\n"
+
+
+def test_trecho_de_varias_linhas_casa_com_crlf_e_usa_crlf_nas_novas(tmp_path):
+    caminho = _arquivo(tmp_path, b"x\r\ny\r\nz\n")
+    assert editar(caminho, "x\ny", "1\n2\n3")["sucesso"]
+    with open(caminho, "rb") as f:
+        assert f.read() == b"1\r\n2\r\n3\r\nz\n"
+
+
+def test_regex_com_fim_de_linha_em_arquivo_crlf(tmp_path):
+    caminho = _arquivo(tmp_path, b"fim\r\nfim\n")
+    assert editar(caminho, r"m$", "M", regex=True)["sucesso"]
+    with open(caminho, "rb") as f:
+        assert f.read() == b"fiM\r\nfiM\n"
+
+
+def test_blocos_pequenos_nao_quebram_crlf_nem_ocorrencias(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_editor, "TAMANHO_BLOCO", 3)
+    caminho = _arquivo(tmp_path, b"ab\r\ncd\nab\r\ncd\r\n")
+    resultado = editar_lote([{"caminho": caminho, "texto_antigo": "ab\ncd", "texto_novo": "X"}])
+    assert resultado["arquivos"][0]["substituicoes"] == 2
+    with open(caminho, "rb") as f:
+        assert f.read() == b"X\nX\r\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="sem symlinks")
+def test_symlink_continua_link_e_o_alvo_e_editado(tmp_path):
+    alvo = _arquivo(tmp_path, b"valor antigo\n", "alvo.txt")
+    link = str(tmp_path / "link.txt")
+    try:
+        os.symlink(alvo, link)
+    except OSError:
+        pytest.skip("sem permissão para criar symlink")
+    assert editar(link, "antigo", "novo")["sucesso"]
+    escrever(link, "reescrito\n")
+    assert os.path.islink(link)
+    with open(alvo, encoding="utf-8") as f:
+        assert f.read() == "reescrito\n"
+    assert len(listar_backups(link)["backups"]) == 2
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
@@ -0,0 +1,88 @@
+import os
+import time
+
+import file_index
+from file_index import IndiceArquivos
+
+
+def _esperar(condicao, timeout=10):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if condicao():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _arvore(raiz, n):
+    os.makedirs(raiz)
+    for i in range(n):
+        with open(os.path.join(raiz, f"arq{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"conteúdo {i}")
+
+
+def test_notificar_indexa_arquivo_criado_e_remove_o_apagado(tmp_path):
+    raiz = str(tmp_path / "raiz")
+    _arvore(raiz, 2)
+    indice = IndiceArquivos(str(tmp_path / "indice.db"))
+    indice.adicionar_raiz(raiz, explicita=True)
+    assert _esperar(lambda: indice.raiz_pronta(raiz))
+
+    novo = os.path.join(raiz, "sub", "novo_relatorio.md")
+    os.makedirs(os.path.dirname(novo))
+    with open(novo, "w", encoding="utf-8") as f:
+        f.write("texto novo")
+    indice.notificar(os.path.dirname(novo))
+    assert _esperar(lambda: indice.buscar_nomes(raiz, "novo_relatorio"))
+
+    os.remove(novo)
+    os.rmdir(os.path.dirname(novo))
+    indice.notificar(os.path.dirname(novo))
+    assert _esperar(lambda: indice.buscar_nomes(raiz, "novo_relatorio") == [])
+
+
+def test_raiz_automatica_grande_demais_nao_e_indexada(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_index, "MAX_ARQUIVOS_RAIZ", 3)
+    raiz = str(tmp_path / "grande")
+    _arvore(raiz, 5)
+    indice = IndiceArquivos(str(tmp_path / "indice.db"))
+    assert indice.buscar_nomes(raiz, "arq") is None
+    assert _esperar(lambda: file_index._chave(raiz) in indice._grandes)
+    assert indice.buscar_nomes(raiz, "arq") is None
+    assert indice.estatisticas()["arquivos"] == 0
+
+
+def test_raiz_velha_cai_no_walk_ate_revarrer(tmp_path, monkeypatch):
+    raiz = str(tmp_path / "raiz")
+    _arvore(os.path.join(raiz, "sub"), 2)
+    indice = IndiceArquivos(str(tmp_path / "indice.db"))
+    indice.adicionar_raiz(raiz, explicita=True)
+    assert _esperar(lambda: indice.raiz_pronta(raiz))
+
+    with open(os.path.join(raiz, "fora_do_agente.txt"), "w", encoding="utf-8") as f:
+        f.write("criado por outro programa")
+    monkeypatch.setattr(file_index, "INTERVALO_REVARREDURA", -1)
+    indice.pausar()
+    assert indice.buscar_nomes(raiz, "fora_do_agente") is None
+    # Pesquisar num subdiretório não registra outra raiz enquanto a de cima é revarrida
+    assert indice.buscar_nomes(os.path.join(raiz, "sub"), "arq") is None
+    assert len(indice.estatisticas()["raizes"]) == 1
+
+    monkeypatch.setattr(file_index, "INTERVALO_REVARREDURA", 30)
+    indice.retomar()
+    assert _esperar(lambda: indice.buscar_nomes(raiz, "fora_do_agente"))
+
+
+def test_indice_ignora_os_mesmos_diretorios_que_o_walk(tmp_path):
+    from grep_engine import listar_arquivos
+
+    raiz = str(tmp_path / "raiz")
+    _arvore(raiz, 1)
+    for oculto in (".git", "node_modules", "$Recycle.Bin"):
+        _arvore(os.path.join(raiz, oculto), 1)
+    indice = IndiceArquivos(str(tmp_path / "indice.db"))
+    indice.adicionar_raiz(raiz, explicita=True)
+    assert _esperar(lambda: indice.raiz_pronta(raiz))
+
+    pelo_indice = sorted(r["caminho"] for r in indice.buscar_nomes(raiz, "arq"))
+    assert pelo_indice == sorted(listar_arquivos(raiz, [], ["*"])) == [os.path.join(raiz, "arq0.txt")]
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import file_reader
+from file_reader import IndiceLinhas, ler
+
+
+@pytest.fixture
+def indice_pequeno(monkeypatch):
+    # Checkpoints e blocos minúsculos: exercita o índice sem arquivos enormes
+    monkeypatch.setattr(file_reader, "PASSO_INDICE", 3)
+    monkeypatch.setattr(file_reader, "TAMANHO_BLOCO", 7)
+    file_reader.limpar_indices()
+    yield
+    file_reader.limpar_indices()
+
+
+def _arquivo(tmp_path, linhas, final="\n"):
+    caminho = tmp_path / "log.txt"
+    caminho.write_bytes(("\n".join(linhas) + final).encode("utf-8"))
+    return str(caminho)
+
+
+def _indice(caminho):
+    st = os.stat(caminho)
+    return IndiceLinhas(caminho, (st.st_size, st.st_mtime))
+
+
+def test_posicao_de_cada_linha_em_qualquer_ordem(tmp_path, indice_pequeno):
+    linhas = [f"linha {i} " + "x" * (i % 5) for i in range(1, 21)]
+    caminho = _arquivo(tmp_path, linhas)
+    indice = _indice(caminho)
+    with open(caminho, "rb") as f:
+        dados = f.read()
+        esperado, pos = [], 0
+        for linha in linhas:
+            esperado.append(pos)
+            pos += len(linha) + 1
+        for n in [15, 1, 20, 4, 10, 2, 19]:
+            assert indice.posicao(f, n) == esperado[n - 1]
+            f.seek(indice.posicao(f, n))
+            assert f.readline().decode() == linhas[n - 1] + "\n"
+        assert indice.posicao(f, 21) == len(dados)
+        assert indice.posicao(f, 22) is None
+    assert indice.total_linhas == 20
+
+
+def test_total_conta_ultima_linha_sem_quebra(tmp_path, indice_pequeno):
+    caminho = _arquivo(tmp_path, ["a", "b", "c", "d"], final="")
+    indice = _indice(caminho)
+    assert indice.total_linhas is None
+    with open(caminho, "rb") as f:
+        assert indice.posicao(f, 4) == 6
+        assert indice.posicao(f, 9) is None
+    assert indice.total_linhas == 4
+
+
+def test_ler_faixa_de_linhas_usa_o_indice_e_percebe_arquivo_alterado(tmp_path, indice_pequeno):
+    caminho = _arquivo(tmp_path, [f"l{i}" for i in range(1, 11)])
+    resultado = ler(caminho, linha_inicio=5, linha_fim=6)
+    assert resultado["conteudo"] == "l5\nl6\n"
+    assert resultado["truncado"]
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("novo1\nnovo2\nnovo3\nnovo4\nnovo5\n")
+    os.utime(caminho, (1, 1))
+    assert ler(caminho, linha_inicio=5)["conteudo"] == "novo5\n"
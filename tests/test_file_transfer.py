@@ -0,0 +1,146 @@
+import os
+import threading
+
+import pytest
+
+import file_transfer
+from file_transfer import copiar, mover
+
+
+@pytest.fixture(autouse=True)
+def _manifestos_temporarios(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_transfer, "PASTA_MANIFESTOS", str(tmp_path / "manifestos"))
+
+
+def _escrever(caminho, texto):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(texto)
+
+
+def test_mover_so_apaga_o_que_copiou_sem_mudancas(tmp_path, monkeypatch):
+    origem, destino = str(tmp_path / "origem"), str(tmp_path / "destino")
+    _escrever(os.path.join(origem, "a.txt"), "a")
+    _escrever(os.path.join(origem, "sub", "b.txt"), "b")
+    copiar_arquivo = file_transfer._copiar_arquivo
+
+    def copiar_e_mexer_na_origem(src, dst, rel, *args):
+        copiar_arquivo(src, dst, rel, *args)
+        if rel == "sub/b.txt":
+            # Durante a movimentação: um arquivo novo aparece e um já copiado muda
+            _escrever(os.path.join(origem, "novo.txt"), "novo")
+            _escrever(src, "b alterado")
+
+    monkeypatch.setattr(file_transfer, "WORKERS", 1)
+    monkeypatch.setattr(file_transfer, "_copiar_arquivo", copiar_e_mexer_na_origem)
+    resultado = mover(origem, destino, incluir=["*.txt"])
+    assert resultado["sucesso"]
+    assert not os.path.exists(os.path.join(origem, "a.txt"))
+    assert os.path.exists(os.path.join(origem, "novo.txt"))
+    with open(os.path.join(origem, "sub", "b.txt"), encoding="utf-8") as f:
+        assert f.read() == "b alterado"
+    assert resultado["alterados_na_origem"] == [os.path.join(origem, "sub", "b.txt")]
+    assert sorted(os.listdir(destino)) == ["a.txt", "sub"]
+
+
+def test_copia_com_erro_retoma_so_o_que_faltou(tmp_path, monkeypatch):
+    origem, destino = str(tmp_path / "origem"), str(tmp_path / "destino")
+    for nome in ("a.txt", "b.txt", "sub/c.txt"):
+        _escrever(os.path.join(origem, nome), nome)
+    copiar_arquivo = file_transfer._copiar_arquivo
+    falhar = {"sub/c.txt"}
+    copiados = []
+
+    def falhar_uma_vez(src, dst, rel, *args):
+        if rel in falhar:
+            falhar.discard(rel)
+            raise OSError("disco cheio")
+        copiados.append(rel)
+        copiar_arquivo(src, dst, rel, *args)
+
+    monkeypatch.setattr(file_transfer, "_copiar_arquivo", falhar_uma_vez)
+    primeira = copiar(origem, destino)
+    assert not primeira["sucesso"] and primeira["erros"] == ["sub/c.txt: disco cheio"]
+    assert os.listdir(file_transfer.PASTA_MANIFESTOS)
+
+    copiados.clear()
+    segunda = copiar(origem, destino)
+    assert segunda["sucesso"] and segunda["pulados"] == 2
+    assert copiados == ["sub/c.txt"]
+    assert not os.listdir(file_transfer.PASTA_MANIFESTOS)
+
+
+def test_arquivo_grande_cancelado_continua_do_byte_onde_parou(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_transfer, "ARQUIVO_GRANDE", 1024)
+    monkeypatch.setattr(file_transfer, "TAMANHO_BLOCO", 256)
+    monkeypatch.setattr(file_transfer, "INTERVALO_PROGRESSO", 0)
+    origem, destino = str(tmp_path / "grande.bin"), str(tmp_path / "copia.bin")
+    dados = os.urandom(4096)
+    with open(origem, "wb") as f:
+        f.write(dados)
+
+    cancelar = threading.Event()
+
+    def progresso(_msg):
+        if os.path.exists(destino + ".part") and os.path.getsize(destino + ".part") >= 1024:
+            cancelar.set()
+
+    primeira = copiar(origem, destino, on_progresso=progresso, cancelar=cancelar)
+    assert not primeira["sucesso"] and not os.path.exists(destino)
+
+    posicoes = []
+    copiar_blocos = file_transfer._copiar_blocos
+    monkeypatch.setattr(file_transfer, "_copiar_blocos",
+                        lambda fsrc, fdst, pos, *a: posicoes.append(pos) or copiar_blocos(fsrc, fdst, pos, *a))
+    segunda = copiar(origem, destino)
+    assert segunda["sucesso"]
+    assert 1024 <= posicoes[0] < 4096
+    with open(destino, "rb") as f:
+        assert f.read() == dados
+
+
+def _arvore_com_pastas(origem, tmp_path):
+    _escrever(os.path.join(origem, "sub", "a.txt"), "a")
+    _escrever(os.path.join(origem, "sub", "x.log"), "log")
+    os.makedirs(os.path.join(origem, "vazia"))
+    externa = str(tmp_path / "externa")
+    _escrever(os.path.join(externa, "grande.bin"), "fora da árvore")
+    os.symlink(externa, os.path.join(origem, "atalho"), target_is_directory=True)
+    return externa
+
+
+def test_copiar_cria_pastas_vazias_e_copia_link_de_pasta(tmp_path):
+    origem, destino = str(tmp_path / "origem"), str(tmp_path / "destino")
+    externa = _arvore_com_pastas(origem, tmp_path)
+
+    resultado = copiar(origem, destino, excluir=["*.log"])
+    assert resultado["sucesso"], resultado
+    assert sorted(os.listdir(destino)) == ["atalho", "sub", "vazia"]
+    assert os.listdir(os.path.join(destino, "vazia")) == []
+    assert os.readlink(os.path.join(destino, "atalho")) == externa
+    # Repetir a cópia não estranha o link que já está lá
+    assert copiar(origem, destino, excluir=["*.log"])["sucesso"]
+
+
+def test_mover_leva_pastas_vazias_e_links_e_mantem_o_que_nao_foi(tmp_path):
+    origem, destino = str(tmp_path / "origem"), str(tmp_path / "destino")
+    externa = _arvore_com_pastas(origem, tmp_path)
+
+    resultado = mover(origem, destino, excluir=["*.log"])
+    assert resultado["sucesso"], resultado
+    assert sorted(os.listdir(destino)) == ["atalho", "sub", "vazia"]
+    assert os.readlink(os.path.join(destino, "atalho")) == externa
+    assert os.listdir(externa) == ["grande.bin"]
+    # Na origem só sobra o que o filtro deixou para trás
+    assert sorted(os.listdir(origem)) == ["sub"]
+    assert os.listdir(os.path.join(origem, "sub")) == ["x.log"]
+
+
+def test_mover_com_incluir_nao_apaga_pasta_que_nao_foi_levada(tmp_path):
+    origem, destino = str(tmp_path / "origem"), str(tmp_path / "destino")
+    _escrever(os.path.join(origem, "docs", "a.md"), "a")
+    os.makedirs(os.path.join(origem, "vazia"))
+
+    assert mover(origem, destino, incluir=["*.md"])["sucesso"]
+    assert sorted(os.listdir(destino)) == ["docs"]
+    assert sorted(os.listdir(origem)) == ["vazia"]
@@ -0,0 +1,49 @@
+import grep_engine
+from grep_engine import Busca, aceita_arquivo, buscar, encerrar_pool, separar_filtros
+
+
+def test_pool_nao_e_encerrado_no_meio_de_uma_busca(tmp_path, monkeypatch):
+    monkeypatch.setenv("ADK_GREP_WORKERS", "2")
+    arquivos = []
+    for i in range(300):
+        caminho = tmp_path / f"arq{i}.txt"
+        caminho.write_text(f"linha {i}\nachado aqui\n", encoding="utf-8")
+        arquivos.append(str(caminho))
+    busca = Busca(arquivos, "achado", max_resultados=1000)
+    resultados = []
+    try:
+        for r in busca:
+            if not resultados:
+                # O watchdog soltando caches enquanto a busca roda
+                assert not encerrar_pool()
+            resultados.append(r)
+        assert len(resultados) == 300
+        assert not busca.truncado
+        assert grep_engine._pool_em_uso == 0
+    finally:
+        assert encerrar_pool()
+
+
+def test_separar_filtros():
+    assert separar_filtros(".py, MD;*.txt  test_*") == ([".py", ".md", ".txt"], ["test_*"])
+    assert separar_filtros("*.t?t") == ([], ["*.t?t"])
+    assert separar_filtros("") == ([], [])
+    assert separar_filtros("*, *.*") == ([], [])
+
+
+def test_aceita_arquivo_por_extensao_ou_glob():
+    extensoes, globs = separar_filtros(".py, test_*")
+    assert aceita_arquivo("Modulo.PY", extensoes, globs)
+    assert aceita_arquivo("test_dados.json", extensoes, globs)
+    assert not aceita_arquivo("dados.json", extensoes, globs)
+    assert aceita_arquivo("qualquer.bin", [], [])
+
+
+def test_busca_no_thread_ignora_caixa_e_acentos_e_pula_binarios(tmp_path):
+    texto = tmp_path / "a.txt"
+    texto.write_text("nada\nAÇÃO pendente\n", encoding="utf-8")
+    binario = tmp_path / "b.txt"
+    binario.write_bytes(b"\x00\x01" + "ação".encode("utf-8"))
+    resultado = buscar([str(texto), str(binario)], "ação")
+    assert [r["linha"] for r in resultado["resultados"]] == [2]
+    assert resultado["binarios_pulados"] == 1
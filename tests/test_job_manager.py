@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+
+import pytest
+
+import job_manager
+
+
+@pytest.fixture(autouse=True)
+def jobs_isolados(monkeypatch, tmp_path):
+    monkeypatch.setattr(job_manager, "ARQUIVO_JOBS", str(tmp_path / "jobs.json"))
+    monkeypatch.setattr(job_manager, "_jobs", {})
+    monkeypatch.setattr(job_manager, "_futuros", {})
+    monkeypatch.setattr(job_manager, "_cancelamentos", {})
+    monkeypatch.setattr(job_manager, "_carregado", True)
+    monkeypatch.setattr(job_manager, "_executor", None)
+    monkeypatch.setattr(job_manager, "_callback_concluido", None)
+    yield
+    job_manager.liberar_fila()
+    if job_manager._executor is not None:
+        job_manager._executor.shutdown(wait=True)
+
+
+def _esperar_estado(job_id, *estados, limite=5.0):
+    fim = time.time() + limite
+    while time.time() < fim:
+        estado = job_manager.status(job_id)["estado"]
+        if estado in estados:
+            return estado
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} ficou em {job_manager.status(job_id)['estado']}")
+
+
+def _ok(skill, params):
+    return json.dumps({"sucesso": True, "mensagem": skill})
+
+
+def test_fila_adiada_segura_o_job_ate_liberar():
+    job_manager.adiar_fila("CPU alta")
+    job_id = job_manager.iniciar("baixar", {}, _ok)["id"]
+    time.sleep(0.1)
+    assert job_manager.status(job_id)["estado"] == "na_fila"
+    assert job_manager.status()["fila_adiada"] == "CPU alta"
+
+    job_manager.liberar_fila()
+    assert _esperar_estado(job_id, "concluido") == "concluido"
+    assert "fila_adiada" not in job_manager.status()
+    assert json.loads(job_manager.resultado(job_id)["resultado"])["mensagem"] == "baixar"
+
+
+def test_cancelar_job_adiado_nao_chega_a_executar():
+    chamadas = []
+    job_manager.adiar_fila("memória baixa")
+    job_id = job_manager.iniciar("instalar", {}, lambda s, p: chamadas.append(s))["id"]
+
+    resposta = job_manager.cancelar(job_id)
+    assert resposta["sucesso"] and "antes de começar" in resposta["mensagem"]
+    job_manager.liberar_fila()
+    job_manager._executor.shutdown(wait=True)
+    assert chamadas == []
+    assert job_manager.status(job_id)["estado"] == "cancelado"
+    assert not job_manager.cancelar(job_id)["sucesso"]
+
+
+def test_cancelar_job_em_execucao_e_cooperativo_e_nao_avisa():
+    avisos = []
+    job_manager.registrar_callback(avisos.append)
+    comecou = threading.Event()
+
+    def longa(skill, params):
+        comecou.set()
+        while not job_manager.cancelamento_solicitado():
+            time.sleep(0.01)
+        return json.dumps({"sucesso": True})
+
+    job_id = job_manager.iniciar("agente", {}, longa)["id"]
+    assert comecou.wait(2)
+    assert "próximo ponto seguro" in job_manager.cancelar(job_id)["mensagem"]
+    assert _esperar_estado(job_id, "cancelado", "concluido") == "cancelado"
+    assert avisos == []
+
+
+def test_erro_na_skill_vira_estado_erro_e_avisa():
+    avisos = []
+    job_manager.registrar_callback(avisos.append)
+    job_id = job_manager.iniciar("x", {}, lambda s, p: json.dumps({"sucesso": False}))["id"]
+    assert _esperar_estado(job_id, "erro", "concluido") == "erro"
+    job_manager._executor.shutdown(wait=True)
+    assert [a["id"] for a in avisos] == [job_id]
@@ -0,0 +1,31 @@
+from modules.json_stream import JsonArrayStream, iter_json_array
+
+DOC = ('{"titulo": "plano [x]", "plano": [{"passo": 1, "tarefa": "ler \\"a\\" e [b]"}, '
+       '{"passo": 2, "depende_de": [1]}, {"passo": 3, "extra": {"plano": [9]}}], "fim": true}')
+
+
+def test_elementos_saem_iguais_com_qualquer_corte_do_stream():
+    esperado = [{"passo": 1, "tarefa": 'ler "a" e [b]'}, {"passo": 2, "depende_de": [1]},
+                {"passo": 3, "extra": {"plano": [9]}}]
+    for tamanho in (1, 2, 7, len(DOC)):
+        pedacos = [DOC[i:i + tamanho] for i in range(0, len(DOC), tamanho)]
+        assert list(iter_json_array(pedacos, "plano")) == esperado
+
+
+def test_elemento_sai_assim_que_fecha():
+    stream = JsonArrayStream("plano")
+    assert stream.feed('{"plano": [{"passo": 1}') == [{"passo": 1}]
+    assert stream.feed(', {"pa') == []
+    assert stream.feed('sso": 2}]}') == [{"passo": 2}]
+    assert stream.finished
+    assert stream.parse() == {"plano": [{"passo": 1}, {"passo": 2}]}
+
+
+def test_array_de_escalares_e_chave_dentro_de_string():
+    texto = '{"nota": "\\"plano\\": [0]", "plano": [1, "dois", null, true]}'
+    assert list(iter_json_array([texto], "plano")) == [1, "dois", None, True]
+
+
+def test_elemento_invalido_e_ignorado():
+    stream = JsonArrayStream("plano")
+    assert stream.feed('{"plano": [{"passo": 1}, {"passo": }, {"passo": 3}]}') == [{"passo": 1}, {"passo": 3}]
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from modules import llm_bridge
+from modules.llm_bridge import LLMBridge, _Limite
+from modules.llm_cache import ResponseCache
+
+
+class _Erro429(Exception):
+    code = 429
+
+
+class _Models:
+    def __init__(self, falhas=0, pedacos=("a", "b")):
+        self.falhas = falhas
+        self.pedacos = pedacos
+        self.chamadas = 0
+        self.ativas = 0
+        self.pico = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, model, contents, config):
+        self.chamadas += 1
+        if self.chamadas <= self.falhas:
+            raise _Erro429("429 RESOURCE_EXHAUSTED")
+        with self.lock:
+            self.ativas += 1
+            self.pico = max(self.pico, self.ativas)
+        time.sleep(0.05)
+        with self.lock:
+            self.ativas -= 1
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+    def generate_content_stream(self, model, contents, config):
+        for texto in self.pedacos:
+            yield SimpleNamespace(text=texto, usage_metadata=None)
+
+
+class _AioModels:
+    def __init__(self, models):
+        self.models = models
+
+    async def generate_content(self, model, contents, config):
+        return await asyncio.to_thread(self.models.generate_content, model, contents, config)
+
+
+def _ponte(models):
+    ponte = LLMBridge.__new__(LLMBridge)
+    ponte.client = SimpleNamespace(models=models, aio=SimpleNamespace(models=_AioModels(models)))
+    ponte.model = "teste"
+    ponte.temperature = 0.0
+    return ponte
+
+
+def test_repete_erros_temporarios(monkeypatch):
+    monkeypatch.setattr(llm_bridge.time, "sleep", lambda s: None)
+    models = _Models(falhas=2)
+    assert _ponte(models)._generate("oi", None).text == "ok"
+    assert models.chamadas == 3
+
+
+def test_nao_repete_erro_definitivo():
+    class _Models400(_Models):
+        def generate_content(self, model, contents, config):
+            self.chamadas += 1
+            raise ValueError("400 INVALID_ARGUMENT")
+
+    models = _Models400()
+    with pytest.raises(ValueError):
+        _ponte(models)._generate("oi", None)
+    assert models.chamadas == 1
+
+
+def test_limite_vale_para_chamadas_sincronas_e_assincronas_juntas(monkeypatch):
+    monkeypatch.setattr(llm_bridge, "_limite", _Limite(2))
+    models = _Models()
+    ponte = _ponte(models)
+
+    async def assincronas():
+        await asyncio.gather(*(ponte._agenerate("oi", None) for _ in range(3)))
+
+    threads = [threading.Thread(target=ponte._generate, args=("oi", None)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    asyncio.run(assincronas())
+    for t in threads:
+        t.join()
+    assert models.chamadas == 6
+    assert models.pico == 2
+
+
+def test_stream_devolve_a_vaga_depois_do_primeiro_pedaco(monkeypatch):
+    limite = _Limite(1)
+    monkeypatch.setattr(llm_bridge, "_limite", limite)
+    stream = _ponte(_Models()).chat_stream("oi", config=object())
+    assert next(stream) == "a"
+    # Com o consumidor parado no meio do stream, outra chamada consegue a vaga
+    assert limite._sem.acquire(blocking=False)
+    limite._sem.release()
+    assert list(stream) == ["b"]
+
+
+def test_espera_assincrona_cancelada_nao_perde_a_vaga():
+    limite = _Limite(1)
+
+    async def cenario():
+        limite._sem.acquire()
+        tarefa = asyncio.ensure_future(limite.__aenter__())
+        await asyncio.sleep(0.05)
+        tarefa.cancel()
+        await asyncio.sleep(0)
+        limite._sem.release()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(cenario())
+    assert limite._sem.acquire(blocking=False)
+
+
+def test_stream_json_guarda_o_plano_e_reusa_do_cache(monkeypatch, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.json"))
+    monkeypatch.setattr(llm_bridge, "cache_enabled", lambda: True)
+    monkeypatch.setattr(llm_bridge, "get_response_cache", lambda: cache)
+    models = _Models(pedacos=('{"plano": [{"passo": 1},', ' {"passo": 2}]}'))
+    ponte = _ponte(models)
+    ponte._json_config = lambda system_instruction, schema: None
+
+    assert list(ponte.stream_json("planeje", {}, "plano")) == [{"passo": 1}, {"passo": 2}]
+    models.pedacos = ()
+    assert list(ponte.stream_json("planeje", {}, "plano")) == [{"passo": 1}, {"passo": 2}]
+    # Outro schema é outra chave
+    with pytest.raises(ValueError):
+        list(ponte.stream_json("planeje", {"type": "object"}, "plano"))
+
+
+def test_stream_json_truncado_nao_vai_para_o_cache(monkeypatch, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.json"))
+    monkeypatch.setattr(llm_bridge, "cache_enabled", lambda: True)
+    monkeypatch.setattr(llm_bridge, "get_response_cache", lambda: cache)
+    ponte = _ponte(_Models(pedacos=('{"plano": [{"passo": 1},',)))
+    ponte._json_config = lambda system_instruction, schema: None
+
+    with pytest.raises(ValueError):
+        list(ponte.stream_json("planeje", {}, "plano"))
+    assert cache.stats()["entradas"] == 0
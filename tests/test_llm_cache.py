@@ -0,0 +1,21 @@
+from modules.llm_cache import ResponseCache
+
+
+def _cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "cache.json"))
+
+
+def test_indentacao_faz_parte_da_chave(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("m", None, 0.7, "if x:\n    y()", "indentado")
+    assert cache.get("m", None, 0.7, "if x:\ny()") is None
+    assert cache.get("m", None, 0.7, "  if x:\n    y()\n") == "indentado"
+
+
+def test_discard_remove_a_entrada_e_persiste(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("m", "sys", 0.7, "prompt", "resposta")
+    assert cache.discard("m", "sys", 0.7, "prompt")
+    assert not cache.discard("m", "sys", 0.7, "prompt")
+    cache.flush()
+    assert _cache(tmp_path).get("m", "sys", 0.7, "prompt") is None
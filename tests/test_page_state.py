@@ -0,0 +1,46 @@
+from modules.page_state import PageStateTracker, RollingHistory
+
+
+def test_primeiro_bloco_maior_que_o_orcamento_vai_cortado():
+    tracker = PageStateTracker(max_chars=4000)
+    texto = tracker.update("https://exemplo.com", "x" * 6000 + "\nrodapé")
+    assert "sem conteúdo novo" not in texto
+    corpo = texto.split("\n", 1)[1]
+    assert corpo.startswith("x" * 100)
+    assert len(corpo) <= 4000
+
+
+def test_bloco_grande_no_meio_nao_impede_os_menores():
+    tracker = PageStateTracker(max_chars=100)
+    texto = tracker.update("https://exemplo.com", "título\n" + "y" * 500 + "\nrodapé")
+    assert "título" in texto and "rodapé" in texto
+    # O bloco grande não foi marcado como visto: sai (cortado) no próximo passo
+    proximo = tracker.update("https://exemplo.com", "título\n" + "y" * 500 + "\nrodapé")
+    assert "y" * 50 in proximo
+
+
+def test_so_blocos_novos_depois_da_primeira_vez():
+    tracker = PageStateTracker()
+    tracker.update("https://exemplo.com", "a\nb")
+    texto = tracker.update("https://exemplo.com", "a\nb\nc")
+    assert texto.endswith("\nc")
+    assert "+1 / -0" in texto
+    assert "sem conteúdo novo" in tracker.update("https://exemplo.com", "a\nb\nc")
+    assert "b" in tracker.update("https://outra.com", "a\nb")
+
+
+def test_historico_resume_entradas_antigas():
+    historico = RollingHistory(keep_recent=2, entry_chars=10)
+    for i in range(5):
+        historico.append(f"ação número {i} com texto longo")
+    texto = historico.render()
+    assert "Resumo de 3 ações anteriores" in texto
+    assert "- ação número 4 com texto longo" in texto
+    assert "- ação número 0" not in texto
+
+
+def test_anotacoes_antigas_saem_quando_estoura_o_orcamento():
+    historico = RollingHistory(notes_chars=25)
+    for nota in ("primeira nota", "segunda nota", "terceira nota"):
+        historico.add_note(nota)
+    assert historico.notes == ["segunda nota", "terceira nota"]
@@ -0,0 +1,50 @@
+import json
+import time
+
+from modules.page_wait import PageWaiter
+
+
+class _DriverOcupado:
+    """Documento carregado cujo DOM muda o tempo todo (carrossel) e um request que nunca termina."""
+    current_url = "https://exemplo.com/feed"
+
+    def __init__(self, logs=None):
+        self.logs = list(logs or [])
+
+    def execute_script(self, script, target=None):
+        return {"ready": "complete", "quiet": 0, "target": False}
+
+    def get_log(self, tipo):
+        logs, self.logs = self.logs, []
+        return logs
+
+
+def _evento(metodo, request_id):
+    return {"message": json.dumps({"message": {"method": metodo, "params": {"requestId": request_id}}})}
+
+
+def test_dom_sempre_mutando_nao_espera_o_timeout_inteiro():
+    waiter = PageWaiter(_DriverOcupado(), max_timeout=5.0, poll=0.01, busy_fallback=0.2)
+    inicio = time.time()
+    waiter.wait()
+    assert time.time() - inicio < 1.0
+    assert waiter.history[-1]["motivo"] == "carregado"
+    # O domínio ganhou média: a próxima espera não usa mais o max_timeout
+    assert waiter._timeout_for("exemplo.com") < waiter.max_timeout
+
+
+def test_timeout_tambem_alimenta_a_media():
+    waiter = PageWaiter(_DriverOcupado(), min_timeout=0.1, max_timeout=5.0, poll=0.01, busy_fallback=10)
+    waiter.wait(timeout=0.2)
+    assert waiter.history[-1]["motivo"] == "timeout"
+    assert "exemplo.com" in waiter._avg
+
+
+def test_request_sem_fim_expira():
+    driver = _DriverOcupado([_evento("Network.requestWillBeSent", str(i)) for i in range(5)])
+    waiter = PageWaiter(driver, idle_ms=0, inflight_ttl=0.1)
+    waiter._cdp = True
+    assert not waiter._network_idle()
+    time.sleep(0.15)
+    assert waiter._network_idle()
+    assert not waiter._inflight
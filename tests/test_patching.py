@@ -0,0 +1,43 @@
+import pytest
+
+from modules.patching import PatchError, apply_edits, apply_unified_diff
+
+CODIGO = "import os\n\ndef soma(a, b):\n    return a - b\n\nprint(soma(1, 2))\n"
+
+
+def test_diff_aplica_mesmo_com_o_contexto_deslocado():
+    diff = ("--- a/script.py\n+++ b/script.py\n"
+            "@@ -1,3 +1,3 @@\n def soma(a, b):\n-    return a - b\n+    return a + b\n \n")
+    assert apply_unified_diff(CODIGO, diff) == CODIGO.replace("a - b", "a + b")
+
+
+def test_diff_com_varios_hunks_acumula_o_deslocamento():
+    diff = ("@@ -1,1 +1,2 @@\n import os\n+import sys\n"
+            "@@ -6,1 +7,1 @@\n-print(soma(1, 2))\n+print(soma(3, 4))\n")
+    resultado = apply_unified_diff(CODIGO, diff)
+    assert resultado.startswith("import os\nimport sys\n")
+    assert resultado.endswith("print(soma(3, 4))\n")
+
+
+def test_diff_ignora_espacos_no_fim_e_falha_sem_o_trecho():
+    diff = "@@ -4 +4 @@\n-    return a - b   \n+    return a * b\n"
+    assert "a * b" in apply_unified_diff(CODIGO, diff)
+    with pytest.raises(PatchError):
+        apply_unified_diff(CODIGO, "@@ -4 +4 @@\n-    return 0\n+    return 1\n")
+    with pytest.raises(PatchError):
+        apply_unified_diff(CODIGO, "sem hunks")
+
+
+def test_edicoes_exigem_trecho_unico():
+    assert "a + b" in apply_edits(CODIGO, [{"buscar": "a - b", "substituir": "a + b"}])
+    with pytest.raises(PatchError, match="2 vezes"):
+        apply_edits("x = 1\nx = 1\n", [{"buscar": "x = 1", "substituir": "x = 2"}])
+    with pytest.raises(PatchError, match="não encontrado"):
+        apply_edits(CODIGO, [{"buscar": "return 0", "substituir": "return 1"}])
+
+
+def test_edicoes_em_sequencia_e_com_espacos_no_fim():
+    edits = [{"buscar": "    return a - b  \n", "substituir": "    return a + b\n"},
+             {"buscar": "soma(1, 2)", "substituir": "soma(5, 6)"}]
+    resultado = apply_edits(CODIGO, edits)
+    assert "return a + b" in resultado and "soma(5, 6)" in resultado
@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from modules.json_stream import iter_json_array
+from modules.planner import PlannerAgent, PlanScheduler, PlanStreamError
+
+
+def _plano_interrompido():
+    yield {"passo": 1, "agente": "casual", "tarefa": "a", "depende_de": []}
+    raise ValueError("conexão caiu")
+
+
+def test_stream_truncado_levanta_erro():
+    pedacos = ['{"plano": [{"passo": 1}, ', '{"passo": 2']
+    with pytest.raises(ValueError):
+        list(iter_json_array(pedacos, "plano"))
+    assert list(iter_json_array(['{"plano": [{"passo": 1}]}'], "plano")) == [{"passo": 1}]
+
+
+def test_plano_interrompido_e_erro_com_os_passos_ja_executados():
+    scheduler = PlanScheduler(lambda step, upstream: f"ok {step['tarefa']}")
+    with pytest.raises(PlanStreamError) as erro:
+        scheduler.run(_plano_interrompido())
+    assert [r for _, r in erro.value.executed] == ["ok a"]
+
+
+def test_execute_plan_informa_plano_incompleto():
+    class _LLM:
+        def stream_json(self, prompt, schema, key):
+            return iter_json_array(['{"plano": [{"passo": 1, "agente": "casual", ',
+                                    '"tarefa": "a", "depende_de": []}, {"passo'], key)
+
+        def chat(self, prompt):
+            return "resposta"
+
+    planner = PlannerAgent(llm=_LLM(), browser=object(), coder=object())
+    resultado = planner.execute_plan("objetivo")
+    assert resultado.startswith("Erro no planejamento: plano incompleto")
+    assert "Passo 1 (casual): resposta" in resultado
+
+
+class _Registro:
+    """run_step falso: guarda quando cada passo começou/terminou e o que recebeu das dependências."""
+
+    def __init__(self, duracao=None):
+        self.duracao = duracao or {}
+        self.eventos = []
+        self.upstream = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, step, upstream):
+        passo = step["passo"]
+        with self._lock:
+            self.eventos.append(("inicio", passo))
+            self.upstream[passo] = [d for d, _, _ in upstream]
+        time.sleep(self.duracao.get(passo, 0))
+        with self._lock:
+            self.eventos.append(("fim", passo))
+        return f"r{passo}"
+
+    def antes(self, a, b):
+        return self.eventos.index(("fim", a)) < self.eventos.index(("inicio", b))
+
+
+def test_passo_so_roda_depois_das_dependencias_e_independentes_em_paralelo():
+    registro = _Registro(duracao={1: 0.2})
+    plano = [
+        {"passo": 1, "agente": "browser", "tarefa": "a", "depende_de": []},
+        {"passo": 2, "agente": "browser", "tarefa": "b", "depende_de": []},
+        {"passo": 3, "agente": "casual", "tarefa": "c", "depende_de": [1, 2]},
+    ]
+    executados = PlanScheduler(registro).run(plano)
+    assert [s["passo"] for s, _ in executados] == [1, 2, 3]
+    assert registro.antes(1, 3) and registro.antes(2, 3)
+    # O passo 2 não esperou o 1 (mais lento) terminar
+    assert not registro.antes(1, 2)
+    assert sorted(registro.upstream[3]) == [1, 2]
+
+
+def test_sem_depende_de_espera_todos_os_anteriores():
+    registro = _Registro()
+    plano = [
+        {"passo": 1, "agente": "coder", "tarefa": "a"},
+        {"passo": 2, "agente": "coder", "tarefa": "b"},
+        {"passo": 3, "agente": "coder", "tarefa": "c"},
+    ]
+    PlanScheduler(registro).run(plano)
+    assert registro.antes(1, 2) and registro.antes(2, 3)
+    assert registro.upstream[3] == [1, 2]
+
+
+def test_dependencia_inexistente_e_ciclo_nao_travam():
+    registro = _Registro()
+    plano = [
+        {"passo": 1, "agente": "casual", "tarefa": "a", "depende_de": [2]},
+        {"passo": 2, "agente": "casual", "tarefa": "b", "depende_de": [1]},
+        {"passo": 3, "agente": "casual", "tarefa": "c", "depende_de": [7]},
+    ]
+    executados = PlanScheduler(registro).run(plano)
+    assert sorted(s["passo"] for s, _ in executados) == [1, 2, 3]
+    assert registro.antes(1, 2)
+    assert registro.upstream[3] == []
+
+
+def test_erro_num_passo_vira_resultado_e_nao_para_o_plano():
+    def run_step(step, upstream):
+        if step["passo"] == 1:
+            raise RuntimeError("quebrou")
+        return [r for _, _, r in upstream]
+
+    plano = [{"passo": 1, "agente": "coder", "tarefa": "a", "depende_de": []},
+             {"passo": 2, "agente": "casual", "tarefa": "b", "depende_de": [1]}]
+    resultados = dict((s["passo"], r) for s, r in PlanScheduler(run_step).run(plano))
+    assert resultados[1] == "Erro no passo 1: quebrou"
+    assert resultados[2] == ["Erro no passo 1: quebrou"]
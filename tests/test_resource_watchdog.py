@@ -0,0 +1,88 @@
+import pytest
+
+import resource_watchdog
+from resource_watchdog import Vigia
+
+
+def _vigia():
+    """Vigia sem as ações padrão (elas mexem em módulos do processo) e sem thread."""
+    vigia = Vigia()
+    vigia._acoes = {}
+    chamadas = []
+    vigia.registrar_acao("fixa", lambda m: chamadas.append(("degradar", m)), lambda: chamadas.append("restaurar"))
+    vigia.registrar_acao("limpeza", lambda m: chamadas.append("limpar"), repetir=True)
+    return vigia, chamadas
+
+
+def _amostra(t, ram):
+    return {"timestamp": t, "ram_percent": ram, "cpu_percent": 5.0, "agente_rss_mb": 100.0}
+
+
+def test_entra_no_modo_economico_depois_de_duas_amostras():
+    vigia, chamadas = _vigia()
+    eventos = []
+    vigia.ao_mudar(eventos.append)
+    vigia.avaliar(_amostra(1, 90))
+    assert not vigia.sob_pressao
+    vigia.avaliar(_amostra(2, 91))
+    assert vigia.sob_pressao
+    assert chamadas == [("degradar", "RAM 91%"), "limpar"]
+    assert [e["tipo"] for e in eventos] == ["pressao"]
+
+
+def test_mesma_amostra_conta_uma_vez_so():
+    vigia, chamadas = _vigia()
+    vigia.avaliar(_amostra(1, 90))
+    vigia.avaliar(_amostra(1, 90))
+    assert not vigia.sob_pressao
+    # Uma amostra normal no meio zera a contagem
+    vigia.avaliar(_amostra(2, 50))
+    vigia.avaliar(_amostra(3, 90))
+    assert not vigia.sob_pressao and chamadas == []
+
+
+def test_sai_depois_de_cinco_amostras_abaixo_do_limite_menos_a_margem():
+    vigia, chamadas = _vigia()
+    vigia.avaliar(_amostra(1, 90))
+    vigia.avaliar(_amostra(2, 90))
+    chamadas.clear()
+    t = 3
+    # Abaixo do limite mas dentro da margem (85 - 10): continua econômico
+    for _ in range(6):
+        vigia.avaliar(_amostra(t, 80))
+        t += 1
+    assert vigia.sob_pressao
+    for _ in range(4):
+        vigia.avaliar(_amostra(t, 70))
+        t += 1
+    vigia.avaliar(_amostra(t, 80))     # volta para a margem: recomeça a contar
+    for _ in range(4):
+        t += 1
+        vigia.avaliar(_amostra(t, 70))
+    assert vigia.sob_pressao
+    vigia.avaliar(_amostra(t + 1, 70))
+    assert not vigia.sob_pressao
+    assert chamadas == ["restaurar"]
+
+
+def test_acoes_repetir_rodam_de_novo_depois_do_intervalo_de_limpeza():
+    vigia, chamadas = _vigia()
+    vigia.avaliar(_amostra(1, 90))
+    vigia.avaliar(_amostra(2, 90))
+    chamadas.clear()
+    vigia.avaliar(_amostra(3, 90))
+    assert chamadas == []
+    vigia._ultima_limpeza -= resource_watchdog.INTERVALO_LIMPEZA
+    vigia.avaliar(_amostra(4, 90))
+    assert chamadas == ["limpar"]
+
+
+def test_captura_limitada_so_para_baixo_e_restaurada():
+    pytest.importorskip("PIL")
+    from screen_capture import ScreenCapture
+
+    captura = ScreenCapture(fps=5.0, resolution=320)
+    captura.limitar(resource_watchdog.FPS_ECONOMICO, resource_watchdog.RESOLUCAO_ECONOMICA)
+    assert (captura.fps, captura.resolution) == (0.5, 320)
+    captura.restaurar()
+    assert (captura.fps, captura.resolution) == (5.0, 320)
@@ -0,0 +1,62 @@
+import os
+import time
+
+from system_metrics import AmostradorSistema
+
+
+def _amostrador(processos=(), historico=()):
+    amostrador = AmostradorSistema(intervalo=1)
+    amostrador._processos = list(processos)
+    amostrador.historico.extend(historico)
+    amostrador._pronto.set()   # sem thread: os testes leem o que foi injetado
+    return amostrador
+
+
+PROCESSOS = [
+    {"pid": 1, "nome": "python.exe", "cpu": 3.0, "memoria": 9.0, "rss_mb": 900.0},
+    {"pid": 2, "nome": "chrome.exe", "cpu": 40.0, "memoria": 2.0, "rss_mb": 200.0},
+    {"pid": 3, "nome": "Python", "cpu": 10.0, "memoria": 1.0, "rss_mb": 100.0},
+]
+
+
+def test_processos_ordena_pela_chave_pedida():
+    amostrador = _amostrador(PROCESSOS)
+    assert [p["pid"] for p in amostrador.processos()["processos"]] == [2, 3, 1]
+    assert [p["pid"] for p in amostrador.processos(ordenar_por="rss_mb")["processos"]] == [1, 2, 3]
+    # Chave desconhecida cai em CPU
+    assert [p["pid"] for p in amostrador.processos(ordenar_por="nome")["processos"]] == [2, 3, 1]
+
+
+def test_processos_filtra_sem_caixa_e_total_conta_antes_do_limite():
+    amostrador = _amostrador(PROCESSOS)
+    resultado = amostrador.processos(filtro="PYTHON", limite=1)
+    assert [p["pid"] for p in resultado["processos"]] == [3]
+    assert resultado["total"] == 2
+    # A lista interna não é reordenada por quem lê
+    assert [p["pid"] for p in amostrador._processos] == [1, 2, 3]
+
+
+def test_snapshot_calcula_medias_por_janela():
+    agora = time.time()
+    amostrador = _amostrador(historico=[
+        (agora - 600, 90.0, 50.0, 0.0, 0.0),
+        (agora - 120, 30.0, 40.0, 0.0, 0.0),
+        (agora - 10, 10.0, 20.0, 0.0, 0.0),
+    ])
+    amostrador._snapshot = {"timestamp": agora, "cpu_percent": 10.0}
+    dados = amostrador.snapshot()
+    assert dados["cpu_media_1m"] == 10.0
+    assert dados["cpu_media_5m"] == 20.0
+    assert dados["cpu_media_15m"] == round(130 / 3, 1)
+    assert dados["ram_media_5m"] == 30.0
+    assert [h["cpu"] for h in amostrador.historico_recente(300)] == [30.0, 10.0]
+
+
+def test_varredura_real_inclui_o_proprio_processo():
+    amostrador = AmostradorSistema(intervalo=1)
+    amostrador._varrer_processos(2 ** 40)
+    amostrador._varrer_processos(2 ** 40)   # segunda passada: CPU por delta
+    proprio = [p for p in amostrador._processos if p["pid"] == os.getpid()]
+    assert len(proprio) == 1
+    assert 0.0 <= proprio[0]["cpu"] <= 100.0
+    assert proprio[0]["rss_mb"] > 0
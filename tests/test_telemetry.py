@@ -0,0 +1,64 @@
+import pytest
+
+import telemetry
+from telemetry import Histograma
+
+
+@pytest.fixture
+def ligada(monkeypatch):
+    monkeypatch.setattr(telemetry, "ATIVO", True)
+    monkeypatch.setattr(telemetry, "_metricas", {})
+    monkeypatch.setattr(telemetry, "_spans", telemetry.deque(maxlen=10))
+
+
+def test_histograma_conta_limite_no_proprio_bucket_e_estima_percentis():
+    hist = Histograma("latencia", "", buckets=(0.1, 1.0, 5.0))
+    for valor in (0.05, 0.1, 0.5, 0.7, 0.9, 2.0, 3.0, 4.0, 4.5, 10.0):
+        hist.observar(valor, skill="ler")
+    resumo = hist.resumo()['{skill="ler"}']
+    assert resumo["n"] == 10
+    assert resumo["media"] == round(25.75 / 10, 4)
+    assert (resumo["p50"], resumo["p95"], resumo["p99"]) == (1.0, float("inf"), float("inf"))
+
+    buckets = {a[3][0][1]: a[2] for a in hist.amostras() if a[0].endswith("_bucket")}
+    assert buckets == {"0.1": 2, "1.0": 5, "5.0": 9, "+Inf": 10}
+
+
+def test_texto_prometheus_tem_tipos_rotulos_escapados_e_buckets_acumulados(ligada):
+    telemetry.contador("adk_skills_total", "Skills executadas").inc(skill='di"z')
+    telemetry.medidor("adk_fila").definir_funcao(lambda: 3)
+    telemetry.histograma("adk_lat_segundos", buckets=(1.0,)).observar(0.5, fase="stt")
+
+    texto = telemetry.texto_prometheus()
+    assert "# HELP adk_skills_total Skills executadas\n# TYPE adk_skills_total counter\n" in texto
+    assert 'adk_skills_total{skill="di\\"z"} 1\n' in texto
+    assert "adk_fila 3.0\n" in texto
+    assert 'adk_lat_segundos_bucket{fase="stt",le="1.0"} 1\n' in texto
+    assert 'adk_lat_segundos_bucket{fase="stt",le="+Inf"} 1\n' in texto
+    assert 'adk_lat_segundos_count{fase="stt"} 1\n' in texto
+    assert texto.endswith('adk_lat_segundos_sum{fase="stt"} 0.5\n')
+
+
+def test_span_observa_a_duracao_e_encadeia_pai(ligada):
+    hist = telemetry.histograma("adk_span_segundos")
+    with telemetry.span("turno", hist, canal="voz") as pai:
+        with telemetry.span("skill") as filho:
+            pass
+    assert filho.pai == pai.id and filho.trace == pai.trace
+    assert [s["nome"] for s in telemetry._spans] == ["skill", "turno"]
+    assert hist.resumo()['{canal="voz"}']["n"] == 1
+
+
+def test_desligada_nao_registra_nada(monkeypatch):
+    monkeypatch.setattr(telemetry, "ATIVO", False)
+    monkeypatch.setattr(telemetry, "_metricas", {})
+    contador = telemetry.contador("x_total")
+    contador.inc(skill="a")
+    telemetry.histograma("x_segundos").observar(1.0)
+    with telemetry.span("nada", telemetry.histograma("y")) as s:
+        pass
+    assert s is telemetry.span("outro")
+    assert telemetry._metricas == {}
+    assert telemetry.texto_prometheus() == "\n"
+    telemetry.iniciar()
+    assert telemetry._thread is None
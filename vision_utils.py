@@ -11,6 +11,9 @@ from PIL import Image
 from typing import Dict, List, Tuple, Optional, Any
 import io
 import base64
+import threading
+
+import telemetry
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -18,6 +21,10 @@ import base64
 # ═══════════════════════════════════════════════════════════════════
 
 _easyocr_reader = None
+_ocr_lock = threading.Lock()          # um OCR por vez; também protege a liberação do reader
+_ocr_liberado = threading.Event()     # limpo quando o watchdog pausa o OCR de segundo plano
+_ocr_liberado.set()
+_OCR_SEGUNDOS = telemetry.histograma("adk_ocr_segundos", "Tempo do EasyOCR (readtext) por chamada")
 
 
 def _get_easyocr_reader(languages=['pt', 'en']):
@@ -33,6 +40,40 @@ def _get_easyocr_reader(languages=['pt', 'en']):
     return _easyocr_reader
 
 
+def pausar_ocr_segundo_plano():
+    """OCR pedido de dentro de um job espera até retomar_ocr(); o da conversa continua rodando."""
+    _ocr_liberado.clear()
+
+
+def retomar_ocr():
+    _ocr_liberado.set()
+
+
+def liberar_ocr() -> bool:
+    """Descarta o EasyOCR Reader (centenas de MB) se nenhum OCR estiver rodando. Recarrega no próximo uso."""
+    global _easyocr_reader
+    if _easyocr_reader is None or not _ocr_lock.acquire(blocking=False):
+        return False
+    try:
+        _easyocr_reader = None
+    finally:
+        _ocr_lock.release()
+    return True
+
+
+def _aguardar_ocr_liberado():
+    try:
+        from job_manager import evento_cancelamento
+    except ImportError:
+        return
+    cancelar = evento_cancelamento()
+    if cancelar is None:
+        return
+    while not _ocr_liberado.wait(1.0):
+        if cancelar.is_set():
+            raise RuntimeError("Job cancelado enquanto o OCR estava pausado")
+
+
 def capturar_tela_cv() -> np.ndarray:
     """Captura a tela inteira e retorna como array numpy (BGR)."""
     with mss.mss() as sct:
@@ -60,6 +101,9 @@ def detectar_texto_tela(regiao: Tuple[int, int, int, int] = None, idiomas: List[
         }
     """
     try:
+        # Sob pressão de memória/CPU o OCR dos jobs espera (antes de capturar, para não ler tela velha)
+        _aguardar_ocr_liberado()
+
         # Capturar tela
         img = capturar_tela_cv()
         
@@ -70,13 +114,15 @@ def detectar_texto_tela(regiao: Tuple[int, int, int, int] = None, idiomas: List[
         
         # Usar EasyOCR
         idiomas = idiomas or ['pt', 'en']
-        reader = _get_easyocr_reader(idiomas)
-        
-        if reader is None:
-            return {"sucesso": False, "mensagem": "EasyOCR não disponível. Instale: pip install easyocr"}
-        
-        # Detectar texto
-        results = reader.readtext(img)
+        with _ocr_lock:
+            reader = _get_easyocr_reader(idiomas)
+            
+            if reader is None:
+                return {"sucesso": False, "mensagem": "EasyOCR não disponível. Instale: pip install easyocr"}
+            
+            # Detectar texto
+            with telemetry.span("ocr", _OCR_SEGUNDOS):
+                results = reader.readtext(img)
         
         # Processar resultados
         textos_detectados = []